@@ -0,0 +1,375 @@
+"""
+Bootstrap of the estimates of a fitted model.
+
+The bootstrap samples are drawn with one of the schemes
+
+pairs
+    observations, rows of endog and exog, are drawn with replacement.
+residual
+    residuals are drawn with replacement and added to the fitted values.
+wild
+    residuals are multiplied by Rademacher weights, +1 or -1 with equal
+    probability, and added to the fitted values.
+block
+    moving block bootstrap of the observations for time series, blocks of
+    `block_length` consecutive rows are drawn with replacement.
+stationary
+    stationary bootstrap of Politis and Romano, blocks with geometrically
+    distributed length with mean `block_length` that wrap around the end of
+    the sample.
+
+Each replication uses its own random seed, which is drawn from `seed`
+before the replications are distributed to the executor, so the results do
+not depend on the executor or the number of jobs. The model of each
+replication is fit with the original parameters as start_params, and only
+the requested statistic is stored.
+
+References
+----------
+Efron, B. and Tibshirani, R.J. 1993. `An Introduction to the Bootstrap`.
+    Chapman & Hall.
+Politis, D.N. and Romano, J.P. 1994. "The Stationary Bootstrap."
+    `Journal of the American Statistical Association`. 89.428.
+"""
+
+import inspect
+import warnings
+import numpy as np
+from scipy import stats
+from statsmodels.tools.decorators import cache_readonly
+from statsmodels.tools.parallel import parallel_func
+from statsmodels.tools.sm_exceptions import PerfectSeparationError
+
+__all__ = ['bootstrap', 'BootstrapResults']
+
+_schemes = ['pairs', 'residual', 'wild', 'block', 'stationary']
+
+# numerical failures of a fit in a bootstrap sample, other exceptions are
+# errors in the specification and are raised
+_fit_errors = (np.linalg.LinAlgError, PerfectSeparationError,
+               FloatingPointError)
+
+
+def _params(results):
+    return results.params
+
+
+def _clone_model(model, endog, exog, rows=None):
+    """
+    Create a model of the same class for new data.
+
+    Constructor arguments that are attached to the model, for example
+    family, weights, sigma or offset, are passed on. Arrays that have one
+    entry per observation are indexed by `rows`. Attributes listed in
+    `model.cloneattr` are copied.
+    """
+    klass = model.__class__
+    # self, endog, exog
+    argnames = inspect.getargspec(klass.__init__).args[3:]
+    nobs = len(model.endog)
+    kwds = {}
+    for name in argnames:
+        if name == 'missing' or name not in model.__dict__:
+            continue
+        value = model.__dict__[name]
+        if value is None:
+            continue
+        if name == 'exposure':
+            value = np.exp(value) # models store log(exposure)
+        if (rows is not None and isinstance(value, np.ndarray) and
+                value.ndim > 0 and value.shape[0] == nobs):
+            value = value[rows]
+            if value.ndim == 2 and value.shape[1] == nobs:
+                value = value[:, rows]
+        kwds[name] = value
+    mod = klass(endog, exog, **kwds)
+    for attr in getattr(model, 'cloneattr', []):
+        setattr(mod, attr, getattr(model, attr))
+    return mod
+
+
+def _draw_rows(scheme, nobs, block_length, rng):
+    if scheme == 'pairs':
+        return rng.randint(0, nobs, size=nobs)
+    elif scheme == 'block':
+        n_blocks = -(-nobs // block_length)
+        starts = rng.randint(0, nobs - block_length + 1, size=n_blocks)
+        rows = starts[:, None] + np.arange(block_length)
+        return rows.ravel()[:nobs]
+    elif scheme == 'stationary':
+        new_block = rng.rand(nobs) < 1. / block_length
+        new_block[0] = True
+        block_idx = np.cumsum(new_block) - 1
+        block_start = np.nonzero(new_block)[0]
+        starts = rng.randint(0, nobs, size=len(block_start))
+        offset = np.arange(nobs) - block_start[block_idx]
+        return (starts[block_idx] + offset) % nobs
+
+
+def _refit(spec, endog, rows):
+    exog = spec['exog']
+    if rows is not None and exog is not None:
+        exog = exog[rows]
+    mod = _clone_model(spec['model'], endog, exog, rows)
+    res = mod.fit(**spec['fit_kw'])
+    return np.asarray(spec['statistic'](res), dtype=float).ravel()
+
+
+def _bootstrap_reps(spec, seeds):
+    """
+    Run the replications for the given seeds.
+
+    Returns the statistics, with nan rows for fits that failed with one of
+    the numerical errors in `_fit_errors`.
+    """
+    scheme = spec['scheme']
+    nobs = len(spec['endog'])
+    out = np.empty((len(seeds), spec['k_stat']))
+    for i, seed in enumerate(seeds):
+        rng = np.random.RandomState(seed)
+        if scheme == 'residual':
+            rows = None
+            endog = spec['fitted'] + spec['resid'][rng.randint(0, nobs,
+                                                              size=nobs)]
+        elif scheme == 'wild':
+            rows = None
+            weights = 2 * rng.randint(0, 2, size=nobs) - 1
+            endog = spec['fitted'] + spec['resid'] * weights
+        else:
+            rows = _draw_rows(scheme, nobs, spec['block_length'], rng)
+            endog = spec['endog'][rows]
+        try:
+            out[i] = _refit(spec, endog, rows)
+        except _fit_errors:
+            out[i] = np.nan
+    return out
+
+
+def _jackknife(spec):
+    nobs = len(spec['endog'])
+    out = np.empty((nobs, spec['k_stat']))
+    keep = np.ones(nobs, bool)
+    for i in range(nobs):
+        keep[i] = False
+        rows = np.nonzero(keep)[0]
+        out[i] = _refit(spec, spec['endog'][rows], rows)
+        keep[i] = True
+    return out
+
+
+def bootstrap(results, nrep=999, scheme='pairs', statistic=None,
+              block_length=None, seed=None, executor='serial', n_jobs=1,
+              fit_kw=None, warm_start=True):
+    """
+    Bootstrap the estimates of a fitted model.
+
+    Parameters
+    ----------
+    results : Results instance
+        The results of a fitted model, for example OLS, WLS, GLM, Logit or
+        a GenericLikelihoodModel.
+    nrep : int
+        The number of bootstrap replications.
+    scheme : str {'pairs', 'residual', 'wild', 'block', 'stationary'}
+        The resampling scheme, see the module docstring. 'residual' and
+        'wild' are only valid for models with additive errors, for example
+        OLS or GLM with Gaussian family.
+    statistic : callable, optional
+        Called with the results of each replication, returns a scalar or an
+        array. Only the statistic is stored. The default returns the params.
+        It has to be picklable for executor='processes', that is, defined
+        at module level.
+    block_length : int, optional
+        The block length of the 'block' scheme, or the mean block length of
+        the 'stationary' scheme. The default is nobs**(1/3.).
+    seed : None, int or RandomState
+        Used to draw the seeds of the replications. None uses the global
+        numpy random state.
+    executor : str {'serial', 'threads', 'processes'}
+        How the replications are run. 'threads' uses a thread pool with
+        n_jobs threads. 'processes' uses `tools.parallel.parallel_func`,
+        which requires joblib and runs serially if it is not available.
+    n_jobs : int
+        The number of threads or processes.
+    fit_kw : dict, optional
+        Keyword arguments for the fit method of the model. disp=0 is used
+        if fit has a disp option.
+    warm_start : bool
+        If True, the original params are used as start_params if fit has
+        this option.
+
+    Returns
+    -------
+    BootstrapResults instance
+
+    Notes
+    -----
+    Replications in which the fit fails numerically, with a LinAlgError,
+    PerfectSeparationError or FloatingPointError, are nan and excluded from
+    the summary statistics with a warning. Other exceptions are raised, and
+    a ValueError is raised if the fit fails in all replications.
+
+    Examples
+    --------
+    >>> res = OLS(y, x).fit()
+    >>> bs = bootstrap(res, nrep=999, scheme='wild', seed=1234)
+    >>> bs.std
+    >>> bs.conf_int(method='bca')
+    """
+    if scheme not in _schemes:
+        raise ValueError("scheme must be one of %s, got %s" %
+                         (', '.join(_schemes), scheme))
+    if executor not in ['serial', 'threads', 'processes']:
+        raise ValueError("executor %s not understood" % executor)
+    model = results.model
+    if statistic is None:
+        statistic = _params
+    endog = np.asarray(model.endog)
+    exog = getattr(model, 'exog', None)
+    nobs = len(endog)
+    if block_length is None:
+        block_length = max(1, int(round(nobs**(1/3.))))
+
+    fit_kw = dict(fit_kw or {})
+    fit_args = inspect.getargspec(model.fit).args
+    if 'disp' in fit_args:
+        fit_kw.setdefault('disp', 0)
+    if warm_start and 'start_params' in fit_args:
+        fit_kw.setdefault('start_params', np.asarray(results.params))
+
+    stat = np.asarray(statistic(results), dtype=float).ravel()
+    spec = dict(model=model, endog=endog, exog=exog, scheme=scheme,
+                block_length=block_length, statistic=statistic,
+                fit_kw=fit_kw, k_stat=len(stat))
+    if scheme in ['residual', 'wild']:
+        fitted = getattr(results, 'fittedvalues', None)
+        if fitted is None:
+            fitted = model.predict(results.params)
+        spec['fitted'] = fitted = np.asarray(fitted)
+        spec['resid'] = resid = endog - fitted
+        if scheme == 'residual':
+            spec['resid'] = resid - resid.mean()
+
+    if isinstance(seed, np.random.RandomState):
+        random_state = seed
+    elif seed is None:
+        random_state = np.random
+    else:
+        random_state = np.random.RandomState(seed)
+    seeds = random_state.randint(0, 2**31 - 1, size=nrep)
+
+    if executor == 'serial' or n_jobs == 1:
+        reps = _bootstrap_reps(spec, seeds)
+    else:
+        chunks = np.array_split(seeds, n_jobs)
+        if executor == 'threads':
+            from multiprocessing.pool import ThreadPool
+            pool = ThreadPool(n_jobs)
+            try:
+                out = pool.map(lambda chunk: _bootstrap_reps(spec, chunk),
+                               chunks)
+            finally:
+                pool.close()
+        else:
+            parallel, p_func, n_jobs = parallel_func(_bootstrap_reps,
+                                                     n_jobs=n_jobs, verbose=0)
+            out = parallel(p_func(spec, chunk) for chunk in chunks)
+        reps = np.concatenate(out)
+
+    bs = BootstrapResults(stat, reps, scheme, spec)
+    if bs.n_failed == nrep:
+        raise ValueError("the fit failed in all bootstrap replications")
+    elif bs.n_failed:
+        warnings.warn("the fit failed in %d of %d bootstrap replications, "
+                      "these are excluded" % (bs.n_failed, nrep))
+    return bs
+
+
+class BootstrapResults(object):
+    """
+    Results of `bootstrap`.
+
+    Attributes
+    ----------
+    statistic : array
+        The statistic of the original results.
+    replications : array
+        nrep x k array of the statistic in the bootstrap samples. Rows of
+        failed fits are nan.
+    scheme : str
+        The resampling scheme.
+    n_failed : int
+        The number of replications in which the fit failed numerically,
+        with a LinAlgError, PerfectSeparationError or FloatingPointError.
+    """
+
+    def __init__(self, statistic, replications, scheme, spec=None):
+        self.statistic = statistic
+        self.replications = replications
+        self.scheme = scheme
+        self._spec = spec
+        self._valid = ~np.isnan(replications).any(1)
+        self.nrep = len(replications)
+        self.n_failed = self.nrep - self._valid.sum()
+
+    @cache_readonly
+    def mean(self):
+        return self.replications[self._valid].mean(0)
+
+    @cache_readonly
+    def std(self):
+        return self.replications[self._valid].std(0, ddof=1)
+
+    @cache_readonly
+    def bias(self):
+        return self.mean - self.statistic
+
+    @cache_readonly
+    def acceleration(self):
+        """
+        Acceleration of the BCa interval from the jackknife.
+
+        This refits the model nobs times, once without each observation.
+        """
+        if self._spec is None:
+            raise ValueError("the jackknife needs the model")
+        jack = _jackknife(self._spec)
+        dev = jack.mean(0) - jack
+        return (dev**3).sum(0) / (6. * (dev**2).sum(0)**1.5)
+
+    def conf_int(self, alpha=.05, method='percentile'):
+        """
+        Bootstrap confidence intervals.
+
+        Parameters
+        ----------
+        alpha : float
+            The intervals have coverage 1 - alpha.
+        method : str {'percentile', 'basic', 'bca'}
+            'percentile' uses the alpha/2 and 1 - alpha/2 quantiles of the
+            replications, 'basic' reflects them around the statistic. 'bca'
+            is the bias corrected and accelerated interval of Efron, the
+            acceleration is estimated by the jackknife.
+
+        Returns
+        -------
+        conf_int : array
+            k x 2 array of lower and upper bounds.
+        """
+        reps = self.replications[self._valid]
+        q = np.array([alpha / 2., 1 - alpha / 2.])
+        if method == 'percentile':
+            return np.percentile(reps, 100 * q, axis=0).T
+        elif method == 'basic':
+            lower, upper = np.percentile(reps, 100 * q, axis=0)
+            return np.column_stack((2 * self.statistic - upper,
+                                    2 * self.statistic - lower))
+        elif method == 'bca':
+            z0 = stats.norm.ppf((reps < self.statistic).mean(0))
+            a = self.acceleration
+            zq = stats.norm.ppf(q)[:, None]
+            adj_q = stats.norm.cdf(z0 + (z0 + zq) / (1 - a * (z0 + zq)))
+            return np.column_stack([np.percentile(reps[:, j], 100 * adj_q[:, j])
+                                    for j in range(reps.shape[1])]).T
+        else:
+            raise ValueError("method %s not understood" % method)
@@ -4,10 +4,12 @@ results, and doing data cleaning
 """
 
 import numpy as np
+from scipy import sparse
 from pandas import DataFrame, Series, TimeSeries, isnull
 from statsmodels.tools.decorators import (resettable_cache,
                 cache_readonly, cache_writable)
 import statsmodels.tools.data as data_util
+from statsmodels.tools.tools import column_var
 
 try:
     reduce
@@ -28,6 +30,12 @@ def _asarray_2d_null_rows(x):
     Makes sure input is an array and is 2d. Makes sure output is 2d. True
     indicates a null in the rows of 2d x.
     """
+    if sparse.issparse(x):
+        # only the stored values can be NaN
+        x = x.tocoo()
+        null_rows = np.zeros(x.shape[0], dtype=bool)
+        null_rows[x.row[isnull(x.data)]] = True
+        return null_rows[:,None]
     #Have to have the asarrays because isnull doesn't account for array-like
     #input
     x = np.asarray(x)
@@ -88,7 +96,7 @@ class ModelData(object):
                 self.const_idx = None
         else:
             try: # to detect where the constant is
-                const_idx = np.where(self.exog.var(axis = 0) == 0)[0].squeeze()
+                const_idx = np.where(column_var(self.exog) == 0)[0].squeeze()
                 self.k_constant = const_idx.size
                 if self.k_constant > 1:
                     raise ValueError("More than one constant detected.")
@@ -237,13 +245,16 @@ class ModelData(object):
         return np.asarray(endog).squeeze()
 
     def _get_xarr(self, exog):
+        if sparse.issparse(exog):
+            # keep sparse exog sparse, CSR for fast row operations
+            return exog.tocsr().astype(float)
         if data_util._is_structured_ndarray(exog):
             exog = data_util.struct_to_ndarray(exog)
         return np.asarray(exog)
 
     def _check_integrity(self):
         if self.exog is not None:
-            if len(self.exog) != len(self.endog):
+            if self.exog.shape[0] != len(self.endog):
                 raise ValueError("endog and exog matrices are different sizes")
 
     def wrap_output(self, obj, how='columns'):
@@ -359,7 +370,7 @@ def _make_endog_names(endog):
     return ynames
 
 def _make_exog_names(exog):
-    exog_var = exog.var(0)
+    exog_var = column_var(exog)
     if (exog_var == 0).any():
         # assumes one constant in first or last position
         # avoid exception if more than one constant
@@ -387,6 +398,8 @@ def handle_data(endog, exog, missing='none', hasconst=None, **kwargs):
         klass = PandasData
     elif data_util._is_using_patsy(endog, exog):
         klass = PatsyData
+    elif data_util._is_using_sparse(endog, exog):
+        klass = ModelData
     # keep this check last
     elif data_util._is_using_ndarray(endog, exog):
         klass = ModelData
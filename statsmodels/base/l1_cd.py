@@ -0,0 +1,228 @@
+"""
+Holds files for l1 regularization of LikelihoodModel, using proximal Newton
+steps that are solved by cyclic coordinate descent.
+"""
+import numpy as np
+import statsmodels.base.l1_solvers_common as l1_solvers_common
+
+
+def fit_l1_cd(
+        f, score, start_params, args, kwargs, disp=False, maxiter=100,
+        callback=None, retall=False, full_output=False, hess=None):
+    """
+    Solve the l1 or elastic net regularized problem by coordinate descent.
+
+    Specifically, we solve the convex but non-smooth problem
+
+    .. math:: \\min_\\beta f(\\beta) + \\sum_k\\alpha_k (w |\\beta_k| +
+              (1 - w) \\beta_k^2 / 2)
+
+    with proximal Newton iterations. In each iteration the penalized
+    quadratic approximation of f at the current params is minimized by
+    cyclic coordinate descent over the active set, and the step is
+    shortened by a backtracking line search.
+
+    The active set consists of the nonzero and unpenalized params and
+    those that pass the strong rule of Tibshirani et al. (2012) if
+    `alpha_prev` is given. After convergence on the active set, params that
+    violate the optimality conditions are added and the problem is solved
+    again, so the screening does not change the solution.
+
+    Parameters
+    ----------
+    All the usual parameters from LikelhoodModel.fit
+    alpha : non-negative scalar or numpy array (same size as parameters)
+        The weight multiplying the penalty term
+    L1_wt : float
+        The weight w of the l1 penalty, 1 is the lasso and 0 ridge.
+    alpha_prev : None or array
+        The rescaled alpha of the previous fit of a regularization path, at
+        which start_params were estimated. Used for the strong rule.
+    trim_mode : 'auto, 'size', or 'off'
+        If not 'off', trim (set to zero) parameters that would have been zero
+            if the solver reached the theoretical minimum.
+        If 'auto', trim params using the Theory above.
+        If 'size', trim params if they have very small absolute value
+    size_trim_tol : float or 'auto' (default = 'auto')
+        For use when trim_mode === 'size'
+    auto_trim_tol : float
+        For sue when trim_mode == 'auto'.  Use
+    qc_tol : float
+        Print warning and don't allow auto trim when (ii) in "Theory" (above)
+        is violated by this much.
+    qc_verbose : Boolean
+        If true, print out a full QC report upon failure
+    tol : float (default 1e-8)
+        Convergence tolerance for the largest change of params.
+    cd_maxiter : int (default 100)
+        Maximum number of coordinate descent sweeps for each Newton step.
+
+    References
+    ----------
+    Friedman, J., Hastie, T. and Tibshirani, R. 2010. "Regularization Paths
+        for Generalized Linear Models via Coordinate Descent." Journal of
+        Statistical Software 33 (1).
+    Tibshirani, R. et al. 2012. "Strong rules for discarding predictors in
+        lasso-type problems." Journal of the Royal Statistical Society B 74
+        (2).
+    """
+    params = np.array(start_params, dtype=float).ravel('F')
+    k_params = len(params)
+    alpha = np.array(kwargs['alpha_rescaled']).ravel('F') * np.ones(k_params)
+    assert alpha.min() >= 0
+    L1_wt = kwargs.setdefault('L1_wt', 1.)
+    tol = kwargs.setdefault('tol', 1e-8)
+    cd_maxiter = kwargs.setdefault('cd_maxiter', 100)
+    alpha_prev = kwargs.get('alpha_prev', None)
+    l1_pen = alpha * L1_wt
+    l2_pen = alpha * (1 - L1_wt)
+
+    func = lambda x: _objective_func(f, x, l1_pen, l2_pen, *args)
+    fval = func(params)
+    gval = score(params)
+    active = (params != 0) | (l1_pen == 0)
+    if alpha_prev is None:
+        active[:] = True
+    else:
+        # strong rule
+        alpha_prev = np.array(alpha_prev).ravel('F') * np.ones(k_params)
+        active |= np.abs(gval) >= L1_wt * (2 * alpha - alpha_prev)
+
+    iterations = 0
+    n_kkt_fails = 0
+    converged = stalled = False
+    if retall:
+        history = [params]
+    while iterations < maxiter:
+        H = hess(params)
+        step = _cd_newton_step(params, gval, H, l1_pen, l2_pen,
+                               np.nonzero(active)[0], cd_maxiter, tol)
+        # decrease of the objective predicted by the penalized linear model
+        new_params = params + step
+        decrease = (np.dot(gval, step) + _penalty(new_params, l1_pen, l2_pen)
+                    - _penalty(params, l1_pen, l2_pen))
+        t = 1.
+        while True:
+            new_params = params + t * step
+            new_fval = func(new_params)
+            if new_fval <= fval + 1e-4 * t * decrease or t < 1e-10:
+                break
+            t /= 2.
+        iterations += 1
+        # convergence is judged by the proposed step, not by the change of
+        # params, which is zero if the line search fails
+        small_step = np.max(np.abs(step)) < tol
+        if not new_fval <= fval:
+            # no decrease at the precision of f
+            if not small_step:
+                # the same step would be proposed again, no progress
+                stalled = True
+                break
+            new_params, new_fval = params, fval
+        params, fval = new_params, new_fval
+        gval = score(params)
+        if retall:
+            history.append(params)
+        if small_step:
+            # optimality conditions of the params that were left out
+            violated = ~active & (np.abs(gval) > l1_pen)
+            if not violated.any():
+                converged = True
+                break
+            n_kkt_fails += 1
+            active |= violated
+
+    if disp:
+        if converged:
+            print "Optimization terminated successfully."
+        elif stalled:
+            print ("Warning: The line search failed, no further decrease of "
+                   "the objective.")
+        else:
+            print ("Warning: Maximum number of iterations has been "
+                   "exceeded.")
+        print "         Current function value: %f" % fval
+        print "         Iterations: %d" % iterations
+
+    ### Post-process
+    # QC and trimming use the derivative of the smooth part of the objective
+    score_net = lambda x: score(x) + l2_pen * x
+    qc_tol = kwargs['qc_tol']
+    qc_verbose = kwargs['qc_verbose']
+    passed = l1_solvers_common.qc_results(
+        params, l1_pen, score_net, qc_tol, qc_verbose)
+    trim_mode = kwargs['trim_mode']
+    size_trim_tol = kwargs['size_trim_tol']
+    auto_trim_tol = kwargs['auto_trim_tol']
+    params, trimmed = l1_solvers_common.do_trim_params(
+        params, k_params, l1_pen, score_net, passed, trim_mode, size_trim_tol,
+        auto_trim_tol)
+
+    ### Pack up return values for statsmodels optimizers
+    if full_output:
+        gopt = float('nan')     # Objective is non-differentiable
+        hopt = float('nan')
+        retvals = {
+            'fopt': fval, 'converged': converged, 'iterations': iterations,
+            'gopt': gopt, 'hopt': hopt, 'trimmed': trimmed,
+            'qc_passed': passed, 'n_active': active.sum(),
+            'n_kkt_fails': n_kkt_fails}
+        if retall:
+            retvals['allvecs'] = history
+        return params, retvals
+    else:
+        return params
+
+
+def _penalty(params, l1_pen, l2_pen):
+    return (l1_pen * np.abs(params)).sum() + 0.5 * (l2_pen * params**2).sum()
+
+
+def _objective_func(f, params, l1_pen, l2_pen, *args):
+    """
+    The regularized objective function, inf where f is not finite
+    """
+    fval = f(params, *args)
+    if not np.isfinite(fval):
+        return np.inf
+    return fval + _penalty(params, l1_pen, l2_pen)
+
+
+def _cd_newton_step(params, gval, H, l1_pen, l2_pen, active, cd_maxiter,
+                    tol):
+    """
+    Minimize the penalized quadratic approximation by coordinate descent.
+
+    Minimizes, over z with z = params outside of active,
+
+        g'(z - params) + (z - params)'H(z - params) / 2 + penalty(z)
+
+    and returns the step z - params.
+    """
+    H_act = H[active[:, None], active]
+    z = params[active].copy()
+    p_act = params[active]
+    g_act = gval[active]
+    l1_act = l1_pen[active]
+    l2_act = l2_pen[active]
+    diag = np.diag(H_act) + l2_act
+    # H (z - params), updated after each coordinate
+    hz = np.zeros(len(z))
+    for sweep in range(cd_maxiter):
+        max_change = 0.
+        for j in range(len(z)):
+            if diag[j] <= 0:
+                continue
+            grad = g_act[j] + hz[j] + l2_act[j] * z[j]
+            u = diag[j] * z[j] - grad
+            z_new = np.sign(u) * max(abs(u) - l1_act[j], 0.) / diag[j]
+            delta = z_new - z[j]
+            if delta != 0:
+                hz += H_act[:, j] * delta
+                z[j] = z_new
+                max_change = max(max_change, abs(delta))
+        if max_change < tol:
+            break
+    step = np.zeros(len(params))
+    step[active] = z - p_act
+    return step
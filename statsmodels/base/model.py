@@ -1,5 +1,5 @@
 import numpy as np
-from scipy import optimize, stats
+from scipy import optimize, stats, linalg
 from statsmodels.base.data import handle_data
 from statsmodels.tools.tools import recipr, nan_dot
 from statsmodels.stats.contrast import ContrastResults
@@ -186,9 +186,11 @@ class LikelihoodModel(Model):
         start_params : array-like, optional
             Initial guess of the solution for the loglikelihood maximization.
             The default is an array of zeros.
-        method : str {'newton','nm','bfgs','powell','cg', or 'ncg'}
-            Method can be 'newton' for Newton-Raphson, 'nm' for Nelder-Mead,
-            'bfgs' for Broyden-Fletcher-Goldfarb-Shanno, 'powell' for modified
+        method : str
+            Method can be 'newton' for Newton-Raphson, 'trust-newton' for
+            Newton-Raphson with Cholesky solves and Levenberg-Marquardt
+            damping, 'nm' for Nelder-Mead, 'bfgs' for
+            Broyden-Fletcher-Goldfarb-Shanno, 'powell' for modified
             Powell's method, 'cg' for conjugate gradient, or 'ncg' for Newton-
             conjugate gradient.  `method` determines which solver from
             scipy.optimize is used.  The explicit arguments in `fit` are
@@ -220,6 +222,16 @@ class LikelihoodModel(Model):
             'newton'
                 tol : float
                     Relative error in params acceptable for convergence.
+            'trust-newton'
+                tol : float
+                    Relative error in params acceptable for convergence.
+                gtol : float
+                    Stop when the largest absolute value of the score,
+                    divided by nobs, is less than gtol.
+                max_damping_tries : int
+                    Maximum number of damping increases to make the damped
+                    Hessian positive definite before a gradient step is
+                    taken.
             'nm' -- Nelder Mead
                 xtol : float
                     Relative error in params acceptable for convergence
@@ -272,7 +284,8 @@ class LikelihoodModel(Model):
         cov_params_func = kwargs.setdefault('cov_params_func', None)
 
         Hinv = None  # JP error if full_output=0, Hinv not defined
-        methods = ['newton', 'nm', 'bfgs', 'powell', 'cg', 'ncg']
+        methods = ['newton', 'trust-newton', 'nm', 'bfgs', 'powell', 'cg',
+                   'ncg']
         methods += extra_fit_funcs.keys()
         if start_params is None:
             if hasattr(self, 'start_params'):
@@ -303,6 +316,7 @@ class LikelihoodModel(Model):
 
         fit_funcs = {
             'newton': _fit_mle_newton,
+            'trust-newton': _fit_mle_trust_newton,
             'nm': _fit_mle_nm,  # Nelder-Mead
             'bfgs': _fit_mle_bfgs,
             'cg': _fit_mle_cg,
@@ -312,7 +326,7 @@ class LikelihoodModel(Model):
         if extra_fit_funcs:
             fit_funcs.update(extra_fit_funcs)
 
-        if method == 'newton':
+        if method in ['newton', 'trust-newton']:
             score = lambda params: self.score(params) / nobs
             hess = lambda params: self.hessian(params) / nobs
             #TODO: why are score and hess positive?
@@ -328,7 +342,7 @@ class LikelihoodModel(Model):
 
         elif cov_params_func:
             Hinv = cov_params_func(self, xopt, retvals)
-        elif method == 'newton' and full_output:
+        elif method in ['newton', 'trust-newton'] and full_output:
             Hinv = np.linalg.inv(-retvals['Hessian']) / nobs
         else:
             try:
@@ -410,6 +424,112 @@ def _fit_mle_newton(f, score, start_params, fargs, kwargs, disp=True,
 
 
 
+def _fit_mle_trust_newton(f, score, start_params, fargs, kwargs, disp=True,
+                          maxiter=100, callback=None, retall=False,
+                          full_output=True, hess=None):
+    """
+    Newton-Raphson with Levenberg-Marquardt damping.
+
+    The step solves (-H + damping * I) step = score with a Cholesky
+    decomposition. A step is accepted if the decrease of f is at least a
+    quarter of the decrease predicted by the quadratic model, otherwise
+    the damping is increased and the step recomputed. The damping is zero
+    close to the optimum, where the steps are Newton steps. score and hess
+    are of the loglikelihood as in _fit_mle_newton.
+
+    If the damped Hessian cannot be factored within `max_damping_tries`
+    increases of the damping, or it is not finite, a gradient step is
+    taken instead.
+    """
+    tol = kwargs.setdefault('tol', 1e-8)
+    gtol = kwargs.setdefault('gtol', 1e-10)
+    max_damping_tries = kwargs.setdefault('max_damping_tries', 50)
+    params = np.asarray(start_params, dtype=float)
+    if retall:
+        history = [np.inf, params]
+    fval = f(params, *fargs)
+    gval = score(params)
+    H = hess(params)
+    damping = 0.
+    iterations = 0
+    warnflag = 1
+    while iterations < maxiter:
+        if np.max(np.abs(gval)) < gtol:
+            warnflag = 0
+            break
+        A = -H
+        eye_scale = np.abs(np.diag(A)).mean()
+        if not (eye_scale > 0 and np.isfinite(eye_scale)):
+            # zero Hessian, e.g. with saturated probabilities
+            eye_scale = 1.
+        factor = None
+        if np.isfinite(A).all():
+            for _ in range(max_damping_tries):
+                try:
+                    factor = linalg.cho_factor(A + damping * eye_scale *
+                                               np.eye(len(A)))
+                    break
+                except linalg.LinAlgError:
+                    damping = max(4 * damping, 1e-6)
+        if factor is not None:
+            step = linalg.cho_solve(factor, gval)
+            # decrease of f predicted by the quadratic model
+            predicted = (np.dot(gval, step) -
+                         0.5 * np.dot(step, np.dot(A, step)))
+        else:
+            # the Hessian is not usable, gradient step of the damped model
+            step = gval / (max(damping, 1.) * eye_scale)
+            predicted = 0.5 * np.dot(gval, step)
+        # a small step indicates convergence only if it is close to the
+        # Newton step, heavily damped steps are small far from the optimum
+        newton_step = factor is not None and damping < 1
+        new_params = params + step
+        new_fval = f(new_params, *fargs)
+        iterations += 1
+        if not (fval - new_fval >= 0.25 * predicted):
+            if np.max(np.abs(step)) < tol:
+                # no progress possible at the precision of f, converged
+                # if this was close to a Newton step, otherwise stalled
+                warnflag = 0 if newton_step else 2
+                break
+            damping = max(4 * damping, 1e-6)
+            continue
+        if fval - new_fval > 0.75 * predicted:
+            damping = damping / 4. if damping > 1e-6 else 0.
+        params, fval = new_params, new_fval
+        gval = score(params)
+        H = hess(params)
+        if retall:
+            history.append(params)
+        if callback is not None:
+            callback(params)
+        if newton_step and np.max(np.abs(step)) < tol:
+            warnflag = 0
+            break
+    if disp:
+        if warnflag == 2:
+            print ("Warning: No progress with the damped steps, the "
+                   "optimization stalled.")
+        elif warnflag:
+            print ("Warning: Maximum number of iterations has been "
+                   "exceeded.")
+        else:
+            print "Optimization terminated successfully."
+        print "         Current function value: %f" % fval
+        print "         Iterations: %d" % iterations
+    if full_output:
+        retvals = {'fopt': fval, 'iterations': iterations, 'score': gval,
+                   'Hessian': H, 'warnflag': warnflag,
+                   'converged': not warnflag}
+        if retall:
+            retvals.update({'allvecs': history})
+        xopt = params
+    else:
+        retvals = params
+        xopt = None
+    return xopt, retvals
+
+
 def _fit_mle_bfgs(f, score, start_params, fargs, kwargs, disp=True,
                     maxiter=100, callback=None, retall=False,
                     full_output=True, hess=None):
@@ -1599,25 +1719,13 @@ class ResultMixin(object):
         original endog and exog, and therefore is only correct if observations
         are independently distributed.
 
-        This will be moved to apply only to models with independently
-        distributed observations.
+        See `statsmodels.base.bootstrap.bootstrap` for other resampling
+        schemes, parallel execution and confidence intervals.
         '''
-        results = []
-        print self.model.__class__
-        hascloneattr = True if hasattr(self, 'cloneattr') else False
-        for i in xrange(nrep):
-            rvsind = np.random.randint(self.nobs - 1, size=self.nobs)
-            #this needs to set startparam and get other defining attributes
-            #need a clone method on model
-            fitmod = self.model.__class__(self.endog[rvsind],
-                                          self.exog[rvsind, :])
-            if hascloneattr:
-                for attr in self.model.cloneattr:
-                    setattr(fitmod, attr, getattr(self.model, attr))
-
-            fitres = fitmod.fit(method=method, disp=disp)
-            results.append(fitres.params)
-        results = np.array(results)
+        from statsmodels.base.bootstrap import bootstrap
+        bs = bootstrap(self, nrep=nrep, scheme='pairs',
+                       fit_kw=dict(method=method, disp=disp))
+        results = bs.replications[bs._valid]
         if store:
             self.bootstrap_results = results
         return results.mean(0), results.std(0), results
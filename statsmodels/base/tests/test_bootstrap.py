@@ -0,0 +1,137 @@
+import warnings
+import numpy as np
+from numpy.testing import (assert_almost_equal, assert_equal, assert_,
+                           assert_raises)
+import statsmodels.api as sm
+from statsmodels.base.bootstrap import bootstrap, _draw_rows
+from statsmodels.miscmodels.count import PoissonGMLE
+
+
+def _slope(results):
+    return results.params[1]
+
+
+def _slope_fails(results):
+    # a numerical failure in some of the replications
+    if results.params[1] > 1:
+        raise np.linalg.LinAlgError("singular")
+    return results.params[1]
+
+
+class TestBootstrapOLS(object):
+
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(987689)
+        nobs = 200
+        exog = sm.add_constant(np.random.randn(nobs, 2), prepend=True)
+        endog = exog.sum(1) + np.random.randn(nobs)
+        cls.res = sm.OLS(endog, exog).fit()
+        cls.bs = bootstrap(cls.res, nrep=400, seed=1234)
+
+    def test_std(self):
+        for scheme in ['pairs', 'residual', 'wild']:
+            bs = bootstrap(self.res, nrep=400, scheme=scheme, seed=1234)
+            assert_equal(bs.replications.shape, (400, 3))
+            assert_equal(bs.n_failed, 0)
+            assert_almost_equal(bs.std / self.res.bse, np.ones(3), 1)
+            assert_almost_equal(bs.mean, self.res.params, 1)
+
+    def test_reproducible(self):
+        bs = self.bs
+        bs2 = bootstrap(self.res, nrep=400, seed=1234, executor='threads',
+                        n_jobs=3)
+        assert_equal(bs2.replications, bs.replications)
+        bs3 = bootstrap(self.res, nrep=400, seed=np.random.RandomState(1234))
+        assert_equal(bs3.replications, bs.replications)
+
+    def test_conf_int(self):
+        bs = self.bs
+        ci = bs.conf_int()
+        assert_equal(ci.shape, (3, 2))
+        reps = bs.replications
+        assert_almost_equal(ci[:, 0], np.percentile(reps, 2.5, axis=0), 12)
+        assert_almost_equal(ci[:, 1], np.percentile(reps, 97.5, axis=0), 12)
+        ci_basic = bs.conf_int(method='basic')
+        assert_almost_equal(ci_basic.sum(1), 4 * bs.statistic - ci.sum(1), 12)
+        ci_bca = bs.conf_int(method='bca')
+        assert_almost_equal(ci_bca, self.res.conf_int(), 1)
+        assert_raises(ValueError, bs.conf_int, method='normal')
+
+    def test_statistic(self):
+        bs = bootstrap(self.res, nrep=400, statistic=_slope, seed=1234)
+        assert_equal(bs.replications.shape, (400, 1))
+        assert_equal(bs.replications[:, 0], self.bs.replications[:, 1])
+
+    def test_errors(self):
+        assert_raises(ValueError, bootstrap, self.res, scheme='iid')
+        assert_raises(ValueError, bootstrap, self.res, executor='mpi')
+
+    def test_failed_fits(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            bs = bootstrap(self.res, nrep=400, statistic=_slope_fails,
+                           seed=1234)
+        assert_equal(len(w), 1)
+        failed = self.bs.replications[:, 1] > 1
+        assert_(0 < bs.n_failed < 400)
+        assert_equal(bs.n_failed, failed.sum())
+        assert_(np.isnan(bs.replications[failed]).all())
+        assert_almost_equal(bs.mean, self.bs.replications[~failed, 1].mean(),
+                            12)
+        # all replications fail, the original results are fine
+        slope = self.res.params[1]
+        def always_fails(results):
+            if results.params[1] != slope:
+                raise np.linalg.LinAlgError("singular")
+            return slope
+        assert_raises(ValueError, bootstrap, self.res, nrep=10,
+                      statistic=always_fails)
+
+
+def test_draw_rows():
+    rng = np.random.RandomState(0)
+    rows = _draw_rows('block', 103, 10, rng)
+    assert_equal(len(rows), 103)
+    # blocks of consecutive rows
+    assert_equal(np.diff(rows[:100].reshape(10, 10), axis=1), 1)
+    rows = _draw_rows('stationary', 1000, 10, rng)
+    assert_equal(len(rows), 1000)
+    assert_(rows.max() < 1000)
+    n_blocks = (np.diff(rows) % 1000 != 1).sum() + 1
+    assert_(50 < n_blocks < 150)
+
+
+def test_bootstrap_models():
+    # the same resampled rows are used for models with the same estimates
+    np.random.seed(987689)
+    nobs = 200
+    exog = sm.add_constant(np.random.randn(nobs, 2), prepend=True)
+    endog = (exog.sum(1) + np.random.randn(nobs) > 1).astype(float)
+    res_logit = sm.Logit(endog, exog).fit(disp=0)
+    res_glm = sm.GLM(endog, exog, family=sm.families.Binomial()).fit()
+    bs_logit = bootstrap(res_logit, nrep=50, seed=1234)
+    bs_glm = bootstrap(res_glm, nrep=50, seed=1234)
+    assert_almost_equal(bs_logit.replications, bs_glm.replications, 6)
+    assert_almost_equal(bs_logit.std / res_logit.bse, np.ones(3), 0)
+
+    endog = np.random.poisson(np.exp(0.2 * exog.sum(1)))
+    exposure = np.random.uniform(1, 2, size=nobs)
+    res_poisson = sm.Poisson(endog, exog, exposure=exposure).fit(disp=0)
+    res_glm = sm.GLM(endog, exog, family=sm.families.Poisson(),
+                     exposure=exposure).fit()
+    bs_poisson = bootstrap(res_poisson, nrep=50, scheme='block', seed=1234)
+    bs_glm = bootstrap(res_glm, nrep=50, scheme='block', seed=1234)
+    assert_almost_equal(bs_poisson.replications, bs_glm.replications, 6)
+
+    # GenericLikelihoodModel, ResultMixin.bootstrap uses the same engine
+    res_gmle = PoissonGMLE(endog, exog).fit(method='bfgs', disp=0)
+    res_poisson = sm.Poisson(endog, exog).fit(disp=0)
+    np.random.seed(1234)
+    mean, std, reps = res_gmle.bootstrap(nrep=20, method='bfgs')
+    np.random.seed(1234)
+    bs_poisson = bootstrap(res_poisson, nrep=20)
+    assert_almost_equal(reps, bs_poisson.replications, 4)
+    assert_almost_equal(std, bs_poisson.replications.std(0), 4)
+    # errors that are not numerical failures are raised
+    assert_raises(ValueError, res_gmle.bootstrap, nrep=3, method='bogus')
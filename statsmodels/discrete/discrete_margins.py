@@ -142,44 +142,104 @@ def _get_margeff_exog(exog, at, atexog, ind):
         exog[0,~ind] = 1
     return exog
 
+def _discrete_linpred(exog, params, linpred, ind, kind):
+    """
+    Linear predictors with the discrete columns `ind` of exog changed.
+
+    For dummies the columns are set to 0 and 1, for counts they are
+    decreased and increased by one. All columns are changed at once, the
+    returned linear predictors have the columns in axis 1, shape
+    (nobs, len(ind)) + linpred.shape[1:]. Also returns the changes of the
+    columns.
+    """
+    x = exog[:, ind]
+    if kind == 'dummy':
+        lower, upper = -x, 1 - x
+    else:
+        lower, upper = -np.ones_like(x), np.ones_like(x)
+    b = params[ind]
+    # params are K x (J-1) for multinomial models
+    extra_dims = (1,) * (b.ndim - 1)
+    lower = lower.reshape(lower.shape + extra_dims)
+    upper = upper.reshape(upper.shape + extra_dims)
+    linpred = linpred[:, None]
+    return linpred + lower * b, linpred + upper * b, lower, upper
+
+def _discrete_effects(effects, exog, ind, kind, method, model, params):
+    k_vars = exog.shape[1]
+    params = params[:k_vars] # no extra params of the count models
+    linpred = np.dot(exog, params)
+    lin0, lin1, _, _ = _discrete_linpred(exog, params, linpred, ind, kind)
+    effect0 = model._predict_linpred(lin0)
+    effect1 = model._predict_linpred(lin1)
+    if 'ey' in method:
+        effect0 = np.log(effect0)
+        effect1 = np.log(effect1)
+    effects[:, ind] = effect1 - effect0
+    if kind == 'count':
+        effects[:, ind] /= 2
+    return effects
+
 def _get_count_effects(effects, exog, count_ind, method, model, params):
     """
     If there's a count variable, the predicted difference is taken by
     subtracting one and adding one to exog then averaging the difference
     """
-    # this is the index for the effect and the index for count col in exog
-    for i in count_ind:
-        exog0 = exog.copy()
-        exog0[:,i] -= 1
-        effect0 = model.predict(params, exog0)
-        exog0[:,i] += 2
-        effect1 = model.predict(params, exog0)
-        #NOTE: done by analogy with dummy effects but untested bc
-        # stata doesn't handle both count and eydx anywhere
-        if 'ey' in method:
-            effect0 = np.log(effect0)
-            effect1 = np.log(effect1)
-        effects[:, i] = ((effect1 - effect0)/2)
-    return effects
+    #NOTE: done by analogy with dummy effects but untested bc
+    # stata doesn't handle both count and eydx anywhere
+    return _discrete_effects(effects, exog, count_ind, 'count', method,
+                             model, params)
 
 def _get_dummy_effects(effects, exog, dummy_ind, method, model, params):
     """
     If there's a dummy variable, the predicted difference is taken at
     0 and 1
     """
-    # this is the index for the effect and the index for dummy col in exog
-    for i in dummy_ind:
-        exog0 = exog.copy() # only copy once, can we avoid a copy?
-        exog0[:,i] = 0
-        effect0 = model.predict(params, exog0)
-        #fittedvalues0 = np.dot(exog0,params)
-        exog0[:,i] = 1
-        effect1 = model.predict(params, exog0)
-        if 'ey' in method:
-            effect0 = np.log(effect0)
-            effect1 = np.log(effect1)
-        effects[:, i] = (effect1 - effect0)
-    return effects
+    return _discrete_effects(effects, exog, dummy_ind, 'dummy', method,
+                             model, params)
+
+def _index_margeff_jacobian(g, dg, params, exog, method):
+    """
+    Jacobian of the marginal effects of single index models.
+
+    The marginal effects are g(x*b) * b_k, times x_k for 'ex' methods. g is
+    the derivative of the prediction, divided by the prediction for 'ey'
+    methods, and dg its derivative with respect to x*b. Returns the mean
+    over the rows of exog, k_vars x k_vars.
+    """
+    nobs = len(exog)
+    if 'ex' in method:
+        jac = params[:, None] * np.dot((exog * dg[:, None]).T, exog) / nobs
+        jac[np.diag_indices_from(jac)] += np.dot(g, exog) / nobs
+    else:
+        jac = params[:, None] * np.dot(dg, exog)[None, :] / nobs
+        jac[np.diag_indices_from(jac)] += g.mean()
+    return jac
+
+def _index_discrete_jacobian(jac, model, params, exog, ind, kind, method):
+    """
+    Replace the rows of the Jacobian for the discrete columns `ind`.
+
+    The effect F(x1*b) - F(x0*b) has the derivative h(x1*b)*x1 - h(x0*b)*x0
+    with h the derivative of F, divided by F for 'ey' methods. x1 and x0
+    differ from x only in the discrete column, so the rows of all columns
+    are computed with one product with exog.
+    """
+    nobs = len(exog)
+    linpred = np.dot(exog, params)
+    lin0, lin1, lower, upper = _discrete_linpred(exog, params, linpred, ind,
+                                                 kind)
+    h0 = model._derivative_predict_linpred(lin0)
+    h1 = model._derivative_predict_linpred(lin1)
+    if 'ey' in method:
+        h0 /= model._predict_linpred(lin0)
+        h1 /= model._predict_linpred(lin1)
+    rows = np.dot((h1 - h0).T, exog) / nobs
+    rows[np.arange(len(ind)), ind] += (h1 * upper - h0 * lower).mean(0)
+    if kind == 'count':
+        rows /= 2
+    jac[ind, :rows.shape[1]] = rows
+    return jac
 
 def _effects_at(effects, at):
     if at == 'all':
@@ -673,9 +733,14 @@ class DiscreteMargins(object):
                 self.margeff = effects[:, effects_idx]
         else:
             # Set standard error of the marginal effects by Delta method.
+            if hasattr(model, '_derivative_exog_params'):
+                derivative = model._derivative_exog_params(params, exog,
+                                                method, dummy_idx, count_idx)
+            else:
+                derivative = model._derivative_exog
             margeff_cov, margeff_se = margeff_cov_with_se(model, params, exog,
                                                 results.cov_params(), at,
-                                                model._derivative_exog,
+                                                derivative,
                                                 dummy_idx, count_idx,
                                                 method, J)
 
@@ -20,7 +20,7 @@ __all__ = ["Poisson", "Logit", "Probit", "MNLogit", "NegativeBinomial"]
 
 import numpy as np
 from scipy.special import gammaln
-from scipy import stats, special, optimize  # opt just for nbin
+from scipy import stats, special, optimize, sparse  # opt just for nbin
 import statsmodels.tools.tools as tools
 from statsmodels.tools.decorators import (resettable_cache,
         cache_readonly)
@@ -35,6 +35,7 @@ import statsmodels.regression.linear_model as lm
 import statsmodels.base.wrapper as wrap
 
 from statsmodels.base.l1_slsqp import fit_l1_slsqp
+from statsmodels.base.l1_cd import fit_l1_cd
 try:
     import cvxopt
     have_cvxopt = True
@@ -45,6 +46,9 @@ except ImportError:
 #      this
 FLOAT_EPS = np.finfo(float).eps
 
+# number of rows of exog used at a time in MNLogit.hessian
+_HESSIAN_BLOCK_SIZE = 10000
+
 #TODO: add options for the parameter covariance/variance
 # ie., OIM, EIM, and BHHH see Green 21.4
 
@@ -140,7 +144,7 @@ class DiscreteModel(base.LikelihoodModel):
 
     def _check_perfect_pred(self, params):
         endog = self.endog
-        fittedvalues = self.cdf(np.dot(self.exog, params[:self.exog.shape[1]]))
+        fittedvalues = self.cdf(self.exog.dot(params[:self.exog.shape[1]]))
         if (self.raise_on_perfect_prediction and
                 np.allclose(fittedvalues - endog, 0)):
             msg = "Perfect separation detected, results not available"
@@ -180,7 +184,7 @@ class DiscreteModel(base.LikelihoodModel):
         start_params : array-like, optional
             Initial guess of the solution for the loglikelihood maximization.
             The default is an array of zeros.
-        method : 'l1' or 'l1_cvxopt_cp'
+        method : 'l1', 'l1_cd' or 'l1_cvxopt_cp'
             See notes for details.
         maxiter : Integer or 'defined_by_method'
             Maximum number of iterations to perform.
@@ -224,6 +228,19 @@ class DiscreteModel(base.LikelihoodModel):
             'l1'
                 acc : float (default 1e-6)
                     Requested accuracy as used by slsqp
+            'l1_cd'
+                L1_wt : float (default 1)
+                    Weight of the l1 penalty, the penalty is
+                    alpha * (L1_wt * |params| + (1 - L1_wt) * params**2 / 2).
+                    L1_wt < 1 is the elastic net.
+                tol : float (default 1e-8)
+                    Convergence tolerance for the change in params.
+                cd_maxiter : int (default 100)
+                    Maximum number of coordinate descent sweeps in each
+                    Newton step.
+                alpha_prev : array (default None)
+                    alpha of a previous fit at start_params, used to screen
+                    params with the strong rule. See fit_regularized_path.
             'l1_cvxopt_cp'
                 abstol : float
                     absolute accuracy (default: 1e-7).
@@ -252,6 +269,12 @@ class DiscreteModel(base.LikelihoodModel):
 
         .. math:: -u_k \\leq \\beta_k \\leq u_k.
 
+        'l1_cd' solves the non-smooth problem directly with proximal Newton
+        steps, which minimize the penalized quadratic approximation of
+        :math:`L` by cyclic coordinate descent over the active set of
+        params. It scales to many more params than the constrained
+        formulations.
+
         With :math:`\\partial_k L` the derivative of :math:`L` in the
         :math:`k^{th}` parameter direction, theory dictates that, at the
         minimum, exactly one of two conditions holds:
@@ -261,7 +284,7 @@ class DiscreteModel(base.LikelihoodModel):
 
         """
         ### Set attributes based on method
-        if method in ['l1', 'l1_cvxopt_cp']:
+        if method in ['l1', 'l1_cd', 'l1_cvxopt_cp']:
             cov_params_func = self.cov_params_func_l1
         else:
             raise Exception(
@@ -287,13 +310,13 @@ class DiscreteModel(base.LikelihoodModel):
         if maxiter == 'defined_by_method':
             if method == 'l1':
                 maxiter = 1000
-            elif method == 'l1_cvxopt_cp':
+            elif method in ['l1_cd', 'l1_cvxopt_cp']:
                 maxiter = 70
 
         ## Parameters to pass to super(...).fit()
         # For the 'extra' parameters, pass all that are available,
         # even if we know (at this point) we will only use one.
-        extra_fit_funcs = {'l1': fit_l1_slsqp}
+        extra_fit_funcs = {'l1': fit_l1_slsqp, 'l1_cd': fit_l1_cd}
         if have_cvxopt and method == 'l1_cvxopt_cp':
             from statsmodels.base.l1_cvxopt import fit_l1_cvxopt_cp
             extra_fit_funcs['l1_cvxopt_cp'] = fit_l1_cvxopt_cp
@@ -313,6 +336,61 @@ class DiscreteModel(base.LikelihoodModel):
 
         return mlefit # up to subclasses to wrap results
 
+    def fit_regularized_path(self, alphas, start_params=None, method='l1_cd',
+            maxiter='defined_by_method', disp=False, trim_mode='auto',
+            auto_trim_tol=0.01, size_trim_tol=1e-4, qc_tol=0.03,
+            qc_verbose=False, **kwargs):
+        """
+        Fit the regularized model for a sequence of penalty weights.
+
+        Each fit starts at the params of the previous one. With
+        method='l1_cd', params are also screened with the strong rule using
+        the previous alpha, see fit_regularized.
+
+        Parameters
+        ----------
+        alphas : sequence
+            The penalty weights, each a non-negative scalar or an array of
+            the same size as the params. Warm starts work best if they are
+            in decreasing order.
+        start_params : array-like, optional
+            Start params of the fit with the first alpha. The default is an
+            array of zeros.
+        method : 'l1_cd', 'l1' or 'l1_cvxopt_cp'
+            The solver, see fit_regularized.
+        kwargs
+            Other keyword arguments are passed to fit_regularized, for
+            example L1_wt for the elastic net with method='l1_cd'.
+
+        Returns
+        -------
+        results : list
+            The regularized results for each alpha. The mle_retvals of each
+            contain the convergence, QC and trimming diagnostics.
+
+        Examples
+        --------
+        >>> alphas = np.logspace(2, -1, 20)
+        >>> path = Logit(y, x).fit_regularized_path(alphas)
+        >>> params = np.array([res.params for res in path])
+        """
+        nobs = float(self.endog.shape[0])
+        results = []
+        alpha_prev = None
+        for alpha in alphas:
+            fit_kw = dict(kwargs)
+            if method == 'l1_cd' and alpha_prev is not None:
+                fit_kw['alpha_prev'] = np.asarray(alpha_prev) / nobs
+            res = self.fit_regularized(start_params=start_params,
+                    method=method, maxiter=maxiter, disp=disp, alpha=alpha,
+                    trim_mode=trim_mode, auto_trim_tol=auto_trim_tol,
+                    size_trim_tol=size_trim_tol, qc_tol=qc_tol,
+                    qc_verbose=qc_verbose, **fit_kw)
+            results.append(res)
+            start_params = np.asarray(res.params).ravel('F')
+            alpha_prev = alpha
+        return results
+
     def cov_params_func_l1(self, likelihood_model, xopt, retvals):
         """
         Computes cov_params on a reduced parameter space
@@ -374,10 +452,12 @@ class BinaryModel(DiscreteModel):
         """
         if exog is None:
             exog = self.exog
+        elif not sparse.issparse(exog):
+            exog = np.asarray(exog)
         if not linear:
-            return self.cdf(np.dot(exog, params))
+            return self.cdf(exog.dot(params))
         else:
-            return np.dot(exog, params)
+            return exog.dot(params)
 
     def fit_regularized(self, start_params=None, method='l1',
             maxiter='defined_by_method', full_output=1, disp=1, callback=None,
@@ -388,7 +468,7 @@ class BinaryModel(DiscreteModel):
                 full_output=full_output, disp=disp, callback=callback,
                 alpha=alpha, trim_mode=trim_mode, auto_trim_tol=auto_trim_tol,
                 size_trim_tol=size_trim_tol, qc_tol=qc_tol, **kwargs)
-        if method in ['l1', 'l1_cvxopt_cp']:
+        if method in ['l1', 'l1_cd', 'l1_cvxopt_cp']:
             discretefit = L1BinaryResults(self, bnryfit)
         else:
             raise Exception(
@@ -447,6 +527,45 @@ class BinaryModel(DiscreteModel):
                     self, params)
         return margeff
 
+    def _predict_linpred(self, linpred):
+        """
+        Predicted probabilities for the linear predictor, for margins
+        """
+        return self.cdf(linpred)
+
+    def _derivative_predict_linpred(self, linpred):
+        """
+        Derivative of _predict_linpred with respect to linpred
+        """
+        return self.pdf(linpred)
+
+    def _derivative_exog_params(self, params, exog, transform='dydx',
+            dummy_idx=None, count_idx=None):
+        """
+        For computing marginal effects standard errors.
+
+        Returns the Jacobian of the marginal effects, _derivative_exog,
+        with respect to params averaged over the rows of exog. The shape is
+        k_vars x k_vars.
+        """
+        from statsmodels.discrete.discrete_margins import (
+                _index_margeff_jacobian, _index_discrete_jacobian)
+        linpred = np.dot(exog, params)
+        g = self.pdf(linpred)
+        dg = self._derivative_pdf(linpred)
+        if 'ey' in transform:
+            pred = self.cdf(linpred)
+            g = g / pred
+            dg = dg / pred - g**2
+        jac = _index_margeff_jacobian(g, dg, params, exog, transform)
+        if count_idx is not None:
+            jac = _index_discrete_jacobian(jac, self, params, exog,
+                    count_idx, 'count', transform)
+        if dummy_idx is not None:
+            jac = _index_discrete_jacobian(jac, self, params, exog,
+                    dummy_idx, 'dummy', transform)
+        return jac
+
 class MultinomialModel(BinaryModel):
     def initialize(self):
         """
@@ -614,7 +733,7 @@ class MultinomialModel(BinaryModel):
         margeff = np.transpose(margeff, (1,2,0))
         # swap the axes to make sure margeff are in order nobs, K, J
         if 'ex' in transform:
-            margeff *= exog
+            margeff *= exog[:,:,None]
         if 'ey' in transform:
             margeff /= self.predict(params, exog)[:,None,:]
 
@@ -630,6 +749,110 @@ class MultinomialModel(BinaryModel):
                     self, params)
         return margeff.reshape(len(exog), -1, order='F')
 
+    def _predict_linpred(self, linpred):
+        """
+        Predicted probabilities for the linear predictors of the J-1
+        equations in the last axis of linpred, for margins
+        """
+        shape = linpred.shape
+        pred = self.cdf(linpred.reshape(-1, shape[-1]))
+        return pred.reshape(shape[:-1] + (shape[-1] + 1,))
+
+    def _derivative_exog_params(self, params, exog, transform='dydx',
+            dummy_idx=None, count_idx=None):
+        """
+        For computing marginal effects standard errors.
+
+        Returns the Jacobian of the marginal effects, _derivative_exog,
+        with respect to the flattened params averaged over the rows of exog.
+        The shape is (J*K) x ((J-1)*K).
+
+        Notes
+        -----
+        With P_j the probability of choice j, b_j its parameters (b_0 = 0)
+        and d_j = b_j - sum_m P_m b_m, the marginal effect on P_j of
+        variable k is P_j * d_jk and
+
+        d (P_j d_jk) / d b_lr = x_r * P_j * ((1(j=l) - P_l) * d_jk
+                                - P_l * d_lk) + 1(k=r) * P_j * (1(j=l) - P_l)
+
+        The rows of exog are processed in blocks to limit memory use.
+        """
+        J = int(self.J)
+        K = int(self.K)
+        params = params.reshape(K, J-1, order='F')
+        zeroparams = np.column_stack((np.zeros(K), params))
+        nobs = len(exog)
+        sum_wx = np.zeros((J, K, J-1, K))
+        sum_diag = np.zeros((J, K, J-1))
+        eye = np.eye(J)[:, 1:] # 1(j=l) for l = 1, ..., J-1
+        block_size = max(1, 2**20 // (J * K * (J-1)))
+        for start in range(0, nobs, block_size):
+            x = exog[start:start + block_size]
+            pr = self.cdf(np.dot(x, params))
+            pr_l = pr[:, None, 1:]
+            # d_ikj = b_kj - sum_m P_im b_km, nobs x K x J
+            d = zeroparams[None] - np.dot(pr, zeroparams.T)[:, :, None]
+            me = pr[:, None, :] * d
+            if 'ey' in transform:
+                # the derivative of d_jk
+                w = -np.repeat(me[:, None, :, 1:], J, axis=1)
+                diag = eye[None] - pr_l
+            else:
+                # nobs x J x J-1
+                diag = pr[:, :, None] * (eye[None] - pr_l)
+                w = (diag[:, :, None, :] * d.transpose(0, 2, 1)[:, :, :, None]
+                     - pr[:, :, None, None] * me[:, None, :, 1:])
+            diag = np.repeat(diag[:, :, None, :], K, axis=2)
+            if 'ex' in transform:
+                w *= x[:, None, :, None]
+                diag *= x[:, None, :, None]
+            sum_wx += np.dot(w.reshape(len(x), -1).T, x).reshape(J, K, J-1,
+                                                                   K)
+            sum_diag += diag.sum(0)
+        idx = np.arange(K)
+        sum_wx[:, idx, :, idx] += sum_diag.transpose(1, 0, 2)
+        jac = sum_wx.reshape(J*K, (J-1)*K) / nobs
+        for kind, idx in [('count', count_idx), ('dummy', dummy_idx)]:
+            if idx is not None:
+                jac = self._discrete_jacobian(jac, params, exog, idx, kind,
+                                              transform)
+        return jac
+
+    def _discrete_jacobian(self, jac, params, exog, ind, kind, transform):
+        """
+        Replace the rows of the Jacobian for the discrete columns `ind`.
+
+        See _derivative_exog_params. The rows for all columns are computed
+        with one product with exog.
+        """
+        from statsmodels.discrete.discrete_margins import _discrete_linpred
+        J = int(self.J)
+        K = int(self.K)
+        nobs = len(exog)
+        n_ind = len(ind)
+        linpred = np.dot(exog, params)
+        lin0, lin1, lower, upper = _discrete_linpred(exog, params, linpred,
+                                                     ind, kind)
+        eye = np.eye(J)[:, 1:]
+        dpred = []
+        for lin in [lin0, lin1]:
+            pr = self._predict_linpred(lin) # nobs x n_ind x J
+            dp = eye - pr[:, :, None, 1:]
+            if not 'ey' in transform:
+                dp *= pr[:, :, :, None]
+            dpred.append(dp)
+        rows = np.dot((dpred[1] - dpred[0]).reshape(nobs, -1).T, exog)
+        rows = rows.reshape(n_ind, J, J-1, K) / nobs
+        diag = (dpred[1] * upper[:, :, None] -
+                dpred[0] * lower[:, :, None]).mean(0)
+        rows[np.arange(n_ind), :, :, ind] += diag
+        if kind == 'count':
+            rows /= 2
+        for i, col in enumerate(ind):
+            jac[col::K] = rows[i].reshape(J, -1)
+        return jac
+
 class CountModel(DiscreteModel):
     def __init__(self, endog, exog, offset=None, exposure=None, missing='none'):
         self._check_inputs(offset, exposure, endog) # attaches if needed
@@ -678,10 +901,12 @@ class CountModel(DiscreteModel):
             if offset is None:
                 offset = 0
 
+        if not sparse.issparse(exog):
+            exog = np.asarray(exog)
         if not linear:
-            return np.exp(np.dot(exog, params[:exog.shape[1]]) + exposure + offset) # not cdf
+            return np.exp(exog.dot(params[:exog.shape[1]]) + exposure + offset) # not cdf
         else:
-            return np.dot(exog, params[:exog.shape[1]]) + exposure + offset
+            return exog.dot(params[:exog.shape[1]]) + exposure + offset
 
     def _derivative_predict(self, params, exog=None, transform='dydx'):
         """
@@ -718,7 +943,8 @@ class CountModel(DiscreteModel):
         # group 3 poisson, nbreg, zip, zinb
         if exog == None:
             exog = self.exog
-        margeff = self.predict(params, exog)[:,None] * params[None,:]
+        margeff = (self.predict(params, exog)[:,None] *
+                   params[None,:exog.shape[1]])
         if 'ex' in transform:
             margeff *= exog
         if 'ey' in transform:
@@ -736,6 +962,48 @@ class CountModel(DiscreteModel):
                     self, params)
         return margeff
 
+    def _predict_linpred(self, linpred):
+        """
+        Predicted counts for the linear predictor, for margins
+        """
+        return np.exp(linpred)
+
+    def _derivative_predict_linpred(self, linpred):
+        """
+        Derivative of _predict_linpred with respect to linpred
+        """
+        return np.exp(linpred)
+
+    def _derivative_exog_params(self, params, exog, transform='dydx',
+            dummy_idx=None, count_idx=None):
+        """
+        For computing marginal effects standard errors.
+
+        Returns the Jacobian of the marginal effects, _derivative_exog,
+        with respect to params averaged over the rows of exog. The shape is
+        k_vars x len(params), the columns of extra parameters like alpha
+        are zero.
+        """
+        from statsmodels.discrete.discrete_margins import (
+                _index_margeff_jacobian, _index_discrete_jacobian)
+        k_vars = exog.shape[1]
+        params_exog = params[:k_vars]
+        if 'ey' in transform:
+            g = np.ones(len(exog))
+            dg = np.zeros(len(exog))
+        else:
+            g = dg = np.exp(np.dot(exog, params_exog))
+        jac = np.zeros((k_vars, len(params)))
+        jac[:, :k_vars] = _index_margeff_jacobian(g, dg, params_exog, exog,
+                                                  transform)
+        if count_idx is not None:
+            jac = _index_discrete_jacobian(jac, self, params_exog, exog,
+                    count_idx, 'count', transform)
+        if dummy_idx is not None:
+            jac = _index_discrete_jacobian(jac, self, params_exog, exog,
+                    dummy_idx, 'dummy', transform)
+        return jac
+
     def fit(self, start_params=None, method='newton', maxiter=35,
             full_output=1, disp=1, callback=None, **kwargs):
         cntfit = super(CountModel, self).fit(start_params=start_params,
@@ -754,7 +1022,7 @@ class CountModel(DiscreteModel):
                 full_output=full_output, disp=disp, callback=callback,
                 alpha=alpha, trim_mode=trim_mode, auto_trim_tol=auto_trim_tol,
                 size_trim_tol=size_trim_tol, qc_tol=qc_tol, **kwargs)
-        if method in ['l1', 'l1_cvxopt_cp']:
+        if method in ['l1', 'l1_cd', 'l1_cvxopt_cp']:
             discretefit = L1CountResults(self, cntfit)
         else:
             raise Exception(
@@ -863,7 +1131,7 @@ class Poisson(CountModel):
         """
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
-        XB = np.dot(self.exog, params) + offset + exposure
+        XB = self.exog.dot(params) + offset + exposure
         endog = self.endog
         return np.sum(-np.exp(XB) +  endog*XB - gammaln(endog+1))
 
@@ -891,7 +1159,7 @@ class Poisson(CountModel):
         """
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
-        XB = np.dot(self.exog, params) + offset + exposure
+        XB = self.exog.dot(params) + offset + exposure
         endog = self.endog
         #np.sum(stats.poisson.logpmf(endog, np.exp(XB)))
         return -np.exp(XB) +  endog*XB - gammaln(endog+1)
@@ -924,8 +1192,8 @@ class Poisson(CountModel):
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
         X = self.exog
-        L = np.exp(np.dot(X,params) + offset + exposure)
-        return np.dot(self.endog - L, X)
+        L = np.exp(X.dot(params) + offset + exposure)
+        return X.T.dot(self.endog - L)
 
     def jac(self, params):
         """
@@ -954,8 +1222,8 @@ class Poisson(CountModel):
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
         X = self.exog
-        L = np.exp(np.dot(X,params) + offset + exposure)
-        return (self.endog - L)[:,None] * X
+        L = np.exp(X.dot(params) + offset + exposure)
+        return tools.scale_rows(X, self.endog - L)
 
     def hessian(self, params):
         """
@@ -984,8 +1252,8 @@ class Poisson(CountModel):
         offset = getattr(self, "offset", 0)
         exposure = getattr(self, "exposure", 0)
         X = self.exog
-        L = np.exp(np.dot(X,params) + exposure + offset)
-        return -np.dot(L*X.T, X)
+        L = np.exp(X.dot(params) + exposure + offset)
+        return -tools.gram(X, L)
 
 class Logit(BinaryModel):
     __doc__ = """
@@ -1049,6 +1317,13 @@ class Logit(BinaryModel):
         X = np.asarray(X)
         return np.exp(-X)/(1+np.exp(-X))**2
 
+    def _derivative_pdf(self, X):
+        """
+        Derivative of the logistic pdf with respect to the linear predictor
+        """
+        cdf = self.cdf(X)
+        return cdf * (1 - cdf) * (1 - 2 * cdf)
+
     def loglike(self, params):
         """
         Log-likelihood of logit model.
@@ -1073,7 +1348,7 @@ class Logit(BinaryModel):
         """
         q = 2*self.endog - 1
         X = self.exog
-        return np.sum(np.log(self.cdf(q*np.dot(X,params))))
+        return np.sum(np.log(self.cdf(q*X.dot(params))))
 
     def loglikeobs(self, params):
         """
@@ -1101,7 +1376,7 @@ class Logit(BinaryModel):
         """
         q = 2*self.endog - 1
         X = self.exog
-        return np.log(self.cdf(q*np.dot(X,params)))
+        return np.log(self.cdf(q*X.dot(params)))
 
     def score(self, params):
         """
@@ -1125,8 +1400,8 @@ class Logit(BinaryModel):
 
         y = self.endog
         X = self.exog
-        L = self.cdf(np.dot(X,params))
-        return np.dot(y - L,X)
+        L = self.cdf(X.dot(params))
+        return X.T.dot(y - L)
 
     def jac(self, params):
         """
@@ -1153,8 +1428,8 @@ class Logit(BinaryModel):
 
         y = self.endog
         X = self.exog
-        L = self.cdf(np.dot(X, params))
-        return (y - L)[:,None] * X
+        L = self.cdf(X.dot(params))
+        return tools.scale_rows(X, y - L)
 
     def hessian(self, params):
         """
@@ -1176,8 +1451,8 @@ class Logit(BinaryModel):
         .. math:: \\frac{\\partial^{2}\\ln L}{\\partial\\beta\\partial\\beta^{\\prime}}=-\\sum_{i}\\Lambda_{i}\\left(1-\\Lambda_{i}\\right)x_{i}x_{i}^{\\prime}
         """
         X = self.exog
-        L = self.cdf(np.dot(X,params))
-        return -np.dot(L*(1-L)*X.T,X)
+        L = self.cdf(X.dot(params))
+        return -tools.gram(X, L*(1-L))
 
     def fit(self, start_params=None, method='newton', maxiter=35,
             full_output=1, disp=1, callback=None, **kwargs):
@@ -1246,6 +1521,13 @@ class Probit(BinaryModel):
         X = np.asarray(X)
         return stats.norm._pdf(X)
 
+    def _derivative_pdf(self, X):
+        """
+        Derivative of the normal pdf with respect to the linear predictor
+        """
+        X = np.asarray(X)
+        return -X * stats.norm._pdf(X)
+
 
     def loglike(self, params):
         """
@@ -1622,25 +1904,31 @@ class MNLogit(MultinomialModel):
         The actual Hessian matrix has J**2 * K x K elements. Our Hessian
         is reshaped to be square (J*K, J*K) so that the solvers can use it.
 
-        This implementation does not take advantage of the symmetry of
-        the Hessian and could probably be refactored for speed.
+        Each K x K block is a weighted cross product of exog and the block
+        (l, j) is the transpose of (j, l), so only the blocks of the upper
+        triangle are computed. The weights are of one sign within a block,
+        so each block is the Gram matrix of exog scaled by the square root
+        of the weights, for which only a triangle is computed by BLAS.
+        The rows of exog are processed in blocks to limit memory use.
         """
         params = params.reshape(self.K, -1, order='F')
         X = self.exog
-        pr = self.cdf(np.dot(X,params))
-        partials = []
-        J = self.wendog.shape[1] - 1
-        K = self.exog.shape[1]
+        J = int(self.J) - 1
+        K = int(self.K)
+        H = np.zeros((J*K, J*K))
+        for start in range(0, len(X), _HESSIAN_BLOCK_SIZE):
+            Xb = X[start:start + _HESSIAN_BLOCK_SIZE]
+            pr = self.cdf(np.dot(Xb, params))[:,1:]
+            for i in range(J):
+                # this loop assumes we drop the first col.
+                Xw = Xb * np.sqrt(pr[:,i] * (1 - pr[:,i]))[:,None]
+                H[i*K:(i+1)*K, i*K:(i+1)*K] -= np.dot(Xw.T, Xw)
+                for j in range(i + 1, J):
+                    Xw = Xb * np.sqrt(pr[:,i] * pr[:,j])[:,None]
+                    H[i*K:(i+1)*K, j*K:(j+1)*K] += np.dot(Xw.T, Xw)
         for i in range(J):
-            for j in range(J): # this loop assumes we drop the first col.
-                if i == j:
-                    partials.append(\
-                        -np.dot(((pr[:,i+1]*(1-pr[:,j+1]))[:,None]*X).T,X))
-                else:
-                    partials.append(-np.dot(((pr[:,i+1]*-pr[:,j+1])[:,None]*X).T,X))
-        H = np.array(partials)
-        # the developer's notes on multinomial should clear this math up
-        H = np.transpose(H.reshape(J,J,K,K), (0,2,1,3)).reshape(J*K,J*K)
+            for j in range(i + 1, J):
+                H[j*K:(j+1)*K, i*K:(i+1)*K] = H[i*K:(i+1)*K, j*K:(j+1)*K]
         return H
 
 
@@ -2053,6 +2341,34 @@ class NegativeBinomial(CountModel):
         else:
             return mlefit
 
+    def fit_regularized(self, start_params=None, method='l1',
+            maxiter='defined_by_method', full_output=1, disp=1, callback=None,
+            alpha=0, trim_mode='auto', auto_trim_tol=0.01, size_trim_tol=1e-4,
+            qc_tol=0.03, **kwargs):
+        if self.loglike_method.startswith('nb'):
+            # penalize alpha in alpha space, a scalar alpha does not
+            # penalize the heterogeneity parameter
+            self._transparams = False
+            if np.size(alpha) == 1:
+                alpha = alpha * np.ones(self.exog.shape[1] + 1)
+                alpha[-1] = 0
+        if start_params is None:
+            # Use poisson fit as first guess, exposure is already logged
+            offset = getattr(self, 'offset', 0) + getattr(self, 'exposure', 0)
+            if np.isscalar(offset):
+                offset = None
+            start_params = Poisson(self.endog, self.exog,
+                                   offset=offset).fit(disp=0).params
+            if self.loglike_method.startswith('nb'):
+                start_params = np.append(start_params, 0.1)
+        return super(NegativeBinomial, self).fit_regularized(
+                start_params=start_params, method=method, maxiter=maxiter,
+                full_output=full_output, disp=disp, callback=callback,
+                alpha=alpha, trim_mode=trim_mode, auto_trim_tol=auto_trim_tol,
+                size_trim_tol=size_trim_tol, qc_tol=qc_tol, **kwargs)
+
+    fit_regularized.__doc__ = DiscreteModel.fit_regularized.__doc__
+
 ### Results Class ###
 
 class DiscreteResults(base.LikelihoodModelResults):
@@ -2099,7 +2415,7 @@ class DiscreteResults(base.LikelihoodModelResults):
 
     @cache_readonly
     def fittedvalues(self):
-        return np.dot(self.model.exog, self.params[:self.model.exog.shape[1]])
+        return self.model.exog.dot(self.params[:self.model.exog.shape[1]])
 
     @cache_readonly
     def aic(self):
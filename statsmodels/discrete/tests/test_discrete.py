@@ -693,6 +693,180 @@ class TestL1AlphaZeroMNLogit(CompareL1):
         cls.res2 = MNLogit(data.endog, data.exog).fit(disp=0, tol=1e-15)
 
 
+class TestL1CDProbit(CheckLikelihoodModelL1):
+    @classmethod
+    def setupClass(cls):
+        data = sm.datasets.spector.load()
+        data.exog = sm.add_constant(data.exog, prepend=True)
+        alpha = np.array([0.1, 0.2, 0.3, 10])
+        cls.res1 = Probit(data.endog, data.exog).fit_regularized(
+            method="l1_cd", alpha=alpha, disp=0, trim_mode='auto',
+            auto_trim_tol=0.02, tol=1e-10)
+        res2 = DiscreteL1()
+        res2.probit()
+        cls.res2 = res2
+
+    def test_cov_params(self):
+        assert_almost_equal(
+                self.res1.cov_params(), self.res2.cov_params, DECIMAL_4)
+
+
+class TestL1CDMNLogit(CheckLikelihoodModelL1):
+    @classmethod
+    def setupClass(cls):
+        anes_data = sm.datasets.anes96.load()
+        anes_exog = anes_data.exog
+        anes_exog = sm.add_constant(anes_exog, prepend=False)
+        mlogit_mod = sm.MNLogit(anes_data.endog, anes_exog)
+        alpha = 10. * np.ones((mlogit_mod.J - 1, mlogit_mod.K))
+        alpha[-1,:] = 0
+        cls.res1 = mlogit_mod.fit_regularized(
+                method='l1_cd', alpha=alpha, trim_mode='auto',
+                auto_trim_tol=0.02, tol=1e-10, disp=0)
+        res2 = DiscreteL1()
+        res2.mnlogit()
+        cls.res2 = res2
+
+
+class TestL1CDAlphaZeroLogit(CompareL11D):
+    @classmethod
+    def setupClass(cls):
+        data = sm.datasets.spector.load()
+        data.exog = sm.add_constant(data.exog, prepend=True)
+        cls.res1 = Logit(data.endog, data.exog).fit_regularized(
+                method="l1_cd", alpha=0, disp=0, tol=1e-12,
+                trim_mode='auto', auto_trim_tol=0.01)
+        cls.res2 = Logit(data.endog, data.exog).fit(disp=0, tol=1e-15)
+
+
+def test_l1_cd_versus_slsqp():
+    # Poisson, slsqp is less accurate and auto trimming differs
+    data = sm.datasets.randhie.load()
+    exog = sm.add_constant(data.exog, prepend=False)
+    alpha = 10 * np.ones(exog.shape[1])
+    alpha[-1] = 0
+    mod = Poisson(data.endog, exog)
+    res1 = mod.fit_regularized(method='l1', alpha=alpha, disp=0, acc=1e-10,
+                               trim_mode='off')
+    res2 = mod.fit_regularized(method='l1_cd', alpha=alpha, disp=0,
+                               trim_mode='off')
+    assert_almost_equal(res2.params, res1.params, 4)
+    assert_(res2.mle_retvals['converged'])
+    assert_(res2.mle_retvals['qc_passed'])
+    objective = lambda params: -mod.loglike(params) + np.dot(alpha,
+                                                           np.abs(params))
+    assert_(objective(res2.params) <= objective(res1.params))
+
+    # the heterogeneity parameter of NegativeBinomial is not penalized
+    mod = NegativeBinomial(data.endog[:2000], exog[:2000])
+    res1 = mod.fit_regularized(method='l1', alpha=10., disp=0, acc=1e-10,
+                               trim_mode='size')
+    res2 = mod.fit_regularized(method='l1_cd', alpha=10., disp=0,
+                               trim_mode='size')
+    assert_almost_equal(res2.params, res1.params, 4)
+    assert_equal(res2.params == 0, res1.params == 0)
+
+
+def test_l1_cd_elastic_net():
+    data = sm.datasets.spector.load()
+    exog = sm.add_constant(data.exog, prepend=True)
+    mod = Logit(data.endog, exog)
+    alpha = 2 * np.array([0., 1., 1., 1.])
+    res = mod.fit_regularized(method='l1_cd', alpha=alpha, L1_wt=0.5,
+                              disp=0, trim_mode='off', tol=1e-12)
+    params = res.params
+    # optimality conditions of the elastic net
+    grad = -mod.score(params) + 0.5 * alpha * params
+    nonzero = params != 0
+    assert_almost_equal(grad[nonzero],
+                        -0.5 * alpha[nonzero] * np.sign(params[nonzero]), 6)
+    assert_(np.all(np.abs(grad[~nonzero]) <= 0.5 * alpha[~nonzero]))
+    # pure ridge, compare with a smooth penalized optimizer
+    res_ridge = mod.fit_regularized(method='l1_cd', alpha=alpha, L1_wt=0,
+                                    disp=0, trim_mode='off', tol=1e-12)
+    grad = -mod.score(res_ridge.params) + alpha * res_ridge.params
+    assert_almost_equal(grad, np.zeros(4), 6)
+
+
+def test_fit_regularized_path():
+    data = sm.datasets.anes96.load()
+    exog = sm.add_constant(data.exog, prepend=False)
+    mod = Logit((data.endog > 3).astype(float), exog)
+    weights = np.ones(exog.shape[1])
+    weights[-1] = 0
+    alphas = [a * weights for a in np.logspace(2.5, 0, 8)]
+    path = mod.fit_regularized_path(alphas, trim_mode='size',
+                                    size_trim_tol=1e-6, tol=1e-10)
+    assert_equal(len(path), 8)
+    nnz = [res.nnz_params for res in path]
+    assert_(nnz[0] < nnz[-1])
+    for alpha, res in zip(alphas, path):
+        # warm started and screened fits agree with cold fits
+        res_cold = mod.fit_regularized(method='l1_cd', alpha=alpha, disp=0,
+                                       trim_mode='size', size_trim_tol=1e-6,
+                                       tol=1e-10)
+        assert_(res.mle_retvals['converged'])
+        assert_almost_equal(res.params, res_cold.params, 6)
+
+
+def test_l1_cd_stalled():
+    # a badly scaled Hessian makes the line search fail, this is not
+    # convergence
+    class BadHessianLogit(Logit):
+        def hessian(self, params):
+            return 1e-20 * super(BadHessianLogit, self).hessian(params)
+    data = sm.datasets.spector.load()
+    exog = sm.add_constant(data.exog, prepend=True)
+    mod = BadHessianLogit(data.endog, exog)
+    res = mod.fit_regularized(method='l1_cd', alpha=0.1, disp=0,
+                              trim_mode='off')
+    assert_(not res.mle_retvals['converged'])
+    assert_equal(res.mle_retvals['iterations'], 1)
+
+
+def test_l1_cd_negbin_exposure():
+    data = sm.datasets.randhie.load()
+    exog = sm.add_constant(data.exog, prepend=False)[:1000]
+    endog = data.endog[:1000]
+    np.random.seed(12345)
+    exposure = np.random.uniform(1, 3, size=1000)
+    mod = NegativeBinomial(endog, exog, exposure=exposure)
+    res = mod.fit_regularized(method='l1_cd', alpha=0, disp=0,
+                              trim_mode='off', tol=1e-10)
+    res2 = mod.fit(method='newton', disp=0)
+    assert_(res.mle_retvals['converged'])
+    assert_almost_equal(res.params, res2.params, 5)
+
+
+def test_sparse_exog():
+    from scipy import sparse
+    from statsmodels.tools.grouputils import dummy_sparse
+    np.random.seed(98734)
+    nobs = 1000
+    groups = np.random.randint(0, 30, size=nobs)
+    exog = sparse.hstack((dummy_sparse(groups),
+                          np.random.randn(nobs, 2))).tocsr()
+    exog_dense = exog.toarray()
+    linpred = np.dot(exog_dense, 0.5 * np.random.randn(32))
+    endog_count = np.random.poisson(np.exp(linpred))
+    endog_binary = (np.random.logistic(size=nobs) < linpred).astype(float)
+    for model, endog in [(Logit, endog_binary), (Poisson, endog_count)]:
+        mod = model(endog, exog)
+        mod2 = model(endog, exog_dense)
+        params = mod2.fit(disp=0).params
+        assert_almost_equal(mod.loglike(params), mod2.loglike(params), 10)
+        assert_almost_equal(mod.score(params), mod2.score(params), 10)
+        assert_almost_equal(mod.hessian(params), mod2.hessian(params), 10)
+        assert_almost_equal(mod.jac(params).toarray(), mod2.jac(params), 10)
+        res = mod.fit(disp=0)
+        res2 = mod2.fit(disp=0)
+        assert_almost_equal(res.params, res2.params, 10)
+        assert_almost_equal(res.bse, res2.bse, 10)
+        assert_almost_equal(res.llnull, res2.llnull, 10)
+        assert_almost_equal(res.fittedvalues, res2.fittedvalues, 10)
+        assert_almost_equal(res.predict(exog[:10]), res2.predict()[:10], 10)
+
+
 class TestLogitNewton(CheckBinaryResults, CheckMargEff):
     @classmethod
     def setupClass(cls):
@@ -1186,6 +1360,61 @@ class TestMNLogitNewtonBaseZero(CheckModelResults):
     def test_resid(self):
         assert_array_equal(self.res1.resid_misclassified, self.res2.resid)
 
+
+class TestMNLogitTrustNewton(TestMNLogitNewtonBaseZero):
+    @classmethod
+    def setupClass(cls):
+        from results.results_discrete import Anes
+        data = sm.datasets.anes96.load()
+        cls.data = data
+        exog = data.exog
+        exog = sm.add_constant(exog, prepend=False)
+        cls.res1 = MNLogit(data.endog, exog).fit(method="trust-newton",
+                                                 disp=0)
+        res2 = Anes()
+        res2.mnlogit_basezero()
+        cls.res2 = res2
+
+    def test_converged(self):
+        assert_(self.res1.mle_retvals['converged'])
+
+
+def mnlogit_hessian_loop(model, params):
+    # all J**2 blocks, the implementation before the symmetric blocks
+    # also used in sandbox/examples/bench_mnlogit_hessian.py
+    params = params.reshape(model.K, -1, order='F')
+    X = model.exog
+    pr = model.cdf(np.dot(X, params))
+    J = int(model.J) - 1
+    K = int(model.K)
+    partials = []
+    for i in range(J):
+        for j in range(J):
+            partials.append(-np.dot(((pr[:,i+1] * ((i == j) - pr[:,j+1]))
+                                     [:,None] * X).T, X))
+    H = np.array(partials)
+    return np.transpose(H.reshape(J, J, K, K), (0, 2, 1, 3)).reshape(J*K, J*K)
+
+
+def test_mnlogit_hessian():
+    from statsmodels.discrete import discrete_model
+    np.random.seed(987689)
+    nobs = 1000
+    exog = sm.add_constant(np.random.randn(nobs, 3), prepend=True)
+    endog = np.random.randint(0, 4, size=nobs)
+    mod = MNLogit(endog, exog)
+    params = 0.2 * np.random.randn(12)
+    hess = mod.hessian(params)
+    assert_almost_equal(hess, mnlogit_hessian_loop(mod, params), 10)
+    assert_array_equal(hess, hess.T)
+    # rows of exog in several blocks
+    block_size = discrete_model._HESSIAN_BLOCK_SIZE
+    discrete_model._HESSIAN_BLOCK_SIZE = 300
+    try:
+        assert_almost_equal(mod.hessian(params), hess, 10)
+    finally:
+        discrete_model._HESSIAN_BLOCK_SIZE = block_size
+
 def test_perfect_prediction():
     cur_dir = os.path.dirname(os.path.abspath(__file__))
     iris_dir = os.path.join(cur_dir, '..', '..', 'genmod', 'tests', 'results')
@@ -1229,6 +1458,29 @@ def test_poisson_newton():
     mod = sm.Poisson(y_count, x)
     res = mod.fit(start_params=-np.ones(4), method='newton', disp=0)
     assert_(not res.mle_retvals['converged'])
+    # the damped steps converge from the same start_params
+    res = mod.fit(start_params=-np.ones(4), method='trust-newton', disp=0)
+    assert_(res.mle_retvals['converged'])
+    res2 = mod.fit(start_params=np.ones(4), method='newton', disp=0)
+    assert_almost_equal(res.params, res2.params, 8)
+    assert_almost_equal(res.bse, res2.bse, 8)
+
+def test_trust_newton_zero_hessian():
+    # saturated start_params, the Hessian is exactly zero
+    np.random.seed(0)
+    x = np.random.uniform(1, 2, size=50) * np.sign(np.random.randn(50))
+    y = (np.random.rand(50) < 0.5).astype(float)
+    mod = sm.Logit(y, x[:,None])
+    assert_equal(mod.hessian(np.array([1e3])), 0)
+    res = mod.fit(start_params=[1e3], method='trust-newton', disp=0)
+    assert_(np.isfinite(res.params).all())
+    assert_(not res.mle_retvals['converged'])
+    # small steps close to the optimum are reported as converged
+    res = mod.fit(start_params=[30.], method='trust-newton', maxiter=1000,
+                  disp=0)
+    assert_(res.mle_retvals['converged'])
+    res2 = mod.fit(method='newton', disp=0)
+    assert_almost_equal(res.params, res2.params, 8)
 
 def test_issue_339():
     # make sure MNLogit summary works for J != K.
@@ -1256,6 +1508,41 @@ def test_issue_341():
     np.testing.assert_equal(res1.predict(x).shape, (1,7))
     np.testing.assert_equal(res1.predict(x[None]).shape, (1,7))
 
+def test_margeff_jacobian():
+    # analytic Jacobian of the marginal effects against numerical derivative
+    from statsmodels.tools.numdiff import approx_fprime
+    np.random.seed(987689)
+    nobs = 300
+    exog = np.column_stack((np.random.randn(nobs),
+                            np.random.randint(0, 2, size=nobs),
+                            np.random.randint(1, 6, size=nobs),
+                            np.ones(nobs)))
+    linpred = 0.5 * exog[:, 0] - 0.5 * exog[:, 1] + 0.2 * exog[:, 2] - 0.5
+    endog_binary = (linpred + np.random.logistic(size=nobs) > 0)
+    endog_count = np.random.poisson(np.exp(linpred))
+    endog_multi = np.digitize(linpred + np.random.logistic(size=nobs),
+                              [-1, 0.5])
+    models = [Logit(endog_binary, exog), Probit(endog_binary, exog),
+              Poisson(endog_count, exog),
+              NegativeBinomial(endog_count, exog),
+              MNLogit(endog_multi, exog)]
+    for mod in models:
+        params = mod.fit(disp=0).params
+        params = params.ravel('F')
+        options = [('dydx', None, None), ('eyex', None, None),
+                   ('dyex', None, None), ('eydx', None, None),
+                   ('dydx', np.array([1]), np.array([2])),
+                   ('eydx', np.array([1]), np.array([2]))]
+        for method, dummy_idx, count_idx in options:
+            for x in [exog, exog.mean(0)[None]]:
+                jac = mod._derivative_exog_params(params, x, method,
+                                                  dummy_idx, count_idx)
+                func = lambda p: mod._derivative_exog(p, x, method,
+                                                      dummy_idx,
+                                                      count_idx).mean(0)
+                jac_num = approx_fprime(params, func, centered=True)
+                assert_almost_equal(jac, jac_num, 6)
+
 def test_iscount():
     X = np.random.random((50, 10))
     X[:,2] = np.random.randint(1, 10, size=50)
@@ -0,0 +1,337 @@
+"""
+Generalized linear models for data that does not fit in memory.
+
+The data is read in blocks of rows in each pass of the iteratively
+reweighted least squares algorithm. Only the cross-product matrices X'WX
+and X'Wz and a few sums are kept, as in the bigglm package of R, so that
+neither the full design nor the vectors mu and weights are held in memory.
+
+References
+----------
+Lumley, T. biglm: bounded memory linear and generalized linear models.
+    R package.
+"""
+
+import numpy as np
+from statsmodels.tools.tools import rank
+from statsmodels.tools.decorators import cache_readonly, resettable_cache
+import statsmodels.base.model as base
+from statsmodels.genmod import families
+from statsmodels.genmod.generalized_linear_model import (GLM, GLMResults,
+        _solve_normal, _check_convergence)
+
+__all__ = ['ChunkedGLM', 'ChunkedGLMResults']
+
+
+class ChunkedGLM(GLM):
+    """
+    Generalized linear model fit by streaming the data in blocks of rows.
+
+    Parameters
+    ----------
+    data : tuple of arrays or callable
+        Either a tuple (endog, exog) or (endog, exog, offset) of arrays that
+        support slicing of rows, for example numpy memmaps or HDF5 datasets,
+        or a callable that returns an iterable of such tuples for
+        consecutive blocks of rows. The callable is called once for each
+        pass over the data, a generator function can be used.
+    family : family class instance
+        The default is Gaussian.
+    block_size : int
+        The number of rows in a block if data is a tuple of arrays.
+    exog_names : list of strings, optional
+        Names of the regressors. Default is `x1`, `x2`, ...
+    endog_name : string
+        Name of the dependent variable, default is 'y'.
+
+    Notes
+    -----
+    A log exposure can be included as offset. Binomial endog can have two
+    columns of successes and failures as in GLM.
+
+    Results that need the full vector of observations, for example mu and
+    the residuals, are not available. Use `predict` on blocks of rows
+    instead.
+
+    Examples
+    --------
+    >>> endog = np.memmap('y.dat', dtype=float, mode='r')
+    >>> exog = np.memmap('x.dat', dtype=float, mode='r').reshape(-1, 300)
+    >>> mod = ChunkedGLM((endog, exog), family=sm.families.Poisson())
+    >>> res = mod.fit()
+    """
+
+    def __init__(self, data, family=None, block_size=100000, exog_names=None,
+                 endog_name='y'):
+        if family is None:
+            family = families.Gaussian()
+        self.family = family
+        self.data = data
+        self.block_size = block_size
+        self._exog_names = exog_names
+        self._endog_name = endog_name
+        self.k_exog = None
+        self._data_attr = []
+
+    @property
+    def endog_names(self):
+        return self._endog_name
+
+    @property
+    def exog_names(self):
+        if self._exog_names is not None:
+            return self._exog_names
+        return ['x%d' % i for i in range(1, self.k_exog + 1)]
+
+    def iter_blocks(self):
+        """
+        Iterate over the blocks of data.
+
+        Yields
+        ------
+        endog, exog, offset : arrays
+            The data of a block of rows. offset is 0 if there is none.
+        """
+        data = self.data
+        if callable(data):
+            chunks = data()
+        else:
+            nobs = len(data[0])
+            step = self.block_size
+            chunks = (tuple(arr[start:start + step] for arr in data)
+                      for start in range(0, nobs, step))
+        for chunk in chunks:
+            endog = np.asarray(chunk[0], dtype=float)
+            exog = np.asarray(chunk[1], dtype=float)
+            if exog.ndim == 1:
+                exog = exog[:, None]
+            offset = 0
+            if len(chunk) > 2 and chunk[2] is not None:
+                offset = np.asarray(chunk[2], dtype=float)
+            yield endog, exog, offset
+
+    def _prepare_block(self, endog):
+        if endog.ndim > 1 and endog.shape[1] == 2:
+            data_weights = endog.sum(1) # weights are total trials
+        else:
+            data_weights = 1.
+        if isinstance(self.family, families.Binomial):
+            endog = self.family.initialize(endog)
+        return endog, data_weights
+
+    def _irls_pass(self, params, check_constant=False):
+        """
+        One pass over the data at params.
+
+        Returns X'WX, X'Wz, the deviance, Pearson's chi-square and the
+        number of observations. If params is None, the starting values of
+        the family are used. If check_constant is True, k_constant is set
+        from the columns of exog that are constant and not zero.
+        """
+        family = self.family
+        xtwx = xtwz = None
+        deviance = pearson_chi2 = 0.
+        nobs = 0
+        for endog, exog, offset in self.iter_blocks():
+            if check_constant:
+                if nobs == 0:
+                    col_min, col_max = exog.min(0), exog.max(0)
+                else:
+                    col_min = np.minimum(col_min, exog.min(0))
+                    col_max = np.maximum(col_max, exog.max(0))
+            endog, data_weights = self._prepare_block(endog)
+            if params is None:
+                mu = family.starting_mu(endog)
+                eta = family.predict(mu)
+            else:
+                eta = np.dot(exog, params) + offset
+                mu = family.fitted(eta)
+            weights = data_weights * family.weights(mu)
+            wlsendog = eta + family.link.deriv(mu) * (endog - mu) - offset
+            wexog = exog * weights[:, None]
+            if xtwx is None:
+                xtwx = np.dot(wexog.T, exog)
+                xtwz = np.dot(wlsendog, wexog)
+            else:
+                xtwx += np.dot(wexog.T, exog)
+                xtwz += np.dot(wlsendog, wexog)
+            deviance += family.deviance(endog, mu)
+            pearson_chi2 += np.sum(data_weights * (endog - mu)**2 /
+                                   family.variance(mu))
+            nobs += endog.shape[0]
+        if xtwx is None:
+            raise ValueError("data has no observations")
+        if check_constant:
+            self.k_constant = int(((col_min == col_max) &
+                                   (col_max != 0)).sum())
+        return xtwx, xtwz, deviance, pearson_chi2, nobs
+
+    def loglike(self, params, scale=1.):
+        """
+        Loglikelihood at params, computed in one pass over the data.
+        """
+        family = self.family
+        gaussian_ols = (isinstance(family, families.Gaussian) and
+                        isinstance(family.link, families.links.Power) and
+                        family.link.power == 1)
+        llf = 0.
+        nobs = 0
+        for endog, exog, offset in self.iter_blocks():
+            endog, data_weights = self._prepare_block(endog)
+            eta = np.dot(exog, params) + offset
+            mu = family.fitted(eta)
+            if isinstance(family, families.NegativeBinomial):
+                llf += family.loglike(endog, fittedvalues=eta)
+            elif gaussian_ols:
+                # the concentrated loglikelihood needs the total ssr
+                llf += np.sum((endog - mu)**2)
+            else:
+                llf += family.loglike(endog, mu, scale=scale)
+            nobs += endog.shape[0]
+        if gaussian_ols:
+            nobs2 = nobs / 2.
+            llf = -np.log(llf) * nobs2 - (1 + np.log(np.pi / nobs2)) * nobs2
+        return llf
+
+    def predict(self, params, exog, offset=0, linear=False):
+        """
+        Return predicted values for a block of rows of exog.
+        """
+        eta = np.dot(exog, params) + offset
+        if linear:
+            return eta
+        return self.family.fitted(eta)
+
+    def fit(self, maxiter=100, tol=1e-8, scale=None, start_params=None):
+        """
+        Fit the model by IRLS with one pass over the data per iteration.
+
+        Parameters
+        ----------
+        maxiter : int, optional
+            Maximum number of iterations. Default is 100.
+        tol : float
+            Convergence tolerance for the change in the deviance. Default
+            is 1e-8.
+        scale : string or float, optional
+            See GLM.fit.
+        start_params : array-like, optional
+            Initial guess of the parameters. The default starts from
+            `family.starting_mu` and needs one additional pass.
+
+        Returns
+        -------
+        ChunkedGLMResults instance
+
+        Notes
+        -----
+        The normal equations are solved with a Cholesky decomposition, or the
+        generalized inverse if X'WX is not of full rank. The returned
+        params are the ones at which the deviance converged, and the
+        covariance uses the weights at these params.
+        """
+        self.scaletype = scale
+        params = start_params
+        history = dict(params=[None], deviance=[np.inf])
+        wls_method = 'cholesky'
+        iteration = 0
+        while True:
+            xtwx, xtwz, deviance, pearson_chi2, nobs = self._irls_pass(params,
+                                                    check_constant=iteration == 0)
+            history['params'].append(params)
+            history['deviance'].append(deviance)
+            if params is not None and _check_convergence(
+                    history['deviance'], len(history['deviance']) - 1, tol,
+                    maxiter):
+                break
+            if iteration == 0:
+                self.k_exog = k_exog = xtwx.shape[0]
+                # scale to a correlation matrix for a scale invariant rank
+                std = np.sqrt(np.diag(xtwx))
+                self.rank = rank(xtwx / np.outer(std, std))
+                if self.rank < k_exog:
+                    wls_method = 'pinv'
+            params, normalized_cov_params, wls_method = _solve_normal(xtwx,
+                                                        xtwz, wls_method)
+            iteration += 1
+
+        self.nobs = nobs
+        self.df_model = self.rank - 1
+        self.df_resid = nobs - self.rank
+        normalized_cov_params = _solve_normal(xtwx, np.zeros(len(xtwz)),
+                                              wls_method)[1]
+        self.scale = self._estimate_scale(deviance, pearson_chi2)
+        history['iteration'] = iteration
+        results = ChunkedGLMResults(self, params, normalized_cov_params,
+                                    self.scale)
+        results._cache['deviance'] = deviance
+        results._cache['pearson_chi2'] = pearson_chi2
+        results.fit_history = history
+        return results
+
+    def _estimate_scale(self, deviance, pearson_chi2):
+        scaletype = self.scaletype
+        if not scaletype:
+            if isinstance(self.family, (families.Binomial,
+                                        families.Poisson)):
+                return 1.
+            return pearson_chi2 / self.df_resid
+        if isinstance(scaletype, float):
+            return np.array(scaletype)
+        if isinstance(scaletype, str) and scaletype.lower() == 'x2':
+            return pearson_chi2 / self.df_resid
+        elif isinstance(scaletype, str) and scaletype.lower() == 'dev':
+            return deviance / self.df_resid
+        raise ValueError("Scale %s with type %s not understood" %
+                         (scaletype, type(scaletype)))
+
+
+def _not_available(name):
+    def func(self):
+        raise ValueError("%s needs all observations at once and is not "
+                         "available for ChunkedGLM" % name)
+    return property(func)
+
+
+class ChunkedGLMResults(GLMResults):
+    """
+    Results of a ChunkedGLM.
+
+    Provides the same parameter inference and summary statistics as
+    GLMResults. The loglikelihood and the null deviance need additional
+    passes over the data and are computed when they are first accessed.
+    """
+
+    def __init__(self, model, params, normalized_cov_params, scale):
+        base.LikelihoodModelResults.__init__(self, model, params,
+                normalized_cov_params=normalized_cov_params, scale=scale)
+        self.family = model.family
+        self.nobs = model.nobs
+        self.df_resid = model.df_resid
+        self.df_model = model.df_model
+        self._cache = resettable_cache()
+
+    mu = _not_available('mu')
+    fittedvalues = _not_available('fittedvalues')
+    resid_response = _not_available('resid_response')
+    resid_pearson = _not_available('resid_pearson')
+    resid_working = _not_available('resid_working')
+    resid_anscombe = _not_available('resid_anscombe')
+    resid_deviance = _not_available('resid_deviance')
+    null = _not_available('null')
+
+    @cache_readonly
+    def llf(self):
+        return self.model.loglike(self.params, scale=self.scale)
+
+    @cache_readonly
+    def null_deviance(self):
+        model = self.model
+        def data():
+            for endog, exog, offset in model.iter_blocks():
+                yield endog, np.ones((len(exog), 1)), offset
+        null_model = ChunkedGLM(data, family=self.family)
+        return null_model.fit().deviance
+
+    def remove_data(self):
+        pass
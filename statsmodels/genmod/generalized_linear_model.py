@@ -19,8 +19,9 @@ McCullagh, P. and Nelder, J.A.  1989.  "Generalized Linear Models." 2nd ed.
 """
 
 import numpy as np
+from scipy import linalg, sparse
 import families
-from statsmodels.tools.tools import rank
+from statsmodels.tools.tools import rank, gram
 from statsmodels.tools.decorators import (cache_readonly,
         resettable_cache)
 
@@ -37,6 +38,72 @@ def _check_convergence(criterion, iteration, tol, maxiter):
     return not ((np.fabs(criterion[iteration] - criterion[iteration-1]) > tol)
             and iteration <= maxiter)
 
+# number of rows of the buffer used to accumulate the normal equations
+_BLOCK_SIZE = 10000
+
+def _wls_normal_equations(exog, weights, wlsendog, buffer):
+    """
+    Accumulate X'WX and X'Wz over blocks of rows.
+
+    buffer is a preallocated array with k columns, its number of rows is the
+    block size.
+    """
+    nobs, k_vars = exog.shape
+    block_size = buffer.shape[0]
+    xtwx = np.zeros((k_vars, k_vars))
+    xtwz = np.zeros(k_vars)
+    for start in range(0, nobs, block_size):
+        stop = min(start + block_size, nobs)
+        wexog = buffer[:stop - start]
+        np.multiply(exog[start:stop], weights[start:stop, None], wexog)
+        xtwx += np.dot(wexog.T, exog[start:stop])
+        xtwz += np.dot(wlsendog[start:stop], wexog)
+    return xtwx, xtwz
+
+def _solve_normal(xtwx, xtwz, wls_method='cholesky'):
+    """
+    Solve the normal equations, returns params, normalized_cov_params and
+    the method that was used.
+
+    Falls back to the generalized inverse if xtwx is not positive definite.
+    """
+    if wls_method == 'cholesky':
+        try:
+            factor = linalg.cho_factor(xtwx)
+            params = linalg.cho_solve(factor, xtwz)
+            normalized_cov_params = linalg.cho_solve(factor,
+                                                     np.eye(len(xtwz)))
+            return params, normalized_cov_params, wls_method
+        except linalg.LinAlgError:
+            wls_method = 'pinv-normal'
+    normalized_cov_params = np.linalg.pinv(xtwx)
+    params = np.dot(normalized_cov_params, xtwz)
+    return params, normalized_cov_params, wls_method
+
+def _wls_qr(exog, weights, wlsendog, buffer):
+    """
+    Weighted least squares by the QR decomposition of the weighted design.
+
+    buffer is a preallocated Fortran ordered nobs x (k + 1) array. The
+    weighted endog is appended as last column, so that the last column of R
+    holds Q'z and Q is not needed.
+    """
+    k_vars = exog.shape[1]
+    sqrt_weights = np.sqrt(weights)
+    np.multiply(exog, sqrt_weights[:, None], buffer[:, :k_vars])
+    np.multiply(wlsendog, sqrt_weights, buffer[:, k_vars])
+    r = linalg.qr(buffer, mode='raw', overwrite_a=True)[1]
+    r_inv = linalg.solve_triangular(r[:k_vars, :k_vars], np.eye(k_vars))
+    params = np.dot(r_inv, r[:k_vars, k_vars])
+    return params, np.dot(r_inv, r_inv.T)
+
+def _wls_pinv(exog, weights, wlsendog):
+    sqrt_weights = np.sqrt(weights)
+    pinv_wexog = np.linalg.pinv(exog * sqrt_weights[:, None])
+    params = np.dot(pinv_wexog, sqrt_weights * wlsendog)
+    normalized_cov_params = np.dot(pinv_wexog, pinv_wexog.T)
+    return params, normalized_cov_params
+
 class GLM(base.LikelihoodModel):
     __doc__ = '''
     Generalized Linear Models class
@@ -195,7 +262,7 @@ class GLM(base.LikelihoodModel):
         if exposure is None:
             delattr(self, 'exposure')
         #things to remove_data
-        self._data_attr.extend(['weights', 'pinv_wexog', 'mu', 'data_weights',
+        self._data_attr.extend(['weights', '_pinv_wexog', 'mu', 'data_weights',
                                 ])
 
     def initialize(self):
@@ -207,12 +274,36 @@ class GLM(base.LikelihoodModel):
                         'params' : [np.inf],
                         'deviance' : [np.inf]}
 
-        self.pinv_wexog = np.linalg.pinv(self.exog)
-        self.normalized_cov_params = np.dot(self.pinv_wexog,
-                                        np.transpose(self.pinv_wexog))
-
-        self.df_model = rank(self.exog)-1
-        self.df_resid = self.exog.shape[0] - rank(self.exog)
+        self._pinv_wexog = None
+        self._normalized_cov_params = None
+        self.rank = rank(self.exog)
+        self.df_model = self.rank - 1
+        self.df_resid = self.exog.shape[0] - self.rank
+
+    # pinv_wexog and normalized_cov_params of the design are not used in fit
+    # and are only computed when they are accessed
+    @property
+    def pinv_wexog(self):
+        if self._pinv_wexog is None:
+            self._pinv_wexog = np.linalg.pinv(self.exog)
+        return self._pinv_wexog
+
+    @pinv_wexog.setter
+    def pinv_wexog(self, value):
+        self._pinv_wexog = value
+
+    @property
+    def normalized_cov_params(self):
+        if self._normalized_cov_params is None and sparse.issparse(self.exog):
+            self._normalized_cov_params = np.linalg.pinv(gram(self.exog))
+        elif self._normalized_cov_params is None:
+            self._normalized_cov_params = np.dot(self.pinv_wexog,
+                                                 self.pinv_wexog.T)
+        return self._normalized_cov_params
+
+    @normalized_cov_params.setter
+    def normalized_cov_params(self, value):
+        self._normalized_cov_params = value
 
     def _check_inputs(self, family, offset, exposure, endog):
         if family is None:
@@ -252,14 +343,6 @@ class GLM(base.LikelihoodModel):
         """
         raise NotImplementedError
 
-    def _update_history(self, tmp_result, mu, history):
-        """
-        Helper method to update history during iterative fit.
-        """
-        history['params'].append(tmp_result.params)
-        history['deviance'].append(self.family.deviance(self.endog, mu))
-        return history
-
     def estimate_scale(self, mu):
         """
         Estimates the dispersion/scale.
@@ -333,13 +416,17 @@ class GLM(base.LikelihoodModel):
         exposure = getattr(self, 'exposure', 0)
         if exog is None:
             exog = self.exog
+        if sparse.issparse(exog):
+            linpred = exog.dot(params)
+        else:
+            linpred = np.dot(exog, params)
         if linear:
-            return np.dot(exog, params) + offset + exposure
+            return linpred + offset + exposure
         else:
-            return self.family.fitted(np.dot(exog, params) + exposure + \
-                                                             offset)
+            return self.family.fitted(linpred + exposure + offset)
 
-    def fit(self, maxiter=100, method='IRLS', tol=1e-8, scale=None):
+    def fit(self, maxiter=100, method='IRLS', tol=1e-8, scale=None,
+            start_params=None, wls_method='qr', full_history=True):
         '''
         Fits a generalized linear model for a given family.
 
@@ -359,7 +446,33 @@ class GLM(base.LikelihoodModel):
             `dev` is the deviance divided by df_resid
         tol : float
             Convergence tolerance.  Default is 1e-8.
+        start_params : array-like, optional
+            Initial guess of the parameters. The default starts from
+            `family.starting_mu`.
+        wls_method : str {'qr', 'cholesky', 'pinv'}
+            How the weighted least squares problem of each iteration is
+            solved. 'qr' uses the QR decomposition of the weighted design in
+            a buffer that is allocated once. 'cholesky' accumulates the
+            weighted normal equations X'WX b = X'Wz in blocks of rows and
+            solves them by a Cholesky decomposition. It is the fastest and
+            needs the least memory, but it squares the condition number of
+            the design and can be inaccurate for badly conditioned designs.
+            If X'WX is not positive definite, its generalized inverse is
+            used. 'pinv' uses the generalized inverse of the weighted design
+            computed by a singular value decomposition. 'pinv' is always
+            used if the design is not of full rank.
+
+            If exog is a scipy.sparse matrix, the normal equations are always
+            used, X'WX is accumulated without densifying exog and solved
+            by 'cholesky', or by its generalized inverse if the design is
+            not of full rank.
+        full_history : bool
+            If True, the params of each iteration are stored in
+            `fit_history`. The deviance and the number of iterations are
+            always available.
         '''
+        if wls_method not in ['qr', 'cholesky', 'pinv']:
+            raise ValueError("wls_method %s not understood" % wls_method)
         endog = self.endog
         if endog.ndim > 1 and endog.shape[1] == 2:
             data_weights = endog.sum(1) # weights are total trials
@@ -384,31 +497,64 @@ class GLM(base.LikelihoodModel):
             offset = 0
         #TODO: would there ever be both and exposure and an offset?
 
-        mu = self.family.starting_mu(self.endog)
-        wlsexog = self.exog
-        eta = self.family.predict(mu)
+        exog = self.exog
+        if start_params is None:
+            mu = self.family.starting_mu(self.endog)
+            eta = self.family.predict(mu)
+        else:
+            eta = exog.dot(start_params) + offset
+            mu = self.family.fitted(eta)
         dev = self.family.deviance(self.endog, mu)
         if np.isnan(dev):
             raise ValueError("The first guess on the deviance function "
                              "returned a nan.  This could be a boundary "
                              " problem and should be reported.")
 
-
+        exog_sparse = sparse.issparse(exog)
+        if exog_sparse:
+            wls_method = 'cholesky'
+            if self.rank < exog.shape[1]:
+                wls_method = 'pinv-normal'
+        elif self.rank < exog.shape[1]:
+            wls_method = 'pinv'
         # first guess on the deviance is assumed to be scaled by 1.
         # params are none to start, so they line up with the deviance
-        history = dict(params = [None, None], deviance=[np.inf,dev])
+        history = dict(params = [None, start_params], deviance=[np.inf,dev])
         iteration = 0
         converged = 0
         criterion = history['deviance']
+        buffer = None
         while not converged:
             self.weights = data_weights*self.family.weights(mu)
             wlsendog = eta + self.family.link.deriv(mu) * (self.endog-mu) \
                 - offset
-            wls_results = lm.WLS(wlsendog, wlsexog, self.weights).fit()
-            eta = np.dot(self.exog, wls_results.params) + offset
+            if exog_sparse:
+                xtwx = gram(exog, self.weights)
+                xtwz = exog.T.dot(self.weights * wlsendog)
+                params, normalized_cov_params, wls_method = _solve_normal(
+                                                xtwx, xtwz, wls_method)
+            elif wls_method == 'pinv':
+                params, normalized_cov_params = _wls_pinv(exog, self.weights,
+                                                          wlsendog)
+            elif wls_method == 'qr':
+                if buffer is None:
+                    buffer = np.empty((exog.shape[0], exog.shape[1] + 1),
+                                      order='F')
+                params, normalized_cov_params = _wls_qr(exog, self.weights,
+                                                        wlsendog, buffer)
+            else:
+                if buffer is None:
+                    buffer = np.empty((min(len(exog), _BLOCK_SIZE),
+                                       exog.shape[1]))
+                xtwx, xtwz = _wls_normal_equations(exog, self.weights,
+                                                   wlsendog, buffer)
+                params, normalized_cov_params, wls_method = _solve_normal(
+                                                xtwx, xtwz, wls_method)
+            eta = exog.dot(params) + offset
             mu = self.family.fitted(eta)
-            history = self._update_history(wls_results, mu, history)
-            self.scale = self.estimate_scale(mu)
+            if full_history:
+                history['params'].append(params)
+            history['deviance'].append(self.family.deviance(self.endog, mu))
             iteration += 1
             if endog.squeeze().ndim == 1 and np.allclose(mu - endog, 0):
                 msg = "Perfect separation detected, results not available"
@@ -416,8 +562,10 @@ class GLM(base.LikelihoodModel):
             converged = _check_convergence(criterion, iteration, tol,
                                             maxiter)
         self.mu = mu
-        glm_results = GLMResults(self, wls_results.params,
-                                 wls_results.normalized_cov_params,
+        self.scale = self.estimate_scale(mu)
+        if not full_history:
+            del history['params']
+        glm_results = GLMResults(self, params, normalized_cov_params,
                                  self.scale)
         history['iteration'] = iteration
         glm_results.fit_history = history
@@ -520,11 +668,14 @@ class GLMResults(base.LikelihoodModelResults):
         self._data_weights = model.data_weights
         self.df_resid = model.df_resid
         self.df_model = model.df_model
-        self.pinv_wexog = model.pinv_wexog
         self._cache = resettable_cache()
         # are these intermediate results needed or can we just
         # call the model's attributes?
 
+    @property
+    def pinv_wexog(self):
+        return self.model.pinv_wexog
+
     @cache_readonly
     def resid_response(self):
         return self._data_weights * (self._endog-self.mu)
@@ -592,7 +743,7 @@ class GLMResults(base.LikelihoodModelResults):
         _modelfamily = self.family
         if isinstance(_modelfamily, families.NegativeBinomial):
             val = _modelfamily.loglike(self.model.endog,
-                        fittedvalues = np.dot(self.model.exog,self.params))
+                        fittedvalues = self.model.exog.dot(self.params))
         else:
             val = _modelfamily.loglike(self._endog, self.mu,
                                     scale=self.scale)
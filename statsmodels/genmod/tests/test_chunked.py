@@ -0,0 +1,147 @@
+import os
+import tempfile
+import numpy as np
+from numpy.testing import (assert_almost_equal, assert_allclose, assert_equal,
+                           assert_raises, assert_)
+import statsmodels.api as sm
+from statsmodels.genmod.chunked import ChunkedGLM
+
+
+def _generator(endog, exog, offset=None, block_size=37):
+    def data():
+        for start in range(0, len(endog), block_size):
+            stop = start + block_size
+            chunk = endog[start:stop], exog[start:stop]
+            if offset is not None:
+                chunk += (offset[start:stop],)
+            yield chunk
+    return data
+
+
+class CheckChunked(object):
+
+    def test_params(self):
+        res1, res2 = self.res1, self.res2
+        assert_allclose(res1.params, res2.params, rtol=1e-7)
+        assert_allclose(res1.bse, res2.bse, rtol=1e-7)
+        assert_allclose(res1.scale, res2.scale, rtol=1e-7)
+
+    def test_stats(self):
+        res1, res2 = self.res1, self.res2
+        assert_equal(res1.nobs, res2.nobs)
+        assert_equal(res1.df_resid, res2.df_resid)
+        # the chunked results are at the params of the last deviance
+        assert_allclose(res1.deviance, res2.deviance, rtol=1e-7)
+        assert_allclose(res1.pearson_chi2, res2.pearson_chi2, rtol=1e-7)
+        assert_allclose(res1.llf, res2.llf, rtol=1e-7)
+        assert_allclose(res1.aic, res2.aic, rtol=1e-7)
+        assert_allclose(res1.null_deviance, res2.null_deviance, rtol=1e-7)
+
+    def test_summary(self):
+        self.res1.summary()
+
+    def test_no_data(self):
+        assert_raises(ValueError, getattr, self.res1, 'mu')
+        assert_raises(ValueError, getattr, self.res1, 'resid_pearson')
+
+
+class TestChunkedPoisson(CheckChunked):
+
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(987125)
+        nobs = 1000
+        exog = sm.add_constant(np.random.randn(nobs, 3), prepend=True)
+        exposure = np.random.uniform(1, 5, size=nobs)
+        endog = np.random.poisson(exposure * np.exp(0.2 * exog.sum(1)))
+        # GLMResults.null takes the log of the exposure twice, use offset
+        cls.res2 = sm.GLM(endog, exog, family=sm.families.Poisson(),
+                          offset=np.log(exposure)).fit()
+
+        # memmap of the data as it would be used for data on disk
+        cls.tmpdir = tempfile.mkdtemp()
+        fname = os.path.join(cls.tmpdir, 'exog.dat')
+        exog_mm = np.memmap(fname, dtype=float, mode='w+', shape=exog.shape)
+        exog_mm[:] = exog
+        data = (endog, exog_mm, np.log(exposure))
+        cls.res1 = ChunkedGLM(data, family=sm.families.Poisson(),
+                              block_size=300).fit()
+
+    @classmethod
+    def teardownClass(cls):
+        del cls.res1
+        import shutil
+        shutil.rmtree(cls.tmpdir, ignore_errors=True)
+
+
+class TestChunkedPoissonNoConstant(CheckChunked):
+
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(987125)
+        nobs = 1000
+        exog = np.random.uniform(0, 1, size=(nobs, 2))
+        endog = np.random.poisson(np.exp(2 + exog.sum(1)))
+        cls.res2 = sm.GLM(endog, exog, family=sm.families.Poisson()).fit()
+        gen = _generator(endog, exog, block_size=150)
+        cls.res1 = ChunkedGLM(gen, family=sm.families.Poisson()).fit()
+
+
+class TestChunkedGamma(CheckChunked):
+
+    @classmethod
+    def setupClass(cls):
+        data = sm.datasets.scotland.load()
+        exog = sm.add_constant(data.exog, prepend=False)
+        cls.res2 = sm.GLM(data.endog, exog, family=sm.families.Gamma()).fit()
+        gen = _generator(data.endog, exog, block_size=7)
+        cls.res1 = ChunkedGLM(gen, family=sm.families.Gamma()).fit()
+
+
+class TestChunkedGaussian(CheckChunked):
+
+    @classmethod
+    def setupClass(cls):
+        data = sm.datasets.longley.load()
+        exog = sm.add_constant(data.exog, prepend=False)
+        cls.res2 = sm.GLM(data.endog, exog).fit()
+        cls.res1 = ChunkedGLM((data.endog, exog), block_size=5).fit()
+
+    def test_params(self):
+        # longley is badly conditioned for the normal equations
+        res1, res2 = self.res1, self.res2
+        assert_almost_equal(res1.params / res2.params, 1, 6)
+        assert_almost_equal(res1.bse / res2.bse, 1, 6)
+
+
+class TestChunkedBinomial(CheckChunked):
+
+    @classmethod
+    def setupClass(cls):
+        data = sm.datasets.star98.load()
+        exog = sm.add_constant(data.exog, prepend=False)
+        cls.res2 = sm.GLM(data.endog, exog,
+                          family=sm.families.Binomial()).fit()
+        gen = _generator(data.endog, exog, block_size=50)
+        cls.res1 = ChunkedGLM(gen, family=sm.families.Binomial()).fit()
+
+    def test_stats(self):
+        # GLM computes the null deviance with the proportions as endog
+        res1, res2 = self.res1, self.res2
+        assert_allclose(res1.deviance, res2.deviance, rtol=1e-7)
+        assert_allclose(res1.pearson_chi2, res2.pearson_chi2, rtol=1e-7)
+        assert_allclose(res1.llf, res2.llf, rtol=1e-7)
+
+
+def test_start_params():
+    np.random.seed(987125)
+    nobs = 500
+    exog = sm.add_constant(np.random.randn(nobs, 2), prepend=True)
+    endog = (exog.sum(1) + np.random.logistic(size=nobs) > 1).astype(float)
+    mod = ChunkedGLM((endog, exog), family=sm.families.Binomial(),
+                     block_size=100)
+    res = mod.fit()
+    res_warm = mod.fit(start_params=res.params)
+    assert_almost_equal(res_warm.params, res.params, 8)
+    assert_(res_warm.fit_history['iteration'] < res.fit_history['iteration'])
+    assert_equal(mod.exog_names, ['x1', 'x2', 'x3'])
@@ -340,6 +340,19 @@ class TestGlmPoisson(CheckModelResults):
                     family=sm.families.Poisson()).fit()
         self.res2 = Cpunish()
 
+class TestGlmPoissonCholesky(TestGlmPoisson):
+    def __init__(self):
+        super(TestGlmPoissonCholesky, self).__init__()
+        self.res1 = GLM(self.data.endog, self.data.exog,
+                    family=sm.families.Poisson()).fit(wls_method='cholesky')
+
+class TestGlmPoissonPinv(TestGlmPoisson):
+    def __init__(self):
+        super(TestGlmPoissonPinv, self).__init__()
+        self.res1 = GLM(self.data.endog, self.data.exog,
+                    family=sm.families.Poisson()).fit(wls_method='pinv',
+                                                      full_history=False)
+
 #class TestGlmPoissonIdentity(CheckModelResults):
 #    pass
 
@@ -506,6 +519,56 @@ def test_attribute_writable_resettable():
     glm_model2 = sm.GLM(endog, exog)
     assert_equal(glm_model2.family.link.power, 1.0)
 
+
+def test_wls_methods():
+    data = sm.datasets.scotland.load()
+    exog = add_constant(data.exog, prepend=False)
+    mod = GLM(data.endog, exog, family=sm.families.Gamma())
+    res_qr = mod.fit()
+    assert_equal(len(res_qr.fit_history['params']),
+                 res_qr.fit_history['iteration'] + 2)
+    for wls_method in ['pinv', 'cholesky']:
+        res = mod.fit(wls_method=wls_method, full_history=False)
+        assert_almost_equal(res.params, res_qr.params, 10)
+        assert_almost_equal(res.bse, res_qr.bse, 10)
+        assert_('params' not in res.fit_history)
+    assert_raises(ValueError, mod.fit, wls_method='svd')
+
+    # warm start
+    res = mod.fit(start_params=res_qr.params)
+    assert_almost_equal(res.params, res_qr.params, 10)
+    assert_(res.fit_history['iteration'] <= 2)
+
+    # design that is not of full rank uses the generalized inverse
+    exog2 = np.column_stack((exog, exog[:, 0]))
+    res2 = GLM(data.endog, exog2, family=sm.families.Gamma()).fit()
+    assert_almost_equal(res2.params[1:-1], res_qr.params[1:], 8)
+    assert_almost_equal(res2.params[[0, -1]], res_qr.params[0] / 2., 8)
+
+def test_glm_sparse():
+    from scipy import sparse
+    from statsmodels.tools.grouputils import dummy_sparse
+    np.random.seed(98734)
+    nobs = 1000
+    groups = np.random.randint(0, 30, size=nobs)
+    exog = sparse.hstack((dummy_sparse(groups),
+                          np.random.randn(nobs, 2))).tocsr()
+    exog_dense = exog.toarray()
+    linpred = np.dot(exog_dense, 0.5 * np.random.randn(32))
+    endog = np.random.poisson(np.exp(linpred))
+    for exog_ in [exog, sparse.hstack((exog, exog[:, :1])).tocsr()]:
+        res = GLM(endog, exog_, family=sm.families.Poisson()).fit()
+        res2 = GLM(endog, exog_.toarray(), family=sm.families.Poisson()).fit()
+        assert_(sparse.issparse(res.model.exog))
+        assert_almost_equal(res.params, res2.params, 10)
+        assert_almost_equal(res.bse, res2.bse, 10)
+        assert_almost_equal(res.llf, res2.llf, 8)
+        assert_almost_equal(res.deviance, res2.deviance, 8)
+        assert_almost_equal(res.resid_pearson, res2.resid_pearson, 10)
+        assert_almost_equal(res.predict(exog_[:10]), res.mu[:10], 10)
+        assert_almost_equal(res.model.normalized_cov_params,
+                            res2.model.normalized_cov_params, 10)
+
 if __name__=="__main__":
     #run_module_suite()
     #taken from Fernando Perez:
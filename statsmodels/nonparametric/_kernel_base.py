@@ -7,6 +7,7 @@ import copy
 
 import numpy as np
 from scipy import optimize
+from scipy.spatial import cKDTree
 from scipy.stats.mstats import mquantiles
 
 try:
@@ -236,6 +237,7 @@ class GenericKDE (object):
         self.efficient = defaults.efficient
         self.return_only_bw = defaults.return_only_bw
         self.n_jobs = defaults.n_jobs
+        self.tree_tol = defaults.tree_tol
 
     def _normal_reference(self):
         """
@@ -366,6 +368,15 @@ class EstimatorSettings(object):
         ``n_cores`` the number of available CPU cores.
         See the `joblib documentation
         <http://packages.python.org/joblib/parallel.html>`_ for more details.
+    tree_tol : float or None, optional
+        If not None, the kernel sums in ``KDEMultivariate.pdf`` and
+        ``KernelReg.fit`` are computed with a KD-tree over the continuous
+        variables, and observations for which the Gaussian kernel of the
+        continuous variables is below `tree_tol` times its maximum are
+        ignored.  The kernels of discrete variables are evaluated exactly.
+        The absolute error of the density is at most `tree_tol` times the
+        peak of the continuous product kernel.  Default is None, which uses
+        all observations.
 
     Examples
     --------
@@ -374,7 +385,8 @@ class EstimatorSettings(object):
 
     """
     def __init__(self, efficient=False, randomize=False, n_res=25, n_sub=50,
-                 return_median=True, return_only_bw=False, n_jobs=-1):
+                 return_median=True, return_only_bw=False, n_jobs=-1,
+                 tree_tol=None):
         self.efficient = efficient
         self.randomize = randomize
         self.n_res = n_res
@@ -382,6 +394,7 @@ class EstimatorSettings(object):
         self.return_median = return_median
         self.return_only_bw = return_only_bw  # TODO: remove this?
         self.n_jobs = n_jobs
+        self.tree_tol = tree_tol
 
 
 class LeaveOneOut(object):
@@ -507,3 +520,176 @@ def gpke(bw, data, data_predict, var_type, ckertype='gaussian',
         return dens.sum(axis=0)
     else:
         return dens
+
+
+def _block_slices(nobs, n_cols, block_size=2**20):
+    """
+    Yield row slices such that a block of rows times `n_cols` has at most
+    `block_size` elements.
+    """
+    n_rows = max(1, int(block_size // max(n_cols, 1)))
+    for start in range(0, nobs, n_rows):
+        yield slice(start, min(start + n_rows, nobs))
+
+
+def gpke_matrix(bw, data, data_predict, var_type, ckertype='gaussian',
+                okertype='wangryzin', ukertype='aitchisonaitken'):
+    """
+    Returns the matrix of non-normalized product kernels between points.
+
+    Parameters
+    ----------
+    bw: 1-D ndarray
+        The user-specified bandwidth parameters.
+    data: 2-D ndarray
+        The training data, shape (nobs, k_vars).
+    data_predict: 2-D ndarray
+        The evaluation points, shape (n_predict, k_vars).
+    var_type: str
+        The variable type (continuous, ordered, unordered).
+    ckertype, okertype, ukertype: str, optional
+        The kernels used for continuous, ordered discrete and unordered
+        discrete variables, see `gpke`.
+
+    Returns
+    -------
+    dens: ndarray, shape (n_predict, nobs)
+        Row ``i`` is equal to ``gpke(bw, data, data_predict[i],
+        var_type, tosum=False)``.
+
+    Notes
+    -----
+    All pairs are evaluated in one call to each univariate kernel function,
+    so the memory requirement is proportional to ``n_predict * nobs``.
+    Callers should pass blocks of `data_predict`, see `_loo_kernel_blocks`.
+    """
+    kertypes = dict(c=ckertype, o=okertype, u=ukertype)
+    data = np.asarray(data)
+    data_predict = np.asarray(data_predict)
+    nobs = data.shape[0]
+    n_predict = data_predict.shape[0]
+    dens = np.ones(n_predict * nobs)
+    for ii, vtype in enumerate(var_type):
+        func = kernel_func[kertypes[vtype]]
+        # flattened pairs; the number of levels of discrete kernels is
+        # taken from the unique values in data[:, ii]
+        dens *= func(bw[ii], np.tile(data[:, ii], n_predict),
+                     np.repeat(data_predict[:, ii], nobs))
+
+    iscontinuous = np.array([c == 'c' for c in var_type], dtype=bool)
+    dens /= np.prod(np.asarray(bw)[iscontinuous])
+    return dens.reshape(n_predict, nobs)
+
+
+def _loo_kernel_blocks(bw, data, var_type, ckertype='gaussian',
+                       okertype='wangryzin', ukertype='aitchisonaitken',
+                       block_size=2**20):
+    """
+    Yield blocks of the leave-one-out product kernel matrix of `data`.
+
+    Yields tuples ``(sl, K)`` where ``K = gpke_matrix(bw, data, data[sl],
+    var_type)`` with the kernel of each observation with itself set to zero.
+    The row sums of `K` are therefore the leave-one-out kernel sums, which
+    replaces iterating over `LeaveOneOut` with one vectorized evaluation per
+    block of observations.
+    """
+    nobs = data.shape[0]
+    for sl in _block_slices(nobs, nobs * len(var_type), block_size):
+        K = gpke_matrix(bw, data, data[sl], var_type, ckertype=ckertype,
+                        okertype=okertype, ukertype=ukertype)
+        rows = np.arange(K.shape[0])
+        K[rows, rows + sl.start] = 0
+        yield sl, K
+
+
+def gpke_tree(bw, data, data_predict, var_type, tol, okertype='wangryzin',
+              ukertype='aitchisonaitken', max_pairs=2**21):
+    """
+    Yield truncated product kernels between `data_predict` and `data`.
+
+    Parameters
+    ----------
+    bw: 1-D ndarray
+        The bandwidth parameters.
+    data: 2-D ndarray
+        The training data, shape (nobs, k_vars).
+    data_predict: 2-D ndarray
+        The evaluation points, shape (n_predict, k_vars).
+    var_type: str
+        The variable types, at least one needs to be continuous.
+    tol: float
+        Pairs for which the Gaussian product kernel of the continuous
+        variables is smaller than `tol` times its maximum are dropped.
+    okertype, ukertype: str, optional
+        The kernels used for ordered and unordered discrete variables.
+    max_pairs: int, optional
+        The evaluation points are processed in blocks with about `max_pairs`
+        retained pairs on average, which bounds the memory requirement.
+
+    Yields
+    ------
+    sl: slice
+        The block of rows of `data_predict`.
+    rows: ndarray
+        Row index into ``data_predict[sl]`` of each retained pair.
+    cols: ndarray
+        Row index into `data` of each retained pair.
+    dens: ndarray
+        The non-normalized product kernel of each retained pair, equal to
+        the corresponding element of `gpke_matrix`.
+
+    Notes
+    -----
+    The continuous variables are scaled by their bandwidths, so the
+    Gaussian product kernel is a function of the euclidean distance ``r``
+    and is smaller than ``tol`` times its maximum for
+    ``r > sqrt(-2 log(tol))``.  The pairs within this radius are found
+    with a dual tree traversal of KD-trees of the data and of each block
+    of evaluation points.  The kernels of the discrete variables are
+    evaluated exactly from a table over all pairs of levels, with the
+    number of levels of unordered variables taken from the full `data`.
+    """
+    bw = np.asarray(bw)
+    ix_cont = np.array([c == 'c' for c in var_type], dtype=bool)
+    if not ix_cont.any():
+        raise ValueError('gpke_tree requires a continuous variable')
+
+    # The discrete kernels only depend on the pair of values, they are
+    # tabulated for all pairs of levels and looked up with integer codes.
+    kertypes = dict(o=okertype, u=ukertype)
+    tables = {}
+    for ii, vtype in enumerate(var_type):
+        if vtype == 'c':
+            continue
+        kwds = {}
+        if kertypes[vtype] == 'aitchisonaitken':
+            kwds = dict(num_levels=np.unique(data[:, ii]).size)
+        levels = np.unique(np.concatenate((data[:, ii], data_predict[:, ii])))
+        n_levels = len(levels)
+        table = kernel_func[kertypes[vtype]](bw[ii], np.tile(levels, n_levels),
+                                             np.repeat(levels, n_levels),
+                                             **kwds)
+        tables[ii] = (table.reshape(n_levels, n_levels),
+                      np.searchsorted(levels, data[:, ii]),
+                      np.searchsorted(levels, data_predict[:, ii]))
+
+    radius = np.sqrt(-2 * np.log(tol))
+    tree = cKDTree(data[:, ix_cont] / bw[ix_cont])
+    norm_const = np.sqrt(2 * np.pi)**ix_cont.sum() * np.prod(bw[ix_cont])
+    n_predict = data_predict.shape[0]
+    n_pairs = cKDTree(data_predict[:, ix_cont] / bw[ix_cont]).count_neighbors(
+                                                                tree, radius)
+    block_size = max(1, int(max_pairs * n_predict // max(n_pairs, 1)))
+    for start in range(0, n_predict, block_size):
+        sl = slice(start, min(start + block_size, n_predict))
+        tree_predict = cKDTree(data_predict[sl][:, ix_cont] / bw[ix_cont])
+        pairs = tree_predict.sparse_distance_matrix(tree, radius,
+                                                    output_type='ndarray')
+        rows = pairs['i']
+        cols = pairs['j']
+        # Gaussian product kernel from the scaled distances
+        dens = np.exp(-pairs['v']**2 / 2.) / norm_const
+        for table, codes, codes_predict in tables.values():
+            dens *= table[codes_predict[sl][rows], codes[cols]]
+
+        yield sl, rows, cols, dens
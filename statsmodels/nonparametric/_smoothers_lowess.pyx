@@ -0,0 +1,209 @@
+#cython profile=False
+"""
+Compiled lowess engine following Cleveland's clowess routine, which is also
+used by R's lowess.
+
+cython -a _smoothers_lowess.pyx
+"""
+
+cimport cython
+cimport numpy as np
+import numpy as np
+from libc.math cimport fabs, sqrt, NAN
+
+ctypedef np.float64_t DOUBLE
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef Py_ssize_t _update_window(double[::1] x, double xval, Py_ssize_t nleft,
+                               Py_ssize_t k):
+    """
+    Move the window of the k nearest neighbors x[nleft:nleft + k] to the
+    right as long as the next point on the right is strictly closer to
+    `xval` than the leftmost point.
+    """
+    cdef Py_ssize_t n = x.shape[0]
+    while nleft + k < n:
+        if x[nleft + k] - xval < xval - x[nleft]:
+            nleft += 1
+        else:
+            break
+    return nleft
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef double _local_fit(double[::1] x, double[::1] y, double[::1] rw,
+                       double xval, Py_ssize_t nleft, Py_ssize_t k,
+                       double x_range):
+    """
+    Weighted simple linear regression on the window x[nleft:nleft + k]
+    with tricube distance weights times robustness weights, evaluated at
+    `xval`.  If all weights are zero, nan is returned.
+
+    The weighted moments are accumulated in one pass over the window, with
+    x centered at `xval` so that the distances are at most the window
+    half width.
+    """
+    cdef:
+        Py_ssize_t j, nright = nleft + k
+        double h, h_inv, d, r, w
+        double sum_w = 0, sum_wd = 0, sum_wdd = 0, sum_wy = 0, sum_wdy = 0
+        double dm, ym, c
+
+    h = max(xval - x[nleft], x[nright - 1] - xval)
+    h_inv = 1. / h if h > 0 else 0
+    for j in range(nleft, nright):
+        d = x[j] - xval
+        r = fabs(d) * h_inv
+        if r >= 1:
+            continue
+        r = 1 - r * r * r
+        w = r * r * r * rw[j]
+        sum_w += w
+        sum_wd += w * d
+        sum_wdd += w * d * d
+        sum_wy += w * y[j]
+        sum_wdy += w * d * y[j]
+
+    if sum_w <= 0:
+        return NAN
+
+    dm = sum_wd / sum_w
+    ym = sum_wy / sum_w
+    c = sum_wdd / sum_w - dm * dm
+    # use the slope only if the x values are not (almost) all equal
+    if h > 0 and c > 0 and sqrt(c) > 0.001 * x_range:
+        return ym - dm * (sum_wdy / sum_w - dm * ym) / c
+    return ym
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef void _fit_pass(double[::1] x, double[::1] y, double[::1] rw,
+                    double[::1] fitted, Py_ssize_t k, double delta):
+    """
+    One pass of local fits at the sorted x values.  Points within `delta`
+    of the last fitted point are linearly interpolated, tied x values
+    share the fitted value.  If all weights in a window are zero, the
+    fitted value is the observation itself.
+    """
+    cdef:
+        Py_ssize_t n = x.shape[0]
+        Py_ssize_t i = 0, j, last = -1, nleft = 0
+        double x_range = x[n - 1] - x[0], cut, alpha
+
+    while last < n - 1:
+        nleft = _update_window(x, x[i], nleft, k)
+        fitted[i] = _local_fit(x, y, rw, x[i], nleft, k, x_range)
+        if fitted[i] != fitted[i]:
+            # all weights in the window are zero, keep the observation as
+            # clowess does
+            fitted[i] = y[i]
+
+        # interpolate the skipped points
+        if last < i - 1:
+            for j in range(last + 1, i):
+                alpha = (x[j] - x[last]) / (x[i] - x[last])
+                fitted[j] = alpha * fitted[i] + (1 - alpha) * fitted[last]
+
+        last = i
+        cut = x[last] + delta
+        i = last + 1
+        while i < n:
+            if x[i] > cut:
+                break
+            if x[i] == x[last]:
+                fitted[i] = fitted[last]
+                last = i
+            i += 1
+        i = max(last + 1, i - 1)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def lowess(np.ndarray[DOUBLE, ndim=1] endog, np.ndarray[DOUBLE, ndim=1] exog,
+           np.ndarray[DOUBLE, ndim=1] xvals, double frac=2./3,
+           Py_ssize_t it=3, double delta=0):
+    """
+    lowess(endog, exog, xvals, frac=2./3, it=3, delta=0)
+
+    Lowess fit at the sorted `exog` and at `xvals`.
+
+    Parameters
+    ----------
+    endog, exog : 1-D ndarray of float64
+        The observations, `exog` needs to be sorted in increasing order.
+    xvals : 1-D ndarray of float64
+        Additional sorted points at which the final fit is evaluated, can
+        be empty.
+    frac : float
+        The fraction of observations in each local regression.
+    it : int
+        The number of robustifying iterations.
+    delta : float
+        Local fits are skipped for observations within `delta` of the last
+        fitted observation, and their fitted values are interpolated.
+
+    Returns
+    -------
+    fitted : ndarray
+        The fitted values at `exog`.
+    fitted_xvals : ndarray
+        The fitted values at `xvals`.
+    """
+    cdef:
+        Py_ssize_t n = exog.shape[0], n_xvals = xvals.shape[0]
+        Py_ssize_t k, i, j, iteration, nleft
+        double[::1] x = exog, y = endog, xv = xvals
+        np.ndarray[DOUBLE, ndim=1] fitted = np.empty(n)
+        np.ndarray[DOUBLE, ndim=1] fitted_xvals = np.empty(n_xvals)
+        np.ndarray[DOUBLE, ndim=1] rw = np.ones(n)
+        np.ndarray[DOUBLE, ndim=1] resid
+        double cmad
+
+    if n < 2:
+        # a single observation is its own fit
+        fitted_xvals.fill(endog[0] if n == 1 else NAN)
+        return endog.copy(), fitted_xvals
+
+    k = min(max(<Py_ssize_t>(frac * n), 2), n)
+    for iteration in range(it + 1):
+        _fit_pass(x, y, rw, fitted, k, delta)
+        if iteration == it:
+            break
+
+        # bisquare robustness weights, zero beyond 6 median abs residuals
+        resid = np.abs(endog - fitted)
+        finite = np.isfinite(resid)
+        if not finite.any():
+            break
+        cmad = 6 * np.median(resid[finite])
+        if cmad == 0:
+            # exact fit, further iterations do not change the weights
+            break
+        for i in range(n):
+            if resid[i] < cmad:
+                rw[i] = (1 - (resid[i] / cmad)**2)**2
+            else:
+                rw[i] = 0
+
+    nleft = 0
+    for i in range(n_xvals):
+        nleft = _update_window(x, xv[i], nleft, k)
+        fitted_xvals[i] = _local_fit(x, y, rw, xv[i], nleft, k,
+                                     x[n - 1] - x[0])
+        if fitted_xvals[i] != fitted_xvals[i]:
+            # all weights are zero, use the nearest observation
+            j = nleft
+            while j < nleft + k - 1 and (fabs(x[j + 1] - xv[i]) <
+                                         fabs(x[j] - xv[i])):
+                j += 1
+            fitted_xvals[i] = y[j]
+
+    return fitted, fitted_xvals
@@ -21,7 +21,6 @@ from statsmodels.sandbox.nonparametric import kernels
 from statsmodels.tools.decorators import (cache_readonly,
                                                     resettable_cache)
 from . import bandwidths
-from .kdetools import (forrt, revrt, silverman_transform, counts)
 from .linbin import fast_linbin
 
 #### Kernels Switch for estimators ####
@@ -37,6 +36,19 @@ def _checkisfit(self):
     except:
         raise ValueError("Call fit to fit the density first")
 
+def _grid_cdf(density, grid):
+    """
+    Cumulative distribution function on the grid from the trapezoidal rule.
+
+    Small negative densities from the FFT round-off are set to zero, and the
+    cdf is normalized to end at one, so that the discretization error of the
+    total mass does not lead to negative survival probabilities.
+    """
+    density = np.clip(density, 0, np.inf)
+    probs = (density[1:] + density[:-1]) / 2. * np.diff(grid)
+    cdf = np.r_[0, np.cumsum(probs)]
+    return cdf / cdf[-1]
+
 
 #### Kernel Density Estimator Class ###
 
@@ -52,9 +64,10 @@ class KDEUnivariate(object):
 
     Notes
     -----
-    If cdf, sf, cumhazard, or entropy are computed, they are computed based on
-    the definition of the kernel rather than the FFT approximation, even if
-    the density is fit with FFT = True.
+    If the density is fit with fft=True, then cdf, sf, cumhazard, icdf and
+    entropy are computed from the density on the grid. Otherwise cdf, sf,
+    cumhazard and entropy are computed based on the definition of the kernel
+    and icdf from the quantiles of the data.
 
     `KDEUnivariate` is much faster than `KDEMultivariate`, due to its FFT-based
     implementation.  It should be preferred for univariate, continuous data.
@@ -78,10 +91,9 @@ class KDEUnivariate(object):
     >>> plt.show()
 
     """
-    _cache = resettable_cache()
-
     def __init__(self, endog):
         self.endog = np.asarray(endog)
+        self._cache = resettable_cache()
 
     def fit(self, kernel="gau", bw="scott", fft=True, weights=None,
             gridsize=None, adjust=1, cut=3, clip=(-np.inf, np.inf)):
@@ -112,9 +124,10 @@ class KDEUnivariate(object):
 
         fft : bool
             Whether or not to use FFT. FFT implementation is more
-            computationally efficient. However, only the Gaussian kernel
-            is implemented. If FFT is False, then a 'nobs' x 'gridsize'
-            intermediate array is created.
+            computationally efficient. If FFT is False, then a 'nobs' x
+            'gridsize' intermediate array is created.
+        weights : array or None
+            Optional weights for the observations.
         gridsize : int
             If gridsize is None, max(len(X), 50) is used.
         cut : float
@@ -132,12 +145,6 @@ class KDEUnivariate(object):
         endog = self.endog
 
         if fft:
-            if kernel != "gau":
-                msg = "Only gaussian kernel is available for fft"
-                raise NotImplementedError(msg)
-            if weights is not None:
-                msg = "Weights are not implemented for fft"
-                raise NotImplementedError(msg)
             density, grid, bw = kdensityfft(endog, kernel=kernel, bw=bw,
                     adjust=adjust, weights=weights, gridsize=gridsize,
                     clip=clip, cut=cut)
@@ -145,9 +152,12 @@ class KDEUnivariate(object):
             density, grid, bw = kdensity(endog, kernel=kernel, bw=bw,
                     adjust=adjust, weights=weights, gridsize=gridsize,
                     clip=clip, cut=cut)
+        # the cached statistics belong to this instance and this fit
+        self._cache = resettable_cache()
         self.density = density
         self.support = grid
         self.bw = bw
+        self.fft = fft
         self.kernel = kernel_switch[kernel](h=bw) # we instantiate twice,
                                                 # should this passed to funcs?
 
@@ -161,6 +171,8 @@ class KDEUnivariate(object):
         Will not work if fit has not been called.
         """
         _checkisfit(self)
+        if self.fft:
+            return _grid_cdf(self.density, self.support)
         density = self.density
         kern = self.kernel
         if kern.domain is None: # TODO: test for grid point at domain bound
@@ -213,19 +225,28 @@ class KDEUnivariate(object):
         probability to ensure that log(0) is not called.
         """
         _checkisfit(self)
+        if self.fft:
+            pdf = np.clip(self.density, 0, np.inf)
+            return -np.trapz(pdf * np.log(pdf + 1e-12), self.support)
 
         def entr(x,s):
-            pdf = kern.density(s,x)
+            u = (s - x) / bw
+            k = kern(u)
+            if kern.domain is not None:
+                k[(u < kern.domain[0]) | (u > kern.domain[1])] = 0
+            pdf = k.mean() / bw
             return pdf*np.log(pdf+1e-12)
 
-        pdf = self.density
         kern = self.kernel
+        bw = self.bw
+        endog = self.endog
 
         if kern.domain is not None:
-            a,b = self.domain
+            # the kernel domain is in units of the bandwidth
+            a = endog.min() + kern.domain[0] * bw
+            b = endog.max() + kern.domain[1] * bw
         else:
             a,b = -np.inf,np.inf
-        endog = self.endog
         #TODO: below could run into integr problems, cf. stats.dist._entropy
         return -integrate.quad(entr, a,b, args=(endog,))[0]
 
@@ -236,11 +257,15 @@ class KDEUnivariate(object):
 
         Notes
         -----
-        Will not work if fit has not been called. Uses
-        `scipy.stats.mstats.mquantiles`.
+        Will not work if fit has not been called. If the density is fit with
+        FFT, the quantiles are interpolated from the cdf on the grid.
+        Otherwise uses `scipy.stats.mstats.mquantiles`.
         """
         _checkisfit(self)
         gridsize = len(self.density)
+        if self.fft:
+            return np.interp(np.linspace(0, 1, gridsize), self.cdf,
+                             self.support)
         return stats.mstats.mquantiles(self.endog, np.linspace(0,1,
                     gridsize))
 
@@ -260,6 +285,7 @@ class KDEUnivariate(object):
 class KDE(KDEUnivariate):
     def __init__(self, endog):
         self.endog = np.asarray(endog)
+        self._cache = resettable_cache()
         warnings.warn("KDE is deprecated and will be removed in 0.6, "
                       "use KDEUnivariate instead", FutureWarning)
 
@@ -372,6 +398,25 @@ def kdensity(X, kernel="gau", bw="scott", weights=None, gridsize=None,
     else:
         return dens, bw
 
+def _kernel_fft(kernel, bw, delta, gridsize):
+    """
+    Real FFT of the kernel discretized on the grid lags.
+
+    The kernel is evaluated at the lags 0, ..., gridsize - 1 and
+    -gridsize, ..., -1 times `delta`, so that the convolution with the binned
+    data zero padded to length 2 * gridsize has no wrap-around. `bw` can be a
+    1d array, then each row of the returned array belongs to one bandwidth.
+    """
+    kern = kernel_switch[kernel]()
+    bw = np.asarray(bw, dtype=float)[..., None]
+    lags = delta * np.r_[np.arange(gridsize), np.arange(-gridsize, 0)]
+    u = lags / bw
+    kvals = kern(u) * np.ones(u.shape)
+    if kern.domain is not None:
+        z_lo, z_high = kern.domain
+        kvals[(u < z_lo) | (u > z_high)] = 0
+    return np.fft.rfft(kvals / bw, axis=-1)
+
 def kdensityfft(X, kernel="gau", bw="scott", weights=None, gridsize=None,
                 adjust=1, clip=(-np.inf,np.inf), cut=3, retgrid=True):
     """
@@ -382,53 +427,57 @@ def kdensityfft(X, kernel="gau", bw="scott", weights=None, gridsize=None,
     X : array-like
         The variable for which the density estimate is desired.
     kernel : str
-        ONLY GAUSSIAN IS CURRENTLY IMPLEMENTED.
-        "bi" for biweight
-        "cos" for cosine
-        "epa" for Epanechnikov, default
-        "epa2" for alternative Epanechnikov
-        "gau" for Gaussian.
-        "par" for Parzen
-        "rect" for rectangular
-        "tri" for triangular
-    bw : str, float
+        The Kernel to be used. Choices are
+        - "biw" for biweight
+        - "cos" for cosine
+        - "epa" for Epanechnikov
+        - "gau" for Gaussian.
+        - "tri" for triangular
+        - "triw" for triweight
+        - "uni" for uniform
+    bw : str, float or array-like
         "scott" - 1.059 * A * nobs ** (-1/5.), where A is min(std(X),IQR/1.34)
         "silverman" - .9 * A * nobs ** (-1/5.), where A is min(std(X),IQR/1.34)
-        If a float is given, it is the bandwidth.
+        If a float is given, it is the bandwidth. If a 1d array is given, the
+        density is estimated for each bandwidth from the same binned data.
     weights : array or None
-        WEIGHTS ARE NOT CURRENTLY IMPLEMENTED.
         Optional  weights. If the X value is clipped, then this weight is
         also dropped.
     gridsize : int
-        If gridsize is None, min(len(X), 512) is used. Note that the provided
+        If gridsize is None, max(len(X), 512) is used. Note that the provided
         number is rounded up to the next highest power of 2.
     adjust : float
         An adjustment factor for the bw. Bandwidth becomes bw * adjust.
-        clip : tuple
+    clip : tuple
         Observations in X that are outside of the range given by clip are
         dropped. The number of observations in X is then shortened.
     cut : float
         Defines the length of the grid past the lowest and highest values of X
         so that the kernel goes to zero. The end points are
-        -/+ cut*bw*{X.min() or X.max()}
+        -/+ cut*bw*{X.min() or X.max()}. If several bandwidths are given, the
+        largest one defines the grid.
     retgrid : bool
         Whether or not to return the grid over which the density is estimated.
 
     Returns
     -------
     density : array
-        The densities estimated at the grid points.
+        The densities estimated at the grid points. If `bw` is an array, the
+        rows contain the densities for each bandwidth.
     grid : array, optional
         The grid points at which the density is estimated.
+    bw : float or array
+        The bandwidth, or bandwidths, after the adjustment.
 
     Notes
     -----
-    Only the default kernel is implemented. Weights aren't implemented yet.
     This follows Silverman (1982) with changes suggested by Jones and Lotwick
     (1984). However, the discretization step is replaced by linear binning
-    of Fan and Marron (1994). This should be extended to accept the parts
-    that are dependent only on the data to speed things up for
-    cross-validation.
+    of Fan and Marron (1994). The binned data are convolved with the kernel
+    discretized on the grid, Wand (1994), using the FFT with zero padding,
+    so that any kernel can be used. The binning and its FFT are computed only
+    once for all bandwidths, which makes it cheap to evaluate the density
+    for many bandwidths, e.g. for cross-validation.
 
     References
     ---------- ::
@@ -442,57 +491,49 @@ def kdensityfft(X, kernel="gau", bw="scott", weights=None, gridsize=None,
     Silverman, B.W. (1982) `Algorithm AS 176. Kernel density estimation using
         the Fast Fourier Transform. Journal of the Royal Statistical Society.
         Series C. 31.2, 93-9.
+    Wand, M.P. (1994) `Fast Computation of Multivariate Kernel Estimators`.
+        Journal of Computational and Graphical Statistics. 3.4, 433-45.
     """
-    X = np.asarray(X)
-    X = X[np.logical_and(X>clip[0], X<clip[1])] # won't work for two columns.
-                                                # will affect underlying data?
-    try:
-        bw = float(bw)
-    except:
-        bw = bandwidths.select_bandwidth(X, bw, kernel) # will cross-val fit this pattern?
-    bw *= adjust
+    X = np.asarray(X, dtype=float).ravel()
+    clip_x = np.logical_and(X>clip[0], X<clip[1])
+    X = X[clip_x]
 
     nobs = float(len(X)) # after trim
 
+    if weights is None:
+        q = nobs
+    else:
+        weights = np.asarray(weights, dtype=float)
+        if len(weights) != len(clip_x):
+            msg = "The length of the weights must be the same as the given X."
+            raise ValueError(msg)
+        weights = weights[clip_x]
+        q = weights.sum()
+
+    try:
+        bw = float(bw)
+    except TypeError:
+        bw = np.asarray(bw, dtype=float)
+    except ValueError:
+        bw = bandwidths.select_bandwidth(X, bw, kernel)
+    bw = bw * adjust
+
     # 1 Make grid and discretize the data
     if gridsize == None:
         gridsize = np.max((nobs,512.))
-    gridsize = 2**np.ceil(np.log2(gridsize)) # round to next power of 2
+    gridsize = int(2**np.ceil(np.log2(gridsize))) # round to next power of 2
 
-    a = np.min(X)-cut*bw
-    b = np.max(X)+cut*bw
+    a = np.min(X) - cut * np.max(bw)
+    b = np.max(X) + cut * np.max(bw)
     grid,delta = np.linspace(a,b,gridsize,retstep=True)
-    RANGE = b-a
-
-#TODO: Fix this?
-# This is the Silverman binning function, but I believe it's buggy (SS)
-# weighting according to Silverman
-#    count = counts(X,grid)
-#    binned = np.zeros_like(grid)    #xi_{k} in Silverman
-#    j = 0
-#    for k in range(int(gridsize-1)):
-#        if count[k]>0: # there are points of X in the grid here
-#            Xingrid = X[j:j+count[k]] # get all these points
-#            # get weights at grid[k],grid[k+1]
-#            binned[k] += np.sum(grid[k+1]-Xingrid)
-#            binned[k+1] += np.sum(Xingrid-grid[k])
-#            j += count[k]
-#    binned /= (nobs)*delta**2 # normalize binned to sum to 1/delta
-
-#NOTE: THE ABOVE IS WRONG, JUST TRY WITH LINEAR BINNING
-    binned = fast_linbin(X,a,b,gridsize)/(delta*nobs)
-
-    # step 2 compute FFT of the weights, using Munro (1976) FFT convention
-    y = forrt(binned)
-
-    # step 3 and 4 for optimal bw compute zstar and the density estimate f
-    # don't have to redo the above if just changing bw, ie., for cross val
-
-#NOTE: silverman_transform is the closed form solution of the FFT of the
-#gaussian kernel. Not yet sure how to generalize it.
-    zstar = silverman_transform(bw, gridsize, RANGE)*y # 3.49 in Silverman
-                                                   # 3.50 w Gaussian kernel
-    f = revrt(zstar)
+
+    binned = fast_linbin(X, a, b, gridsize, weights=weights) / q
+
+    # 2 convolve with the discretized kernel, the FFT of the binned data is
+    # shared by all bandwidths
+    y = np.fft.rfft(binned, 2 * gridsize)
+    f = np.fft.irfft(y * _kernel_fft(kernel, bw, delta, gridsize),
+                     2 * gridsize)[..., :gridsize]
     if retgrid:
         return f, grid, bw
     else:
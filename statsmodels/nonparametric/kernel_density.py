@@ -33,9 +33,8 @@ References
 
 import numpy as np
 
-import kernels
 from _kernel_base import GenericKDE, EstimatorSettings, gpke, \
-    LeaveOneOut, _adjust_shape
+    gpke_matrix, gpke_tree, _loo_kernel_blocks, _block_slices, _adjust_shape
 
 
 __all__ = ['KDEMultivariate', 'KDEMultivariateConditional', 'EstimatorSettings']
@@ -139,6 +138,7 @@ class KDEMultivariate(GenericKDE):
         func: callable, optional
             Function to transform the likelihood values (before summing); for
             the log likelihood, use ``func=np.log``.  Default is ``f(x) = x``.
+            It is applied elementwise to arrays of leave-one-out values.
 
         Notes
         -----
@@ -152,13 +152,14 @@ class KDEMultivariate(GenericKDE):
 
         .. math:: K_{h}(X_{i},X_{j}) =
             \prod_{s=1}^{q}h_{s}^{-1}k\left(\frac{X_{is}-X_{js}}{h_{s}}\right)
+
+        The kernel sums over :math:`j \neq i` are computed for blocks of
+        observations at once as the row sums of the kernel matrix with the
+        diagonal removed.
         """
-        LOO = LeaveOneOut(self.data)
         L = 0
-        for i, X_not_i in enumerate(LOO):
-            f_i = gpke(bw, data=-X_not_i, data_predict=-self.data[i, :],
-                       var_type=self.var_type)
-            L += func(f_i)
+        for sl, K in _loo_kernel_blocks(bw, self.data, self.var_type):
+            L += func(K.sum(axis=1)).sum()
 
         return -L
 
@@ -183,12 +184,26 @@ class KDEMultivariate(GenericKDE):
 
         .. math:: K_{h}(X_{i},X_{j}) =
             \prod_{s=1}^{q}h_{s}^{-1}k\left(\frac{X_{is}-X_{js}}{h_{s}}\right)
+
+        If ``tree_tol`` is set in the `EstimatorSettings` and there are
+        continuous variables, the sum only includes the observations that are
+        close in the continuous variables, see `gpke_tree`.
         """
         if data_predict is None:
             data_predict = self.data
         else:
             data_predict = _adjust_shape(data_predict, self.k_vars)
 
+        if self.tree_tol is not None and 'c' in self.var_type:
+            pdf_est = np.empty(data_predict.shape[0])
+            for sl, rows, cols, dens in gpke_tree(self.bw, self.data,
+                                                  data_predict, self.var_type,
+                                                  self.tree_tol):
+                pdf_est[sl] = np.bincount(rows, weights=dens,
+                                          minlength=sl.stop - sl.start)
+
+            return np.squeeze(pdf_est / self.nobs)
+
         pdf_est = []
         for i in xrange(np.shape(data_predict)[0]):
             pdf_est.append(gpke(self.bw, data=self.data,
@@ -275,56 +290,21 @@ class KDEMultivariate(GenericKDE):
         Where :math:`\bar{K}_{h}` is the multivariate product convolution
         kernel (consult [3] for mixed data types).
         """
-        #F = 0
-        #for i in range(self.nobs):
-        #    k_bar_sum = gpke(bw, data=-self.data,
-        #                     data_predict=-self.data[i, :],
-        #                     var_type=self.var_type,
-        #                     ckertype='gauss_convolution',
-        #                     okertype='wangryzin_convolution',
-        #                     ukertype='aitchisonaitken_convolution')
-        #    F += k_bar_sum
-        ## there is a + because loo_likelihood returns the negative
-        #return (F / self.nobs**2 + self.loo_likelihood(bw) * \
-        #        2 / ((self.nobs) * (self.nobs - 1)))
-
-        # The code below is equivalent to the commented-out code above.  It's
-        # about 20% faster due to some code being moved outside the for-loops
-        # and shared by gpke() and loo_likelihood().
+        # The kernel matrices are evaluated in blocks of observations; the
+        # convolution part includes the diagonal, the leave-one-out part
+        # does not.
         F = 0
-        kertypes = dict(c=kernels.gaussian_convolution,
-                        o=kernels.wang_ryzin_convolution,
-                        u=kernels.aitchison_aitken_convolution)
-        nobs = self.nobs
-        data = -self.data
-        var_type = self.var_type
-        ix_cont = np.array([c == 'c' for c in var_type])
-        _bw_cont_product = bw[ix_cont].prod()
-        Kval = np.empty(data.shape)
-        for i in range(nobs):
-            for ii, vtype in enumerate(var_type):
-                Kval[:, ii] = kertypes[vtype](bw[ii],
-                                              data[:, ii],
-                                              data[i, ii])
-
-            dens = Kval.prod(axis=1) / _bw_cont_product
-            k_bar_sum = dens.sum(axis=0)
-            F += k_bar_sum  # sum of prod kernel over nobs
-
-        kertypes = dict(c=kernels.gaussian,
-                        o=kernels.wang_ryzin,
-                        u=kernels.aitchison_aitken)
-        LOO = LeaveOneOut(self.data)
-        L = 0   # leave-one-out likelihood
-        Kval = np.empty((data.shape[0]-1, data.shape[1]))
-        for i, X_not_i in enumerate(LOO):
-            for ii, vtype in enumerate(var_type):
-                Kval[:, ii] = kertypes[vtype](bw[ii],
-                                              -X_not_i[:, ii],
-                                              data[i, ii])
-            dens = Kval.prod(axis=1) / _bw_cont_product
-            L += dens.sum(axis=0)
+        L = 0
+        for sl in _block_slices(self.nobs, self.nobs * self.k_vars):
+            F += gpke_matrix(bw, self.data, self.data[sl], self.var_type,
+                             ckertype='gauss_convolution',
+                             okertype='wangryzin_convolution',
+                             ukertype='aitchisonaitken_convolution').sum()
+
+        for sl, K in _loo_kernel_blocks(bw, self.data, self.var_type):
+            L += K.sum()
 
+        nobs = self.nobs
         # CV objective function, eq. (2.4) of Ref. [3]
         return (F / nobs**2 - 2 * L / (nobs * (nobs - 1)))
 
@@ -446,6 +426,7 @@ class KDEMultivariateConditional(GenericKDE):
         func: callable, optional
             Function to transform the likelihood values (before summing); for
             the log likelihood, use ``func=np.log``.  Default is ``f(x) = x``.
+            It is applied elementwise to arrays of leave-one-out values.
 
         Returns
         -------
@@ -457,18 +438,14 @@ class KDEMultivariateConditional(GenericKDE):
         Similar to ``KDE.loo_likelihood`, but substitute ``f(y|x)=f(x,y)/f(y)``
         for ``f(x)``.
         """
-        yLOO = LeaveOneOut(self.data)
-        xLOO = LeaveOneOut(self.exog).__iter__()
         L = 0
-        for i, Y_j in enumerate(yLOO):
-            X_not_i = xLOO.next()
-            f_yx = gpke(bw, data=-Y_j, data_predict=-self.data[i, :],
-                        var_type=(self.dep_type + self.indep_type))
-            f_x = gpke(bw[self.k_dep:], data=-X_not_i,
-                       data_predict=-self.exog[i, :],
-                       var_type=self.indep_type)
-            f_i = f_yx / f_x
-            L += func(f_i)
+        for sl, K_x in _loo_kernel_blocks(bw[self.k_dep:], self.exog,
+                                          self.indep_type):
+            K_y = gpke_matrix(bw[:self.k_dep], self.endog, self.endog[sl],
+                              self.dep_type)
+            f_yx = (K_y * K_x).sum(axis=1)
+            f_x = K_x.sum(axis=1)
+            L += func(f_yx / f_x).sum()
 
         return -L
 
@@ -627,36 +604,26 @@ class KDEMultivariateConditional(GenericKDE):
         `GenericKDE` class to return the bw estimates that minimize the
         distance between the estimated and "true" probability density.
         """
-        zLOO = LeaveOneOut(self.data)
         CV = 0
         nobs = float(self.nobs)
-        expander = np.ones((self.nobs - 1, 1))
-        for ii, Z in enumerate(zLOO):
-            X = Z[:, self.k_dep:]
-            Y = Z[:, :self.k_dep]
-            Ye_L = np.kron(Y, expander)
-            Ye_R = np.kron(expander, Y)
-            Xe_L = np.kron(X, expander)
-            Xe_R = np.kron(expander, X)
-            K_Xi_Xl = gpke(bw[self.k_dep:], data=Xe_L,
-                           data_predict=self.exog[ii, :],
-                           var_type=self.indep_type, tosum=False)
-            K_Xj_Xl = gpke(bw[self.k_dep:], data=Xe_R,
-                           data_predict=self.exog[ii, :],
-                           var_type=self.indep_type, tosum=False)
-            K2_Yi_Yj = gpke(bw[0:self.k_dep], data=Ye_L,
-                            data_predict=Ye_R, var_type=self.dep_type,
-                            ckertype='gauss_convolution',
-                            okertype='wangryzin_convolution',
-                            ukertype='aitchisonaitken_convolution',
-                            tosum=False)
-            G = (K_Xi_Xl * K_Xj_Xl * K2_Yi_Yj).sum() / nobs**2
-            f_X_Y = gpke(bw, data=-Z, data_predict=-self.data[ii, :],
-                         var_type=(self.dep_type + self.indep_type)) / nobs
-            m_x = gpke(bw[self.k_dep:], data=-X,
-                       data_predict=-self.exog[ii, :],
-                       var_type=self.indep_type) / nobs
-            CV += (G / m_x ** 2) - 2 * (f_X_Y / m_x)
+        bw_dep = bw[:self.k_dep]
+        for sl, K_x in _loo_kernel_blocks(bw[self.k_dep:], self.exog,
+                                          self.indep_type):
+            K_y = gpke_matrix(bw_dep, self.endog, self.endog[sl],
+                              self.dep_type)
+            f_X_Y = (K_x * K_y).sum(axis=1) / nobs
+            m_x = K_x.sum(axis=1) / nobs
+            # The convolution kernel is evaluated at the first observation
+            # that is not left out, as in the original implementation which
+            # passed the expanded Y as a 2-D `data_predict` to gpke.  The
+            # double sum over i, j then factors into m_x times a single sum.
+            first = (np.arange(sl.start, sl.stop) == 0).astype(int)
+            K2_Y = gpke_matrix(bw_dep, self.endog, self.endog[first],
+                               self.dep_type, ckertype='gauss_convolution',
+                               okertype='wangryzin_convolution',
+                               ukertype='aitchisonaitken_convolution')
+            G = m_x * (K_x * K2_Y).sum(axis=1) / nobs
+            CV += ((G / m_x ** 2) - 2 * (f_X_Y / m_x)).sum()
 
         return CV / nobs
 
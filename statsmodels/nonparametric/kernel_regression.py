@@ -38,13 +38,91 @@ from scipy import optimize
 from scipy.stats.mstats import mquantiles
 
 from _kernel_base import GenericKDE, EstimatorSettings, gpke, \
-    LeaveOneOut, _get_type_pos, _adjust_shape, _compute_min_std_IQR
+    LeaveOneOut, _get_type_pos, _adjust_shape, _compute_min_std_IQR, \
+    _loo_kernel_blocks, gpke_tree
 
 
 
 __all__ = ['KernelReg', 'KernelCensoredReg']
 
 
+def _loo_fit(bw, endog, exog, var_type, reg_type, weights=None,
+             ukertype='aitchisonaitken', okertype='wangryzin'):
+    """
+    Leave-one-out local constant or local linear fit at each observation.
+
+    Vectorized equivalent of evaluating ``_est_loc_constant`` or
+    ``_est_loc_linear`` at ``exog[i]`` with observation ``i`` left out, for
+    all ``i``.  The kernel matrix is computed in blocks of observations with
+    the diagonal set to zero.
+
+    Parameters
+    ----------
+    bw : array_like
+        Vector of bandwidth values.
+    endog : array_like
+        The dependent variable.
+    exog : array_like
+        The independent variable(s), shape (nobs, k_vars).
+    var_type : str
+        The variable types.
+    reg_type : {'lc', 'll'}
+        Local constant or local linear estimator.
+    weights : array_like, optional
+        Weights multiplying the kernel of each observation, as used by
+        `KernelCensoredReg`.
+    ukertype, okertype : str, optional
+        The kernels for unordered and ordered discrete variables.
+
+    Returns
+    -------
+    G : ndarray, shape (nobs,)
+        The leave-one-out estimates of the conditional mean.
+    """
+    exog = _adjust_shape(exog, len(var_type))
+    endog = np.asarray(endog).ravel()
+    nobs, k_vars = exog.shape
+    G = np.empty(nobs)
+    block_size = 2**20
+    if reg_type == 'll':
+        # memory for the design of the local regressions
+        block_size //= (k_vars + 1)
+    for sl, K in _loo_kernel_blocks(bw, exog, var_type, okertype=okertype,
+                                    ukertype=ukertype,
+                                    block_size=block_size):
+        if weights is not None:
+            K *= np.asarray(weights).ravel()
+        if reg_type == 'lc':
+            G[sl] = K.dot(endog) / K.sum(axis=1)
+            continue
+
+        # local linear: weighted least squares of endog on [1, X_j - X_i]
+        # for each i, solved with the pseudo-inverse as in _est_loc_linear
+        Z = np.ones((K.shape[0], nobs, k_vars + 1))
+        Z[:, :, 1:] = exog[None, :, :] - exog[sl][:, None, :]
+        KZ = K[:, :, None] * Z
+        M = np.einsum('mni,mnj->mij', KZ, Z)
+        V = np.einsum('mni,n->mi', KZ, endog)
+        G[sl] = _pinv_solve(M, V)[:, 0]
+
+    return G
+
+
+def _pinv_solve(M, V):
+    """
+    Solve the stacked systems ``M[i] b[i] = V[i]`` with the pseudo-inverse.
+
+    Uses the same singular value cutoff as ``np.linalg.pinv``.
+    """
+    u, s, vt = np.linalg.svd(M)
+    cutoff = 1e-15 * s.max(axis=1)
+    s_inv = np.zeros_like(s)
+    large = s > cutoff[:, None]
+    s_inv[large] = 1. / s[large]
+    UtV = np.einsum('mki,mk->mi', u, V) * s_inv
+    return np.einsum('mji,mj->mi', vt, UtV)
+
+
 class KernelReg(GenericKDE):
     """
     Nonparametric kernel regression class.
@@ -306,6 +384,11 @@ class KernelReg(GenericKDE):
         and :math:`h` is the vector of bandwidths
 
         """
+        if func == self._est_loc_constant or func == self._est_loc_linear:
+            reg_type = 'lc' if func == self._est_loc_constant else 'll'
+            G = _loo_fit(bw, self.endog, self.exog, self.var_type, reg_type)
+            return ((np.squeeze(self.endog) - G) ** 2).sum() / self.nobs
+
         LOO_X = LeaveOneOut(self.exog)
         LOO_Y = LeaveOneOut(self.endog).__iter__()
         L = 0
@@ -315,7 +398,6 @@ class KernelReg(GenericKDE):
                      data_predict=-self.exog[ii, :])[0]
             L += (self.endog[ii] - G) ** 2
 
-        # Note: There might be a way to vectorize this. See p.72 in [1]
         return L / self.nobs
 
     def r_squared(self):
@@ -367,6 +449,9 @@ class KernelReg(GenericKDE):
         else:
             data_predict = _adjust_shape(data_predict, self.k_vars)
 
+        if self.tree_tol is not None and 'c' in self.var_type:
+            return self._fit_tree(data_predict)
+
         N_data_predict = np.shape(data_predict)[0]
         mean = np.empty((N_data_predict,))
         mfx = np.empty((N_data_predict, self.k_vars))
@@ -379,6 +464,57 @@ class KernelReg(GenericKDE):
 
         return mean, mfx
 
+    def _fit_tree(self, data_predict):
+        """
+        Mean and marginal effects from the truncated kernel sums of
+        `gpke_tree`, used by `fit` if ``tree_tol`` is set.
+
+        Computes the same estimates as ``_est_loc_constant`` and
+        ``_est_loc_linear`` for all points, accumulating the kernel weighted
+        sums over the retained pairs of observations and points.
+        """
+        endog = np.squeeze(self.endog, axis=1)
+        exog = self.exog
+        nobs, k_vars = exog.shape
+        n_predict = data_predict.shape[0]
+        mean = np.empty(n_predict)
+        mfx = np.empty((n_predict, k_vars))
+        ix_cont = _get_type_pos(self.var_type)[0]
+        for sl, rows, cols, ker in gpke_tree(self.bw, exog, data_predict,
+                                             self.var_type, self.tree_tol):
+            m = sl.stop - sl.start
+            # bincount of an empty block is of integer type
+            rowsum = lambda w: np.bincount(rows, weights=w,
+                                           minlength=m).astype(float)
+            diff = exog[cols] - data_predict[sl][rows]
+            if self.reg_type == 'lc':
+                G_numer = rowsum(ker * endog[cols])
+                G_denom = rowsum(ker)
+                # product of the derivatives of the Gaussian kernels
+                ker_xc = ker * np.prod(2 * diff[:, ix_cont] /
+                                       self.bw[ix_cont]**2, axis=1)
+                d_mx = -rowsum(ker_xc * endog[cols]) / float(nobs)
+                d_fx = -rowsum(ker_xc) / float(nobs)
+                # nan for points without neighbours, as in the dense sums
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    mean[sl] = G_numer / G_denom
+                    mfx[sl] = ((G_numer * d_fx - G_denom * d_mx) /
+                               G_denom**2)[:, None]
+            else:
+                Z = np.column_stack((np.ones(len(rows)), diff))
+                M = np.empty((m, k_vars + 1, k_vars + 1))
+                V = np.empty((m, k_vars + 1))
+                for a in range(k_vars + 1):
+                    V[:, a] = rowsum(ker * Z[:, a] * endog[cols])
+                    for b in range(a + 1):
+                        M[:, a, b] = M[:, b, a] = rowsum(ker * Z[:, a] *
+                                                         Z[:, b])
+                mean_mfx = _pinv_solve(M, V)
+                mean[sl] = mean_mfx[:, 0]
+                mfx[sl] = mean_mfx[:, 1:]
+
+        return mean, mfx
+
     def sig_test(self, var_pos, nboot=50, nested_res=25, pivot=False):
         """
         Significance test for the variables in the regression.
@@ -632,6 +768,12 @@ class KernelCensoredReg(KernelReg):
         and :math:`h` is the vector of bandwidths
 
         """
+        if func == self._est_loc_linear:
+            G = _loo_fit(bw, self.endog, self.exog, self.var_type, 'll',
+                         weights=self.W_in, ukertype='aitchison_aitken_reg',
+                         okertype='wangryzin_reg')
+            return ((np.squeeze(self.endog) - G) ** 2).sum() / self.nobs
+
         LOO_X = LeaveOneOut(self.exog)
         LOO_Y = LeaveOneOut(self.endog).__iter__()
         LOO_W = LeaveOneOut(self.W_in).__iter__()
@@ -643,7 +785,6 @@ class KernelCensoredReg(KernelReg):
                      data_predict=-self.exog[ii, :], W=w)[0]
             L += (self.endog[ii] - G) ** 2
 
-        # Note: There might be a way to vectorize this. See p.72 in [1]
         return L / self.nobs
 
     def fit(self, data_predict=None):
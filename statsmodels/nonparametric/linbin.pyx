@@ -7,6 +7,7 @@ gcc -shared -pthread -fPIC -fwrapv -O2 -Wall -fno-strict-aliasing -I/usr/include
 cimport cython
 cimport numpy as np
 import numpy as np
+from libc.math cimport floor
 
 ctypedef np.float64_t DOUBLE
 ctypedef np.int_t INT
@@ -14,25 +15,41 @@ ctypedef np.int_t INT
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.cdivision(True)
-def fast_linbin(np.ndarray[DOUBLE] X, double a, double b, int M, int trunc=1):
+def fast_linbin(np.ndarray[DOUBLE] X, double a, double b, int M, int trunc=1,
+                np.ndarray[DOUBLE] weights=None):
     """
     Linear Binning as described in Fan and Marron (1994)
+
+    The (weighted) mass of each observation is split between the two
+    neighboring points of the grid of `M` equally spaced points on [a, b].
+    Observations outside of [a, b] are dropped if `trunc` is true, otherwise
+    they are assigned to the end points.
     """
     cdef:
         Py_ssize_t i, li_i
         int nobs = X.shape[0]
         double delta = (b - a)/(M - 1)
+        double lxi, rem, w = 1
+        bint has_weights = weights is not None
         np.ndarray[DOUBLE] gcnts = np.zeros(M, np.float)
-        np.ndarray[DOUBLE] lxi = (X - a)/delta
-        np.ndarray[INT] li = lxi.astype(int)
-        np.ndarray[DOUBLE] rem = lxi - li
 
+    if has_weights and weights.shape[0] != nobs:
+        raise ValueError("weights and X need to have the same length")
 
     for i in range(nobs):
-        li_i = li[i]
-        if li_i > 1 and li_i < M:
-            gcnts[li_i] = gcnts[li_i] + 1 - rem[i]
-            gcnts[li_i+1] = gcnts[li_i+1] + rem[i]
-        if li_i > M and trunc == 0:
-            gcnts[M] = gcnts[M] + 1
+        if has_weights:
+            w = weights[i]
+        lxi = (X[i] - a)/delta
+        li_i = <Py_ssize_t>floor(lxi)
+        rem = lxi - li_i
+        if li_i >= 0 and li_i < M - 1:
+            gcnts[li_i] += (1 - rem) * w
+            gcnts[li_i + 1] += rem * w
+        elif li_i == M - 1 and rem == 0:
+            gcnts[M - 1] += w
+        elif trunc == 0:
+            if li_i < 0:
+                gcnts[0] += w
+            else:
+                gcnts[M - 1] += w
     return gcnts
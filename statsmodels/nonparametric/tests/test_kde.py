@@ -89,6 +89,82 @@ class TestKDEGaussFFT(CheckKDE):
         cls.res_density = np.genfromtxt(open(rfname2, 'rb'))
 
 
+def test_linbin_weights():
+    from statsmodels.nonparametric.linbin import fast_linbin
+    x = np.array([0., 0.25, 1.5, 4., 5.])
+    w = np.array([1., 2., 3., 4., 5.])
+    binned = fast_linbin(x, 0, 4, 5, weights=w)
+    npt.assert_almost_equal(binned, [2.5, 2., 1.5, 0., 4.])
+    npt.assert_almost_equal(fast_linbin(x, 0, 4, 5, trunc=0, weights=w),
+                            [2.5, 2., 1.5, 0., 9.])
+    npt.assert_almost_equal(fast_linbin(x, 0, 4, 5),
+                            [1.75, 0.75, 0.5, 0., 1.])
+
+
+def test_kdensityfft_kernels():
+    from statsmodels.nonparametric.kde import kdensity, kdensityfft
+    weights = np.linspace(1, 100, 200)
+    for kernel in ["biw", "cos", "epa", "gau", "tri", "triw"]:
+        f1, grid1, bw1 = kdensityfft(Xi, kernel=kernel, bw=0.4,
+                                     weights=weights, gridsize=1024)
+        f2, grid2, bw2 = kdensity(Xi, kernel=kernel, bw=0.4,
+                                  weights=weights, gridsize=1024)
+        npt.assert_almost_equal(grid1, grid2, 13)
+        # the difference is the error of the linear binning
+        npt.assert_almost_equal(f1, f2, 3)
+        npt.assert_almost_equal(np.trapz(f1, grid1), 1, 3)
+
+    # the discretized uniform kernel integrates to one up to the grid step
+    res = KDE(Xi)
+    res.fit(kernel="uni", bw=0.4, fft=True, weights=weights, gridsize=4096)
+    npt.assert_almost_equal(np.trapz(res.density, res.support), 1, 2)
+
+
+def test_kdensityfft_bandwidths():
+    from statsmodels.nonparametric.kde import kdensityfft
+    bws = np.array([0.2, 0.3, 0.5])
+    dens, grid, bw = kdensityfft(Xi, kernel="epa", bw=bws, adjust=2)
+    npt.assert_equal(dens.shape, (3, len(grid)))
+    npt.assert_almost_equal(bw, 2 * bws, 15)
+    for i in range(3):
+        # a common grid is determined by the largest bandwidth
+        f, grid1, _ = kdensityfft(Xi, kernel="epa", bw=bw[i],
+                                  cut=3. * bw.max() / bw[i])
+        npt.assert_almost_equal(grid1, grid, 13)
+        npt.assert_almost_equal(dens[i], f, 13)
+
+
+def test_fft_cdf_icdf():
+    res = KDE(Xi)
+    res.fit(kernel="epa", fft=True, bw="silverman")
+    res2 = KDE(Xi)
+    res2.fit(kernel="epa", fft=False, bw="silverman")
+    cdf = res.cdf
+    npt.assert_equal(len(cdf), len(res.support))
+    npt.assert_almost_equal(cdf[[0, -1]], [0, 1], 15)
+    npt.assert_(np.all(np.diff(cdf) >= 0))
+    npt.assert_almost_equal(res.sf, 1 - cdf, 15)
+    idx = np.searchsorted(res.support, [-1, 0, 1])
+    x = res.support[idx]
+    # compare with the cdf from the kernel definition
+    npt.assert_almost_equal(cdf[idx],
+            [KDE_cdf_direct(res2, xi) for xi in x], 3)
+    # icdf interpolates the inverse of the cdf
+    q = res.icdf
+    npt.assert_almost_equal(np.interp(q[1:-1], res.support, cdf),
+                            np.linspace(0, 1, len(q))[1:-1], 10)
+    # the entropy by numerical integration, not shared through the cache
+    npt.assert_almost_equal(res.entropy, res2.entropy, 3)
+    npt.assert_(res.entropy != res2.entropy)
+
+
+def KDE_cdf_direct(res, x):
+    # weighted average of the kernel cdfs of the observations
+    u = (x - Xi) / res.bw
+    u = np.clip(u, -1, 1)
+    return np.mean(0.5 + 0.75 * (u - u**3 / 3.))
+
+
 if __name__ == "__main__":
     import nose
     nose.runmodule(argv=[__file__,'-vvs','-x','--pdb'],
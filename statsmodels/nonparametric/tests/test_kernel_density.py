@@ -305,3 +305,57 @@ class TestKDEMultivariateConditional(MyTest):
         bw_expected = np.array([0.73387, 0.43715])
         npt.assert_allclose(dens_efficient.bw, bw_expected, atol=0, rtol=1e-3)
 
+
+
+def test_loo_vectorized():
+    # compare with explicit loops over the leave-one-out samples
+    from statsmodels.nonparametric._kernel_base import LeaveOneOut, gpke
+    np.random.seed(12345)
+    nobs = 40
+    c = np.random.normal(size=nobs)
+    o = np.random.binomial(3, 0.5, size=nobs)
+    y = c + o + np.random.normal(size=nobs)
+    bw = np.array([0.5, 0.3])
+
+    dens = nparam.KDEMultivariate(data=[c, o], var_type='co', bw=bw)
+    L = 0
+    for i, X_not_i in enumerate(LeaveOneOut(dens.data)):
+        L += np.log(gpke(bw, data=X_not_i, data_predict=dens.data[i],
+                         var_type='co'))
+    npt.assert_allclose(dens.loo_likelihood(bw, np.log), -L, rtol=1e-12)
+
+    dens = nparam.KDEMultivariateConditional(endog=[y], exog=[o],
+                                             dep_type='c', indep_type='o',
+                                             bw=bw)
+    x_loo = LeaveOneOut(dens.exog).__iter__()
+    L = 0
+    for i, Z in enumerate(LeaveOneOut(dens.data)):
+        f_yx = gpke(bw, data=Z, data_predict=dens.data[i], var_type='co')
+        f_x = gpke(bw[1:], data=x_loo.next(), data_predict=dens.exog[i],
+                   var_type='o')
+        L += np.log(f_yx / f_x)
+    npt.assert_allclose(dens.loo_likelihood(bw, np.log), -L, rtol=1e-12)
+
+
+def test_pdf_tree():
+    np.random.seed(12345)
+    nobs = 300
+    c1 = np.random.normal(size=nobs)
+    c2 = np.random.normal(2, 1, size=nobs)
+    o = np.random.binomial(3, 0.5, size=nobs)
+    u = np.random.binomial(2, 0.3, size=nobs)
+    bw = np.array([0.3, 0.4, 0.2, 0.3])
+    dens = nparam.KDEMultivariate(data=[c1, c2, o, u], var_type='ccou', bw=bw)
+    pdf = dens.pdf()
+    data_predict = np.column_stack((c1, c2, o, u))[:20] + [0.1, 0, 0, 0]
+    pdf_predict = dens.pdf(data_predict)
+    for tol in [1e-12, 1e-4]:
+        settings = nparam.EstimatorSettings(tree_tol=tol)
+        dens_tree = nparam.KDEMultivariate(data=[c1, c2, o, u],
+                                           var_type='ccou', bw=bw,
+                                           defaults=settings)
+        # the error bound is tol times the peak of the continuous kernel
+        atol = tol / (2 * np.pi * bw[0] * bw[1])
+        npt.assert_allclose(dens_tree.pdf(), pdf, rtol=0, atol=atol)
+        npt.assert_allclose(dens_tree.pdf(data_predict), pdf_predict,
+                            rtol=0, atol=atol)
@@ -300,3 +300,56 @@ class TestKernelReg(MyTest):
         npt.assert_equal(sig_var1 == 'Not Significant', False)
         sig_var2 = model.sig_test([1], nboot=nboot)  # H0: b2 = 0
         npt.assert_equal(sig_var2 == 'Not Significant', True)
+
+
+def test_cv_loo_vectorized():
+    # wrapping the estimator uses the loop over leave-one-out samples
+    np.random.seed(12345)
+    nobs = 50
+    C1 = np.random.normal(size=(nobs, ))
+    O = np.random.binomial(3, 0.5, size=(nobs, ))
+    Y = 0.3 + 1.2 * C1 + O + np.random.normal(size=(nobs, ))
+    bw = np.array([0.5, 0.3])
+    for reg_type in ['lc', 'll']:
+        model = nparam.KernelReg(endog=[Y], exog=[C1, O], reg_type=reg_type,
+                                 var_type='co', bw=bw)
+        func = model.est[reg_type]
+        loop = model.cv_loo(bw, lambda *args, **kwds: func(*args, **kwds))
+        npt.assert_allclose(model.cv_loo(bw, func), loop, rtol=1e-12)
+
+    Y[Y > 2] = 2
+    model = nparam.KernelCensoredReg(endog=[Y], exog=[C1, O], reg_type='ll',
+                                     var_type='co', bw=bw, censor_val=2)
+    func = model.est['ll']
+    loop = model.cv_loo(bw, lambda *args, **kwds: func(*args, **kwds))
+    npt.assert_allclose(model.cv_loo(bw, func), loop, rtol=1e-10)
+
+
+def test_fit_tree():
+    np.random.seed(12345)
+    nobs = 200
+    C1 = np.random.normal(size=(nobs, ))
+    C2 = np.random.normal(2, 1, size=(nobs, ))
+    O = np.random.binomial(3, 0.5, size=(nobs, ))
+    Y = 0.3 + 1.2 * C1 - 0.9 * C2 + O + np.random.normal(size=(nobs, ))
+    bw = np.array([0.5, 0.6, 0.3])
+    settings = nparam.EstimatorSettings(tree_tol=1e-14)
+    for reg_type in ['lc', 'll']:
+        model = nparam.KernelReg(endog=[Y], exog=[C1, C2, O],
+                                 reg_type=reg_type, var_type='cco', bw=bw)
+        model_tree = nparam.KernelReg(endog=[Y], exog=[C1, C2, O],
+                                      reg_type=reg_type, var_type='cco',
+                                      bw=bw, defaults=settings)
+        mean, mfx = model.fit()
+        mean_tree, mfx_tree = model_tree.fit()
+        npt.assert_allclose(mean_tree, mean, rtol=1e-9)
+        npt.assert_allclose(mfx_tree, mfx, rtol=1e-8, atol=1e-12)
+        # a point without neighbours, alone and with another point
+        far = np.array([[0., 2., 1.], [100., 2., 1.]])
+        for data_predict in [far, far[1:]]:
+            mean, mfx = model.fit(data_predict)
+            mean_tree, mfx_tree = model_tree.fit(data_predict)
+            npt.assert_allclose(mean_tree, mean, rtol=1e-9)
+            npt.assert_allclose(mfx_tree, mfx, rtol=1e-8, atol=1e-12)
+        if reg_type == 'lc':
+            npt.assert_(np.isnan(mean_tree).all())
@@ -139,6 +139,59 @@ class  TestLowess(object):
         #not sure why I get lower precision on the last test
         assert_almost_equal(expected_lowess_15, actual_lowess_15, decimal=6)
 
+    def test_delta(self):
+        np.random.seed(12345)
+        x = np.arange(40.)
+        y = np.sin(x / 5.) + np.random.standard_t(3, size=40)
+        fitted = lowess(y, x, frac=0.3, it=0)[:,1]
+        # with delta=2.5 the regressions are fit at the even points and
+        # the odd points are interpolated
+        fitted_delta = lowess(y, x, frac=0.3, it=0, delta=2.5)[:,1]
+        assert_almost_equal(fitted_delta[::2], fitted[::2], 13)
+        assert_almost_equal(fitted_delta[1:-1:2],
+                            (fitted[:-2:2] + fitted[2::2]) / 2., 13)
+        assert_almost_equal(fitted_delta[-1], fitted[-1], 13)
+        # delta smaller than the spacing fits at every point
+        assert_almost_equal(lowess(y, x, frac=0.3, delta=0.5),
+                            lowess(y, x, frac=0.3), 13)
+
+    def test_xvals(self):
+        np.random.seed(12345)
+        x = np.random.uniform(-2 * np.pi, 2 * np.pi, size=200)
+        y = np.sin(x) + np.random.standard_t(3, size=200)
+        for it in [0, 3]:
+            res = lowess(y, x, frac=0.2, it=it)
+            # the fit at the observed points, in reverse order
+            xvals = res[::-1, 0]
+            assert_almost_equal(lowess(y, x, frac=0.2, it=it, xvals=xvals),
+                                res[::-1, 1], 13)
+            res_sorted = lowess(y[np.argsort(x)], res[:,0], frac=0.2, it=it,
+                                is_sorted=True)
+            assert_almost_equal(res_sorted, res, 13)
+
+        # a straight line is reproduced at new points
+        xvals = np.linspace(-7, 7, 15)
+        assert_almost_equal(lowess(2 + 0.5 * x, x, frac=0.2, xvals=xvals),
+                            2 + 0.5 * xvals, 12)
+
+    def test_zero_weights(self):
+        # heavy tails give windows where all robustness weights are zero
+        np.random.seed(4)
+        x = np.random.uniform(0, 10, size=200)
+        y = np.sin(x) + np.random.standard_cauchy(size=200)
+        res = lowess(y, x, frac=0.05, it=3)
+        assert_(np.isfinite(res[:,1]).all())
+        xvals = np.linspace(0, 10, 51)
+        res_xvals = lowess(y, x, frac=0.05, it=3, xvals=xvals)
+        assert_(np.isfinite(res_xvals).all())
+
+    def test_small_sample(self):
+        assert_almost_equal(lowess([1.], [2.]), [[2., 1.]], 14)
+        assert_almost_equal(lowess([1.], [2.], xvals=[0., 3.]), [1., 1.], 14)
+        assert_(lowess(np.empty(0), np.empty(0)).shape == (0, 2))
+        assert_almost_equal(lowess([1., 3.], [2., 4.], frac=0.1),
+                            [[2., 1.], [4., 3.]], 14)
+
 
 if __name__ == "__main__":
     import nose
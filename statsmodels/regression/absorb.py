@@ -0,0 +1,365 @@
+"""
+Linear and Poisson regression with absorbed high-dimensional fixed effects.
+
+The fixed effects of one or several group factors, for example firms,
+workers and years, are not estimated as dummy variables. Instead the
+regressors and the dependent variable are demeaned with respect to all
+factors, by alternating projections or conjugate gradients as in the
+reghdfe and ppmlhdfe packages of Stata, and only the parameters of the
+remaining regressors are estimated. For the Poisson pseudo-maximum
+likelihood estimator the weighted demeaning is repeated in each iteration
+of iteratively reweighted least squares.
+
+By the Frisch-Waugh-Lovell theorem the params and the residuals are the
+same as in the regression that includes the dummy variables of all
+factors.
+
+References
+----------
+Correia, S. 2016. "Linear Models with High-Dimensional Fixed Effects: An
+    Efficient and Feasible Estimator." Working paper.
+Correia, S., Guimaraes, P. and Zylkin, T. 2019. "ppmlhdfe: Fast Poisson
+    Estimation with High-Dimensional Fixed Effects." Working paper.
+Guimaraes, P. and Portugal, P. 2010. "A simple feasible procedure to fit
+    models with high-dimensional fixed effects." The Stata Journal 10 (4).
+"""
+
+import numpy as np
+from statsmodels.tools.tools import rank, gram
+from statsmodels.tools.grouputils import FixedEffects
+from statsmodels.stats import sandwich_covariance as sw
+from statsmodels.regression.linear_model import (WLS, RegressionResults,
+                                                 RegressionResultsWrapper)
+from statsmodels.genmod.generalized_linear_model import (GLM, GLMResults,
+        GLMResultsWrapper, _solve_normal, _check_convergence)
+from statsmodels.genmod import families
+
+__all__ = ['AbsorbOLS', 'AbsorbOLSResults', 'AbsorbPoisson',
+           'AbsorbPoissonResults']
+
+
+def _cluster_correction(fixed_effects, group, nobs, k_params):
+    """
+    Small sample correction of the cluster robust covariance.
+
+    Fixed effects that are nested within the clusters are not counted, as
+    in Stata's xtreg and reghdfe.
+    """
+    nested = [k for k in range(fixed_effects.k_factors)
+              if fixed_effects.is_nested(k, group)]
+    k_fe = fixed_effects.df_absorbed(exclude=nested)
+    n_groups = len(np.unique(group))
+    return (n_groups / (n_groups - 1.) *
+            (nobs - 1.) / float(nobs - k_params - k_fe))
+
+
+class AbsorbOLS(WLS):
+    """
+    Ordinary or weighted least squares with absorbed fixed effects.
+
+    Parameters
+    ----------
+    endog : array-like
+        1d dependent variable.
+    exog : array-like
+        nobs x k array of regressors. exog should not include a constant,
+        the constant is absorbed by the fixed effects.
+    groups : array-like or list of array-like
+        The group labels of the fixed effects, either a 1d array for a
+        single factor, a 2d array with one column per factor, or a list of
+        1d arrays.
+    weights : array-like, optional
+        Weights of the observations as in WLS.
+    demean_method : 'cg' or 'map'
+        Method of the demeaning, see `FixedEffects.demean`.
+    tol : float
+        Convergence tolerance of the demeaning.
+    maxiter : int
+        Maximum number of iterations of the demeaning.
+
+    Attributes
+    ----------
+    fixed_effects : FixedEffects instance
+        The demeaning engine of the group factors.
+    k_absorbed : int
+        The number of absorbed fixed effects that are not redundant.
+    endog, exog : array
+        The demeaned endog and exog.
+
+    Notes
+    -----
+    The model is the regression with the demeaned variables, so that
+    `fittedvalues` and `rsquared` refer to the within transformed model.
+    `df_resid` is reduced by the degrees of freedom of the fixed effects,
+    so that `bse` is the same as in the regression with the dummy
+    variables.
+
+    With more than two factors the number of redundant fixed effects is not
+    computed exactly and `df_resid` can be conservative.
+
+    Examples
+    --------
+    >>> mod = AbsorbOLS(wage, exog, [firm_id, worker_id, year])
+    >>> res = mod.fit()
+    >>> cov = res.cov_cluster(firm_id)
+    """
+
+    def __init__(self, endog, exog, groups, weights=1., demean_method='cg',
+                 tol=1e-8, maxiter=1000, missing='none'):
+        if missing != 'none':
+            raise ValueError("missing='%s' is not supported, drop the "
+                             "missing values before absorbing groups" %
+                             missing)
+        self.fixed_effects = FixedEffects(groups)
+        self.demean_method = demean_method
+        self.demean_tol = tol
+        self.demean_maxiter = maxiter
+        super(AbsorbOLS, self).__init__(endog, exog, weights=weights,
+                                        hasconst=False)
+
+    def initialize(self):
+        self.k_absorbed = self.fixed_effects.df_absorbed()
+        x = np.column_stack((self.endog, self.exog))
+        x, self.demean_iterations = self.fixed_effects.demean(x,
+                weights=self.weights, method=self.demean_method,
+                tol=self.demean_tol, maxiter=self.demean_maxiter)
+        self.endog = x[:,0]
+        self.exog = x[:,1:]
+        self.k_constant = 0
+        super(AbsorbOLS, self).initialize()
+        self.df_resid -= self.k_absorbed
+
+    def fit(self, method='pinv', **kwargs):
+        """
+        Fit the model to the demeaned data.
+
+        See RegressionModel.fit for the parameters. A regressor that is
+        collinear with the fixed effects, for example a constant, has a
+        zero column after demeaning and a param of zero with the default
+        method "pinv".
+        """
+        res = super(AbsorbOLS, self).fit(method=method, **kwargs)._results
+        lfit = AbsorbOLSResults(self, res.params,
+                                normalized_cov_params=res.normalized_cov_params)
+        return RegressionResultsWrapper(lfit)
+
+
+class AbsorbOLSResults(RegressionResults):
+    """
+    Results of a regression with absorbed fixed effects.
+
+    See RegressionResults. `rsquared` is the within R-squared of the
+    demeaned data.
+    """
+
+    def cov_cluster(self, group, use_correction=True):
+        """
+        Cluster robust covariance of the params.
+
+        Parameters
+        ----------
+        group : array-like
+            The cluster labels of the observations.
+        use_correction : bool
+            If True (default), the small sample correction
+            G/(G-1) * (n-1)/(n-k) is used, where k includes the fixed
+            effects that are not nested within the clusters.
+
+        Returns
+        -------
+        cov : ndarray (k_vars, k_vars)
+        """
+        # as sandwich_covariance.cov_cluster, but with the whitened data
+        score_obs = self.model.wexog * self.wresid[:,None]
+        cov = sw._HCCM2(self, sw.S_crosssection(score_obs, group))
+        if use_correction:
+            model = self.model
+            cov *= _cluster_correction(model.fixed_effects, group,
+                                       self.nobs, model.rank)
+        return cov
+
+
+class AbsorbPoisson(GLM):
+    """
+    Poisson pseudo-maximum likelihood with absorbed fixed effects.
+
+    Parameters
+    ----------
+    endog : array-like
+        1d array of counts or of non-negative continuous values.
+    exog : array-like
+        nobs x k array of regressors without a constant.
+    groups : array-like or list of array-like
+        The group labels of the fixed effects, either a 1d array for a
+        single factor, a 2d array with one column per factor, or a list of
+        1d arrays.
+    offset : array-like, optional
+        Offset of the linear predictor.
+    exposure : array-like, optional
+        log(exposure) is added to the linear predictor.
+    demean_method : 'cg' or 'map'
+        Method of the demeaning, see `FixedEffects.demean`.
+
+    Attributes
+    ----------
+    fixed_effects : FixedEffects instance
+        The demeaning engine of the group factors.
+    k_absorbed : int
+        The number of absorbed fixed effects that are not redundant.
+
+    Notes
+    -----
+    In each IRLS iteration the working dependent variable and exog are
+    demeaned with the current weights mu, starting from the demeaned
+    values of the previous iteration, which is close to the solution. The
+    fitted linear predictor including the fixed effects is the working
+    dependent variable minus the residual of the weighted regression of
+    the demeaned variables.
+
+    Groups in which all counts are zero have no finite fixed effect. They
+    should be dropped before fitting, otherwise the IRLS iterations
+    converge slowly.
+    """
+
+    def __init__(self, endog, exog, groups, offset=None, exposure=None,
+                 demean_method='cg', missing='none'):
+        if missing != 'none':
+            raise ValueError("missing='%s' is not supported, drop the "
+                             "missing values before absorbing groups" %
+                             missing)
+        self.fixed_effects = FixedEffects(groups)
+        self.demean_method = demean_method
+        super(AbsorbPoisson, self).__init__(endog, exog,
+                family=families.Poisson(), offset=offset, exposure=exposure)
+
+    def initialize(self):
+        super(AbsorbPoisson, self).initialize()
+        self.k_absorbed = self.fixed_effects.df_absorbed()
+        self._set_rank(self.rank)
+
+    def _set_rank(self, rank):
+        # the rank of the demeaned exog is only known after the first
+        # demeaning in fit
+        self.rank = rank
+        self.df_model = rank + self.k_absorbed - 1
+        self.df_resid = self.exog.shape[0] - rank - self.k_absorbed
+
+    def fit(self, maxiter=100, tol=1e-8, demean_tol=1e-8,
+            demean_maxiter=1000):
+        """
+        Fit the model by IRLS with demeaning in each iteration.
+
+        Parameters
+        ----------
+        maxiter : int
+            Maximum number of IRLS iterations.
+        tol : float
+            Convergence tolerance for the change in the deviance.
+        demean_tol : float
+            Convergence tolerance of the demeaning.
+        demean_maxiter : int
+            Maximum number of iterations of each demeaning.
+
+        Returns
+        -------
+        AbsorbPoissonResults instance
+        """
+        family = self.family
+        endog = self.endog
+        exog = self.exog
+        fixed_effects = self.fixed_effects
+        if hasattr(self, 'offset'):
+            offset = self.offset
+        elif hasattr(self, 'exposure'):
+            offset = self.exposure
+        else:
+            offset = 0
+        self.data_weights = np.ones(endog.shape[0])
+        self.scaletype = None
+
+        mu = family.starting_mu(endog)
+        eta = family.predict(mu)
+        history = dict(deviance=[np.inf, family.deviance(endog, mu)],
+                       demean_iterations=[])
+        wlsendog_dm = wlsendog_prev = 0
+        exog_dm = exog
+        iteration = 0
+        converged = False
+        while not converged:
+            self.weights = family.weights(mu)
+            wlsendog = eta + family.link.deriv(mu) * (endog - mu) - offset
+            # warm start, the previous demeaned values differ from the
+            # current ones by fixed effects
+            x = np.column_stack((wlsendog_dm + wlsendog - wlsendog_prev,
+                                 exog_dm))
+            x, demean_iterations = fixed_effects.demean(x,
+                    weights=self.weights, method=self.demean_method,
+                    tol=demean_tol, maxiter=demean_maxiter)
+            wlsendog_dm, exog_dm = x[:,0], x[:,1:]
+            wlsendog_prev = wlsendog
+            history['demean_iterations'].append(demean_iterations)
+            xtwx = gram(exog_dm, self.weights)
+            xtwz = np.dot(wlsendog_dm * self.weights, exog_dm)
+            if iteration == 0:
+                # scale to a correlation matrix for a scale invariant rank
+                std = np.sqrt(np.diag(xtwx))
+                std[std == 0] = 1
+                self._set_rank(rank(xtwx / np.outer(std, std)))
+                wls_method = 'cholesky'
+                if self.rank < exog.shape[1]:
+                    wls_method = 'pinv-normal'
+            params, normalized_cov_params, wls_method = _solve_normal(xtwx,
+                                                        xtwz, wls_method)
+            eta = wlsendog - (wlsendog_dm - np.dot(exog_dm, params)) + offset
+            mu = family.fitted(eta)
+            history['deviance'].append(family.deviance(endog, mu))
+            iteration += 1
+            converged = _check_convergence(history['deviance'], iteration,
+                                           tol, maxiter)
+        self.mu = mu
+        self.exog_demeaned = exog_dm
+        self.scale = 1.
+        history['iteration'] = iteration
+        results = AbsorbPoissonResults(self, params, normalized_cov_params,
+                                       self.scale)
+        results.fit_history = history
+        return GLMResultsWrapper(results)
+
+
+class AbsorbPoissonResults(GLMResults):
+    """
+    Results of a Poisson regression with absorbed fixed effects.
+
+    See GLMResults. `fittedvalues` and `mu` include the fixed effects.
+    """
+
+    def cov_cluster(self, group, use_correction=True):
+        """
+        Cluster robust covariance of the params.
+
+        Parameters
+        ----------
+        group : array-like
+            The cluster labels of the observations.
+        use_correction : bool
+            If True (default), the small sample correction
+            G/(G-1) * (n-1)/(n-k) is used, where k includes the fixed
+            effects that are not nested within the clusters.
+
+        Returns
+        -------
+        cov : ndarray (k_vars, k_vars)
+
+        Notes
+        -----
+        The scores of the params are the demeaned exog of the last
+        iteration times the response residuals, the scores of the fixed
+        effects are orthogonal to them.
+        """
+        model = self.model
+        score_obs = model.exog_demeaned * self.resid_response[:,None]
+        cov = sw._HCCM2(self, sw.S_crosssection(score_obs, group))
+        if use_correction:
+            cov *= _cluster_correction(model.fixed_effects, group,
+                                       self.nobs, model.rank)
+        return cov
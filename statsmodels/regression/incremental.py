@@ -0,0 +1,352 @@
+"""
+Ordinary least squares from incrementally accumulated sufficient statistics.
+
+The data is never needed in memory at the same time. Chunks of observations
+are added with `partial_fit` and only the cross-product matrices X'X, X'y,
+y'y, sum(y) and the number of observations are kept. Accumulators that were
+filled from different shards of the data can be combined with `merge`, so
+that the statistics can be computed in a map-reduce fashion.
+
+Notes
+-----
+Forming the cross-product matrix squares the condition number of the
+design matrix. For badly conditioned designs the full data OLS with
+method="qr" is numerically more accurate.
+"""
+
+import numpy as np
+from scipy import stats
+from statsmodels.tools.tools import rank
+from statsmodels.tools.decorators import cache_readonly
+import statsmodels.base.model as base
+
+__all__ = ['IncrementalOLS', 'IncrementalOLSResults']
+
+
+class IncrementalOLS(object):
+    """
+    Ordinary least squares estimated from chunks of data.
+
+    Parameters
+    ----------
+    k_exog : int, optional
+        Number of regressors. If None, it is taken from the first chunk.
+    exog_names : list of strings, optional
+        Names of the regressors, used in `t_test` and `f_test`. Default is
+        `x1`, `x2`, ... with `const` for a constant column.
+    hasconst : None or bool
+        Indicates whether the regressors include a user-supplied constant.
+        If None, a constant is detected as a column that has the same
+        nonzero value in all observations.
+
+    Attributes
+    ----------
+    xtx : array
+        k x k cross-product matrix of exog.
+    xty : array
+        cross-product of exog and endog.
+    yty : float
+        uncentered sum of squares of endog.
+    sum_endog : float
+        sum of endog, used for the centered total sum of squares.
+    nobs : float
+        number of observations added so far.
+
+    Examples
+    --------
+    >>> mod = IncrementalOLS()
+    >>> for endog_chunk, exog_chunk in chunks:
+    ...     mod.partial_fit(endog_chunk, exog_chunk)
+    >>> res = mod.fit()
+
+    Accumulators computed in separate processes can be reduced with
+
+    >>> mod = reduce(lambda a, b: a.merge(b), list_of_models)
+    """
+
+    def __init__(self, k_exog=None, exog_names=None, hasconst=None):
+        self.hasconst = hasconst
+        self._exog_names = exog_names
+        self.nobs = 0.
+        self.yty = 0.
+        self.sum_endog = 0.
+        self.k_exog = None
+        if k_exog is not None:
+            self._initialize(k_exog)
+
+    def _initialize(self, k_exog):
+        self.k_exog = k_exog
+        self.xtx = np.zeros((k_exog, k_exog))
+        self.xty = np.zeros(k_exog)
+        # column ranges to detect a constant
+        self.exog_min = np.empty(k_exog)
+        self.exog_min.fill(np.inf)
+        self.exog_max = np.empty(k_exog)
+        self.exog_max.fill(-np.inf)
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwds):
+        """
+        Create and fill an instance from an iterable of (endog, exog) chunks.
+
+        Parameters
+        ----------
+        chunks : iterable
+            Iterable, for example a generator, that returns tuples of
+            endog and exog arrays for consecutive blocks of observations.
+        kwds : extra keywords
+            These are passed to the class.
+
+        Returns
+        -------
+        model : IncrementalOLS instance
+        """
+        mod = cls(**kwds)
+        for endog, exog in chunks:
+            mod.partial_fit(endog, exog)
+        return mod
+
+    def partial_fit(self, endog, exog):
+        """
+        Add a chunk of observations to the sufficient statistics.
+
+        Parameters
+        ----------
+        endog : array-like
+            1d array of the dependent variable for the chunk.
+        exog : array-like
+            nobs_chunk x k array of regressors for the chunk.
+
+        Returns
+        -------
+        self
+        """
+        endog = np.asarray(endog, dtype=np.float64).squeeze()
+        exog = np.asarray(exog, dtype=np.float64)
+        if exog.ndim == 1:
+            exog = exog[:,None]
+        if endog.ndim == 0:
+            endog = endog[None]
+        if endog.ndim != 1:
+            raise ValueError("endog has to be 1d")
+        if exog.ndim != 2 or exog.shape[0] != endog.shape[0]:
+            raise ValueError("exog has to be 2d with the same number of rows "
+                             "as endog")
+        if self.k_exog is None:
+            self._initialize(exog.shape[1])
+        elif exog.shape[1] != self.k_exog:
+            raise ValueError("chunk has %d columns, expected %d" %
+                             (exog.shape[1], self.k_exog))
+        if endog.shape[0] == 0:
+            return self
+
+        self.xtx += np.dot(exog.T, exog)
+        self.xty += np.dot(exog.T, endog)
+        self.yty += np.dot(endog, endog)
+        self.sum_endog += endog.sum()
+        self.nobs += endog.shape[0]
+        np.minimum(self.exog_min, exog.min(0), self.exog_min)
+        np.maximum(self.exog_max, exog.max(0), self.exog_max)
+        return self
+
+    def merge(self, other):
+        """
+        Add the sufficient statistics of another instance to this one.
+
+        Parameters
+        ----------
+        other : IncrementalOLS instance
+            Accumulated on a different set of observations of the same
+            regression.
+
+        Returns
+        -------
+        self
+        """
+        if other.k_exog is None:
+            return self
+        if self.k_exog is None:
+            self._initialize(other.k_exog)
+        elif other.k_exog != self.k_exog:
+            raise ValueError("cannot merge models with different number of "
+                             "regressors")
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+        self.sum_endog += other.sum_endog
+        self.nobs += other.nobs
+        np.minimum(self.exog_min, other.exog_min, self.exog_min)
+        np.maximum(self.exog_max, other.exog_max, self.exog_max)
+        return self
+
+    @property
+    def _is_const(self):
+        # constant columns, an all zero column is not a constant
+        return (self.exog_min == self.exog_max) & (self.exog_max != 0)
+
+    @property
+    def k_constant(self):
+        if self.hasconst is not None:
+            return int(bool(self.hasconst))
+        is_const = self._is_const
+        k_constant = int(is_const.sum())
+        if k_constant > 1:
+            raise ValueError("More than one constant detected.")
+        return k_constant
+
+    @property
+    def exog_names(self):
+        if self._exog_names is not None:
+            return self._exog_names
+        is_const = self._is_const
+        if is_const.any():
+            const_idx = is_const.argmax()
+            exog_names = ['x%d' % i for i in range(1, self.k_exog)]
+            exog_names.insert(const_idx, 'const')
+        else:
+            exog_names = ['x%d' % i for i in range(1, self.k_exog + 1)]
+        return exog_names
+
+    def fit(self):
+        """
+        Solve the normal equations of the accumulated data.
+
+        Returns
+        -------
+        An IncrementalOLSResults instance.
+
+        Notes
+        -----
+        The generalized inverse of X'X is used, so that a singular design
+        gives the same minimum norm solution as OLS with method="pinv".
+        """
+        if self.k_exog is None or self.nobs == 0:
+            raise ValueError("no data has been added")
+        self.rank = rank(self.xtx)
+        self.df_model = float(self.rank - self.k_constant)
+        self.df_resid = self.nobs - self.rank
+        normalized_cov_params = np.linalg.pinv(self.xtx)
+        params = np.dot(normalized_cov_params, self.xty)
+        return IncrementalOLSResults(self, params,
+                                     normalized_cov_params=normalized_cov_params)
+
+
+class IncrementalOLSResults(base.LikelihoodModelResults):
+    """
+    Results of an OLS regression computed from sufficient statistics.
+
+    Provides the same parameter inference as RegressionResults, params,
+    bse, cov_params, t_test, f_test and conf_int, and the summary statistics
+    that can be computed without the residuals.
+    """
+
+    def __init__(self, model, params, normalized_cov_params=None):
+        super(IncrementalOLSResults, self).__init__(model, params,
+                                                    normalized_cov_params,
+                                                    scale=1.)
+        self.nobs = model.nobs
+        self.df_model = model.df_model
+        self.df_resid = model.df_resid
+        self.k_constant = model.k_constant
+        self.scale = self.ssr / self.df_resid
+
+    @cache_readonly
+    def ssr(self):
+        # y'y - b'X'y is the residual sum of squares at the LS solution
+        ssr = self.model.yty - np.dot(self.params, self.model.xty)
+        return max(ssr, 0.)
+
+    @cache_readonly
+    def centered_tss(self):
+        model = self.model
+        return model.yty - model.sum_endog**2 / model.nobs
+
+    @cache_readonly
+    def uncentered_tss(self):
+        return self.model.yty
+
+    @cache_readonly
+    def ess(self):
+        if self.k_constant:
+            return self.centered_tss - self.ssr
+        else:
+            return self.uncentered_tss - self.ssr
+
+    @cache_readonly
+    def rsquared(self):
+        if self.k_constant:
+            return 1 - self.ssr/self.centered_tss
+        else:
+            return 1 - self.ssr/self.uncentered_tss
+
+    @cache_readonly
+    def rsquared_adj(self):
+        return (1 - (self.nobs - self.k_constant)/self.df_resid *
+                (1 - self.rsquared))
+
+    @cache_readonly
+    def mse_model(self):
+        return self.ess/self.df_model
+
+    @cache_readonly
+    def mse_resid(self):
+        return self.ssr/self.df_resid
+
+    @cache_readonly
+    def fvalue(self):
+        return self.mse_model/self.mse_resid
+
+    @cache_readonly
+    def f_pvalue(self):
+        return stats.f.sf(self.fvalue, self.df_model, self.df_resid)
+
+    @cache_readonly
+    def pvalues(self):
+        return stats.t.sf(np.abs(self.tvalues), self.df_resid)*2
+
+    @cache_readonly
+    def llf(self):
+        nobs2 = self.nobs / 2.0
+        llf = -np.log(self.ssr) * nobs2
+        llf -= (1+np.log(np.pi/nobs2))*nobs2
+        return llf
+
+    @cache_readonly
+    def aic(self):
+        return -2 * self.llf + 2 * (self.df_model + self.k_constant)
+
+    @cache_readonly
+    def bic(self):
+        return (-2 * self.llf + np.log(self.nobs) * (self.df_model +
+                                                     self.k_constant))
+
+    def conf_int(self, alpha=.05, cols=None):
+        """
+        Returns the confidence interval of the fitted parameters.
+
+        Parameters
+        ----------
+        alpha : float, optional
+            The `alpha` level for the confidence interval.
+            ie., The default `alpha` = .05 returns a 95% confidence interval.
+        cols : array-like, optional
+            `cols` specifies which confidence intervals to return
+
+        Notes
+        -----
+        The confidence interval is based on Student's t-distribution.
+        """
+        bse = self.bse
+        params = self.params
+        q = stats.t.ppf(1 - alpha / 2, self.df_resid)
+        if cols is not None:
+            cols = np.asarray(cols)
+            params = params[cols]
+            bse = bse[cols]
+        return np.column_stack((params - q * bse, params + q * bse))
+
+    def predict(self, exog):
+        """
+        Return linear predicted values for the design matrix exog.
+        """
+        return np.dot(exog, self.params)
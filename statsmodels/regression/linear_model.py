@@ -30,15 +30,19 @@ __docformat__ = 'restructuredtext en'
 
 __all__ = ['GLS', 'WLS', 'OLS', 'GLSAR']
 
+import copy
 import numpy as np
+from scipy import linalg, sparse
 from scipy.linalg import toeplitz
 from scipy import stats
 from scipy.stats.stats import ss
 from statsmodels.tools.tools import (add_constant, rank,
-                                             recipr, chain_dot)
+                                             recipr, chain_dot, gram,
+                                             scale_rows, hat_diag)
 from statsmodels.tools.decorators import (resettable_cache,
         cache_readonly, cache_writable)
 import statsmodels.base.model as base
+from statsmodels.stats import sandwich_covariance as sw
 import statsmodels.base.wrapper as wrap
 from statsmodels.emplike.elregress import _ELRegOpts
 from scipy import optimize
@@ -88,9 +92,8 @@ class RegressionModel(base.LikelihoodModel):
         self.rank = rank(self.exog)
         self.df_model = float(self.rank - self.k_constant)
         self.df_resid = self.nobs - self.rank
-        self.df_model = float(rank(self.exog) - self.k_constant)
 
-    def fit(self, method="pinv", **kwargs):
+    def fit(self, method="pinv", keep_factors=True, **kwargs):
         """
         Full fit of the model.
 
@@ -100,9 +103,15 @@ class RegressionModel(base.LikelihoodModel):
         Parameters
         ----------
         method : str
-            Can be "pinv", "qr".  "pinv" uses the Moore-Penrose pseudoinverse
-            to solve the least squares problem. "qr" uses the QR
-            factorization.
+            Can be "pinv", "qr" or "cholesky".  "pinv" uses the Moore-Penrose
+            pseudoinverse to solve the least squares problem. "qr" uses the
+            economic QR factorization and a triangular solve. "cholesky" uses
+            the Cholesky factorization of the normal equations X'X b = X'y.
+        keep_factors : bool
+            If True (default), the factorization of the design matrix,
+            `pinv_wexog` or `exog_Q` and `exog_R`, is cached on the model and
+            reused in later calls to fit. If False, the nobs x k factors are
+            deleted after the parameters have been computed.
 
         Returns
         -------
@@ -114,17 +123,86 @@ class RegressionModel(base.LikelihoodModel):
 
         Notes
         -----
-        The fit method uses the pseudoinverse of the design/exogenous variables
-        to solve the least squares minimization.
+        The default fit method uses the pseudoinverse of the design/exogenous
+        variables to solve the least squares minimization.
+
+        "qr" and "cholesky" never form the nobs x k pseudoinverse. "cholesky"
+        only needs the k x k cross-product matrix and is the fastest method,
+        but it squares the condition number of the design. If the design
+        matrix is not of full rank, both methods fall back to "pinv" which
+        returns the minimum norm solution.
+
+        If exog is a scipy.sparse matrix, "pinv" and "cholesky" solve the
+        normal equations with the dense k x k matrix X'X and the design
+        matrix is never densified. "qr" is not available for sparse exog.
         """
-        exog = self.wexog
-        endog = self.wendog
+        beta, effects = self._solve(self.wendog, method)
+        if effects is not None:
+            # used in ANOVA
+            self.effects = effects
 
-        if method == "pinv":
+        if not keep_factors:
+            self._drop_factors()
+
+        if isinstance(self, OLS):
+            lfit = OLSResults(self, beta,
+                       normalized_cov_params=self.normalized_cov_params)
+        else:
+            lfit = RegressionResults(self, beta,
+                       normalized_cov_params=self.normalized_cov_params)
+        return RegressionResultsWrapper(lfit)
+
+    def _solve(self, endog, method):
+        """
+        Least squares solution for the whitened design and `endog`.
+
+        The factorization of the design matrix for `method` and
+        normalized_cov_params are computed if they are not cached on the
+        model. endog can be 1d or 2d with one column per series.
+
+        Returns
+        -------
+        beta : ndarray
+            The parameters, with one column per column of endog.
+        effects : ndarray or None
+            Q'endog if method is "qr", otherwise None.
+        """
+        exog = self.wexog
+        exog_sparse = sparse.issparse(exog)
+        effects = None
+        if exog_sparse and method == "qr":
+            raise ValueError("method 'qr' is not available for sparse exog, "
+                             "use 'pinv' or 'cholesky'")
+
+        if method in ["qr", "cholesky"] and self.rank < exog.shape[1]:
+            # singular design, use minimum norm solution
+            method = "pinv"
+
+        if method == "cholesky":
+            if ((not hasattr(self, 'exog_cho')) or
+                (not hasattr(self, 'normalized_cov_params'))):
+                try:
+                    self.exog_cho = linalg.cho_factor(gram(exog))
+                except np.linalg.LinAlgError:
+                    method = "pinv"
+                else:
+                    self.normalized_cov_params = linalg.cho_solve(
+                                    self.exog_cho, np.eye(exog.shape[1]))
+            if method == "cholesky":
+                beta = linalg.cho_solve(self.exog_cho, exog.T.dot(endog))
+
+        if method == "pinv" and exog_sparse:
+            # minimum norm solution of the normal equations, the nobs x k
+            # pseudoinverse would be dense
+            if not hasattr(self, 'normalized_cov_params'):
+                self.normalized_cov_params = np.linalg.pinv(gram(exog))
+            beta = np.dot(self.normalized_cov_params, exog.T.dot(endog))
+
+        elif method == "pinv":
             if ((not hasattr(self, 'pinv_wexog')) or
                 (not hasattr(self, 'normalized_cov_params'))):
                 #print "recalculating pinv"   #for debugging
-                self.pinv_wexog = pinv_wexog = np.linalg.pinv(self.wexog)
+                self.pinv_wexog = pinv_wexog = np.linalg.pinv(exog)
                 self.normalized_cov_params = np.dot(pinv_wexog,
                                                  np.transpose(pinv_wexog))
             beta = np.dot(self.pinv_wexog, endog)
@@ -134,22 +212,68 @@ class RegressionModel(base.LikelihoodModel):
                 (not hasattr(self, 'normalized_cov_params'))):
                 Q, R = np.linalg.qr(exog)
                 self.exog_Q, self.exog_R = Q, R
-                self.normalized_cov_params = np.linalg.inv(np.dot(R.T, R))
+                R_inv = linalg.solve_triangular(R, np.eye(R.shape[0]))
+                self.normalized_cov_params = np.dot(R_inv, R_inv.T)
             else:
                 Q, R = self.exog_Q, self.exog_R
 
-            # used in ANOVA
-            self.effects = effects = np.dot(Q.T, endog)
-            beta = np.linalg.solve(R, effects)
+            effects = np.dot(Q.T, endog)
+            beta = linalg.solve_triangular(R, effects)
 
-            # no upper triangular solve routine in numpy/scipy?
-        if isinstance(self, OLS):
-            lfit = OLSResults(self, beta,
-                       normalized_cov_params=self.normalized_cov_params)
-        else:
-            lfit = RegressionResults(self, beta,
-                       normalized_cov_params=self.normalized_cov_params)
-        return RegressionResultsWrapper(lfit)
+        elif method != "cholesky":
+            raise ValueError("method has to be 'pinv', 'qr' or 'cholesky'")
+
+        return beta, effects
+
+    def _drop_factors(self):
+        """
+        Delete the cached nobs x k factorizations of the design matrix.
+
+        normalized_cov_params and the k x k Cholesky factor are kept.
+        Heteroscedasticity robust covariances are then computed from
+        normalized_cov_params and wexog.
+        """
+        for attr in ['pinv_wexog', 'exog_Q', 'exog_R']:
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+    def fit_many(self, method="qr"):
+        """
+        Fit the model separately to each column of a 2d endog.
+
+        The (whitened) design matrix is factored only once and the least
+        squares problem is solved for all columns of endog at the same time.
+
+        Parameters
+        ----------
+        method : str
+            Can be "qr", "pinv" or "cholesky", see `fit`. The factorization
+            is cached on the model and shared with `fit`. If the design
+            matrix is not of full rank, "qr" and "cholesky" fall back to
+            "pinv".
+
+        Returns
+        -------
+        A BatchRegressionResults instance.
+
+        See Also
+        --------
+        regression.BatchRegressionResults
+
+        Notes
+        -----
+        endog has to be a nobs x n_series array. Only vectorized summary
+        statistics are computed. A full RegressionResults instance for a
+        single column is created on demand by indexing the returned results.
+        """
+        endog = self.wendog
+        if endog.ndim != 2:
+            raise ValueError("fit_many requires a 2d endog of shape "
+                             "nobs x n_series")
+        beta = self._solve(endog, method)[0]
+
+        return BatchRegressionResults(self, beta,
+                        normalized_cov_params=self.normalized_cov_params)
 
     def predict(self, params, exog=None):
         """
@@ -174,6 +298,8 @@ class RegressionModel(base.LikelihoodModel):
         #SS: it needs its own predict method
         if exog is None:
             exog = self.exog
+        if sparse.issparse(exog):
+            return exog.dot(params)
         return np.dot(exog, params)
 
 class GLS(RegressionModel):
@@ -280,6 +406,11 @@ class GLS(RegressionModel):
         --------
         regression.GLS
         """
+        if sparse.issparse(X):
+            if np.any(self.sigma) and not self.sigma.shape == ():
+                # the whitened design is dense
+                return X.T.dot(self.cholsigmainv.T).T
+            return X
         X = np.asarray(X)
         if np.any(self.sigma) and not self.sigma.shape == ():
             return np.dot(self.cholsigmainv, X)
@@ -315,7 +446,7 @@ class GLS(RegressionModel):
         """
         #TODO: combine this with OLS/WLS loglike and add _det_sigma argument
         nobs2 = self.nobs / 2.0
-        SSR = ss(self.wendog - np.dot(self.wexog,params))
+        SSR = ss(self.wendog - self.wexog.dot(params))
         llf = -np.log(SSR) * nobs2      # concentrated likelihood
         llf -= (1+np.log(np.pi/nobs2))*nobs2  # with likelihood constant
         if np.any(self.sigma) and self.sigma.ndim == 2:
@@ -398,6 +529,8 @@ class WLS(RegressionModel):
         sqrt(weights)*X
         """
         #print self.weights.var()
+        if sparse.issparse(X):
+            return scale_rows(X, np.sqrt(self.weights))
         X = np.asarray(X)
         if X.ndim == 1:
             return X * np.sqrt(self.weights)
@@ -427,7 +560,7 @@ class WLS(RegressionModel):
         where :math:`W` is a diagonal matrix
         """
         nobs2 = self.nobs / 2.0
-        SSR = ss(self.wendog - np.dot(self.wexog,params))
+        SSR = ss(self.wendog - self.wexog.dot(params))
         llf = -np.log(SSR) * nobs2      # concentrated likelihood
         llf -= (1+np.log(np.pi/nobs2))*nobs2  # with constant
         return llf
@@ -494,8 +627,8 @@ class OLS(WLS):
         nobs2 = self.nobs/2.
         return -nobs2*np.log(2*np.pi)-nobs2*np.log(1/(2*nobs2) *\
                 np.dot(np.transpose(self.endog -
-                    np.dot(self.exog, params)),
-                    (self.endog - np.dot(self.exog,params)))) -\
+                    self.exog.dot(params)),
+                    (self.endog - self.exog.dot(params)))) -\
                     nobs2
 
     def whiten(self, Y):
@@ -799,6 +932,11 @@ class RegressionResults(base.LikelihoodModelResults):
         another attribute cov_HC3, which is the full HCCM and also `het_scale`,
         which is in this case is resid^(2)/(1-h_ii)^(2).  HCCM matrices are
         only appropriate for OLS.
+    hac_nlags
+        The number of lags of the HAC covariance selected by the method of
+        Newey and West (1994) for the Bartlett kernel. It is computed from
+        the whitened scores when it is first accessed and is cached. See
+        statsmodels.stats.sandwich_covariance.hac_nlags.
     model
         A pointer to the model instance that called fit() or results.
     mse_model
@@ -1003,8 +1141,15 @@ class RegressionResults(base.LikelihoodModelResults):
 
     #TODO: make these properties reset bse
     def _HCCM(self, scale):
-        H = np.dot(self.model.pinv_wexog,
-            scale[:,None]*self.model.pinv_wexog.T)
+        model = self.model
+        if hasattr(model, 'pinv_wexog'):
+            H = np.dot(model.pinv_wexog, scale[:,None]*model.pinv_wexog.T)
+        else:
+            # pinv_wexog = (X'X)^(-1) X' if the model was fit without pinv
+            wexog = model.wexog
+            xsx = gram(wexog, scale)
+            H = chain_dot(self.normalized_cov_params, xsx,
+                          self.normalized_cov_params)
         return H
 
     @property
@@ -1035,10 +1180,7 @@ class RegressionResults(base.LikelihoodModelResults):
         See statsmodels.RegressionResults
         """
         if self._HC2_se is None:
-            # probably could be optimized
-            h = np.diag(chain_dot(self.model.exog,
-                                  self.normalized_cov_params,
-                                  self.model.exog.T))
+            h = hat_diag(self.model.exog, self.normalized_cov_params)
             self.het_scale = self.resid**2/(1-h)
             self.cov_HC2 = self._HCCM(self.het_scale)
             self._HC2_se = np.sqrt(np.diag(self.cov_HC2))
@@ -1050,15 +1192,21 @@ class RegressionResults(base.LikelihoodModelResults):
         See statsmodels.RegressionResults
         """
         if self._HC3_se is None:
-            # above probably could be optimized to only calc the diag
-            h = np.diag(chain_dot(self.model.exog,
-                                  self.normalized_cov_params,
-                                  self.model.exog.T))
+            h = hat_diag(self.model.exog, self.normalized_cov_params)
             self.het_scale=(self.resid/(1-h))**2
             self.cov_HC3 = self._HCCM(self.het_scale)
             self._HC3_se = np.sqrt(np.diag(self.cov_HC3))
         return self._HC3_se
 
+    @cache_readonly
+    def hac_nlags(self):
+        """
+        See statsmodels.RegressionResults
+        """
+        wexog = self.model.wexog
+        return sw.hac_nlags(wexog * self.wresid[:,None],
+                            weights=sw._hac_nlags_weights(wexog))
+
     #TODO: this needs a test
     def norm_resid(self):
         """
@@ -1198,7 +1346,7 @@ class RegressionResults(base.LikelihoodModelResults):
         #TODO: reuse condno from somewhere else ?
         #condno = np.linalg.cond(np.dot(self.wexog.T, self.wexog))
         wexog = self.model.wexog
-        eigvals = np.linalg.linalg.eigvalsh(np.dot(wexog.T, wexog))
+        eigvals = np.linalg.linalg.eigvalsh(gram(wexog))
         eigvals = np.sort(eigvals) #in increasing order
         condno = np.sqrt(eigvals[-1]/eigvals[0])
 
@@ -1735,6 +1883,179 @@ class OLSResults(RegressionResults):
         return (lowerl, upperl)
 
 
+class BatchRegressionResults(object):
+    """
+    Vectorized results for a regression model fit to many endog columns.
+
+    Returned by `fit_many`. All columns share the same design matrix, so
+    `normalized_cov_params`, `df_resid` and `df_model` are common. Array
+    attributes that are per parameter have shape k x n_series, all others
+    have length n_series.
+
+    Indexing the instance, `results[i]`, returns the full (wrapped)
+    RegressionResults instance for column i of endog. It is created on
+    demand and reuses the factorization cached on the model.
+
+    Attributes
+    ----------
+    model
+        A pointer to the model instance that called fit_many.
+    params
+        k x n_series array of least squares coefficients.
+    normalized_cov_params
+        k x k array, common to all columns.
+    bse
+        k x n_series array of standard errors of the parameter estimates.
+    tvalues
+        k x n_series array of t-statistics of the params.
+    pvalues
+        k x n_series array of two-tailed p values of the t-statistics.
+    ssr
+        Sum of squared (whitened) residuals for each column.
+    scale
+        ssr / df_resid for each column.
+    rsquared
+        R-squared for each column, defined as in RegressionResults.
+    rsquared_adj
+        Adjusted R-squared for each column.
+    llf, aic, bic
+        Log-likelihood and information criteria for each column.
+    """
+
+    def __init__(self, model, params, normalized_cov_params=None):
+        self.model = model
+        self.params = params
+        self.normalized_cov_params = normalized_cov_params
+        self.k_constant = model.k_constant
+        self.df_resid = model.df_resid
+        self.df_model = model.df_model
+        self.nobs = model.nobs
+        self.n_series = params.shape[1]
+        self._cache = resettable_cache()
+
+    def __len__(self):
+        return self.n_series
+
+    def __getitem__(self, idx):
+        return self.get_results(idx)
+
+    def __iter__(self):
+        for idx in range(self.n_series):
+            yield self.get_results(idx)
+
+    def get_results(self, idx):
+        """
+        Full results instance for a single column of endog.
+
+        Parameters
+        ----------
+        idx : int
+            Column index of endog.
+
+        Returns
+        -------
+        A wrapped RegressionResults instance (OLSResults for OLS).
+        """
+        model = self.model
+        if not -self.n_series <= idx < self.n_series:
+            raise IndexError("index %s out of range for %s series" %
+                             (idx, self.n_series))
+
+        # shallow copy shares exog and the cached factorization
+        mod_i = copy.copy(model)
+        mod_i.endog = model.endog[:, idx]
+        mod_i.wendog = model.wendog[:, idx]
+        data = mod_i.data = copy.copy(model.data)
+        data._cache = resettable_cache()
+        data.endog = mod_i.endog
+        orig_endog = model.data.orig_endog
+        if hasattr(orig_endog, 'iloc'):
+            data.orig_endog = orig_endog.iloc[:, idx]
+        else:
+            data.orig_endog = np.asarray(orig_endog)[:, idx]
+        ynames = model.endog_names
+        if isinstance(ynames, list):
+            data.ynames = ynames[idx]
+
+        if isinstance(model, OLS):
+            res_cls = OLSResults
+        else:
+            res_cls = RegressionResults
+        res = res_cls(mod_i, self.params[:, idx],
+                      normalized_cov_params=self.normalized_cov_params)
+        return RegressionResultsWrapper(res)
+
+    @cache_readonly
+    def ssr(self):
+        model = self.model
+        wresid = model.wendog - model.wexog.dot(self.params)
+        return (wresid**2).sum(0)
+
+    @cache_readonly
+    def scale(self):
+        return self.ssr / self.df_resid
+
+    @cache_readonly
+    def bse(self):
+        var_params = np.diag(self.normalized_cov_params)
+        return np.sqrt(var_params[:,None] * self.scale)
+
+    @cache_readonly
+    def tvalues(self):
+        return self.params / self.bse
+
+    @cache_readonly
+    def pvalues(self):
+        return stats.t.sf(np.abs(self.tvalues), self.df_resid)*2
+
+    @cache_readonly
+    def centered_tss(self):
+        model = self.model
+        weights = getattr(model, 'weights', None)
+        if weights is not None:
+            endog = model.endog
+            mean = np.average(endog, axis=0, weights=weights)
+            return np.dot(weights, (endog - mean)**2)
+        else:
+            centered_endog = model.wendog - model.wendog.mean(0)
+            return (centered_endog**2).sum(0)
+
+    @cache_readonly
+    def uncentered_tss(self):
+        return (self.model.wendog**2).sum(0)
+
+    @cache_readonly
+    def rsquared(self):
+        if self.k_constant:
+            return 1 - self.ssr/self.centered_tss
+        else:
+            return 1 - self.ssr/self.uncentered_tss
+
+    @cache_readonly
+    def rsquared_adj(self):
+        return (1 - (self.nobs - self.k_constant)/self.df_resid *
+                (1 - self.rsquared))
+
+    @cache_readonly
+    def llf(self):
+        nobs2 = self.nobs / 2.0
+        llf = -np.log(self.ssr) * nobs2
+        llf -= (1+np.log(np.pi/nobs2))*nobs2
+        sigma = getattr(self.model, 'sigma', None)
+        if np.any(sigma) and sigma.ndim == 2:
+            llf -= .5*np.log(np.linalg.det(sigma))
+        return llf
+
+    @cache_readonly
+    def aic(self):
+        return -2 * self.llf + 2 * (self.df_model + self.k_constant)
+
+    @cache_readonly
+    def bic(self):
+        return (-2 * self.llf + np.log(self.nobs) * (self.df_model +
+                                                     self.k_constant))
+
+
 class RegressionResultsWrapper(wrap.ResultsWrapper):
 
     _attrs = {
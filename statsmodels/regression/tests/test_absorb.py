@@ -0,0 +1,138 @@
+"""
+Tests for regression with absorbed fixed effects, compared to the
+regression with dummy variables
+"""
+import numpy as np
+from numpy.testing import (assert_almost_equal, assert_equal, assert_raises)
+from statsmodels.regression.linear_model import OLS, WLS
+from statsmodels.genmod.generalized_linear_model import GLM
+from statsmodels.genmod import families
+from statsmodels.stats import sandwich_covariance as sw
+from statsmodels.tools.grouputils import FixedEffects
+from statsmodels.regression.absorb import AbsorbOLS, AbsorbPoisson
+
+
+def _make_data():
+    np.random.seed(246810)
+    nobs = 600
+    g1 = np.random.randint(0, 40, nobs)
+    g2 = np.random.randint(0, 15, nobs)
+    exog = np.random.randn(nobs, 2)
+    fe = np.random.randn(40)[g1] + np.random.randn(15)[g2]
+    dummies = np.column_stack(((g1[:,None] == np.arange(40)),
+                               (g2[:,None] == np.arange(1, 15))))
+    return g1, g2, exog, fe, np.column_stack((exog, dummies)).astype(float)
+
+
+def test_demean():
+    g1, g2, exog, fe, exog_dummy = _make_data()
+    g3 = np.arange(len(g1)) % 7
+    dummies = np.column_stack((exog_dummy[:,2:], g3[:,None] == np.arange(7)))
+    weights = np.random.uniform(0.5, 2, len(g1))
+    sqrt_w = np.sqrt(weights)[:,None]
+    expected = exog - np.dot(dummies, np.dot(np.linalg.pinv(dummies * sqrt_w),
+                                             exog * sqrt_w))
+    fixed_effects = FixedEffects([g1, g2, g3])
+    for method in ['cg', 'map']:
+        demeaned = fixed_effects.demean(exog, weights=weights, method=method,
+                                        tol=1e-12)[0]
+        assert_almost_equal(demeaned, expected, 10)
+    # 1d and single factor
+    demeaned = FixedEffects(g1).demean(exog[:,0])[0]
+    assert_almost_equal(demeaned, exog[:,0] - (np.bincount(g1, exog[:,0]) /
+                                               np.bincount(g1))[g1], 13)
+    assert_equal(fixed_effects.df_absorbed(), np.linalg.matrix_rank(dummies))
+    assert_raises(ValueError, fixed_effects.demean, exog, method='qr')
+
+
+def test_df_absorbed_components():
+    # two disconnected sets of groups have two redundant fixed effects
+    g1 = np.array([0, 0, 1, 1, 2, 2, 3, 3])
+    g2 = np.array([0, 1, 0, 1, 2, 3, 2, 3])
+    fixed_effects = FixedEffects(np.column_stack((g1, g2)))
+    assert_equal(fixed_effects.n_components(), 2)
+    assert_equal(fixed_effects.df_absorbed(), 6)
+    assert_equal(fixed_effects.df_absorbed(exclude=[0]), 4)
+    assert_equal(fixed_effects.is_nested(0, g1 // 2), True)
+    assert_equal(fixed_effects.is_nested(1, g1), False)
+
+
+class CheckAbsorb(object):
+
+    def test_params(self):
+        assert_almost_equal(self.res1.params, self.res2.params[:2], 10)
+        assert_almost_equal(self.res1.bse, self.res2.bse[:2], 10)
+
+    def test_df(self):
+        assert_equal(self.res1.df_resid, self.res2.df_resid)
+        assert_equal(self.res1.model.k_absorbed, 54)
+
+    def test_llf(self):
+        assert_almost_equal(self.res1.llf, self.res2.llf, 8)
+
+    def test_cov_cluster(self):
+        cov = self.res1.cov_cluster(self.group, use_correction=False)
+        assert_almost_equal(cov, self.cov_cluster[:2,:2], 10)
+        # g1 is nested in the clusters and not counted in the correction
+        n_groups = 10.
+        nobs = len(self.group)
+        correction = (n_groups / (n_groups - 1) * (nobs - 1.) /
+                      (nobs - 2 - 15))
+        assert_almost_equal(self.res1.cov_cluster(self.group),
+                            cov * correction, 13)
+
+
+class TestAbsorbOLS(CheckAbsorb):
+    @classmethod
+    def setupClass(cls):
+        g1, g2, exog, fe, exog_dummy = _make_data()
+        endog = np.dot(exog, [1., -.5]) + fe + np.random.randn(len(g1))
+        cls.group = g1 // 4
+        cls.res1 = AbsorbOLS(endog, exog, [g1, g2]).fit()
+        cls.res2 = OLS(endog, exog_dummy).fit()
+        cls.cov_cluster = sw.cov_cluster(cls.res2, cls.group,
+                                         use_correction=False)
+
+    def test_resid(self):
+        # the demeaning converges to a tolerance of 1e-8
+        assert_almost_equal(self.res1.resid, self.res2.resid, 7)
+
+    def test_map(self):
+        model = self.res1.model
+        res = AbsorbOLS(model.data.endog, model.data.exog,
+                        model.fixed_effects.group_int,
+                        demean_method='map').fit()
+        assert_almost_equal(res.params, self.res1.params, 10)
+
+
+class TestAbsorbWLS(CheckAbsorb):
+    @classmethod
+    def setupClass(cls):
+        g1, g2, exog, fe, exog_dummy = _make_data()
+        endog = np.dot(exog, [1., -.5]) + fe + np.random.randn(len(g1))
+        weights = np.random.uniform(0.5, 2, len(g1))
+        cls.group = g1 // 4
+        cls.res1 = AbsorbOLS(endog, exog, [g1, g2], weights=weights).fit()
+        cls.res2 = WLS(endog, exog_dummy, weights=weights).fit()
+        score_obs = cls.res2.model.wexog * cls.res2.wresid[:,None]
+        cls.cov_cluster = sw._HCCM2(cls.res2,
+                                    sw.S_crosssection(score_obs, cls.group))
+
+
+class TestAbsorbPoisson(CheckAbsorb):
+    @classmethod
+    def setupClass(cls):
+        g1, g2, exog, fe, exog_dummy = _make_data()
+        mu = np.exp(np.dot(exog, [0.3, -0.2]) + 0.3 * fe)
+        endog = np.random.poisson(mu)
+        cls.group = g1 // 4
+        cls.res1 = AbsorbPoisson(endog, exog, [g1, g2]).fit()
+        cls.res2 = GLM(endog, exog_dummy, family=families.Poisson()).fit()
+        score_obs = exog_dummy * cls.res2.resid_response[:,None]
+        cls.cov_cluster = sw._HCCM2(cls.res2,
+                                    sw.S_crosssection(score_obs, cls.group))
+
+    def test_mu(self):
+        assert_almost_equal(self.res1.mu, self.res2.mu, 8)
+        assert_almost_equal(self.res1.deviance, self.res2.deviance, 8)
+        assert_equal(self.res1.df_model, self.res2.df_model)
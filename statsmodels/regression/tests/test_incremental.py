@@ -0,0 +1,87 @@
+"""
+Tests for OLS from incrementally accumulated sufficient statistics
+"""
+import numpy as np
+from numpy.testing import (assert_almost_equal, assert_equal, assert_raises)
+from statsmodels.tools.tools import add_constant
+from statsmodels.regression.linear_model import OLS
+from statsmodels.regression.incremental import IncrementalOLS
+
+
+class TestIncrementalOLS(object):
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(97531)
+        nobs = 200
+        exog = add_constant(np.random.randn(nobs, 3), prepend=True)
+        endog = np.dot(exog, [1., .5, -.5, 0.1]) + np.random.randn(nobs)
+        cls.res2 = OLS(endog, exog).fit()
+
+        chunks = [(endog[i:i+30], exog[i:i+30]) for i in range(0, nobs, 30)]
+        cls.res1 = IncrementalOLS.from_chunks(chunks).fit()
+
+        # map-reduce: accumulate shards separately and merge
+        shards = [IncrementalOLS.from_chunks(chunks[:3]),
+                  IncrementalOLS.from_chunks(chunks[3:])]
+        mod = IncrementalOLS()
+        for shard in shards:
+            mod.merge(shard)
+        cls.res_merged = mod.fit()
+
+    def test_params(self):
+        assert_almost_equal(self.res1.params, self.res2.params, 10)
+        assert_almost_equal(self.res_merged.params, self.res2.params, 10)
+
+    def test_cov(self):
+        assert_almost_equal(self.res1.cov_params(),
+                            self.res2.cov_params(), 10)
+        assert_almost_equal(self.res1.bse, self.res2.bse, 10)
+        assert_almost_equal(self.res1.pvalues, self.res2.pvalues, 10)
+        assert_almost_equal(self.res1.conf_int(), self.res2.conf_int(), 10)
+
+    def test_stats(self):
+        res1, res2 = self.res1, self.res2
+        assert_equal(res1.nobs, res2.nobs)
+        assert_equal(res1.df_resid, res2.df_resid)
+        assert_equal(res1.df_model, res2.df_model)
+        assert_equal(res1.k_constant, 1)
+        assert_almost_equal(res1.ssr, res2.ssr, 8)
+        assert_almost_equal(res1.rsquared, res2.rsquared, 10)
+        assert_almost_equal(res1.rsquared_adj, res2.rsquared_adj, 10)
+        assert_almost_equal(res1.fvalue, res2.fvalue, 8)
+        assert_almost_equal(res1.llf, res2.llf, 8)
+        assert_almost_equal(res1.aic, res2.aic, 8)
+        assert_almost_equal(res1.bic, res2.bic, 8)
+
+    def test_tests(self):
+        r_matrix = np.eye(4)[1:]
+        t1 = self.res1.t_test(r_matrix)
+        t2 = self.res2.t_test(r_matrix)
+        assert_almost_equal(t1.tvalue, t2.tvalue, 8)
+        assert_almost_equal(t1.pvalue, t2.pvalue, 8)
+        f1 = self.res1.f_test("x1 = x2 = 0")
+        f2 = self.res2.f_test("x1 = x2 = 0")
+        assert_almost_equal(f1.fvalue, f2.fvalue, 8)
+        assert_almost_equal(f1.pvalue, f2.pvalue, 8)
+
+
+def test_incremental_errors():
+    mod = IncrementalOLS()
+    assert_raises(ValueError, mod.fit)
+    mod.partial_fit(np.ones(5), np.ones((5, 2)))
+    assert_raises(ValueError, mod.partial_fit, np.ones(5), np.ones((5, 3)))
+    assert_raises(ValueError, mod.partial_fit, np.ones(5), np.ones((4, 2)))
+
+
+def test_incremental_zero_column():
+    # an all zero column is neither counted nor named as constant
+    np.random.seed(98765)
+    exog = np.column_stack((np.random.randn(20), np.zeros(20), np.ones(20)))
+    mod = IncrementalOLS()
+    mod.partial_fit(np.random.randn(20), exog)
+    assert_equal(mod.k_constant, 1)
+    assert_equal(mod.exog_names, ['x1', 'x2', 'const'])
+    mod = IncrementalOLS()
+    mod.partial_fit(np.random.randn(20), exog[:, :2])
+    assert_equal(mod.k_constant, 0)
+    assert_equal(mod.exog_names, ['x1', 'x2'])
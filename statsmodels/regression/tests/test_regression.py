@@ -6,7 +6,9 @@ import numpy as np
 from numpy.testing import (assert_almost_equal, assert_, assert_approx_equal,
                             assert_raises, assert_equal)
 from scipy.linalg import toeplitz
+from scipy import sparse
 from statsmodels.tools.tools import add_constant, categorical
+from statsmodels.tools.grouputils import dummy_sparse
 from statsmodels.regression.linear_model import (OLS, GLSAR, WLS, GLS,
         yule_walker)
 from statsmodels.datasets import longley
@@ -697,6 +699,201 @@ def test_summary():
     assert_equal(table, expected)
 
 
+class TestFitMany(object):
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(987125)
+        nobs, n_series = 50, 4
+        exog = add_constant(np.random.randn(nobs, 2), prepend=True)
+        endog = (np.dot(exog, np.random.randn(3, n_series)) +
+                 np.random.randn(nobs, n_series))
+        cls.weights = np.random.uniform(1, 3, size=nobs)
+        cls.exog, cls.endog = exog, endog
+
+    def _check(self, model_class, kwds, method):
+        mod = model_class(self.endog, self.exog, **kwds)
+        res = mod.fit_many(method=method)
+        assert_equal(len(res), self.endog.shape[1])
+        for i in range(self.endog.shape[1]):
+            res_i = model_class(self.endog[:,i], self.exog, **kwds).fit()
+            assert_almost_equal(res.params[:,i], res_i.params, 10)
+            assert_almost_equal(res.bse[:,i], res_i.bse, 10)
+            assert_almost_equal(res.tvalues[:,i], res_i.tvalues, 10)
+            assert_almost_equal(res.pvalues[:,i], res_i.pvalues, 10)
+            assert_almost_equal(res.ssr[i], res_i.ssr, 10)
+            assert_almost_equal(res.rsquared[i], res_i.rsquared, 10)
+            assert_almost_equal(res.rsquared_adj[i], res_i.rsquared_adj, 10)
+            assert_almost_equal(res.llf[i], res_i.llf, 10)
+            assert_almost_equal(res.aic[i], res_i.aic, 10)
+            # results built on demand
+            res_full = res[i]
+            assert_almost_equal(res_full.params, res_i.params, 10)
+            assert_almost_equal(res_full.bse, res_i.bse, 10)
+            assert_almost_equal(res_full.resid, res_i.resid, 10)
+            assert_almost_equal(res_full.fvalue, res_i.fvalue, 10)
+            assert_(res_full.model is not mod)
+
+    def test_ols(self):
+        self._check(OLS, {}, "qr")
+        self._check(OLS, {}, "pinv")
+        self._check(OLS, {}, "cholesky")
+
+    def test_wls(self):
+        self._check(WLS, {'weights' : self.weights}, "qr")
+
+    def test_gls(self):
+        sigma = 1. / self.weights
+        self._check(GLS, {'sigma' : sigma}, "pinv")
+
+    def test_pandas(self):
+        endog = pandas.DataFrame(self.endog, columns=list('abcd'))
+        res = OLS(endog, self.exog).fit_many()
+        res_full = res[2]
+        assert_equal(res_full.model.endog_names, 'c')
+        assert_(isinstance(res_full.resid, pandas.Series))
+
+    def test_rank_deficient(self):
+        exog = np.column_stack((self.exog, self.exog[:,1]))
+        res2 = OLS(self.endog, exog).fit_many(method="pinv")
+        for method in ["qr", "cholesky"]:
+            res = OLS(self.endog, exog).fit_many(method=method)
+            assert_almost_equal(res.params, res2.params, 10)
+            assert_almost_equal(res.bse, res2.bse, 10)
+        res_0 = OLS(self.endog[:,0], exog).fit()
+        assert_almost_equal(res.params[:,0], res_0.params, 10)
+
+    def test_1d_raises(self):
+        mod = OLS(self.endog[:,0], self.exog)
+        assert_raises(ValueError, mod.fit_many)
+
+class TestFitMethods(object):
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(12398)
+        nobs = 40
+        cls.exog = add_constant(np.random.randn(nobs, 4), prepend=False)
+        cls.endog = (np.dot(cls.exog, [1., -1., .5, 0, 2.]) +
+                     np.random.randn(nobs) * (1 + cls.exog[:,0]**2))
+        cls.res_pinv = OLS(cls.endog, cls.exog).fit()
+
+    def _check(self, res):
+        res2 = self.res_pinv
+        assert_almost_equal(res.params, res2.params, 10)
+        assert_almost_equal(res.bse, res2.bse, 10)
+        assert_almost_equal(res.normalized_cov_params,
+                            res2.normalized_cov_params, 10)
+        assert_almost_equal(res.HC0_se, res2.HC0_se, 10)
+        assert_almost_equal(res.HC3_se, res2.HC3_se, 10)
+
+    def test_qr(self):
+        mod = OLS(self.endog, self.exog)
+        self._check(mod.fit(method="qr"))
+        assert_(hasattr(mod, 'exog_Q'))
+        assert_(not hasattr(mod, 'pinv_wexog'))
+
+    def test_cholesky(self):
+        mod = OLS(self.endog, self.exog)
+        self._check(mod.fit(method="cholesky"))
+        assert_(not hasattr(mod, 'pinv_wexog'))
+        assert_(not hasattr(mod, 'exog_Q'))
+
+    def test_drop_factors(self):
+        for method in ["pinv", "qr"]:
+            mod = OLS(self.endog, self.exog)
+            self._check(mod.fit(method=method, keep_factors=False))
+            assert_(not hasattr(mod, 'pinv_wexog'))
+            assert_(not hasattr(mod, 'exog_Q'))
+            # refit recomputes the factors
+            self._check(mod.fit(method=method))
+
+    def test_rank_deficient(self):
+        exog = np.column_stack((self.exog, self.exog[:,0]))
+        res_pinv = OLS(self.endog, exog).fit()
+        for method in ["qr", "cholesky"]:
+            res = OLS(self.endog, exog).fit(method=method)
+            assert_almost_equal(res.params, res_pinv.params, 10)
+            assert_almost_equal(res.bse, res_pinv.bse, 10)
+
+    def test_wls(self):
+        weights = np.arange(1, len(self.endog) + 1)
+        res2 = WLS(self.endog, self.exog, weights=weights).fit()
+        for method in ["qr", "cholesky"]:
+            res = WLS(self.endog, self.exog, weights=weights).fit(
+                                                method=method)
+            assert_almost_equal(res.params, res2.params, 10)
+            assert_almost_equal(res.bse, res2.bse, 10)
+            assert_almost_equal(res.HC1_se, res2.HC1_se, 10)
+
+    def test_bad_method(self):
+        mod = OLS(self.endog, self.exog)
+        assert_raises(ValueError, mod.fit, method="lu")
+
+
+class TestSparse(object):
+    @classmethod
+    def setupClass(cls):
+        np.random.seed(98734)
+        nobs = 500
+        groups = np.random.randint(0, 20, size=nobs)
+        cls.exog = sparse.hstack((dummy_sparse(groups),
+                                  np.random.randn(nobs, 2))).tocsr()
+        cls.exog_dense = cls.exog.toarray()
+        cls.endog = (np.dot(cls.exog_dense, np.random.randn(22)) +
+                     np.random.randn(nobs))
+        cls.weights = np.random.uniform(0.5, 2, size=nobs)
+
+    def _check(self, res, res2):
+        assert_(sparse.issparse(res.model.exog))
+        assert_almost_equal(res.params, res2.params, 10)
+        assert_almost_equal(res.bse, res2.bse, 10)
+        assert_almost_equal(res.resid, res2.resid, 10)
+        assert_almost_equal(res.llf, res2.llf, 8)
+        assert_almost_equal(res.rsquared, res2.rsquared, 10)
+        assert_almost_equal(res.HC0_se, res2.HC0_se, 10)
+        assert_almost_equal(res.HC3_se, res2.HC3_se, 10)
+        assert_equal(res.df_model, res2.df_model)
+
+    def test_ols(self):
+        res2 = OLS(self.endog, self.exog_dense).fit()
+        for method in ["pinv", "cholesky"]:
+            res = OLS(self.endog, self.exog).fit(method=method)
+            self._check(res, res2)
+        assert_almost_equal(res.predict(self.exog[:10]),
+                            res2.fittedvalues[:10], 10)
+        res.summary()
+        assert_raises(ValueError, OLS(self.endog, self.exog).fit,
+                      method="qr")
+
+    def test_wls(self):
+        res2 = WLS(self.endog, self.exog_dense, weights=self.weights).fit()
+        res = WLS(self.endog, self.exog, weights=self.weights).fit()
+        self._check(res, res2)
+
+    def test_rank_deficient(self):
+        exog = sparse.hstack((self.exog, self.exog[:, :1])).tocsr()
+        exog_dense = exog.toarray()
+        res2 = OLS(self.endog, exog_dense).fit()
+        res = OLS(self.endog, exog).fit()
+        self._check(res, res2)
+
+    def test_constant(self):
+        # with 300 rows the moments of a column of ones are not exact
+        endog = self.endog[:300]
+        exog_dense = add_constant(self.exog_dense[:300, -2:], prepend=True)
+        exog = sparse.csr_matrix(exog_dense)
+        res2 = OLS(endog, exog_dense).fit()
+        res = OLS(endog, exog).fit()
+        self._check(res, res2)
+        assert_equal(res.model.k_constant, 1)
+        assert_equal(res.model.exog_names, ['const', 'x1', 'x2'])
+        assert_almost_equal(res.fvalue, res2.fvalue, 8)
+
+    def test_missing(self):
+        exog = self.exog_dense.copy()
+        exog[[3, 10], -1] = np.nan
+        res2 = OLS(self.endog, exog, missing='drop').fit()
+        res = OLS(self.endog, sparse.csc_matrix(exog), missing='drop').fit()
+        self._check(res, res2)
 
 
 if __name__=="__main__":
@@ -707,7 +904,3 @@ if __name__=="__main__":
                    exit=False)
 
     # nose.runmodule(argv=[__file__,'-vvs','-x'], exit=False) #, '--pdb'
-
-
-
-
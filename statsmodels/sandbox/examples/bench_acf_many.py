@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the batched autocorrelation functions
+
+compares acf with FFT, Ljung-Box statistics and confidence intervals, and
+pacf, called for each series, with acf_many and pacf_many for all series at
+once. Use command line arguments nobs k_series to change the problem size,
+e.g.
+
+    python bench_acf_many.py 1000 20000
+
+"""
+import sys
+import time
+import numpy as np
+from statsmodels.tsa.stattools import acf, pacf, acf_many, pacf_many
+
+
+def bench(nobs, k_series, nlags=40, n_loop=200, seed=12345):
+    np.random.seed(seed)
+    x = np.random.randn(nobs, k_series)
+    n_loop = min(n_loop, k_series)
+
+    t0 = time.time()
+    res1 = [acf(x[:,i], nlags=nlags, qstat=True, alpha=0.05, fft=True)
+            for i in range(n_loop)]
+    t_acf = (time.time() - t0) / n_loop * k_series
+    t0 = time.time()
+    res = acf_many(x, nlags=nlags, qstat=True, alpha=0.05)
+    t_acf_many = time.time() - t0
+    diff_acf = np.abs(res[2][:,:n_loop].T - [r[2] for r in res1]).max()
+
+    t0 = time.time()
+    pres1 = [pacf(x[:,i], nlags=nlags) for i in range(n_loop)]
+    t_pacf = (time.time() - t0) / n_loop * k_series
+    t0 = time.time()
+    pres = pacf_many(x, nlags=nlags)
+    t_pacf_many = time.time() - t0
+    diff_pacf = np.abs(pres[:,:n_loop].T - pres1).max()
+    return ((t_acf, t_acf_many, diff_acf), (t_pacf, t_pacf_many, diff_pacf))
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1000
+    k_series = int(float(sys.argv[2])) if len(sys.argv) > 2 else 20000
+    results = bench(nobs, k_series)
+    print("nobs=%d, k_series=%d, nlags=40" % (nobs, k_series))
+    print("%-6s %14s %10s %8s %12s" % ("", "loop (s)", "many (s)",
+                                        "speedup", "max diff"))
+    for name, (t_loop, t_many, diff) in zip(["acf", "pacf"], results):
+        print("%-6s %14.2f %10.2f %8.1f %12.3g" % (name, t_loop, t_many,
+                                                   t_loop / t_many, diff))
+    print("the loop times are extrapolated from 200 series")
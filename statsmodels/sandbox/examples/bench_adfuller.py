@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the lag length search in adfuller and of adfuller_many
+
+compares adfuller with autolag, which selects the lag length from one QR
+decomposition of the regressors, the same lag search with an OLS fit for
+each lag through _autolag with regresults, and adfuller_many for all series
+at once. Use command line arguments nobs k_series to change the problem
+size, e.g.
+
+    python bench_adfuller.py 1000 5000
+
+"""
+import sys
+import time
+import numpy as np
+from statsmodels.tsa.stattools import adfuller, adfuller_many
+
+
+def bench(nobs, k_series, n_loop=50, seed=12345):
+    np.random.seed(seed)
+    x = np.random.randn(nobs, k_series).cumsum(0)
+    n_loop = min(n_loop, k_series)
+
+    t0 = time.time()
+    for i in range(n_loop):
+        adfuller(x[:,i], regresults=True)
+    t_ols = (time.time() - t0) / n_loop * k_series
+    t0 = time.time()
+    res1 = [adfuller(x[:,i]) for i in range(n_loop)]
+    t_qr = (time.time() - t0) / n_loop * k_series
+    t0 = time.time()
+    res = adfuller_many(x)
+    t_many = time.time() - t0
+    diff = np.abs(res[0][:n_loop] - [r[0] for r in res1]).max()
+    return t_ols, t_qr, t_many, diff
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1000
+    k_series = int(float(sys.argv[2])) if len(sys.argv) > 2 else 2000
+    t_ols, t_qr, t_many, diff = bench(nobs, k_series)
+    print("nobs=%d, k_series=%d, autolag='AIC'" % (nobs, k_series))
+    print("%-30s %10s %8s" % ("method", "time (s)", "speedup"))
+    print("%-30s %10.2f %8.1f" % ("OLS fit per lag (extrapolated)", t_ols, 1))
+    print("%-30s %10.2f %8.1f" % ("adfuller (extrapolated)", t_qr,
+                                  t_ols / t_qr))
+    print("%-30s %10.2f %8.1f" % ("adfuller_many", t_many, t_ols / t_many))
+    print("max abs diff of adf statistic: %g" % diff)
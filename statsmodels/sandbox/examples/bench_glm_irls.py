@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the weighted least squares solvers in the IRLS loop of GLM.fit
+
+compares wls_method="qr" (default), "cholesky" and "pinv" for a Poisson
+model in run time and the largest absolute difference of params and bse to
+the pinv solution. Use command line arguments nobs k to change the problem
+size, e.g.
+
+    python bench_glm_irls.py 1000000 100
+
+"""
+import sys
+import time
+import numpy as np
+import statsmodels.api as sm
+
+
+def bench(nobs, k_vars, methods=("pinv", "qr", "cholesky"), seed=12345):
+    np.random.seed(seed)
+    exog = np.random.randn(nobs, k_vars) / np.sqrt(k_vars)
+    exog[:,0] = 1
+    endog = np.random.poisson(np.exp(exog.sum(1) * 0.5))
+
+    results = {}
+    for method in methods:
+        mod = sm.GLM(endog, exog, family=sm.families.Poisson())
+        t0 = time.time()
+        res = mod.fit(wls_method=method, full_history=False)
+        bse = res.bse
+        results[method] = (time.time() - t0, res.params, bse,
+                           res.fit_history['iteration'])
+        del mod, res
+    return results
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 200000
+    k_vars = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    results = bench(nobs, k_vars)
+    t_pinv, params_pinv, bse_pinv, _ = results["pinv"]
+    print("nobs=%d, k=%d" % (nobs, k_vars))
+    print("%-10s %10s %8s %6s %12s %12s" % ("method", "time (s)", "speedup",
+                                "iter", "max dparams", "max dbse"))
+    for method in ["pinv", "qr", "cholesky"]:
+        t, params, bse, iteration = results[method]
+        print("%-10s %10.3f %8.2f %6d %12.3g %12.3g" % (method, t, t_pinv / t,
+                iteration, np.max(np.abs(params - params_pinv)),
+                np.max(np.abs(bse - bse_pinv))))
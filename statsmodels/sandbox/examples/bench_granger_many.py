@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the Granger causality tests for all pairs of series
+
+compares grangercausalitytests called for each pair with
+grangercausalitytests_many, which shares the lag matrices and the
+factorization of the restricted model. Use command line arguments nobs
+k_vars maxlag to change the problem size, e.g.
+
+    python bench_granger_many.py 200 300 4
+
+"""
+import sys
+import time
+import numpy as np
+from statsmodels.tsa.stattools import (grangercausalitytests,
+                                       grangercausalitytests_many)
+
+
+def bench(nobs, k_vars, maxlag, n_loop=30, seed=12345):
+    np.random.seed(seed)
+    x = np.random.randn(nobs, k_vars)
+    n_loop = min(n_loop, k_vars - 1)
+
+    t0 = time.time()
+    res1 = [grangercausalitytests(x[:,[0, j]], maxlag, verbose=False)
+            for j in range(1, n_loop + 1)]
+    t_loop = (time.time() - t0) / n_loop * k_vars * (k_vars - 1)
+    t0 = time.time()
+    res = grangercausalitytests_many(x, maxlag)
+    t_many = time.time() - t0
+    diff = max(abs(res['ssr_ftest'][0, j + 1, lag - 1] -
+                   res1[j][lag][0]['ssr_ftest'][0])
+               for j in range(n_loop) for lag in range(1, maxlag + 1))
+    return t_loop, t_many, diff
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 200
+    k_vars = int(float(sys.argv[2])) if len(sys.argv) > 2 else 300
+    maxlag = int(float(sys.argv[3])) if len(sys.argv) > 3 else 4
+    t_loop, t_many, diff = bench(nobs, k_vars, maxlag)
+    print("nobs=%d, k_vars=%d, maxlag=%d" % (nobs, k_vars, maxlag))
+    print("pairwise grangercausalitytests (extrapolated): %10.2f s" % t_loop)
+    print("grangercausalitytests_many:                    %10.2f s" % t_many)
+    print("speedup %.1f, max abs diff of F statistic %g" % (t_loop / t_many,
+                                                          diff))
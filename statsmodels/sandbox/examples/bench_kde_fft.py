@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the binned FFT density in KDEUnivariate
+
+compares the direct kernel sums of ``fit(fft=False)`` with the linear binned
+FFT estimate for each kernel, and the evaluation of several bandwidths with
+one call to kdensityfft with separate calls. Use command line arguments
+nobs gridsize to change the problem size, e.g.
+
+    python bench_kde_fft.py 20000 2048
+
+"""
+import sys
+import time
+import numpy as np
+from statsmodels.nonparametric.kde import (KDEUnivariate, kdensityfft,
+                                           kernel_switch)
+
+
+def bench(nobs, gridsize, seed=12345):
+    np.random.seed(seed)
+    x = np.r_[np.random.randn(nobs // 2), 2 + 0.5 * np.random.randn(nobs // 2)]
+    weights = np.random.uniform(0.5, 2, len(x))
+
+    results = {}
+    for kernel in sorted(kernel_switch):
+        if kernel == 'uni':
+            # the direct estimate does not support the uniform kernel
+            continue
+        t0 = time.time()
+        kde = KDEUnivariate(x)
+        kde.fit(kernel=kernel, fft=False, weights=weights, gridsize=gridsize)
+        t_direct = time.time() - t0
+        t0 = time.time()
+        kde_fft = KDEUnivariate(x)
+        kde_fft.fit(kernel=kernel, fft=True, weights=weights,
+                    gridsize=gridsize)
+        t_fft = time.time() - t0
+        diff = np.abs(kde.density - kde_fft.density).max()
+        results[kernel] = (t_direct, t_fft, diff)
+    return results
+
+
+def bench_bandwidths(nobs, gridsize, n_bw=50, seed=12345):
+    np.random.seed(seed)
+    x = np.random.randn(nobs)
+    bws = np.linspace(0.05, 0.5, n_bw)
+    t0 = time.time()
+    dens = kdensityfft(x, kernel='epa', bw=bws, gridsize=gridsize)[0]
+    t_vec = time.time() - t0
+    t0 = time.time()
+    for bw in bws:
+        kdensityfft(x, kernel='epa', bw=bw, gridsize=gridsize,
+                    cut=3 * bws.max() / bw)
+    t_loop = time.time() - t0
+    return t_loop, t_vec
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 20000
+    gridsize = int(float(sys.argv[2])) if len(sys.argv) > 2 else 2048
+    results = bench(nobs, gridsize)
+    print("nobs=%d, gridsize=%d" % (nobs, gridsize))
+    print("%-8s %12s %10s %8s %12s" % ("kernel", "direct (s)", "fft (s)",
+                                       "speedup", "max diff"))
+    for kernel in sorted(results):
+        t_direct, t_fft, diff = results[kernel]
+        print("%-8s %12.3f %10.4f %8.1f %12.3g" % (kernel, t_direct, t_fft,
+                                                    t_direct / t_fft, diff))
+    t_loop, t_vec = bench_bandwidths(nobs, gridsize)
+    print("\n50 bandwidths: loop %.4f s, one pass %.4f s, speedup %.1f" %
+          (t_loop, t_vec, t_loop / t_vec))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the KD-tree kernel sums in KDEMultivariate and KernelReg
+
+compares the exact kernel sums with the truncated sums of gpke_tree for
+several values of ``EstimatorSettings(tree_tol=...)`` in run time and the
+largest absolute difference of the pdf, and of the mean and marginal
+effects of a local linear regression. Use command line arguments nobs
+n_predict to change the problem size, e.g.
+
+    python bench_kernel_tree.py 100000 2000
+
+"""
+import sys
+import time
+import numpy as np
+import statsmodels.api as sm
+
+nparam = sm.nonparametric
+
+
+def bench(nobs, n_predict, tols=(None, 1e-12, 1e-8, 1e-4), seed=12345):
+    np.random.seed(seed)
+    c1 = np.random.randn(nobs)
+    c2 = np.random.randn(nobs)
+    o = np.random.binomial(3, 0.5, size=nobs)
+    endog = np.sin(2 * c1) + 0.5 * c2 + o + np.random.randn(nobs)
+    exog = np.column_stack((c1, c2, o))
+    bw = np.array([1.06, 1.06, 1.]) * nobs ** (-1. / 7) * [1, 1, 0.5]
+    predict = exog[:n_predict]
+
+    results = {}
+    for tol in tols:
+        settings = nparam.EstimatorSettings(tree_tol=tol)
+        t0 = time.time()
+        dens = nparam.KDEMultivariate(exog, 'cco', bw=bw, defaults=settings)
+        pdf = dens.pdf(predict)
+        t_pdf = time.time() - t0
+        t0 = time.time()
+        reg = nparam.KernelReg(endog, exog, 'cco', reg_type='ll', bw=bw,
+                               defaults=settings)
+        mean, mfx = reg.fit(predict)
+        t_fit = time.time() - t0
+        results[tol] = (t_pdf, pdf, t_fit, mean, mfx)
+    return results
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 20000
+    n_predict = int(float(sys.argv[2])) if len(sys.argv) > 2 else 1000
+    tols = (None, 1e-12, 1e-8, 1e-4)
+    results = bench(nobs, n_predict, tols=tols)
+    t_pdf0, pdf0, t_fit0, mean0, mfx0 = results[None]
+    print("nobs=%d, n_predict=%d" % (nobs, n_predict))
+    print("%-10s %10s %8s %12s %10s %8s %12s %12s" % ("tree_tol",
+          "pdf (s)", "speedup", "max dpdf", "fit (s)", "speedup",
+          "max dmean", "max dmfx"))
+    for tol in tols:
+        t_pdf, pdf, t_fit, mean, mfx = results[tol]
+        print("%-10s %10.3f %8.2f %12.3g %10.3f %8.2f %12.3g %12.3g" % (
+              tol, t_pdf, t_pdf0 / t_pdf, np.max(np.abs(pdf - pdf0)),
+              t_fit, t_fit0 / t_fit, np.max(np.abs(mean - mean0)),
+              np.max(np.abs(mfx - mfx0))))
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the MNLogit Hessian and the Newton solvers
+
+compares the Hessian with all J**2 blocks, as computed before the blocks of
+the upper triangle were used, to MNLogit.hessian, and the time to fit the
+model with method="newton" and method="trust-newton".
+
+The default problem size J=10, k=300, nobs=1e6 needs about 2.4GB for exog
+and takes several minutes. Use command line arguments J k nobs to change
+it, e.g.
+
+    python bench_mnlogit_hessian.py 10 100 100000
+
+"""
+import sys
+import time
+import numpy as np
+from statsmodels.discrete.discrete_model import MNLogit
+from statsmodels.discrete.tests.test_discrete import mnlogit_hessian_loop
+
+
+def simulate(n_choices, k_vars, nobs, seed=12345):
+    np.random.seed(seed)
+    exog = np.random.randn(nobs, k_vars)
+    exog[:,0] = 1
+    params = 0.5 * np.random.randn(k_vars, n_choices) / np.sqrt(k_vars)
+    util = np.dot(exog, params) + np.random.gumbel(size=(nobs, n_choices))
+    endog = util.argmax(1)
+    return endog, exog
+
+
+if __name__ == "__main__":
+    n_choices = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    k_vars = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    nobs = int(float(sys.argv[3])) if len(sys.argv) > 3 else 1000000
+
+    endog, exog = simulate(n_choices, k_vars, nobs)
+    mod = MNLogit(endog, exog)
+    params = np.zeros(k_vars * (n_choices - 1))
+    print("J=%d, k=%d, nobs=%d" % (n_choices, k_vars, nobs))
+
+    t0 = time.time()
+    hess_loop = mnlogit_hessian_loop(mod, params)
+    t_loop = time.time() - t0
+    t0 = time.time()
+    hess = mod.hessian(params)
+    t_hess = time.time() - t0
+    print("hessian, all blocks     %10.3f s" % t_loop)
+    print("hessian, upper blocks   %10.3f s  speedup %.2f  max diff %.3g" %
+          (t_hess, t_loop / t_hess, np.max(np.abs(hess - hess_loop))))
+    del hess_loop
+
+    for method in ["newton", "trust-newton"]:
+        t0 = time.time()
+        res = mod.fit(method=method, disp=0)
+        t_fit = time.time() - t0
+        print("fit %-12s %10.3f s  iterations %d  llf %.6f" % (method,
+              t_fit, res.mle_retvals['iterations'], res.llf))
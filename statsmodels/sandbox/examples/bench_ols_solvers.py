@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark of the least squares solvers in RegressionModel.fit
+
+compares method="pinv" (default), "qr" and "cholesky" in run time and the
+largest absolute difference of params and bse to the pinv solution.
+
+The default problem size nobs=1e6, k=200 needs about 1.6GB for exog and
+the same again for the pinv or Q factors. Use command line arguments
+nobs k to change it, e.g.
+
+    python bench_ols_solvers.py 100000 50
+
+"""
+import sys
+import time
+import numpy as np
+from statsmodels.regression.linear_model import OLS
+
+
+def bench(nobs, k_vars, methods=("pinv", "qr", "cholesky"), seed=12345):
+    np.random.seed(seed)
+    exog = np.random.randn(nobs, k_vars)
+    exog[:,0] = 1
+    endog = exog.sum(1) + np.random.randn(nobs)
+
+    results = {}
+    for method in methods:
+        mod = OLS(endog, exog)
+        t0 = time.time()
+        res = mod.fit(method=method, keep_factors=False)
+        bse = res.bse
+        results[method] = (time.time() - t0, res.params, bse)
+        del mod, res
+    return results
+
+
+if __name__ == "__main__":
+    nobs = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1000000
+    k_vars = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    results = bench(nobs, k_vars)
+    t_pinv, params_pinv, bse_pinv = results["pinv"]
+    print("nobs=%d, k=%d" % (nobs, k_vars))
+    print("%-10s %10s %8s %12s %12s" % ("method", "time (s)", "speedup",
+                                         "max dparams", "max dbse"))
+    for method in ["pinv", "qr", "cholesky"]:
+        t, params, bse = results[method]
+        print("%-10s %10.3f %8.2f %12.3g %12.3g" % (method, t, t_pinv / t,
+                np.max(np.abs(params - params_pinv)),
+                np.max(np.abs(bse - bse_pinv))))
@@ -9,6 +9,7 @@ License: BSD-3
 
 from collections import defaultdict
 import numpy as np
+from scipy import linalg
 
 from statsmodels.regression.linear_model import OLS
 from statsmodels.tools.decorators import cache_readonly
@@ -175,20 +176,27 @@ class OLSInfluence(object):
     ----------
     results : Regression Results instance
         currently assumes the results are from an OLS regression
+    chunk_size : int
+        number of observations that are processed at the same time
 
     Notes
     -----
-    One part of the results can be calculated without any auxiliary regression
-    (some of which have the `_internal` postfix in the name. Other statistics
-    require leave-one-observation-out (LOOO) auxiliary regression, and will be
-    slower (mainly results with `_external` postfix in the name).
-    The auxiliary LOOO regression only the required results are stored.
-
-    Using the LOO measures is currently only recommended if the data set
-    is not too large. One possible approach for LOOO measures would be to
-    identify possible problem observations with the _internal measures, and
-    then run the leave-one-observation-out only with observations that are
-    possible outliers. (However, this is not yet available in an automized way.)
+    Some of the results are based on the original regression (some of which
+    have the `_internal` postfix in the name). Other statistics are based on
+    the leave-one-observation-out (LOOO) regressions (mainly results with
+    `_external` postfix in the name).
+
+    The LOOO regressions are not estimated. Their params, error variance
+    and determinant of cov_params follow in closed form from the rank-one
+    downdate of X'X by each observation (Sherman-Morrison), for example ::
+
+       params_not_obsi = params - (X'X)^(-1) x_i resid_i / (1 - h_i)
+
+    where h_i is the diagonal of the hat matrix. All measures are computed
+    from the triangular factor R of a single QR decomposition of exog, in
+    chunks of observations, so that apart from the returned arrays the
+    memory requirement is O(k_vars^2 + chunk_size k_vars). If exog is not of
+    full rank, normalized_cov_params is used instead of R.
 
     This should be extended to general least squares.
 
@@ -197,28 +205,74 @@ class OLSInfluence(object):
 
     '''
 
-    def __init__(self, results):
+    def __init__(self, results, chunk_size=10000):
         #check which model is allowed
         self.results = maybe_unwrap_results(results)
         self.nobs, self.k_vars = results.model.exog.shape
         self.endog = results.model.endog
         self.exog = results.model.exog
         self.model_class = results.model.__class__
+        self.chunk_size = chunk_size
 
         self.sigma_est = np.sqrt(results.mse_resid)
 
         self.aux_regression_exog = {}
         self.aux_regression_endog = {}
 
+    @cache_readonly
+    def _exog_R(self):
+        '''R of the QR decomposition of exog, None if exog has not full rank
+
+        The QR decomposition of the fit is used if available, otherwise R is
+        updated with each chunk of exog.
+        '''
+        model = self.results.model
+        R = getattr(model, 'exog_R', None)
+        if R is None:
+            exog = self.exog
+            step = max(self.chunk_size, self.k_vars)
+            R = np.zeros((0, self.k_vars))
+            for start in range(0, self.nobs, step):
+                R = np.linalg.qr(np.vstack((R, exog[start:start + step])),
+                                 mode='r')
+        diag = np.abs(np.diag(R))
+        if len(diag) < self.k_vars or diag.min() <= 1e-12 * diag.max():
+            return None
+        return R
+
+    def _iter_chunks(self):
+        '''
+        yields the slice, x_i (X'X)^(-1) and h_i for chunks of observations
+        '''
+        R = self._exog_R
+        if R is None:
+            normalized_cov_params = self.results.normalized_cov_params
+        exog = self.exog
+        for start in range(0, self.nobs, self.chunk_size):
+            sl = slice(start, start + self.chunk_size)
+            x = exog[sl]
+            if R is not None:
+                # rows of Q = X R^(-1) and of X (X'X)^(-1) = Q R^(-T)
+                q = linalg.solve_triangular(R, x.T, trans='T')
+                hii = (q * q).sum(0)
+                xtxi_x = linalg.solve_triangular(R, q).T
+            else:
+                xtxi_x = np.dot(x, normalized_cov_params)
+                hii = (x * xtxi_x).sum(1)
+            yield sl, xtxi_x, hii
+
     @cache_readonly
     def hat_matrix_diag(self):
         '''(cached attribute) diagonal of the hat_matrix for OLS
 
         Notes
         -----
-        temporarily calculated here, this should go to model class
+        computed in chunks from the R factor of the QR decomposition of exog
         '''
-        return (self.exog * self.results.model.pinv_wexog.T).sum(1)
+        hii = np.empty(self.nobs)
+        for sl, xtxi_x, hii_chunk in self._iter_chunks():
+            hii[sl] = hii_chunk
+        return hii
 
     @cache_readonly
     def resid_press(self):
@@ -353,14 +407,25 @@ class OLSInfluence(object):
         dffits_threshold = 2 * np.sqrt(self.k_vars * 1. / self.nobs)
         return dffits_, dffits_threshold
 
+    def _params_change(self, scale=None):
+        '''
+        params - params_not_obsi, divided by scale, computed in chunks
+        '''
+        resid_factor = self.results.resid / (1 - self.hat_matrix_diag)
+        if scale is not None:
+            resid_factor = resid_factor / scale
+        change = np.empty((self.nobs, self.k_vars))
+        for sl, xtxi_x, hii in self._iter_chunks():
+            change[sl] = xtxi_x * resid_factor[sl, None]
+        return change
+
     @cache_readonly
     def dfbetas(self):
         '''(cached attribute) dfbetas
 
-        uses results from leave-one-observation-out loop
+        based on the leave-one-observation-out regressions
         '''
-        dfbetas = self.results.params - self.params_not_obsi#[None,:]
-        dfbetas /= np.sqrt(self.sigma2_not_obsi[:,None])
+        dfbetas = self._params_change(np.sqrt(self.sigma2_not_obsi))
         dfbetas /=  np.sqrt(np.diag(self.results.normalized_cov_params))
         return dfbetas
 
@@ -368,27 +433,31 @@ class OLSInfluence(object):
     def sigma2_not_obsi(self):
         '''(cached attribute) error variance for all LOOO regressions
 
-        This is 'mse_resid' from each auxiliary regression.
+        This is 'mse_resid' from each auxiliary regression ::
 
-        uses results from leave-one-observation-out loop
+           (ssr - resid_i**2 / (1 - h_i)) / (df_resid - 1)
         '''
-        return np.asarray(self._res_looo['mse_resid'])
+        results = self.results
+        resid = results.resid
+        return ((results.ssr - resid**2 / (1 - self.hat_matrix_diag)) /
+                (results.df_resid - 1))
 
     @cache_readonly
     def params_not_obsi(self):
         '''(cached attribute) parameter estimates for all LOOO regressions
-
-        uses results from leave-one-observation-out loop
         '''
-        return np.asarray(self._res_looo['params'])
+        return self.results.params - self._params_change()
 
     @cache_readonly
     def det_cov_params_not_obsi(self):
         '''(cached attribute) determinant of cov_params of all LOOO regressions
 
-        uses results from leave-one-observation-out loop
+        The determinant of the inverse of the downdated X'X is
+        det((X'X)^(-1)) / (1 - h_i).
         '''
-        return np.asarray(self._res_looo['det_cov_params'])
+        det = np.linalg.det(self.results.normalized_cov_params)
+        return self.sigma2_not_obsi**self.k_vars * det / (1 -
+                                                self.hat_matrix_diag)
 
     @cache_readonly
     def cooks_distance(self):
@@ -413,15 +482,15 @@ class OLSInfluence(object):
     def cov_ratio(self):
         '''(cached attribute) covariance ratio between LOOO and original
 
-        This uses determinant of the estimate of the parameter covariance
-        from leave-one-out estimates.
-        requires leave one out loop for observations
+        This is the ratio of the determinants of the estimate of the
+        parameter covariance from the leave-one-out estimates and from the
+        original estimate ::
+
+           (sigma2_not_obsi / mse_resid)**k_vars / (1 - h_i)
 
         '''
-        #don't use inplace division / because then we change original
-        cov_ratio = (self.det_cov_params_not_obsi
-                            / np.linalg.det(self.results.cov_params()))
-        return cov_ratio
+        return ((self.sigma2_not_obsi / self.results.mse_resid)**self.k_vars
+                / (1 - self.hat_matrix_diag))
 
     @cache_readonly
     def resid_var(self):
@@ -528,37 +597,6 @@ class OLSInfluence(object):
 
         return res_loo
 
-    @cache_readonly
-    def _res_looo(self):
-        '''collect required results from the LOOO loop
-
-        all results will be attached.
-        currently only 'params', 'mse_resid', 'det_cov_params' are stored
-
-        regresses endog on exog dropping one observation at a time
-
-        this uses a nobs loop, only attributes of the OLS instance are stored.
-        '''
-        from statsmodels.sandbox.tools.cross_val import LeaveOneOut
-        get_det_cov_params = lambda res: np.linalg.det(res.cov_params())
-
-        endog = self.endog
-        exog = self.exog
-
-        params = np.zeros_like(exog)
-        mse_resid = np.zeros_like(endog)
-        det_cov_params = np.zeros_like(endog)
-
-        cv_iter = LeaveOneOut(self.nobs)
-        for inidx, outidx in cv_iter:
-            res_i = self.model_class(endog[inidx], exog[inidx]).fit()
-            params[outidx] = res_i.params
-            mse_resid[outidx] = res_i.mse_resid
-            det_cov_params[outidx] = get_det_cov_params(res_i)
-
-        return dict(params=params, mse_resid=mse_resid,
-                       det_cov_params=det_cov_params)
-
     def summary_frame(self):
         """
         Creates a DataFrame with all available influence results.
@@ -102,12 +102,16 @@ Statistics 90, no. 3 (2008): 414–427.
 
 """
 
+import hashlib
+from itertools import combinations
+
 import numpy as np
 
-from statsmodels.tools.grouputils import Group
 from statsmodels.stats.moment_helpers import se_cov
 
-__all__ = ['cov_cluster', 'cov_cluster_2groups', 'cov_hac', 'cov_nw_panel',
+__all__ = ['cov_cluster', 'cov_cluster_2groups', 'cov_cluster_multi',
+           'cov_cluster_scores', 'cov_hac', 'cov_nw_panel',
+           'hac_nlags', 'IncrementalHAC',
            'cov_white_simple',
            'cov_hc0', 'cov_hc1', 'cov_hc2', 'cov_hc3',
            'se_cov', 'weights_bartlett', 'weights_uniform']
@@ -165,8 +169,14 @@ def _HCCM(results, scale):
     where pinv(x) = (X'X)^(-1) X
     and scale is (nobs,)
     '''
-    H = np.dot(results.model.pinv_wexog,
-        scale[:,None]*results.model.pinv_wexog.T)
+    model = results.model
+    if hasattr(model, 'pinv_wexog'):
+        H = np.dot(model.pinv_wexog, scale[:,None]*model.pinv_wexog.T)
+    else:
+        # model fit without pinv, pinv(x) = (X'X)^(-1) X
+        xsx = np.dot(model.wexog.T, scale[:,None]*model.wexog)
+        H = np.dot(results.normalized_cov_params,
+                   np.dot(xsx, results.normalized_cov_params))
     return H
 
 def cov_hc0(results):
@@ -237,12 +247,16 @@ def _HCCM1(results, scale):
         robust covariance matrix for the parameter estimates
 
     '''
+    model = results.model
+    if hasattr(model, 'pinv_wexog'):
+        pinv_wexog = model.pinv_wexog
+    else:
+        # model fit without pinv, pinv(x) = (X'X)^(-1) X
+        pinv_wexog = np.dot(results.normalized_cov_params, model.wexog.T)
     if scale.ndim == 1:
-        H = np.dot(results.model.pinv_wexog,
-                   scale[:,None]*results.model.pinv_wexog.T)
+        H = np.dot(pinv_wexog, scale[:,None]*pinv_wexog.T)
     else:
-        H = np.dot(results.model.pinv_wexog,
-                   np.dot(scale, results.model.pinv_wexog.T))
+        H = np.dot(pinv_wexog, np.dot(scale, pinv_wexog.T))
     return H
 
 def _HCCM2(results, scale):
@@ -313,7 +327,61 @@ def weights_uniform(nlags):
     #with lag zero
     return np.ones(nlags+1.)
 
-def S_hac_simple(x, nlags=None, weights_func=weights_bartlett):
+def _fft_length(n):
+    # power of 2 for the zero padded FFT
+    return 2**int(np.ceil(np.log2(max(n, 2))))
+
+
+def S_hac_fft(x, weights):
+    '''inner covariance matrix for HAC computed with the FFT
+
+    Parameters
+    ----------
+    x : ndarray (nobs,) or (nobs, k_var)
+        data, for HAC this is array of x_i * u_i
+    weights : ndarray (nlags+1,)
+        kernel weights including lag zero
+
+    Returns
+    -------
+    S : ndarray, (k_vars, k_vars)
+        inner covariance matrix for sandwich
+
+    Notes
+    -----
+    The weighted sum of the lagged cross-products is the inner product of
+    the kernel weights with the cross-correlations of the columns. With
+    zero padding to a length of at least nobs + nlags the
+    cross-correlations are circular, so that the weighted sum is computed
+    from the discrete Fourier transforms as
+
+        S = Re(F' diag(W) conj(F)) / m
+
+    where F holds the FFT of the columns of x and W is the FFT of the
+    symmetric kernel weights. This needs k_vars FFTs and one matrix
+    product over the m frequencies, O(m k_vars (log m + k_vars)) instead of
+    O(nobs k_vars^2 nlags) for the direct sum over lags. All lags up to
+    nobs - 1 can be used.
+    '''
+    if x.ndim == 1:
+        x = x[:,None]
+    nobs = x.shape[0]
+    nlags = min(len(weights) - 1, nobs - 1)
+    weights = np.asarray(weights[:nlags + 1], dtype=float)
+    m = _fft_length(nobs + nlags)
+    f_x = np.fft.rfft(x, n=m, axis=0)
+    # symmetric circular weight sequence v(l) = w(|l|)
+    v = np.zeros(m)
+    v[:nlags + 1] = weights
+    v[m - nlags:] = weights[1:][::-1]
+    f_v = np.fft.rfft(v).real
+    # rfft holds the nonnegative frequencies, the others are conjugate
+    f_v[1:(m + 1) // 2] *= 2
+    S = np.dot((f_x * f_v[:,None]).T, f_x.conj()).real / m
+    return S
+
+
+def S_hac_simple(x, nlags=None, weights_func=weights_bartlett, method='auto'):
     '''inner covariance matrix for HAC (Newey, West) sandwich
 
     assumes we have a single time series with zero axis consecutive, equal
@@ -330,6 +398,9 @@ def S_hac_simple(x, nlags=None, weights_func=weights_bartlett):
     weights_func : callable
         weights_func is called with nlags as argument to get the kernel
         weights. default are Bartlett weights
+    method : 'auto', 'direct' or 'fft'
+        'direct' sums the cross-products over the lags, 'fft' uses
+        S_hac_fft. 'auto' uses the FFT if nlags is larger than 16.
 
     Returns
     -------
@@ -350,9 +421,13 @@ def S_hac_simple(x, nlags=None, weights_func=weights_bartlett):
         x = x[:,None]
     n_periods = x.shape[0]
     if nlags is None:
-        nlags = np.floor[4 * (n_periods / 100.)**(2./9.)]
+        nlags = int(np.floor(4 * (n_periods / 100.)**(2./9.)))
 
     weights = weights_func(nlags)
+    if method == 'fft' or (method == 'auto' and nlags > 16):
+        return S_hac_fft(x, weights)
+    elif method not in ['auto', 'direct']:
+        raise ValueError("method has to be 'auto', 'direct' or 'fft'")
 
     S = weights[0] * np.dot(x.T, x)  #weights[0] just for completeness, is 1
 
@@ -495,12 +570,11 @@ def cov_cluster(results, group, use_correction=True):
     same result as Stata in UCLA example and same as Peterson
 
     '''
-    #TODO: currently used version of groupsums requires 2d resid
     xu = results.model.exog * results.resid[:, None]
-    scale = S_crosssection(xu, group)
+    group, n_groups = group_codes(group)
+    scale = S_cluster_scores(xu, group, n_groups)
 
     nobs, k_vars = results.model.exog.shape
-    n_groups = len(np.unique(group)) #replace with stored group attributes if available
 
     cov_c = _HCCM2(results, scale)
 
@@ -554,10 +628,8 @@ def cov_cluster_2groups(results, group, group2=None, use_correction=True):
     #[0] because we get still also returns bse
     cov1 = cov_cluster(results, group1, use_correction=use_correction)
 
-    group_intersection = Group(group)
     #cov of cluster formed by intersection of two groups
-    cov01 = cov_cluster(results,
-                        group_intersection.group_int,
+    cov01 = cov_cluster(results, group_codes(group)[0],
                         use_correction=use_correction)
 
     #robust cov matrix for union of groups
@@ -567,6 +639,254 @@ def cov_cluster_2groups(results, group, group2=None, use_correction=True):
     return cov_both, cov0, cov1
 
 
+def _compact_codes(codes, size):
+    """
+    Relabel integer codes in range(size) to consecutive integers.
+
+    Uses bincount if size is not much larger than the number of codes and
+    sorting otherwise.
+    """
+    if size <= 4 * len(codes) + 1000:
+        used = np.bincount(codes, minlength=size) > 0
+        relabel = np.cumsum(used) - 1
+        return relabel[codes], int(used.sum())
+    uniques, codes = np.unique(codes, return_inverse=True)
+    return codes, len(uniques)
+
+
+def _group_columns(group):
+    # list of the 1d label arrays, only a tuple of arrays or a 2d array
+    # define several groups, a list is a single 1d array of labels
+    if isinstance(group, tuple):
+        return [np.asarray(g) for g in group]
+    group = np.asarray(group)
+    if group.ndim == 1:
+        return [group]
+    return [group[:, i] for i in range(group.shape[1])]
+
+
+def group_codes(group):
+    """
+    Consecutive integer codes of the groups or of their intersection.
+
+    Parameters
+    ----------
+    group : array-like
+        1d array of group labels, or 2d array or tuple of 1d arrays of
+        several groups. In the latter case the codes of the intersection,
+        i.e. the cells of all groups, are returned.
+
+    Returns
+    -------
+    codes : ndarray of int
+        The group of each observation, in range(n_groups).
+    n_groups : int
+        The number of groups that are present.
+
+    Notes
+    -----
+    Integer labels are relabeled with bincount if their range is not much
+    larger than the number of observations, other labels are sorted. The
+    codes of an intersection are formed arithmetically from the codes of
+    the groups, without forming string labels.
+    """
+    codes = n_groups = None
+    for labels in _group_columns(group):
+        if labels.dtype.kind in 'iub' and len(labels):
+            low = labels.min()
+            labels_codes, n_labels = _compact_codes(
+                    (labels - low).astype(np.intp), int(labels.max() - low) + 1)
+        else:
+            uniques, labels_codes = np.unique(labels, return_inverse=True)
+            n_labels = len(uniques)
+        if codes is None:
+            codes, n_groups = labels_codes, n_labels
+        else:
+            codes, n_groups = _compact_codes(
+                    codes.astype(np.int64) * n_labels + labels_codes,
+                    n_groups * n_labels)
+    return codes, n_groups
+
+
+def S_cluster_scores(score_obs, codes, n_groups=None):
+    """
+    inner covariance matrix of the cluster sums of the scores
+
+    Parameters
+    ----------
+    score_obs : ndarray (nobs, k_vars)
+        score or moment condition of each observation, e.g. x_i * u_i
+    codes : ndarray of int
+        group codes in range(n_groups), see group_codes
+    n_groups : int, optional
+        number of groups
+
+    Returns
+    -------
+    S : ndarray (k_vars, k_vars)
+    """
+    if score_obs.ndim == 1:
+        score_obs = score_obs[:, None]
+    if n_groups is None:
+        n_groups = codes.max() + 1
+    k_vars = score_obs.shape[1]
+    sums = np.empty((n_groups, k_vars))
+    for col in range(k_vars):
+        sums[:, col] = np.bincount(codes, weights=score_obs[:, col],
+                                   minlength=n_groups)
+    return np.dot(sums.T, sums)
+
+
+def cov_cluster_scores(score_obs, bread, group, use_correction=True,
+                       k_params=None):
+    """
+    multiway cluster robust covariance matrix from the scores
+
+    Parameters
+    ----------
+    score_obs : ndarray (nobs, k_vars)
+        score or moment condition of each observation. For linear
+        regression this is exog * resid[:, None], for a likelihood model the
+        derivative of the loglikelihood of each observation.
+    bread : ndarray (k_vars, k_vars)
+        the inverse of the (negative) Hessian, e.g. normalized_cov_params.
+    group : array-like
+        1d array of cluster labels, or 2d array or tuple of 1d arrays for
+        clustering in several dimensions.
+    use_correction : bool
+        If true (default), then the small sample correction factor
+        G/(G-1) * (nobs-1)/(nobs-k_params) is used for each term, where G
+        is the number of clusters of the term.
+    k_params : int, optional
+        number of parameters in the small sample correction. Default is the
+        number of columns of score_obs.
+
+    Returns
+    -------
+    cov : ndarray (k_vars, k_vars)
+        cluster robust covariance matrix for parameter estimates
+
+    Notes
+    -----
+    With several cluster dimensions the covariance is the inclusion
+    exclusion sum over all nonempty subsets of the dimensions, of the one
+    way cluster robust covariance of the intersection of the subset, with
+    sign + for an odd and - for an even number of dimensions, as in
+    Cameron, Gelbach and Miller (2011). This covariance need not be
+    positive semi-definite.
+
+    Each intersection is coded from the integer codes of the dimensions,
+    and the scores are summed by bincount. The memory needed is
+    n_groups x k_vars for each term.
+    """
+    if score_obs.ndim == 1:
+        score_obs = score_obs[:, None]
+    dims = _group_columns(group)
+    nobs = score_obs.shape[0]
+    if k_params is None:
+        k_params = score_obs.shape[1]
+    dims = [group_codes(g) for g in dims]
+
+    S = 0
+    for n_dims in range(1, len(dims) + 1):
+        sign = 1 if n_dims % 2 else -1
+        for subset in combinations(range(len(dims)), n_dims):
+            if n_dims == 1:
+                codes, n_groups = dims[subset[0]]
+            else:
+                codes, n_groups = group_codes(tuple(dims[i][0]
+                                                    for i in subset))
+            S_sub = S_cluster_scores(score_obs, codes, n_groups)
+            if use_correction:
+                S_sub *= (n_groups / (n_groups - 1.) *
+                          ((nobs - 1.) / float(nobs - k_params)))
+            S = S + sign * S_sub
+    return np.dot(np.dot(bread, S), bread.T)
+
+
+def _cluster_scores(results):
+    """
+    score_obs and bread of regression, GLM and discrete results
+
+    The scores are cached on the results instance.
+    """
+    cache = getattr(results, '_cache', {})
+    if 'cluster_scores' in cache:
+        return cache['cluster_scores']
+    model = results.model
+    if hasattr(results, 'wresid'):
+        score_obs = model.wexog * results.wresid[:, None]
+    elif hasattr(model, 'family'):
+        # quasi-score of GLM, the scale cancels in the sandwich
+        mu = results.mu
+        family = model.family
+        resid = results.resid_response / (family.link.deriv(mu) *
+                                          family.variance(mu))
+        score_obs = model.exog * resid[:, None]
+    elif hasattr(model, 'jac'):
+        score_obs = model.jac(results.params)
+    else:
+        raise ValueError('results need to be regression, GLM or discrete '
+                         'model results')
+    cache['cluster_scores'] = score_obs, results.normalized_cov_params
+    return score_obs, results.normalized_cov_params
+
+
+def _group_key(group):
+    # key for the cache, hash of the data of the group labels
+    if isinstance(group, tuple):
+        return tuple(_group_key(g) for g in group)
+    group = np.ascontiguousarray(group)
+    if group.dtype.kind == 'O':
+        return None
+    return (group.shape, group.dtype.str,
+            hashlib.sha1(group.view(np.uint8)).hexdigest())
+
+
+def cov_cluster_multi(results, group, use_correction=True):
+    """
+    cluster robust covariance matrix for one or several cluster dimensions
+
+    Parameters
+    ----------
+    results : result instance
+       results of a linear regression, a GLM or a discrete model. Uses the
+       whitened exog and residuals, the GLM quasi-score or the discrete
+       model's jac, and normalized_cov_params.
+    group : array-like
+        1d array of cluster labels, or 2d array or tuple of 1d arrays for
+        clustering in several dimensions.
+    use_correction : bool
+       If true (default), then the small sample correction factor is used
+       for each term.
+
+    Returns
+    -------
+    cov : ndarray, (k_vars, k_vars)
+        cluster robust covariance matrix for parameter estimates
+
+    Notes
+    -----
+    Same results as cov_cluster and as the first return of
+    cov_cluster_2groups for OLS. See cov_cluster_scores for the method.
+
+    The scores and the covariance for each group are cached on the results
+    instance, the cache key is a hash of the group labels.
+    """
+    score_obs, bread = _cluster_scores(results)
+    key = _group_key(group)
+    cache = getattr(results, '_cache', {})
+    covs = cache.setdefault('cov_cluster', {})
+    if key is not None and (key, use_correction) in covs:
+        return covs[key, use_correction]
+    cov = cov_cluster_scores(score_obs, bread, group,
+                             use_correction=use_correction,
+                             k_params=score_obs.shape[1])
+    if key is not None:
+        covs[key, use_correction] = cov
+    return cov
+
+
 def cov_white_simple(results, use_correction=True):
     '''
     heteroscedasticity robust covariance matrix (White)
@@ -621,9 +941,11 @@ def cov_hac_simple(results, nlags=None, weights_func=weights_bartlett,
     results : result instance
        result of a regression, uses results.model.exog and results.resid
        TODO: this should use wexog instead
-    nlags : int or None
+    nlags : int, None, 'newey-west' or 'andrews'
         highest lag to include in kernel window. If None, then
-        nlags = floor[4(T/100)^(2/9)] is used.
+        nlags = floor[4(T/100)^(2/9)] is used. 'newey-west' and 'andrews'
+        select the lags automatically, see hac_nlags. For regression
+        results 'newey-west' uses the cached `results.hac_nlags`.
     weights_func : callable
         weights_func is called with nlags as argument to get the kernel
         weights. default are Bartlett weights
@@ -642,6 +964,11 @@ def cov_hac_simple(results, nlags=None, weights_func=weights_bartlett,
 
     '''
     xu = results.model.exog * results.resid[:, None]
+    if nlags == 'newey-west' and hasattr(results, 'hac_nlags'):
+        nlags = results.hac_nlags
+    elif nlags in ['newey-west', 'andrews']:
+        nlags = hac_nlags(xu, method=nlags,
+                          weights=_hac_nlags_weights(results.model.exog))
     sigma = S_hac_simple(xu, nlags=nlags, weights_func=weights_func)
 
     cov_hac = _HCCM2(results, sigma)
@@ -654,6 +981,151 @@ def cov_hac_simple(results, nlags=None, weights_func=weights_bartlett,
 
 cov_hac = cov_hac_simple   #alias for users
 
+
+def _hac_nlags_weights(exog):
+    # weights of the scores for the lag selection, zero for a constant
+    weights = np.ones(exog.shape[1])
+    if exog.shape[1] > 1:
+        weights[np.ptp(exog, axis=0) == 0] = 0
+    return weights
+
+
+def hac_nlags(x, method='newey-west', weights=None):
+    '''automatic selection of the number of lags for the Bartlett kernel
+
+    Parameters
+    ----------
+    x : ndarray (nobs,) or (nobs, k_var)
+        data, for HAC this is array of x_i * u_i
+    method : 'newey-west' or 'andrews'
+        'newey-west' uses the nonparametric plug-in method of Newey and West
+        (1994), 'andrews' the AR(1) plug-in method of Andrews (1991).
+    weights : ndarray (k_var,), optional
+        weights of the columns, default is one for all. Newey and West
+        recommend a weight of zero for the score of the constant.
+
+    Returns
+    -------
+    nlags : int
+        the integer part of the bandwidth
+
+    References
+    ----------
+    Andrews, D.W.K. 1991. "Heteroskedasticity and Autocorrelation
+        Consistent Covariance Matrix Estimation." Econometrica 59 (3).
+    Newey, W.K. and West, K.D. 1994. "Automatic Lag Selection in Covariance
+        Matrix Estimation." Review of Economic Studies 61 (4).
+    '''
+    if x.ndim == 1:
+        x = x[:,None]
+    nobs, k_vars = x.shape
+    if weights is None:
+        weights = np.ones(k_vars)
+    if method == 'newey-west':
+        f = np.dot(x, weights)
+        n = int(np.floor(4 * (nobs / 100.)**(2./9.)))
+        sigma = np.array([np.dot(f[j:], f[:nobs - j]) for j in range(n + 1)])
+        s0 = sigma[0] + 2 * sigma[1:].sum()
+        s1 = 2 * np.dot(np.arange(1, n + 1), sigma[1:])
+        bandwidth = 1.1447 * ((s1 / s0)**2 * nobs)**(1./3.)
+    elif method == 'andrews':
+        x0, x1 = x[:-1], x[1:]
+        rho = (x0 * x1).sum(0) / (x0 * x0).sum(0)
+        sigma2 = ((x1 - rho * x0)**2).mean(0)
+        alpha = ((weights * 4 * rho**2 * sigma2**2 /
+                  ((1 - rho)**6 * (1 + rho)**2)).sum() /
+                 (weights * sigma2**2 / (1 - rho)**4).sum())
+        bandwidth = 1.1447 * (alpha * nobs)**(1./3.)
+    else:
+        raise ValueError("method has to be 'newey-west' or 'andrews'")
+    return int(min(bandwidth, nobs - 1))
+
+
+class IncrementalHAC(object):
+    '''inner covariance matrix for HAC that is updated with new observations
+
+    The lagged cross-products are accumulated for each lag, so that adding
+    a block of b observations costs O(b k_vars^2 nlags) independently of the
+    number of observations already added. With a rolling window the
+    oldest observations are removed in the same way.
+
+    Parameters
+    ----------
+    nlags : int
+        highest lag to include in kernel window.
+    weights_func : callable
+        weights_func is called with nlags as argument to get the kernel
+        weights. default are Bartlett weights
+    window : int, optional
+        If given, only the last `window` observations are used.
+
+    Examples
+    --------
+    >>> hac = IncrementalHAC(nlags=5, window=250)
+    >>> for xu_block in blocks:
+    ...     hac.update(xu_block)
+    ...     cov = np.dot(bread, np.dot(hac.S(), bread))
+    '''
+
+    def __init__(self, nlags, weights_func=weights_bartlett, window=None):
+        if window is not None and window <= nlags:
+            raise ValueError('window has to be larger than nlags')
+        self.nlags = nlags
+        self.weights = np.asarray(weights_func(nlags), dtype=float)
+        self.window = window
+        self.gamma = None
+        self.nobs = 0
+        # the rows of the window, or the last nlags rows without window
+        self._x = None
+
+    def update(self, x):
+        '''add observations at the end of the series
+
+        Parameters
+        ----------
+        x : ndarray (nobs,) or (nobs, k_var)
+            new observations, e.g. of x_i * u_i
+        '''
+        x = np.asarray(x, dtype=float)
+        if x.ndim == 1:
+            x = x[:,None]
+        nlags = self.nlags
+        if self._x is None:
+            self.gamma = np.zeros((nlags + 1, x.shape[1], x.shape[1]))
+            self._x = x[:0]
+        # the last nlags old rows are the lags of the first new rows
+        n_old = min(nlags, self._x.shape[0])
+        ext = np.vstack((self._x[self._x.shape[0] - n_old:], x))
+        n_ext = ext.shape[0]
+        for lag in range(min(nlags, n_ext - 1) + 1):
+            start = max(n_old, lag)
+            self.gamma[lag] += np.dot(ext[start:].T,
+                                      ext[start - lag:n_ext - lag])
+        self._x = np.vstack((self._x, x))
+        self.nobs += x.shape[0]
+        if self.window is None:
+            self._x = self._x[max(self._x.shape[0] - nlags, 0):]
+        elif self.nobs > self.window:
+            self._remove(self.nobs - self.window)
+
+    def _remove(self, n_remove):
+        # remove the products of the first n_remove rows with later rows
+        x = self._x
+        for lag in range(self.nlags + 1):
+            self.gamma[lag] -= np.dot(x[lag:n_remove + lag].T,
+                                      x[:min(n_remove, x.shape[0] - lag)])
+        self._x = x[n_remove:]
+        self.nobs -= n_remove
+
+    def S(self):
+        '''inner covariance matrix of the current observations
+        '''
+        gamma = self.gamma
+        S = self.weights[0] * gamma[0]
+        for lag in range(1, self.nlags + 1):
+            S = S + self.weights[lag] * (gamma[lag] + gamma[lag].T)
+        return S
+
 #---------------------- use time lags corrected for groups
 #the following were copied from a different experimental script,
 #groupidx is tuple, observations assumed to be stacked by group member and
@@ -661,38 +1133,61 @@ cov_hac = cov_hac_simple   #alias for users
 #I think this is pure within group HAC: apply HAC to each group member
 #separately
 
+def _group_positions(groupidx):
+    '''
+    rows of the groups and the time position of each row within its group
+    '''
+    groupidx = np.asarray(groupidx, dtype=int).reshape(-1, 2)
+    lengths = groupidx[:,1] - groupidx[:,0]
+    n_rows = lengths.sum()
+    first = np.cumsum(lengths) - lengths
+    pos = np.arange(n_rows) - np.repeat(first, lengths)
+    rows = np.repeat(groupidx[:,0], lengths) + pos
+    return rows, pos
+
+
 def lagged_groups(x, lag, groupidx):
     '''
     assumes sorted by time, groupidx is tuple of start and end values
-    not optimized, just to get a working version, loop over groups
+
+    returns the rows that have a lag within their group and the lagged rows
     '''
-    out0 = []
-    out_lagged = []
-    for l,u in groupidx:
-        if l+lag < u: #group is longer than lag
-            out0.append(x[l+lag:u])
-            out_lagged.append(x[l:u-lag])
-
-    if out0 == []:
+    rows, pos = _group_positions(groupidx)
+    rows = rows[pos >= lag]
+    if len(rows) == 0:
         raise ValueError('all groups are empty taking lags')
-    #return out0, out_lagged
-    return np.vstack(out0), np.vstack(out_lagged)
-
+    return x[rows], x[rows - lag]
 
 
-def S_nw_panel(xw, weights, groupidx):
+def S_nw_panel(xw, weights, groupidx, method='auto'):
     '''inner covariance matrix for HAC for panel data
 
     no denominator nobs used
 
     no reference for this, just accounting for time indices
+
+    For method 'fft', or 'auto' with more than 16 lags, the groups are
+    stacked into one series separated by nlags zero rows, so that lagged
+    products across groups vanish, and S_hac_fft is used. Otherwise the
+    lagged products are summed for all groups at once for each lag.
     '''
     nlags = len(weights)-1
+    rows, pos = _group_positions(groupidx)
+
+    if method == 'fft' or (method == 'auto' and nlags > 16):
+        group = np.cumsum(pos == 0) - 1
+        padded = np.zeros((len(rows) + nlags * len(groupidx), xw.shape[1]))
+        padded[np.arange(len(rows)) + nlags * group] = xw[rows]
+        return S_hac_fft(padded, weights)
+    elif method not in ['auto', 'direct']:
+        raise ValueError("method has to be 'auto', 'direct' or 'fft'")
 
     S = weights[0] * np.dot(xw.T, xw)  #weights just for completeness
     for lag in range(1, nlags+1):
-        xw0, xwlag = lagged_groups(xw, lag, groupidx)
-        s = np.dot(xw0.T, xwlag)
+        idx = rows[pos >= lag]
+        if len(idx) == 0:
+            break
+        s = np.dot(xw[idx].T, xw[idx - lag])
         S += weights[lag] * (s + s.T)
     return S
 
@@ -665,6 +665,44 @@ def test_outlier_influence_funcs():
     infl = res2.get_influence()
     infl.summary_table()
 
+def test_influence_closed_form():
+    # compare with explicit leave-one-observation-out regressions
+    np.random.seed(97531)
+    nobs = 50
+    exog = add_constant(np.random.randn(nobs, 3))
+    endog = exog.sum(1) + np.random.randn(nobs)
+    res = OLS(endog, exog).fit()
+    params = np.zeros((nobs, 4))
+    mse_resid = np.zeros(nobs)
+    det_cov = np.zeros(nobs)
+    for i in range(nobs):
+        mask = np.arange(nobs) != i
+        res_i = OLS(endog[mask], exog[mask]).fit()
+        params[i] = res_i.params
+        mse_resid[i] = res_i.mse_resid
+        det_cov[i] = np.linalg.det(res_i.cov_params())
+
+    # small chunks and R from the fit with qr
+    for infl in [oi.OLSInfluence(res, chunk_size=7),
+                 oi.OLSInfluence(OLS(endog, exog).fit(method='qr'))]:
+        assert_almost_equal(infl.params_not_obsi, params, 12)
+        assert_almost_equal(infl.sigma2_not_obsi, mse_resid, 12)
+        assert_almost_equal(infl.det_cov_params_not_obsi, det_cov, 12)
+        assert_almost_equal(infl.cov_ratio, det_cov /
+                            np.linalg.det(res.cov_params()), 12)
+        assert_almost_equal(infl.hat_matrix_diag,
+                            np.diag(exog.dot(np.linalg.pinv(exog))), 12)
+
+    # exog not of full rank uses normalized_cov_params
+    exog2 = np.column_stack((exog, exog[:,1] + exog[:,2]))
+    res2 = OLS(endog, exog2).fit()
+    infl = oi.OLSInfluence(res2, chunk_size=7)
+    assert_(infl._exog_R is None)
+    infl1 = oi.OLSInfluence(res)
+    assert_almost_equal(infl.hat_matrix_diag, infl1.hat_matrix_diag, 12)
+    assert_almost_equal(infl.resid_studentized_external,
+                        infl1.resid_studentized_external, 12)
+
 def test_influence_wrapped():
     from pandas import DataFrame
     from pandas.util.testing import assert_series_equal
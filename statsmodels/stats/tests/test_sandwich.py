@@ -10,9 +10,12 @@ Created on Sat Dec 17 08:39:16 2011
 Author: Josef Perktold
 """
 import numpy as np
-from numpy.testing import assert_almost_equal
+from numpy.testing import assert_almost_equal, assert_equal, assert_raises
 
 from statsmodels.regression.linear_model import OLS, GLSAR
+from statsmodels.discrete.discrete_model import Logit
+from statsmodels.genmod.generalized_linear_model import GLM
+from statsmodels.genmod import families
 from statsmodels.tools.tools import add_constant
 import statsmodels.stats.sandwich_covariance as sw
 #import statsmodels.sandbox.panel.sandwich_covariance_generic as swg
@@ -52,6 +55,56 @@ def test_cov_cluster_2groups():
     assert_almost_equal(bse_1, bse_pet1, decimal=4)
     assert_almost_equal(bse_01, bse_pet01, decimal=4)
 
+    # fast path with integer codes, also for string labels
+    assert_almost_equal(sw.cov_cluster_multi(res, (group, time)), cov01, 14)
+    assert_almost_equal(sw.cov_cluster_multi(res, group), covg, 14)
+    labels = np.column_stack((group, time)).astype(str)
+    assert_almost_equal(sw.cov_cluster_multi(res, labels), cov01, 14)
+    assert_equal(len(res._cache['cov_cluster']), 3)
+    # a list of labels is a single cluster dimension
+    assert_almost_equal(sw.cov_cluster(res, group.tolist()), covg, 14)
+    assert_almost_equal(sw.cov_cluster_multi(res, group.tolist()), covg, 14)
+
+def test_cov_cluster_multi():
+    np.random.seed(5312)
+    nobs = 1000
+    groups = tuple(np.random.randint(0, k, nobs) for k in [50, 12, 5])
+    exog = add_constant(np.random.randn(nobs, 2))
+    endog = exog.sum(1) + np.random.randn(nobs)
+    res = OLS(endog, exog).fit()
+
+    # three way clustering by inclusion-exclusion
+    def cov1(*idx):
+        codes = sw.group_codes(tuple(groups[i] for i in idx))[0]
+        return sw.cov_cluster(res, codes)
+    cov3 = (cov1(0) + cov1(1) + cov1(2) - cov1(0, 1) - cov1(0, 2) -
+            cov1(1, 2) + cov1(0, 1, 2))
+    assert_almost_equal(sw.cov_cluster_multi(res, groups), cov3, 14)
+
+    score_obs = exog * res.resid[:, None]
+    cov = sw.cov_cluster_scores(score_obs, res.normalized_cov_params,
+                                np.column_stack(groups))
+    assert_almost_equal(cov, cov3, 14)
+
+    # the same scores from GLM and discrete results
+    endog_b = (endog > 1).astype(float)
+    res_logit = Logit(endog_b, exog).fit(disp=0)
+    res_glm = GLM(endog_b, exog, family=families.Binomial()).fit()
+    assert_almost_equal(sw.cov_cluster_multi(res_glm, groups[:2]),
+                        sw.cov_cluster_multi(res_logit, groups[:2]), 10)
+
+def test_group_codes():
+    codes, n_groups = sw.group_codes(np.array([10**9, 5, 5, 7]))
+    assert_equal(codes, [2, 0, 0, 1])
+    assert_equal(n_groups, 3)
+    codes, n_groups = sw.group_codes((np.array(['a', 'b', 'a', 'a']),
+                                      np.array([1, 1, 2, 1])))
+    assert_equal(codes, [0, 2, 1, 0])
+    assert_equal(n_groups, 3)
+    codes, n_groups = sw.group_codes(['b', 'a', 'b', 'c'])
+    assert_equal(codes, [1, 0, 1, 2])
+    assert_equal(n_groups, 3)
+
 def test_hac_simple():
 
     from statsmodels.datasets import macrodata
@@ -84,6 +137,81 @@ def test_hac_simple():
     assert_almost_equal(cov1, cov1_r, decimal=14)
     assert_almost_equal(cov2, cov2_r, decimal=14)
 
+def test_hac_fft():
+    np.random.seed(8642)
+    x = np.random.randn(300, 3)
+    x[1:] += 0.5 * x[:-1]
+    for nlags in [0, 1, 4, 30, 299]:
+        S_direct = sw.S_hac_simple(x, nlags=nlags, method='direct')
+        S_fft = sw.S_hac_simple(x, nlags=nlags, method='fft')
+        assert_almost_equal(S_fft, S_direct, 10)
+
+    # panel, stacking the groups with zero rows in between
+    groupidx = [(0, 100), (100, 110), (110, 240), (240, 300)]
+    for nlags in [0, 3, 20]:
+        weights = sw.weights_bartlett(nlags)
+        S_loop = weights[0] * np.dot(x.T, x)
+        for lag in range(1, nlags + 1):
+            x0, xlag = sw.lagged_groups(x, lag, groupidx)
+            s = np.dot(x0.T, xlag)
+            S_loop += weights[lag] * (s + s.T)
+        assert_almost_equal(sw.S_nw_panel(x, weights, groupidx,
+                                          method='direct'), S_loop, 10)
+        assert_almost_equal(sw.S_nw_panel(x, weights, groupidx,
+                                          method='fft'), S_loop, 10)
+    x0, xlag = sw.lagged_groups(x, 15, groupidx)
+    assert_equal(x0, np.vstack((x[15:100], x[125:240], x[255:300])))
+    assert_equal(xlag, np.vstack((x[:85], x[110:225], x[240:285])))
+
+def test_incremental_hac():
+    np.random.seed(8642)
+    x = np.random.randn(300, 3)
+    x[1:] += 0.5 * x[:-1]
+    hac = sw.IncrementalHAC(nlags=6)
+    for start in range(0, 300, 23):
+        hac.update(x[start:start + 23])
+    assert_equal(hac.nobs, 300)
+    assert_almost_equal(hac.S(), sw.S_hac_simple(x, nlags=6), 10)
+
+    hac = sw.IncrementalHAC(nlags=6, window=50)
+    for start in range(0, 300, 7):
+        hac.update(x[start:start + 7])
+        stop = min(start + 7, 300)
+        assert_almost_equal(hac.S(),
+                            sw.S_hac_simple(x[max(stop - 50, 0):stop],
+                                            nlags=6), 10)
+    assert_equal(hac.nobs, 50)
+
+def test_hac_nlags():
+    from statsmodels.datasets import macrodata
+    d2 = macrodata.load().data
+    g_gdp = 400*np.diff(np.log(d2['realgdp']))
+    g_inv = 400*np.diff(np.log(d2['realinv']))
+    exogg = add_constant(np.c_[g_gdp, d2['realint'][:-1]])
+    res_olsg = OLS(g_inv, exogg).fit()
+
+    xu = exogg * res_olsg.resid[:, None]
+    weights = np.array([0., 1, 1])
+    # bandwidths 4.942 and 1.038, the definitions are those of R
+    # sandwich::bwNeweyWest with prewhite=0 and bwAndrews with the AR(1)
+    # approximation, both with zero weight for the intercept
+    assert_equal(sw.hac_nlags(xu, weights=weights), 4)
+    assert_equal(sw.hac_nlags(xu, method='andrews', weights=weights), 1)
+    assert_equal(res_olsg.hac_nlags, 4)
+    assert_almost_equal(sw.cov_hac_simple(res_olsg, nlags='newey-west'),
+                        sw.cov_hac_simple(res_olsg, nlags=4), 14)
+
+    # series with hand computed bandwidths
+    # Newey-West: x = 1, -1, ... with nobs=100, n=4 and
+    # sigma_j = (-1)**j (100 - j), s0 = 96, s1 = 380,
+    # 1.1447 * ((380 / 96.)**2 * 100)**(1/3.) = 13.30
+    assert_equal(sw.hac_nlags(np.tile([1., -1], 50)), 13)
+    # Andrews: x = 2, 1, ... with nobs=100, rho = 198 / 249. and for a
+    # single series alpha = 4 rho**2 / (1 - rho**2)**2 = 18.71,
+    # 1.1447 * (18.71 * 100)**(1/3.) = 14.10
+    assert_equal(sw.hac_nlags(np.tile([2., 1], 50), method='andrews'), 14)
+    assert_raises(ValueError, sw.hac_nlags, xu, method='parzen')
+
 if __name__ == '__main__':
     import nose
     nose.runmodule(argv=[__file__, '-vvs', '-x'], exit=False)
@@ -105,6 +105,10 @@ def _is_using_ndarray(endog, exog):
     return (isinstance(endog, np.ndarray) and
             (isinstance(exog, np.ndarray) or exog is None))
 
+def _is_using_sparse(endog, exog):
+    from scipy import sparse
+    return isinstance(endog, np.ndarray) and sparse.issparse(exog)
+
 def _is_using_pandas(endog, exog):
     if not have_pandas():
         return False
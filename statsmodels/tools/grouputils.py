@@ -104,7 +104,7 @@ def group_sums(x, group, use_bincount=True):
         uniques = np.unique(group)
         result = np.zeros([len(uniques)] + list(x.shape[1:]))
         for ii, cat in enumerate(uniques):
-            result[ii] = x[g==cat].sum(0)
+            result[ii] = x[group==cat].sum(0)
         return result
 
 
@@ -169,7 +169,7 @@ def dummy_sparse(groups):
 
     indptr = np.arange(len(groups)+1)
     data = np.ones(len(groups), dtype=np.int8)
-    indi = sparse.csr_matrix((data, g, indptr))
+    indi = sparse.csr_matrix((data, groups, indptr))
 
     return indi
 
@@ -240,9 +240,11 @@ class Group(object):
         return group_sums(x, self.group_int, use_bincount=use_bincount)
 
     def group_demean(self, x, use_bincount=True):
-        means_g = group_demean(x/float(nobs), self.group_int,
-                               use_bincount=use_bincount)
-        x_demeaned = x - means_g[self.group_int]  #check reverse_index?
+        x = np.asarray(x, dtype=float)
+        means_g = group_sums(x, self.group_int).T / self.counts()[:,None]
+        if x.ndim == 1:
+            means_g = means_g[:,0]
+        x_demeaned = x - means_g[self.group_int]
         return x_demeaned, means_g
 
 
@@ -283,6 +285,227 @@ class GroupSorted(Group):
         return lag_idx[mask_ok]
 
 
+class FixedEffects(object):
+    """
+    Absorb the fixed effects of several group factors by demeaning.
+
+    The within transformation removes the projection on the dummy variables
+    of all factors, without creating the dummy variables. With one factor
+    this is one pass of group demeaning. With several factors the
+    projection is computed iteratively, either by alternating projections
+    or by the conjugate gradient method on the normal equations of the
+    fixed effects, using bincount based group sums in both cases.
+
+    Parameters
+    ----------
+    groups : array-like or list of array-like
+        The group labels, either a 1d array for a single factor, a 2d array
+        with one column per factor, or a list of 1d arrays. Labels can be
+        of any type that np.unique can sort.
+
+    Attributes
+    ----------
+    group_int : list of arrays
+        The integer codes of the groups of each factor.
+    n_groups : list of int
+        The number of groups of each factor.
+
+    References
+    ----------
+    Guimaraes, P. and Portugal, P. 2010. "A simple feasible procedure to fit
+        models with high-dimensional fixed effects." The Stata Journal 10 (4).
+    Correia, S. 2016. "Linear Models with High-Dimensional Fixed Effects:
+        An Efficient and Feasible Estimator." Working paper.
+    """
+
+    def __init__(self, groups):
+        if isinstance(groups, (list, tuple)):
+            groups = [np.asarray(g) for g in groups]
+        else:
+            groups = np.asarray(groups)
+            if groups.ndim == 1:
+                groups = [groups]
+            else:
+                groups = [groups[:,i] for i in range(groups.shape[1])]
+        self.group_int = [combine_indices(g)[0] for g in groups]
+        self.n_groups = [int(g.max()) + 1 for g in self.group_int]
+        self.k_factors = len(self.group_int)
+        self.nobs = len(self.group_int[0])
+
+    def demean(self, x, weights=None, method='cg', tol=1e-8, maxiter=1000):
+        """
+        Remove the fixed effects from the columns of x.
+
+        Parameters
+        ----------
+        x : array-like
+            1d or 2d array with nobs rows.
+        weights : array-like, optional
+            Weights of the observations for weighted demeaning.
+        method : 'cg' or 'map'
+            'cg' uses the preconditioned conjugate gradient method on the
+            normal equations of the fixed effects. 'map' uses alternating
+            projections, i.e. cycles through the factors and subtracts the
+            group means of each.
+        tol : float
+            Convergence tolerance for the largest change of the group means
+            in an iteration, relative to the largest absolute value of each
+            column. The demeaned values of a previous call can be used as
+            x to warm start, for example in iteratively reweighted least
+            squares.
+        maxiter : int
+            Maximum number of iterations.
+
+        Returns
+        -------
+        x_demeaned : ndarray
+            The residuals of the projection of x on the fixed effects.
+        iterations : int
+            The number of iterations that were used.
+        """
+        x = np.array(x, dtype=float)
+        is1d = x.ndim == 1
+        if is1d:
+            x = x[:,None]
+        if weights is None:
+            weights = np.ones(self.nobs)
+        weights = np.asarray(weights, dtype=float)
+        wsums = [np.bincount(g, weights=weights, minlength=n)
+                 for g, n in zip(self.group_int, self.n_groups)]
+        if method == 'map':
+            x, iterations = self._demean_map(x, weights, wsums, tol, maxiter)
+        elif method == 'cg':
+            x, iterations = self._demean_cg(x, weights, wsums, tol, maxiter)
+        else:
+            raise ValueError("method has to be 'cg' or 'map'")
+        if is1d:
+            x = x[:,0]
+        return x, iterations
+
+    def _group_means(self, wx, k, wsum):
+        return group_sums(wx, self.group_int[k]).T / wsum[:,None]
+
+    def _demean_map(self, x, weights, wsums, tol, maxiter):
+        scale = np.abs(x).max(0)
+        scale[scale == 0] = 1
+        for iteration in range(1, maxiter + 1):
+            change = np.zeros(x.shape[1])
+            for k in range(self.k_factors):
+                means = self._group_means(x * weights[:,None], k, wsums[k])
+                x -= means[self.group_int[k]]
+                change = np.maximum(change, np.abs(means).max(0))
+            if self.k_factors == 1 or np.all(change <= tol * scale):
+                break
+        return x, iteration
+
+    def _demean_cg(self, x, weights, wsums, tol, maxiter):
+        group_int = self.group_int
+        offsets = np.cumsum([0] + self.n_groups)
+        diag = np.concatenate(wsums)[:,None]
+        diag[diag == 0] = 1
+
+        def dummy_dot(coef):
+            # D coef, the fitted fixed effects
+            fitted = coef[offsets[0]:offsets[1]][group_int[0]]
+            for k in range(1, self.k_factors):
+                fitted = fitted + coef[offsets[k]:offsets[k+1]][group_int[k]]
+            return fitted
+
+        def dummy_tdot(v):
+            # D'W v
+            wv = v * weights[:,None]
+            return np.vstack([group_sums(wv, g).T for g in group_int])
+
+        scale = np.abs(x).max(0)
+        scale[scale == 0] = 1
+        coef = np.zeros((offsets[-1], x.shape[1]))
+        resid = dummy_tdot(x)
+        z = resid / diag
+        if np.all(np.abs(z).max(0) <= tol * scale):
+            return x, 0
+        direc = z.copy()
+        rz = (resid * z).sum(0)
+        for iteration in range(1, maxiter + 1):
+            a_direc = dummy_tdot(dummy_dot(direc))
+            curv = (direc * a_direc).sum(0)
+            step = np.zeros_like(rz)
+            np.divide(rz, curv, out=step, where=curv > 0)
+            coef += step * direc
+            resid -= step * a_direc
+            # the preconditioned residual are the group means of the
+            # current residual of x, as in alternating projections
+            z = resid / diag
+            if np.all(np.abs(z).max(0) <= tol * scale):
+                break
+            rz_new = (resid * z).sum(0)
+            beta = np.zeros_like(rz)
+            np.divide(rz_new, rz, out=beta, where=rz > 0)
+            direc = z + beta * direc
+            rz = rz_new
+        return x - dummy_dot(coef), iteration
+
+    def n_components(self, k0=0, k1=1):
+        """
+        Number of connected components of the groups of two factors.
+
+        Two groups are connected if they have an observation in common. The
+        number of components is the number of redundant fixed effects if
+        both factors are absorbed.
+        """
+        from scipy import sparse
+        from scipy.sparse.csgraph import connected_components
+        n0 = self.n_groups[k0]
+        n_nodes = n0 + self.n_groups[k1]
+        graph = sparse.coo_matrix((np.ones(self.nobs),
+                                   (self.group_int[k0],
+                                    n0 + self.group_int[k1])),
+                                  shape=(n_nodes, n_nodes))
+        return connected_components(graph, directed=False)[0]
+
+    def df_absorbed(self, exclude=()):
+        """
+        The degrees of freedom used up by the fixed effects.
+
+        Parameters
+        ----------
+        exclude : sequence of int
+            Factors that are not counted, e.g. factors that are nested
+            within the clusters of a cluster robust covariance.
+
+        Notes
+        -----
+        The redundant fixed effects are counted exactly for the first two
+        factors from the connected components of their groups. For each
+        further factor one redundant fixed effect is assumed, so the degrees
+        of freedom can be conservative with more than two factors.
+        """
+        factors = [k for k in range(self.k_factors) if k not in exclude]
+        if not factors:
+            return 0
+        df = self.n_groups[factors[0]]
+        if len(factors) > 1:
+            df += (self.n_groups[factors[1]] -
+                   self.n_components(factors[0], factors[1]))
+        for k in factors[2:]:
+            df += self.n_groups[k] - 1
+        return df
+
+    def is_nested(self, k, group):
+        """
+        Check whether the groups of factor k are nested within group.
+
+        Parameters
+        ----------
+        k : int
+            Index of the factor.
+        group : array-like
+            Group labels of the observations, e.g. the clusters.
+        """
+        group_int = combine_indices(np.asarray(group))[0]
+        pairs = combine_indices((self.group_int[k], group_int))[2]
+        return len(pairs) == self.n_groups[k]
+
+
 if __name__ == '__main__':
 
     #---------- examples combine_indices
@@ -388,6 +388,32 @@ def test_chain_dot():
     assert_equal(tools.chain_dot(A,B,C), np.array([[1820],[4300],[6780]]))
 
 
+def test_sparse_helpers():
+    from scipy import sparse
+    np.random.seed(12345)
+    x = sparse.rand(103, 5, density=0.2, format='csr')
+    x_dense = x.toarray()
+    weights = np.random.uniform(size=103)
+    for x_ in [x, x_dense]:
+        assert_almost_equal(tools.gram(x_), np.dot(x_dense.T, x_dense), 14)
+        assert_almost_equal(tools.gram(x_, weights),
+                            np.dot(x_dense.T * weights, x_dense), 14)
+        assert_almost_equal(tools.column_var(x_), x_dense.var(0), 14)
+        cov = np.linalg.inv(np.dot(x_dense.T, x_dense))
+        h = np.diag(tools.chain_dot(x_dense, cov, x_dense.T))
+        assert_almost_equal(tools.hat_diag(x_, cov, block_size=10), h, 14)
+    const = sparse.csr_matrix(np.ones((300, 2)) * [1., .3])
+    assert_equal(tools.column_var(const), [0, 0])
+    assert_true(sparse.issparse(tools.scale_rows(x, weights)))
+    assert_equal(tools.rank(x), 5)
+    assert_equal(tools.rank(sparse.hstack((x, x[:, :2])).tocsr()), 5)
+
+def test_dummy_sparse():
+    from statsmodels.tools.grouputils import dummy_sparse
+    g = np.array([0, 0, 2, 1, 1, 2, 0])
+    indi = dummy_sparse(g)
+    assert_equal(indi.toarray(), (g[:, None] == np.arange(3)).astype(int))
+
 class TestNanDot(object):
     @classmethod
     def setupClass(cls):
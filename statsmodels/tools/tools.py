@@ -7,6 +7,7 @@ import numpy.lib.recfunctions as nprf
 import numpy.linalg as L
 from scipy.interpolate import interp1d
 from scipy.linalg import svdvals
+from scipy import sparse
 from statsmodels.distributions import (ECDF, monotone_fn_inverter,
                                                StepFunction)
 from statsmodels.tools.data import _is_using_pandas
@@ -378,6 +379,12 @@ def rank(X, cond=1.0e-12):
     Return the rank of a matrix X based on its generalized inverse,
     not the SVD.
     """
+    if sparse.issparse(X):
+        # rank of the cross-product matrix scaled to a correlation matrix
+        xtx = gram(X)
+        std = np.sqrt(np.diag(xtx))
+        std[std == 0] = 1
+        return rank(xtx / np.outer(std, std), cond=cond)
     X = np.asarray(X)
     if len(X.shape) == 2:
         D = svdvals(X)
@@ -461,6 +468,78 @@ def chain_dot(*arrs):
     """
     return reduce(lambda x, y: np.dot(y, x), arrs[::-1])
 
+def gram(X, weights=None):
+    """
+    Returns the cross-product matrix X' diag(weights) X as a dense array.
+
+    Parameters
+    ----------
+    X : ndarray or scipy.sparse matrix
+        2d array of shape (nobs, k)
+    weights : ndarray, optional
+        1d array of weights for the rows of X.
+
+    Returns
+    -------
+    xtwx : ndarray
+        Array of shape (k, k).
+
+    Notes
+    -----
+    If X is sparse, the product is computed without densifying X.
+    """
+    if sparse.issparse(X):
+        if weights is None:
+            xtwx = X.T.dot(X)
+        else:
+            xtwx = X.T.dot(scale_rows(X, weights))
+        return xtwx.toarray()
+    if weights is None:
+        return np.dot(X.T, X)
+    return np.dot(X.T * weights, X)
+
+def scale_rows(X, weights):
+    """
+    Returns diag(weights) X, sparse if X is a scipy.sparse matrix.
+    """
+    if sparse.issparse(X):
+        return sparse.diags(weights, 0).dot(X)
+    return X * weights[:, None]
+
+def column_var(X):
+    """
+    Returns the variance of the columns of X, X can be scipy.sparse.
+    """
+    if sparse.issparse(X):
+        mean = np.asarray(X.mean(0)).ravel()
+        mean_sq = np.asarray(X.multiply(X).mean(0)).ravel()
+        var = np.maximum(mean_sq - mean**2, 0)
+        # the moment formula is not exact, constant columns are found from
+        # the column extremes so that var == 0 can be used to detect them
+        const = X.min(0).toarray().ravel() == X.max(0).toarray().ravel()
+        var[const] = 0
+        return var
+    return np.asarray(X).var(0)
+
+def hat_diag(X, normalized_cov_params, block_size=10000):
+    """
+    Returns the diagonal of X normalized_cov_params X'.
+
+    The diagonal is computed in blocks of rows and the nobs x nobs hat
+    matrix is never formed. X can be a scipy.sparse matrix.
+    """
+    nobs = X.shape[0]
+    h = np.empty(nobs)
+    for start in range(0, nobs, block_size):
+        stop = min(start + block_size, nobs)
+        xb = X[start:stop]
+        xc = xb.dot(normalized_cov_params)
+        if sparse.issparse(xb):
+            h[start:stop] = np.asarray(xb.multiply(xc).sum(1)).ravel()
+        else:
+            h[start:stop] = (xb * xc).sum(1)
+    return h
+
 def webuse(data, baseurl='http://www.stata-press.com/data/r11/', as_df=True):
     """
     Parameters
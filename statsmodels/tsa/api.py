@@ -9,6 +9,8 @@ import tsatools
 from .tsatools import (add_trend, detrend, lagmat, lagmat2ds, add_lag)
 import interp
 import stattools
-from .stattools import (adfuller, acovf, q_stat, acf, pacf_yw, pacf_ols, pacf,
-                            ccovf, ccf, periodogram, grangercausalitytests)
+from .stattools import (adfuller, adfuller_many, acovf, q_stat, acf, pacf_yw,
+                        pacf_ols, pacf, acovf_many, acf_many, pacf_many,
+                        ccovf, ccf, periodogram, grangercausalitytests,
+                        grangercausalitytests_many)
 from .base import datetools
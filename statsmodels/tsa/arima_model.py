@@ -2,8 +2,10 @@ from __future__ import absolute_import
 # for 2to3 with extensions
 
 from datetime import datetime
+from itertools import product
 
 import numpy as np
+from pandas import DataFrame
 from scipy import optimize
 from scipy.stats import t, norm
 from scipy.signal import lfilter
@@ -26,7 +28,8 @@ from statsmodels.tsa.arima_process import arma2ma
 from statsmodels.tools.numdiff import (approx_fprime, approx_fprime_cs,
         approx_hess_cs)
 from statsmodels.tsa.base.datetools import _index_date
-from statsmodels.tsa.kalmanf import KalmanFilter
+from statsmodels.tsa.kalmanf import KalmanFilter, ARMAFilterState
+from statsmodels.tools.parallel import parallel_func
 from .kalmanf import kalman_loglike
 
 _armax_notes = """
@@ -339,6 +342,9 @@ class ARMA(tsbase.TimeSeriesModel):
                     "params" : _arma_params, "extra_params" : "",
                     "extra_sections" : _armax_notes % {"Model" : "ARMA"}}
 
+    # Kalman filter used by loglike_kalman, "fast" or "numpy"
+    kalman_backend = "fast"
+
     def __init__(self, endog, order=None, exog=None, dates=None, freq=None,
                         missing='none'):
         super(ARMA, self).__init__(endog, exog, dates, freq)
@@ -396,9 +402,7 @@ class ARMA(tsbase.TimeSeriesModel):
             endog -= np.dot(exog, ols_params).squeeze()
         if q != 0:
             if p != 0:
-                armod = AR(endog).fit(ic='bic', trend='nc')
-                arcoefs_tmp = armod.params
-                p_tmp = armod.k_ar
+                arcoefs_tmp, p_tmp = self._fit_long_ar(endog, k)
                 resid = endog[p_tmp:] - np.dot(lagmat(endog, p_tmp,
                                 trim='both'), arcoefs_tmp)
                 if p < p_tmp + q:
@@ -437,6 +441,31 @@ class ARMA(tsbase.TimeSeriesModel):
         # check MA coefficients
         return start_params
 
+    def _fit_long_ar(self, endog, k):
+        """
+        Long autoregression used by the Hannan-Rissanen start parameters.
+
+        The lag length is selected by BIC. The result only depends on the
+        data and on the k exogenous variables that were partialled out, so
+        it is cached in the dict `_long_ar` keyed by k. Models of different
+        order for the same data can share this dict, see
+        `arima_select_order`.
+
+        Returns
+        -------
+        arcoefs : array
+            The AR coefficients.
+        k_ar : int
+            The selected lag length.
+        """
+        cache = getattr(self, '_long_ar', None)
+        if cache is None:
+            cache = self._long_ar = {}
+        if k not in cache:
+            armod = AR(endog).fit(ic='bic', trend='nc')
+            cache[k] = (armod.params, armod.k_ar)
+        return cache[k]
+
     def _fit_start_params(self, order, method):
         if method != 'css-mle': # use Hannan-Rissanen to get start params
             start_params = self._fit_start_params_hr(order)
@@ -454,14 +483,24 @@ class ARMA(tsbase.TimeSeriesModel):
         return start_params
 
 
+    def _use_analytic_score(self, params):
+        return (getattr(self, 'method', None) in ['mle', 'css-mle'] and
+                self.kalman_backend == "fast" and
+                not np.iscomplexobj(params))
+
     def score(self, params):
         """
         Compute the score function at params.
 
         Notes
         -----
-        This is a numerical approximation.
+        For the exact likelihood and real valued params the score is computed
+        analytically with the derivative recursions of the Kalman filter,
+        see `KalmanFilter.loglike_score`. Otherwise, this is a numerical
+        approximation.
         """
+        if self._use_analytic_score(params):
+            return KalmanFilter.loglike_score(params, self)[1]
         loglike = self.loglike
         #if self.transparams:
         #    params = self._invtransparams(params)
@@ -474,8 +513,15 @@ class ARMA(tsbase.TimeSeriesModel):
 
         Notes
         -----
-        This is a numerical approximation.
+        This is a numerical approximation. If the analytic score is
+        available, the Hessian is the central difference derivative of the
+        score, which needs 2*k filter passes instead of O(k**2) for the
+        complex step Hessian of the loglikelihood.
         """
+        if self._use_analytic_score(params):
+            hess = approx_fprime(params, self.score, centered=True)
+            hess = np.atleast_2d(hess)
+            return (hess + hess.T) / 2.
         loglike = self.loglike
         #if self.transparams:
         #    params = self._invtransparams(params)
@@ -661,8 +707,14 @@ class ARMA(tsbase.TimeSeriesModel):
     def loglike_kalman(self, params):
         """
         Compute exact loglikelihood for ARMA(p,q) model using the Kalman Filter.
+
+        Notes
+        -----
+        The filter implementation is chosen by the attribute
+        `kalman_backend`, "fast" (default) or "numpy". See
+        `KalmanFilter.loglike`.
         """
-        return KalmanFilter.loglike(params, self)
+        return KalmanFilter.loglike(params, self, backend=self.kalman_backend)
 
     def loglike_css(self, params):
         """
@@ -828,9 +880,18 @@ class ARMA(tsbase.TimeSeriesModel):
             pgtol = kwargs.get('pgtol', 1e-8)
             factr = kwargs.get('factr', 1e2)
             m = kwargs.get('m', 12)
-            mlefit = optimize.fmin_l_bfgs_b(loglike, start_params,
-                    approx_grad=True, m=m, pgtol=pgtol, factr=factr,
-                    bounds=bounds, iprint=disp)
+            if self._use_analytic_score(start_params):
+                # loglikelihood and gradient from one filter pass
+                def loglike_score(params):
+                    llf, score = KalmanFilter.loglike_score(params, self)
+                    return -llf, -score
+                mlefit = optimize.fmin_l_bfgs_b(loglike_score, start_params,
+                        m=m, pgtol=pgtol, factr=factr, bounds=bounds,
+                        iprint=disp)
+            else:
+                mlefit = optimize.fmin_l_bfgs_b(loglike, start_params,
+                        approx_grad=True, m=m, pgtol=pgtol, factr=factr,
+                        bounds=bounds, iprint=disp)
             self.mlefit = mlefit
             params = mlefit[0]
 
@@ -1521,6 +1582,291 @@ class ARIMAResultsWrapper(ARMAResultsWrapper):
 wrap.populate_wrapper(ARIMAResultsWrapper, ARIMAResults)
 
 
+def _select_order_job(endog, exog, d, orders, trend, method, ic, prune,
+                      fit_kw):
+    """
+    Fit the ARMA orders for one series and one degree of differencing.
+
+    Returns plain lists so that the output is cheap to send back from a
+    worker process: the table rows and a dict of params for the successful
+    fits keyed by (p, q).
+    """
+    if d:
+        endog = np.diff(endog, n=d)
+        if exog is not None:
+            exog = exog[d:]
+    # the long AR of the Hannan-Rissanen start params is shared by all orders
+    long_ar = {}
+    crit = {}
+    best = np.inf # best criterion of the orders with fewer lags
+    best_level = np.inf
+    level = 0
+    rows = []
+    params = {}
+    for p, q in orders:
+        if p + q > level:
+            level = p + q
+            best = min(best, best_level)
+        if prune is not None:
+            neighbors = [crit[o] for o in [(p - 1, q), (p, q - 1)]
+                         if o in crit]
+            if neighbors and min(neighbors) > best + prune:
+                crit[(p, q)] = np.inf
+                rows.append((p, d, q, np.nan, np.nan, np.nan, 'pruned'))
+                continue
+        try:
+            mod = ARMA(endog, (p, q), exog)
+            mod._long_ar = long_ar
+            res = mod.fit(trend=trend, method=method, **fit_kw)
+            aic, bic, hqic = res.aic, res.bic, res.hqic
+        except Exception, err:
+            rows.append((p, d, q, np.nan, np.nan, np.nan,
+                         'failed: %s' % str(err).split('\n')[0]))
+            continue
+        value = dict(aic=aic, bic=bic, hqic=hqic)[ic]
+        if not np.isfinite(value):
+            value = np.inf
+        crit[(p, q)] = value
+        best_level = min(best_level, value)
+        params[(p, q)] = res.params
+        rows.append((p, d, q, aic, bic, hqic, 'ok'))
+    return rows, params
+
+
+def arima_select_order(endog, max_ar=4, max_ma=2, d=0, exog=None, trend='c',
+                       method='css-mle', ic='aic', prune=None, n_jobs=1,
+                       fit_kw=None):
+    """
+    Select the order of an ARIMA model by information criteria.
+
+    Parameters
+    ----------
+    endog : array-like
+        The time series. A 2d array or DataFrame is treated as a collection
+        of series, one in each column, that are searched independently.
+    max_ar : int
+        Maximum number of AR lags. All p in 0, ..., max_ar are fit.
+    max_ma : int
+        Maximum number of MA lags. All q in 0, ..., max_ma are fit.
+    d : int or list of int
+        The degree or degrees of differencing that are searched.
+    exog : array-like, optional
+        Exogenous variables, the same for all series.
+    trend : str {'c','nc'}
+        Whether to include a constant or not.
+    method : str {'css-mle','mle','css'}
+        The method used in `ARMA.fit`.
+    ic : str {'aic', 'bic', 'hqic'}
+        The information criterion used to select the best order and to
+        prune the search.
+    prune : float or None
+        If not None, an order (p, q) is not fit if the neighbors (p-1, q)
+        and (p, q-1) all have an information criterion that is more than
+        `prune` above the best value of the orders with fewer than p + q
+        lags, or were pruned themselves. Orders are visited by increasing
+        p + q.
+    n_jobs : int
+        The number of processes. The series and degrees of differencing
+        are distributed to the processes, and require joblib. -1 uses all
+        cores.
+    fit_kw : dict, optional
+        Additional keyword arguments for `ARMA.fit`. The default sets
+        disp=-1.
+
+    Returns
+    -------
+    table : DataFrame
+        One row for each series and order with the columns series, p, d, q,
+        aic, bic, hqic and status. status is 'ok', 'pruned' or the error
+        message of a failed fit, for which the criteria are nan.
+    best : ARMAResults or ARIMAResults, or list
+        The best model of each series refit with the estimated parameters
+        as start_params. A list with one entry for each series if endog is
+        2d. The entry is None if no fit was successful.
+
+    Notes
+    -----
+    The differenced series and the long autoregression that is used for the
+    Hannan-Rissanen start parameters are computed only once for each series
+    and degree of differencing. A fit that raises an exception, for example
+    because the start parameters are not stationary, is recorded in the
+    table and the search continues.
+
+    The information criteria for different d are based on the likelihood
+    of differently differenced data. When more than one d is given, the
+    comparison across d should be treated as a heuristic.
+
+    Examples
+    --------
+    >>> table, res = arima_select_order(y, max_ar=3, max_ma=3, d=[0, 1])
+    >>> table.sort('aic').head()
+    """
+    if ic not in ['aic', 'bic', 'hqic']:
+        raise ValueError("ic must be 'aic', 'bic' or 'hqic', got %s" % ic)
+    fit_kw = dict(fit_kw or {})
+    fit_kw.setdefault('disp', -1)
+
+    if isinstance(endog, DataFrame):
+        labels = list(endog.columns)
+        series = [endog[col] for col in labels]
+        is_2d = True
+    else:
+        arr = np.asarray(endog)
+        is_2d = arr.ndim == 2 and not hasattr(endog, 'name')
+        if is_2d:
+            labels = range(arr.shape[1])
+            series = [arr[:, i] for i in labels]
+        else:
+            labels = [getattr(endog, 'name', None) or 0]
+            series = [endog]
+    if exog is not None:
+        exog_arr = np.asarray(exog, dtype=float)
+        if exog_arr.ndim == 1:
+            exog_arr = exog_arr[:, None]
+    else:
+        exog_arr = None
+
+    d_list = [d] if np.isscalar(d) else list(d)
+    orders = sorted(product(range(max_ar + 1), range(max_ma + 1)),
+                    key=lambda o: (o[0] + o[1], o[0]))
+    if trend == 'nc' and exog is None:
+        orders.remove((0, 0)) # no parameters to estimate
+    jobs = [(i, d_) for i in range(len(series)) for d_ in d_list]
+    args = (orders, trend, method, ic, prune, fit_kw)
+    data = [np.asarray(y, dtype=float) for y in series]
+
+    if n_jobs == 1:
+        out = [_select_order_job(data[i], exog_arr, d_, *args)
+               for i, d_ in jobs]
+    else:
+        parallel, p_func, n_jobs = parallel_func(_select_order_job,
+                                                 n_jobs=n_jobs, verbose=0)
+        out = parallel(p_func(data[i], exog_arr, d_, *args)
+                       for i, d_ in jobs)
+
+    rows = []
+    best = [None] * len(series)
+    best_fit = [(np.inf, None, None)] * len(series)
+    for (i, d_), (job_rows, params) in zip(jobs, out):
+        for row in job_rows:
+            rows.append((labels[i],) + row)
+            p, _, q, aic, bic, hqic = row[:6]
+            value = dict(aic=aic, bic=bic, hqic=hqic)[ic]
+            if value < best_fit[i][0]:
+                best_fit[i] = (value, (p, d_, q), params[(p, q)])
+    table = DataFrame(rows, columns=['series', 'p', 'd', 'q', 'aic', 'bic',
+                                     'hqic', 'status'])
+
+    for i, (value, order, params) in enumerate(best_fit):
+        if order is None:
+            continue
+        mod = ARIMA(series[i], order, exog)
+        best[i] = mod.fit(start_params=params, trend=trend, method=method,
+                          **fit_kw)
+
+    if not is_2d:
+        best = best[0]
+    return table, best
+
+
+def arma_fit_rolling(endog, order, start, window=None, exog=None, steps=1,
+                     refit_every=1, trend='c', method='css-mle', fit_kw=None):
+    """
+    Fit an ARMA model on expanding or rolling windows and forecast.
+
+    This is a generator that yields the parameters and the forecasts for
+    each forecast origin, so that a backtest can be processed as a stream.
+
+    Parameters
+    ----------
+    endog : array-like
+        The time series.
+    order : tuple
+        The (p, q) order of the ARMA model.
+    start : int
+        The first forecast origin. The model for origin t is estimated on
+        endog[:t], or on endog[t-window:t] if window is given.
+    window : int or None
+        The length of the rolling window. None uses an expanding window.
+    exog : array-like, optional
+        Exogenous variables. Forecasts for origin t need exog[t:t+steps],
+        so exog can have more rows than endog.
+    steps : int
+        The number of steps ahead to forecast from each origin.
+    refit_every : int
+        The parameters are estimated at every `refit_every`-th origin. In
+        between, the parameters are held fixed and only the new observation
+        is added to the Kalman filter state.
+    trend : str {'c','nc'}
+        Whether to include a constant or not.
+    method : str {'css-mle','mle','css'}
+        The method used in `ARMA.fit` for the first window. Later fits are
+        warm started from the previous parameters and do not compute start
+        parameters.
+    fit_kw : dict, optional
+        Additional keyword arguments for `ARMA.fit`. The default sets
+        disp=-1.
+
+    Yields
+    ------
+    t : int
+        The forecast origin, the number of observations that are used.
+    params : array
+        The parameters of the last fit.
+    forecast : array
+        The forecasts of endog[t:t+steps].
+    stderr : array
+        The standard errors of the forecasts.
+
+    Notes
+    -----
+    Between two refits the filter state conditions on all observations
+    since the beginning of the last estimation window, also if a rolling
+    window is used. The forecasts are computed from the exact Kalman filter
+    state, so they differ slightly from `ARMAResults.forecast`, which uses
+    the MA representation of the process, in short samples.
+
+    Examples
+    --------
+    >>> for t, params, fcast, stderr in arma_fit_rolling(y, (1, 1), 250,
+    ...                                                  refit_every=20):
+    ...     errors.append(y[t] - fcast[0])
+    """
+    endog = np.asarray(endog, dtype=float)
+    nobs = len(endog)
+    k_ar, k_ma = order
+    fit_kw = dict(fit_kw or {})
+    fit_kw.setdefault('disp', -1)
+    if exog is not None:
+        exog = np.asarray(exog, dtype=float)
+        if exog.ndim == 1:
+            exog = exog[:, None]
+        end = min(nobs, len(exog) - steps)
+        n_exog = len(exog)
+    else:
+        end = nobs
+        n_exog = nobs + steps
+    # trend and exogenous variables for all periods including forecasts
+    k_trend, X = _make_arma_exog(np.empty(n_exog), exog, trend)
+    k = k_trend + (0 if exog is None else exog.shape[1])
+
+    params = None
+    for i, t in enumerate(range(start, end + 1)):
+        if i % refit_every == 0:
+            lo = 0 if window is None else max(0, t - window)
+            mod = ARMA(endog[lo:t], order,
+                       None if exog is None else exog[lo:t])
+            res = mod.fit(start_params=params, trend=trend, method=method,
+                          **fit_kw)
+            params = res.params
+            state = ARMAFilterState(params, k_ar, k_ma, k, res.sigma2)
+            state.update(endog[lo:t], X[lo:t] if k else None)
+        else:
+            state.update(endog[t-1:t], X[t-1:t] if k else None)
+        forecast, stderr = state.forecast(steps, X[t:t+steps] if k else None)
+        yield t, params, forecast, stderr
+
+
 if __name__ == "__main__":
     import numpy as np
     import statsmodels.api as sm
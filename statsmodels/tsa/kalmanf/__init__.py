@@ -1 +1 @@
-from kalmanfilter import KalmanFilter
+from kalmanfilter import KalmanFilter, ARMAFilterState
@@ -11,6 +11,7 @@ ctypedef complex64_t COMPLEX64
 
 cdef extern from "math.h":
     double log(double x)
+    double fabs(double x)
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -139,3 +140,310 @@ def kalman_loglike_complex(ndarray[COMPLEX128, ndim=1] y,
     loglike = -.5 *(loglikelihood + nobs*nplog(sigma2))
     loglike -= nobs/2. * (log(2*pi) + 1)
     return loglike, sigma2
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def kalman_filter_fast(ndarray[DOUBLE, ndim=1] y,
+                       ndarray[DOUBLE, ndim=2] R_mat,
+                       ndarray[DOUBLE, ndim=2] T_mat,
+                       double tol=0.):
+    """
+    Typed Kalman filter recursions for an ARMA process.
+
+    Parameters
+    ----------
+    y : ndarray
+        1d array of observations, exog effects already removed.
+    R_mat : ndarray
+        r x 1 array, the state disturbance loading.
+    T_mat : ndarray
+        r x r array, the transition matrix.
+    tol : float
+        Once the forecast error variance F is within tol of one, the filter
+        has reached its steady state. The gain and the state covariance are
+        not updated anymore and F is one for the remaining observations.
+
+    Returns
+    -------
+    v : ndarray
+        1d array of one-step forecast errors.
+    F : ndarray
+        1d array of forecast error variances.
+    loglikelihood : float
+        sum of log(F)
+
+    Notes
+    -----
+    Z is assumed to be the selector [1, 0, ..., 0] as in the ARMA state
+    space form. All buffers are allocated once before the loop and the
+    recursions use only C level arithmetic.
+    """
+    cdef Py_ssize_t nobs = y.shape[0]
+    cdef Py_ssize_t m = T_mat.shape[0]
+    cdef Py_ssize_t i, j, l, n
+    cdef double F_t, v_t, tmp
+    cdef double loglikelihood = 0.
+    cdef bint steady_state = False
+
+    cdef ndarray[DOUBLE, ndim=1] v = zeros(nobs)
+    cdef ndarray[DOUBLE, ndim=1] F = ones(nobs)
+    cdef ndarray[DOUBLE, ndim=1] alpha = zeros(m)
+    cdef ndarray[DOUBLE, ndim=1] alpha_tmp = zeros(m)
+    cdef ndarray[DOUBLE, ndim=1] K = zeros(m)
+    cdef ndarray[DOUBLE, ndim=2] TP = zeros((m, m))
+    cdef ndarray[DOUBLE, ndim=2] RR = dot(R_mat, R_mat.T)
+    # initial variance, unconditional variance of the state
+    cdef ndarray[DOUBLE, ndim=2] P = dot(pinv(identity(m**2) -
+                        kron(T_mat, T_mat)), RR.ravel('F')).reshape(m, m,
+                        order='F')
+
+    for i in range(nobs):
+        v_t = y[i] - alpha[0]
+        v[i] = v_t
+        if not steady_state:
+            F_t = P[0,0]
+            F[i] = F_t
+            loglikelihood += log(F_t)
+            # TP = T P
+            for j in range(m):
+                for l in range(m):
+                    tmp = 0.
+                    for n in range(m):
+                        tmp += T_mat[j,n] * P[n,l]
+                    TP[j,l] = tmp
+            # Kalman gain K = T P Z' / F
+            for j in range(m):
+                K[j] = TP[j,0] / F_t
+            # P = T P L' + R R' with L = T - K Z
+            for j in range(m):
+                for l in range(m):
+                    tmp = RR[j,l] - TP[j,0] * K[l]
+                    for n in range(m):
+                        tmp += TP[j,n] * T_mat[l,n]
+                    P[j,l] = tmp
+            if fabs(F_t - 1.) <= tol:
+                steady_state = True
+        # update state, alpha = T alpha + K v
+        for j in range(m):
+            tmp = K[j] * v_t
+            for n in range(m):
+                tmp += T_mat[j,n] * alpha[n]
+            alpha_tmp[j] = tmp
+        for j in range(m):
+            alpha[j] = alpha_tmp[j]
+    return v, F, loglikelihood
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def kalman_loglike_fast(ndarray[DOUBLE, ndim=1] y,
+                        ndarray[DOUBLE, ndim=2] R_mat,
+                        ndarray[DOUBLE, ndim=2] T_mat,
+                        double tol=0.):
+    """
+    Concentrated exact loglikelihood of an ARMA process.
+
+    See kalman_filter_fast for the parameters.
+    """
+    cdef Py_ssize_t i
+    cdef Py_ssize_t nobs = y.shape[0]
+    cdef double sigma2 = 0.
+    cdef double loglike
+    cdef ndarray[DOUBLE, ndim=1] v, F
+    v, F, loglikelihood = kalman_filter_fast(y, R_mat, T_mat, tol)
+    for i in range(nobs):
+        sigma2 += v[i] * v[i] / F[i]
+    sigma2 /= nobs
+    loglike = -.5 * (loglikelihood + nobs * log(sigma2))
+    loglike -= nobs / 2. * (log(2 * pi) + 1)
+    return loglike, sigma2
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+def kalman_score_fast(ndarray[DOUBLE, ndim=1] y,
+                      ndarray[DOUBLE, ndim=2] exog,
+                      ndarray[DOUBLE, ndim=2] R_mat,
+                      ndarray[DOUBLE, ndim=2] T_mat,
+                      unsigned int k_ar, unsigned int k_ma,
+                      double tol=0.):
+    """
+    Concentrated exact loglikelihood of an ARMA process and its gradient.
+
+    The derivatives of the forecast errors and their variances are
+    computed by running the derivative recursions of the Kalman filter
+    alongside the filter, see Harvey (1989) section 3.4.6.
+
+    Parameters
+    ----------
+    y : ndarray
+        1d array of observations, exog effects already removed.
+    exog : ndarray
+        nobs x k array of trend and exogenous variables. k can be zero.
+    R_mat : ndarray
+        r x 1 array, the state disturbance loading.
+    T_mat : ndarray
+        r x r array, the transition matrix.
+    k_ar, k_ma : int
+        The number of AR and MA coefficients.
+    tol : float
+        See kalman_filter_fast.
+
+    Returns
+    -------
+    loglike : float
+    sigma2 : float
+    score : ndarray
+        The derivative of loglike with respect to the (untransformed)
+        parameters, exog coefficients, AR and then MA coefficients.
+    """
+    cdef Py_ssize_t nobs = y.shape[0]
+    cdef Py_ssize_t m = T_mat.shape[0]
+    cdef Py_ssize_t k = exog.shape[1]
+    cdef Py_ssize_t npar = k + k_ar + k_ma
+    cdef Py_ssize_t i, j, l, n, ip, ir
+    cdef double F_t, v_t, tmp, dF, dv
+    cdef double sum_logF = 0., ssq = 0., sigma2, loglike
+    cdef bint steady_state = False
+
+    cdef ndarray[DOUBLE, ndim=1] alpha = zeros(m)
+    cdef ndarray[DOUBLE, ndim=1] alpha_tmp = zeros(m)
+    cdef ndarray[DOUBLE, ndim=1] K = zeros(m)
+    cdef ndarray[DOUBLE, ndim=2] TP = zeros((m, m))
+    cdef ndarray[DOUBLE, ndim=2] W = zeros((m, m))
+    cdef ndarray[DOUBLE, ndim=1] R = R_mat[:,0].copy()
+    cdef ndarray[DOUBLE, ndim=2] RR = dot(R_mat, R_mat.T)
+    # derivatives, first axis is the parameter
+    cdef ndarray[DOUBLE, ndim=2] dalpha = zeros((npar, m))
+    cdef ndarray[DOUBLE, ndim=2] dK = zeros((npar, m))
+    cdef ndarray[DOUBLE, ndim=1] dTP0 = zeros(m)
+    cdef ndarray[DOUBLE, ndim=1] dsum_logF = zeros(npar)
+    cdef ndarray[DOUBLE, ndim=1] dssq = zeros(npar)
+    cdef ndarray[DOUBLE, ndim=1] score = zeros(npar)
+
+    # initial variance and its derivatives solve Lyapunov equations
+    cdef ndarray[DOUBLE, ndim=2] lyap = pinv(identity(m**2) -
+                                             kron(T_mat, T_mat))
+    cdef ndarray[DOUBLE, ndim=2] P = dot(lyap, RR.ravel('F')).reshape(m, m,
+                                                                 order='F')
+    cdef ndarray[DOUBLE, ndim=3] dP = zeros((npar, m, m))
+    for ip in range(k_ar):
+        dT = zeros((m, m))
+        dT[ip,0] = 1.
+        Q = dot(dot(dT, P), T_mat.T)
+        Q = Q + Q.T
+        dP[k+ip] = dot(lyap, Q.ravel('F')).reshape(m, m, order='F')
+    for ip in range(k_ma):
+        dR = zeros((m, 1))
+        dR[ip+1,0] = 1.
+        Q = dot(dR, R_mat.T)
+        Q = Q + Q.T
+        dP[k+k_ar+ip] = dot(lyap, Q.ravel('F')).reshape(m, m, order='F')
+
+    for i in range(nobs):
+        v_t = y[i] - alpha[0]
+        if not steady_state:
+            F_t = P[0,0]
+            sum_logF += log(F_t)
+            # TP = T P
+            for j in range(m):
+                for l in range(m):
+                    tmp = 0.
+                    for n in range(m):
+                        tmp += T_mat[j,n] * P[n,l]
+                    TP[j,l] = tmp
+            for j in range(m):
+                K[j] = TP[j,0] / F_t
+        ssq += v_t * v_t / F_t
+
+        for ip in range(npar):
+            dv = -dalpha[ip,0]
+            if ip < k:
+                dv -= exog[i,ip]
+            if not steady_state:
+                dF = dP[ip,0,0]
+                dsum_logF[ip] += dF / F_t
+            else:
+                dF = 0.
+            dssq[ip] += 2 * v_t * dv / F_t - v_t * v_t * dF / (F_t * F_t)
+
+            if not steady_state:
+                # d(T P Z') = dT P Z' + T dP Z'
+                for j in range(m):
+                    tmp = 0.
+                    for n in range(m):
+                        tmp += T_mat[j,n] * dP[ip,n,0]
+                    dTP0[j] = tmp
+                if k <= ip < k + k_ar:
+                    dTP0[ip-k] += P[0,0]
+                for j in range(m):
+                    dK[ip,j] = (dTP0[j] - K[j] * dF) / F_t
+
+                # dP = d(T P T') - d(F K K') + d(R R')
+                # W = T dP
+                for j in range(m):
+                    for l in range(m):
+                        tmp = 0.
+                        for n in range(m):
+                            tmp += T_mat[j,n] * dP[ip,n,l]
+                        W[j,l] = tmp
+                for j in range(m):
+                    for l in range(m):
+                        tmp = -dF * K[j] * K[l] - F_t * (dK[ip,j] * K[l] +
+                                                         K[j] * dK[ip,l])
+                        for n in range(m):
+                            tmp += W[j,n] * T_mat[l,n]
+                        dP[ip,j,l] = tmp
+                if k <= ip < k + k_ar:
+                    # dT P T' + T P dT', with P T' = (T P)' for symmetric P
+                    ir = ip - k
+                    for j in range(m):
+                        dP[ip,ir,j] += TP[j,0]
+                        dP[ip,j,ir] += TP[j,0]
+                elif ip >= k + k_ar:
+                    # dR R' + R dR'
+                    ir = ip - k - k_ar + 1
+                    for j in range(m):
+                        dP[ip,ir,j] += R[j]
+                        dP[ip,j,ir] += R[j]
+
+            # dalpha = dT alpha + T dalpha + dK v + K dv
+            for j in range(m):
+                tmp = dK[ip,j] * v_t + K[j] * dv
+                for n in range(m):
+                    tmp += T_mat[j,n] * dalpha[ip,n]
+                alpha_tmp[j] = tmp
+            if k <= ip < k + k_ar:
+                alpha_tmp[ip-k] += alpha[0]
+            for j in range(m):
+                dalpha[ip,j] = alpha_tmp[j]
+
+        if not steady_state:
+            # P = T P T' - F K K' + R R'
+            for j in range(m):
+                for l in range(m):
+                    tmp = RR[j,l] - TP[j,0] * K[l]
+                    for n in range(m):
+                        tmp += TP[j,n] * T_mat[l,n]
+                    P[j,l] = tmp
+            if fabs(F_t - 1.) <= tol:
+                steady_state = True
+                # F is set to one from here on as in kalman_filter_fast
+                F_t = 1.
+
+        # alpha = T alpha + K v
+        for j in range(m):
+            tmp = K[j] * v_t
+            for n in range(m):
+                tmp += T_mat[j,n] * alpha[n]
+            alpha_tmp[j] = tmp
+        for j in range(m):
+            alpha[j] = alpha_tmp[j]
+
+    sigma2 = ssq / nobs
+    loglike = -.5 * (sum_logF + nobs * log(sigma2))
+    loglike -= nobs / 2. * (log(2 * pi) + 1)
+    for ip in range(npar):
+        score[ip] = -.5 * (dsum_logF[ip] + nobs * dssq[ip] / ssq)
+    return loglike, sigma2, score
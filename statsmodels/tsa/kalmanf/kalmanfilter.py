@@ -611,7 +611,7 @@ class KalmanFilter(object):
                newparams, Z_mat, m, R_mat, T_mat, paramsdtype)
 
     @classmethod
-    def loglike(cls, params, arma_model):
+    def loglike(cls, params, arma_model, backend="fast"):
         """
         The loglikelihood for an ARMA model using the Kalman Filter recursions.
 
@@ -623,12 +623,17 @@ class KalmanFilter(object):
             coefficients, then the `q` MA coefficients.
         arma_model : `statsmodels.tsa.arima.ARMA` instance
             A reference to the ARMA model instance.
+        backend : str {"fast", "numpy"}
+            "fast" uses the typed filter `kalman_loglike_fast` with
+            preallocated buffers for real valued parameters. "numpy" uses
+            the filter based on numpy array operations.
 
         Notes
         -----
         This works for both real valued and complex valued parameters. The
         complex values being used to compute the numerical derivative. If
-        available will use a Cython version of the Kalman Filter.
+        available will use a Cython version of the Kalman Filter. Complex
+        valued parameters always use the "numpy" backend.
         """
         #TODO: see section 3.4.6 in Harvey for computing the derivatives in the
         # recursion itself.
@@ -636,7 +641,15 @@ class KalmanFilter(object):
         (y, k, nobs, k_ar, k_ma, k_lags, newparams, Z_mat, m, R_mat, T_mat,
                 paramsdtype) = cls._init_kalman_state(params, arma_model)
 
-        if issubdtype(paramsdtype, float):
+        if backend not in ["fast", "numpy"]:
+            raise ValueError("backend %s not understood" % backend)
+
+        if issubdtype(paramsdtype, float) and backend == "fast":
+            loglike, sigma2 = kalman_loglike.kalman_loglike_fast(y, R_mat,
+                                                                 T_mat)
+            arma_model.sigma2 = sigma2
+            return loglike
+        elif issubdtype(paramsdtype, float):
             loglike, sigma2 =  kalman_loglike.kalman_loglike_double(y, k,
                                     k_ar, k_ma, k_lags, int(nobs), Z_mat,
                                     R_mat, T_mat)
@@ -650,6 +663,179 @@ class KalmanFilter(object):
         arma_model.sigma2 = sigma2
         return loglike.item() # return a scalar not a 0d array
 
+    @classmethod
+    def loglike_score(cls, params, arma_model):
+        """
+        The loglikelihood and its gradient for an ARMA model.
+
+        Parameters
+        ----------
+        params : array
+            The coefficients of the ARMA model, see `loglike`. Only real
+            valued parameters are supported.
+        arma_model : `statsmodels.tsa.arima.ARMA` instance
+            A reference to the ARMA model instance.
+
+        Returns
+        -------
+        loglike : float
+            The exact loglikelihood as returned by `loglike`.
+        score : array
+            The gradient of loglike with respect to params.
+
+        Notes
+        -----
+        The derivatives of the forecast errors and of their variances are
+        computed analytically by recursions that run alongside the filter,
+        see Harvey (1989), section 3.4.6. If the model uses transformed
+        parameters, the gradient is mapped back with the Jacobian of the
+        transformation.
+        """
+        (y, k, nobs, k_ar, k_ma, k_lags, newparams, Z_mat, m, R_mat, T_mat,
+                paramsdtype) = cls._init_kalman_state(params, arma_model)
+        if k > 0:
+            exog = np.asarray(arma_model.exog, dtype=float)
+        else:
+            exog = zeros((int(nobs), 0))
+        loglike, sigma2, score = kalman_loglike.kalman_score_fast(y, exog,
+                                            R_mat, T_mat, k_ar, k_ma)
+        if arma_model.transparams:
+            from statsmodels.tools.numdiff import approx_fprime_cs
+            # chain rule, the transformation does not involve the filter
+            jac = np.atleast_2d(approx_fprime_cs(params,
+                                    arma_model._transparams, epsilon=1e-20))
+            score = dot(score, jac)
+        arma_model.sigma2 = sigma2
+        return loglike, score
+
+
+class ARMAFilterState(object):
+    """
+    Kalman filter state of an ARMA model that is updated observation by
+    observation.
+
+    Parameters
+    ----------
+    params : array
+        The untransformed ARMA parameters, `k` trend and exogenous
+        coefficients, the AR and then the MA coefficients.
+    k_ar : int
+        The AR order.
+    k_ma : int
+        The MA order.
+    k : int
+        The number of trend and exogenous variables.
+    sigma2 : float
+        The variance of the innovations, used for the forecast errors.
+    tol : float
+        Once the one-step forecast variance is within tol of one, the filter
+        has converged and only the state mean is updated.
+
+    Notes
+    -----
+    The filter starts from the unconditional distribution of the state as in
+    `KalmanFilter.loglike`. With the parameters held fixed, observations
+    that arrive later can be appended with `update` instead of running the
+    filter again from the start of the sample.
+    """
+
+    def __init__(self, params, k_ar, k_ma, k=0, sigma2=1., tol=1e-12):
+        self.tol = tol
+        self.params = params = np.asarray(params, dtype=float)
+        self.k = k
+        self.sigma2 = sigma2
+        r = max(k_ar, k_ma + 1)
+        self.T = T = KalmanFilter.T(params, r, k, k_ar)
+        R = KalmanFilter.R(params, r, k, k_ma, k_ar)
+        self.RR = RR = dot(R, R.T)
+        self.alpha = zeros(r)
+        self.P = np.linalg.solve(eye(r**2) - kron(T, T),
+                                 RR.ravel('F')).reshape(r, r, order='F')
+        self.nobs = 0
+        self._steady = False
+
+    def _demean(self, y, exog):
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        if self.k > 0:
+            if exog is None:
+                raise ValueError("exog is required for a model with trend "
+                                 "or exogenous variables")
+            exog = np.asarray(exog, dtype=float).reshape(len(y), self.k)
+            y = y - dot(exog, self.params[:self.k])
+        return y
+
+    def update(self, y, exog=None):
+        """
+        Add observations to the filter.
+
+        Parameters
+        ----------
+        y : array-like
+            The new observations of the endogenous variable.
+        exog : array-like, optional
+            The trend and exogenous variables for the new observations,
+            including the constant, required if k > 0.
+        """
+        y = self._demean(y, exog)
+        T, RR, alpha, P = self.T, self.RR, self.alpha, self.P
+        i = 0
+        nobs = len(y)
+        while i < nobs and not self._steady:
+            v = y[i] - alpha[0]
+            F = P[0, 0]
+            K = dot(T, P[:, 0]) / F
+            alpha = dot(T, alpha) + K * v
+            P = chain_dot(T, P, T.T) + RR - np.outer(K, K) * F
+            # P converges to RR', then the gain is fixed at K = T R
+            self._steady = abs(P[0, 0] - 1) < self.tol
+            i += 1
+        if i < nobs:
+            K = dot(T, RR[:, 0])
+            TK = T.copy()
+            TK[:, 0] -= K # T - K Z
+            for y_t in y[i:]:
+                alpha = dot(TK, alpha) + K * y_t
+            P = RR
+        self.alpha, self.P = alpha, P
+        self.nobs += len(y)
+        return self
+
+    def forecast(self, steps=1, exog=None):
+        """
+        Forecasts from the current state.
+
+        Parameters
+        ----------
+        steps : int
+            The number of steps ahead.
+        exog : array-like, optional
+            The trend and exogenous variables for the forecast periods,
+            including the constant, required if k > 0.
+
+        Returns
+        -------
+        forecast : array
+            The forecasts for the next `steps` observations.
+        stderr : array
+            The standard errors of the forecasts.
+        """
+        T, RR = self.T, self.RR
+        alpha, P = self.alpha, self.P
+        forecast = zeros(steps)
+        mse = zeros(steps)
+        for h in range(steps):
+            forecast[h] = alpha[0]
+            mse[h] = P[0, 0]
+            alpha = dot(T, alpha)
+            P = chain_dot(T, P, T.T) + RR
+        if self.k > 0:
+            if exog is None:
+                raise ValueError("exog is required for a model with trend "
+                                 "or exogenous variables")
+            exog = np.asarray(exog, dtype=float).reshape(steps, self.k)
+            forecast += dot(exog, self.params[:self.k])
+        return forecast, np.sqrt(self.sigma2 * mse)
+
 
 if __name__ == "__main__":
     import numpy as np
@@ -17,6 +17,118 @@ class ResultsStore(object):
     def __str__(self):
         return self._str  # pylint: disable=E1101
 
+def _nested_ols(endog, exog):
+    """
+    OLS statistics for the regressions on all column prefixes of exog
+
+    Parameters
+    ----------
+    endog : ndarray, (..., nobs)
+        The dependent variable.
+    exog : ndarray, (..., nobs, k_vars)
+        The explanatory variables. Leading dimensions of endog and exog are
+        broadcast against each other, each element is a separate regression.
+
+    Returns
+    -------
+    ssr : ndarray, (..., k_vars)
+        ssr[..., k] is the sum of squared residuals of the regression of
+        endog on exog[..., :k+1].
+    tvalues : ndarray, (..., k_vars)
+        tvalues[..., k] is the t-value of the parameter of the last column
+        exog[..., k] in the regression on exog[..., :k+1].
+    full_rank : ndarray of bool, (...)
+        False if the columns of exog are (numerically) linearly dependent, in
+        which case ssr and tvalues are not valid.
+
+    Notes
+    -----
+    Uses a single QR decomposition of the augmented matrix [exog, endog] for
+    each regression. Since the column spaces are nested, the QR decomposition
+    of every column prefix of exog is a prefix of the QR decomposition of
+    exog, and the sum of squared residuals of a prefix is the ssr of the full
+    regression plus the explained sum of squares of the dropped columns.
+    """
+    endog = np.asarray(endog, dtype=float)
+    exog = np.asarray(exog, dtype=float)
+    nobs, k_vars = exog.shape[-2:]
+    lead = np.broadcast(exog[..., 0, 0], endog[..., 0]).shape
+    # the transposed augmented matrices, so that each regression is in
+    # Fortran order for LAPACK
+    aug = np.empty(lead + (k_vars + 1, nobs))
+    aug[..., :k_vars, :] = np.swapaxes(exog, -1, -2)
+    aug[..., k_vars, :] = endog
+    r = np.zeros(lead + (k_vars + 1, k_vars + 1))
+    aug_flat = aug.reshape(-1, k_vars + 1, nobs)
+    r_flat = r.reshape(-1, k_vars + 1, k_vars + 1)
+    for i in range(aug_flat.shape[0]):
+        r_i = np.linalg.qr(aug_flat[i].T, mode='r')
+        r_flat[i, :r_i.shape[0]] = r_i
+
+    r_diag = np.diagonal(r, axis1=-2, axis2=-1)[..., :k_vars]
+    col_norm = np.sqrt((aug[..., :k_vars, :]**2).sum(-1))
+    full_rank = np.all(np.abs(r_diag) > 1e-10 * col_norm, axis=-1)
+    # Q'endog with the sign of the parameters
+    qty = r[..., :k_vars, k_vars] * np.sign(r_diag)
+    ess_dropped = np.cumsum(qty[..., :0:-1]**2, axis=-1)[..., ::-1]
+    ssr = r[..., k_vars, k_vars, None]**2 + np.concatenate((ess_dropped,
+                                            np.zeros(lead + (1,))), axis=-1)
+    df_resid = nobs - np.arange(1, k_vars + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tvalues = qty / np.sqrt(ssr / df_resid)
+    return ssr, tvalues, full_rank
+
+def _autolag_nested(endog, exog, startlag, maxlag, method):
+    """
+    Lag length selection for OLS from the nested regressions.
+
+    Same as `_autolag` with `OLS`, but the information criteria and the
+    t-values for all lag lengths are computed from one QR decomposition,
+    see `_nested_ols`. The leading dimensions of endog and exog are batches
+    of regressions.
+
+    Returns
+    -------
+    icbest : ndarray
+        Best information criteria.
+    bestlag : ndarray
+        The lag length that minimizes the information criterion.
+    full_rank : ndarray of bool
+        False if the regressors are linearly dependent, then the lag length
+        selection is not valid.
+    """
+    method = method.lower()
+    if method not in ["aic", "bic", "t-stat"]:
+        raise ValueError("Information Criterion %s not understood." % method)
+    ssr, tvalues, full_rank = _nested_ols(endog,
+                                          exog[..., :startlag + maxlag])
+    ssr = ssr[..., startlag - 1:]
+    tvalues = tvalues[..., startlag - 1:]
+    k_params = np.arange(startlag, startlag + maxlag + 1)
+    nobs = exog.shape[-2]
+    nobs2 = nobs / 2.0
+    with np.errstate(divide='ignore'):
+        llf = -np.log(ssr) * nobs2 - (1 + np.log(np.pi / nobs2)) * nobs2
+
+    if method == "aic":
+        ic = -2 * llf + 2 * k_params
+        idx = np.argmin(ic, axis=-1)
+    elif method == "bic":
+        ic = -2 * llf + np.log(nobs) * k_params
+        idx = np.argmin(ic, axis=-1)
+    else:
+        #stop = stats.norm.ppf(.95)
+        stop = 1.6448536269514722
+        ic = np.abs(tvalues)
+        # longest lag with a significant last lag, or no lags if there is
+        # none
+        with np.errstate(invalid='ignore'):
+            signif = ic[..., ::-1] >= stop
+        idx = np.where(signif.any(-1), maxlag - np.argmax(signif, axis=-1), 0)
+    ic = ic.reshape(-1, maxlag + 1)
+    icbest = ic[np.arange(ic.shape[0]), idx.ravel()].reshape(idx.shape)
+    return icbest, startlag + idx, full_rank
+
 def _autolag(mod, endog, exog, startlag, maxlag, method, modargs=(),
         fitargs=(), regresults=False):
     """
@@ -53,11 +165,22 @@ def _autolag(mod, endog, exog, startlag, maxlag, method, modargs=(),
     where i goes from lagstart to lagstart+maxlag+1.  Therefore, lags are
     assumed to be in contiguous columns from low to high lag length with
     the highest lag in the last column.
+
+    If mod is OLS and the regression results are not requested, then the
+    information criteria for all lags are computed from a single QR
+    decomposition of exog, see `_autolag_nested`. For the t-stat method no
+    lags are used if none of the last lags is significant.
     """
     #TODO: can tcol be replaced by maxlag + 2?
     #TODO: This could be changed to laggedRHS and exog keyword arguments if
     #    this will be more general.
 
+    if mod is OLS and not modargs and not regresults:
+        icbest, bestlag, full_rank = _autolag_nested(endog, exog, startlag,
+                                                     maxlag, method)
+        if full_rank:
+            return icbest[()], int(bestlag)
+
     results = {}
     method = method.lower()
     for lag in range(startlag, startlag+maxlag+1):
@@ -269,6 +392,145 @@ def adfuller(x, maxlag=None, regression="c", autolag='AIC',
         else:
             return adfstat, pvalue, usedlag, nobs, critvalues, icbest
 
+def _adf_design(xt, xdifft, lags, k_trend, level_first):
+    """
+    Regressors of the ADF regression with `lags` lagged differences.
+
+    xt and xdifft are 2d with series in rows. The regressors are returned
+    with shape (k_series, nobs, k_trend + 1 + lags), the trend columns
+    first, and the lagged level either before or after the lagged
+    differences.
+    """
+    nobs = xdifft.shape[1] - lags
+    k_series = xt.shape[0]
+    exog = np.empty((k_series, k_trend + 1 + lags, nobs))
+    trend = np.arange(1., nobs + 1)
+    for i in range(k_trend):
+        exog[:, i] = trend**i
+    level = k_trend if level_first else k_trend + lags
+    exog[:, level] = xt[:, lags:-1]
+    start = k_trend + 1 if level_first else k_trend
+    for i in range(1, lags + 1):
+        exog[:, start + i - 1] = xdifft[:, lags - i:-i]
+    return np.swapaxes(exog, 1, 2)
+
+def adfuller_many(x, maxlag=None, regression="c", autolag='AIC',
+                  block_size=2**22):
+    """
+    Augmented Dickey-Fuller unit root test for many series
+
+    Parameters
+    ----------
+    x : array_like, 2d
+        The series in columns.
+    maxlag : int
+        Maximum lag which is included in test, default 12*(nobs/100)^{1/4}
+    regression : str {'c','ct','ctt','nc'}
+        Constant and trend order to include in regression
+        * 'c' : constant only
+        * 'ct' : constant and trend
+        * 'ctt' : constant, and linear and quadratic trend
+        * 'nc' : no constant, no trend
+    autolag : {'AIC', 'BIC', 't-stat', None}
+        Method to choose the number of lags for each series, see `adfuller`.
+    block_size : int
+        Approximate number of elements of the regressor arrays that are
+        computed at the same time, which limits the memory usage.
+
+    Returns
+    -------
+    adf : ndarray
+        Test statistics
+    pvalue : ndarray
+        MacKinnon's approximate p-values based on MacKinnon (1994)
+    usedlag : ndarray
+        Number of lags used.
+    nobs : ndarray
+        Number of observations used for the ADF regression and calculation of
+        the critical values.
+    critical values : dict
+        Critical values for the test statistic at the 1 %, 5 %, and 10 %
+        levels, each an array over series. Based on MacKinnon (2010)
+    icbest : ndarray
+        The maximized information criterion if autolag is not None.
+
+    Notes
+    -----
+    The results are the same as those of `adfuller` applied to each column.
+    The regressions for all lag lengths and all series in a block are
+    computed from one QR decomposition per series, see `_nested_ols`. Series
+    for which the regressors are linearly dependent, e.g. constant series,
+    are handled by `adfuller`.
+
+    See Also
+    --------
+    adfuller
+    """
+    trenddict = {None:'nc', 0:'c', 1:'ct', 2:'ctt'}
+    if regression is None or isinstance(regression, int):
+        regression = trenddict[regression]
+    regression = regression.lower()
+    if regression not in ['c','nc','ct','ctt']:
+        raise ValueError("regression option %s not understood" % regression)
+    x = np.asarray(x, dtype=float)
+    if x.ndim == 1:
+        x = x[:,None]
+    nobs, k_series = x.shape
+    k_trend = ['nc', 'c', 'ct', 'ctt'].index(regression)
+
+    if maxlag is None:
+        #from Greene referencing Schwert 1989
+        maxlag = int(np.ceil(12. * np.power(nobs/100., 1/4.)))
+
+    xt = x.T.copy()
+    xdifft = np.diff(xt, axis=1)
+    n_block = max(1, block_size // (nobs * (k_trend + maxlag + 2)))
+    blocks = [slice(i, i + n_block) for i in range(0, k_series, n_block)]
+
+    if autolag:
+        icbest = np.empty(k_series)
+        usedlag = np.empty(k_series, int)
+        full_rank = np.empty(k_series, bool)
+        for sl in blocks:
+            exog = _adf_design(xt[sl], xdifft[sl], maxlag, k_trend, True)
+            icbest[sl], usedlag[sl], full_rank[sl] = _autolag_nested(
+                    xdifft[sl, maxlag:], exog, k_trend + 1, maxlag, autolag)
+            usedlag[sl] -= k_trend + 1
+    else:
+        usedlag = np.repeat(maxlag, k_series)
+        full_rank = np.ones(k_series, bool)
+
+    # the ADF regression with the level in the last column
+    adfstat = np.empty(k_series)
+    for lags in np.unique(usedlag):
+        idx = np.nonzero(usedlag == lags)[0]
+        for i in range(0, len(idx), n_block):
+            sl = idx[i:i + n_block]
+            exog = _adf_design(xt[sl], xdifft[sl], lags, k_trend, False)
+            _, tvalues, rank_ok = _nested_ols(xdifft[sl, lags:], exog)
+            adfstat[sl] = tvalues[:, -1]
+            full_rank[sl] &= rank_ok
+
+    for i in np.nonzero(~full_rank)[0]:
+        res = adfuller(x[:, i], maxlag=maxlag, regression=regression,
+                       autolag=autolag)
+        adfstat[i], usedlag[i] = res[0], res[2]
+        if autolag:
+            icbest[i] = res[5]
+
+    used_nobs = nobs - 1 - usedlag
+    pvalue = np.array([mackinnonp(stat, regression=regression, N=1)
+                       for stat in adfstat])
+    crit = np.empty((k_series, 3))
+    for n in np.unique(used_nobs):
+        crit[used_nobs == n] = mackinnoncrit(N=1, regression=regression,
+                                             nobs=n)
+    critvalues = {"1%" : crit[:,0], "5%" : crit[:,1], "10%" : crit[:,2]}
+    if not autolag:
+        return adfstat, pvalue, usedlag, used_nobs, critvalues
+    else:
+        return adfstat, pvalue, usedlag, used_nobs, critvalues, icbest
+
 def acovf(x, unbiased=False, demean=True, fft=False):
     '''
     Autocovariance for 1D
@@ -313,7 +575,7 @@ def acovf(x, unbiased=False, demean=True, fft=False):
         return (np.correlate(xo, xo, 'full')/d)[n-1:]
 
 
-def q_stat(x,nobs, type="ljungbox"):
+def q_stat(x,nobs, type="ljungbox", axis=0):
     """
     Return's Ljung-Box Q Statistic
 
@@ -322,6 +584,9 @@ def q_stat(x,nobs, type="ljungbox"):
     nobs : int
         Number of observations in the entire sample (ie., not just the length
         of the autocorrelation function results.
+    axis : int
+        The axis of the lags if x contains the autocorrelations of several
+        series.
 
     Returns
     -------
@@ -335,10 +600,12 @@ def q_stat(x,nobs, type="ljungbox"):
     Written to be used with acf.
     """
     x = np.asarray(x)
+    shape = [1] * x.ndim
+    shape[axis] = -1
+    lags = np.arange(1, x.shape[axis]+1).reshape(shape)
     if type=="ljungbox":
-        ret = nobs*(nobs+2)*np.cumsum((1./(nobs-np.arange(1,
-            len(x)+1)))*x**2)
-    chi2 = stats.chi2.sf(ret,np.arange(1,len(x)+1))
+        ret = nobs*(nobs+2)*np.cumsum((1./(nobs-lags))*x**2, axis=axis)
+    chi2 = stats.chi2.sf(ret,lags)
     return ret,chi2
 
 #NOTE: Changed unbiased to False
@@ -443,7 +710,7 @@ def acf(x, unbiased=False, nlags=40, confint=None, qstat=False, fft=False,
             return acf, qstat, pvalue
 
 def pacf_yw(x, nlags=40, method='unbiased'):
-    '''Partial autocorrelation estimated with non-recursive yule_walker
+    '''Partial autocorrelation estimated with Yule-Walker
 
     Parameters
     ----------
@@ -461,14 +728,15 @@ def pacf_yw(x, nlags=40, method='unbiased'):
 
     Notes
     -----
-    This solves yule_walker for each desired lag and contains
-    currently duplicate calculations.
+    The Yule-Walker equations for all lags are solved with the
+    Levinson-Durbin recursion from the same autocovariances as in
+    yule_walker.
     '''
-    xm = x - x.mean()
-    pacf = [1.]
-    for k in range(1, nlags+1):
-        pacf.append(yule_walker(x, k, method=method)[0][-1])
-    return np.array(pacf)
+    method = str(method).lower()
+    if method not in ["unbiased", "mle"]:
+        raise ValueError("ACF estimation method must be 'unbiased' or 'MLE'")
+    acv = acovf(x, unbiased=(method == "unbiased"))
+    return levinson_durbin(acv, nlags=nlags, isacov=True)[2]
 
 #NOTE: this is incorrect.
 def pacf_ols(x, nlags=40):
@@ -539,8 +807,8 @@ def pacf(x, nlags=40, method='ywunbiased', alpha=None):
 
     Notes
     -----
-    This solves yule_walker equations or ols for each desired lag
-    and contains currently duplicate calculations.
+    The Yule-Walker equations for all lags are solved by the Levinson-Durbin
+    recursion, the ols method solves a separate regression for each lag.
     '''
 
     if method == 'ols':
@@ -570,6 +838,230 @@ def pacf(x, nlags=40, method='ywunbiased', alpha=None):
 
 
 
+def acovf_many(x, unbiased=False, demean=True, nlags=None, axis=0,
+               block_size=2**22):
+    '''
+    Autocovariance for many series
+
+    Parameters
+    ----------
+    x : array
+        Time series data, with time along `axis`.
+    unbiased : bool
+        If True, then denominators is n-k, otherwise n
+    demean : bool
+        If True, then subtract the mean of each series
+    nlags : int, optional
+        Largest lag of the returned autocovariances, default is all lags.
+        nlags is at most nobs - 1.
+    axis : int
+        The time axis of x.
+    block_size : int
+        Approximate number of elements of the FFT workspace, which limits
+        the memory usage for a large number of series.
+
+    Returns
+    -------
+    acovf : array
+        autocovariance functions with the lags along `axis`
+
+    Notes
+    -----
+    The autocovariances are computed with one real FFT of the zero padded
+    series for each block of series, the padded workspace is reused for
+    all blocks.
+    '''
+    x = np.asarray(x, dtype=float)
+    axis = axis % x.ndim
+    x = np.rollaxis(x, axis, x.ndim)
+    lead = x.shape[:-1]
+    nobs = x.shape[-1]
+    x = x.reshape(-1, nobs)
+    if nlags is None or nlags > nobs - 1:
+        # the FFT wraps around beyond the available lags
+        nlags = nobs - 1
+    k_series = x.shape[0]
+    # zero-pad for separability
+    nfft = int(2**np.ceil(np.log2(2 * nobs - 1)))
+    n_block = max(1, min(k_series, block_size // nfft))
+    work = np.zeros((n_block, nfft))
+    acov = np.empty((k_series, nlags + 1))
+    for start in range(0, k_series, n_block):
+        x_block = x[start:start + n_block]
+        n_rows = x_block.shape[0]
+        work[:n_rows, :nobs] = x_block
+        if demean:
+            work[:n_rows, :nobs] -= x_block.mean(1)[:,None]
+        frf = np.fft.rfft(work[:n_rows], axis=1)
+        acov[start:start + n_rows] = np.fft.irfft(frf.real**2 + frf.imag**2,
+                                                  nfft, axis=1)[:,:nlags+1]
+    if unbiased:
+        acov /= nobs - np.arange(nlags + 1)
+    else:
+        acov /= nobs
+    acov = acov.reshape(lead + (nlags + 1,))
+    return np.rollaxis(acov, acov.ndim - 1, axis)
+
+def acf_many(x, unbiased=False, nlags=40, qstat=False, alpha=None, axis=0,
+             block_size=2**22):
+    '''
+    Autocorrelation function for many series
+
+    Parameters
+    ----------
+    x : array
+       Time series data, with time along `axis`.
+    unbiased : bool
+       If True, then denominators for autocovariance are n-k, otherwise n
+    nlags: int, optional
+        Number of lags to return autocorrelation for, at most nobs - 1 as
+        in `acf`.
+    qstat : bool, optional
+        If True, returns the Ljung-Box q statistic for each autocorrelation
+        coefficient.  See q_stat for more information.
+    alpha : scalar, optional
+        If a number is given, the confidence intervals for the given level are
+        returned. For instance if alpha=.05, 95 % confidence intervals are
+        returned where the standard deviation is computed according to
+        Bartlett\'s formula.
+    axis : int
+        The time axis of x.
+    block_size : int
+        Approximate number of elements of the FFT workspace, see acovf_many.
+
+    Returns
+    -------
+    acf : array
+        autocorrelation functions with the lags along `axis`
+    confint : array, optional
+        Confidence intervals for the ACF, with the lower and upper bounds in
+        an additional last axis. Returned if alpha is not None.
+    qstat : array, optional
+        The Ljung-Box Q-Statistic, with the lags along `axis`.  Returned if
+        q_stat is True.
+    pvalues : array, optional
+        The p-values associated with the Q-statistics.  Returned if q_stat is
+        True.
+
+    Notes
+    -----
+    The results for each series are the same as those of `acf`. The acf at
+    lag 0 (ie., 1) is returned.
+
+    See Also
+    --------
+    acf, acovf_many
+    '''
+    x = np.asarray(x)
+    axis = axis % x.ndim
+    nobs = x.shape[axis]
+    avf = acovf_many(x, unbiased=unbiased, demean=True, nlags=nlags,
+                     axis=axis, block_size=block_size)
+    # work with the lags in the last axis
+    avf = np.rollaxis(avf, axis, avf.ndim)
+    acf = avf / avf[...,:1]
+    res = [np.rollaxis(acf, acf.ndim - 1, axis)]
+    if alpha is not None:
+        varacf = np.ones(acf.shape) / nobs
+        varacf[...,0] = 0
+        varacf[...,2:] *= 1 + 2*np.cumsum(acf[...,1:-1]**2, axis=-1)
+        interval = stats.norm.ppf(1-alpha/2.)*np.sqrt(varacf)
+        confint = np.concatenate(((acf - interval)[...,None],
+                                  (acf + interval)[...,None]), axis=-1)
+        res.append(np.rollaxis(confint, confint.ndim - 2, axis))
+    if qstat:
+        qstat, pvalue = q_stat(acf[...,1:], nobs=nobs, axis=-1)  #drop lag 0
+        res.append(np.rollaxis(qstat, qstat.ndim - 1, axis))
+        res.append(np.rollaxis(pvalue, pvalue.ndim - 1, axis))
+    if len(res) == 1:
+        return res[0]
+    return tuple(res)
+
+def pacf_many(x, nlags=40, method='ywunbiased', alpha=None, axis=0,
+              block_size=2**22):
+    '''Partial autocorrelation for many series
+
+    Parameters
+    ----------
+    x : array
+        Time series data, with time along `axis`.
+    nlags : int
+        largest lag for which pacf is returned
+    method : 'ywunbiased' (default) or 'ywmle'
+        specifies which method for the calculations to use:
+
+        - yw or ywunbiased : yule walker with bias correction in denominator
+          for acovf
+        - ywm or ywmle : yule walker without bias correction
+        - ld or ldunbiased : Levinson-Durbin recursion with bias correction,
+          same as yw
+        - ldb or ldbiased : Levinson-Durbin recursion without bias
+          correction, same as ywm
+
+    alpha : scalar, optional
+        If a number is given, the confidence intervals for the given level are
+        returned. For instance if alpha=.05, 95 % confidence intervals are
+        returned where the standard deviation is computed according to
+        1/sqrt(nobs)
+    axis : int
+        The time axis of x.
+    block_size : int
+        Approximate number of elements of the FFT workspace, see acovf_many.
+
+    Returns
+    -------
+    pacf : array
+        partial autocorrelations, including lag zero, with the lags along
+        `axis`
+    confint : array, optional
+        Confidence intervals for the PACF, with the lower and upper bounds in
+        an additional last axis. Returned if alpha is not None.
+
+    Notes
+    -----
+    The autocovariances of all series are computed with acovf_many, and the
+    Yule-Walker equations for all lags are solved by the Levinson-Durbin
+    recursion vectorized over the series. The results for each series are
+    the same as those of `pacf` with the corresponding method.
+
+    See Also
+    --------
+    pacf, levinson_durbin
+    '''
+    if method in ['yw', 'ywu', 'ywunbiased', 'yw_unbiased', 'ld', 'ldu',
+                  'ldunbiase', 'ldunbiased', 'ld_unbiased']:
+        unbiased = True
+    elif method in ['ywm', 'ywmle', 'yw_mle', 'ldb', 'ldbiased', 'ld_biased']:
+        unbiased = False
+    else:
+        raise ValueError('method not available')
+    x = np.asarray(x)
+    axis = axis % x.ndim
+    nobs = x.shape[axis]
+    nlags = min(nlags, nobs - 1)
+    acv = acovf_many(x, unbiased=unbiased, nlags=nlags, axis=axis,
+                     block_size=block_size)
+    acv = np.rollaxis(acv, axis, acv.ndim)
+    lead = acv.shape[:-1]
+    acv = acv.reshape(-1, nlags + 1)
+    # the recursion keeps all coefficients, limit its memory in blocks
+    n_block = max(1, block_size // (nlags + 1)**2)
+    ret = np.empty(acv.shape)
+    for start in range(0, acv.shape[0], n_block):
+        sl = slice(start, start + n_block)
+        ret[sl] = levinson_durbin(acv[sl], nlags=nlags, isacov=True)[2]
+    ret = ret.reshape(lead + (nlags + 1,))
+    if alpha is not None:
+        varacf = 1./nobs
+        interval = stats.norm.ppf(1. - alpha/2.) * np.sqrt(varacf)
+        confint = np.concatenate(((ret - interval)[...,None],
+                                  (ret + interval)[...,None]), axis=-1)
+        return (np.rollaxis(ret, ret.ndim - 1, axis),
+                np.rollaxis(confint, confint.ndim - 2, axis))
+    else:
+        return np.rollaxis(ret, ret.ndim - 1, axis)
+
+
 def ccovf(x, y, unbiased=True, demean=True):
     ''' crosscovariance for 1D
 
@@ -668,7 +1160,10 @@ def levinson_durbin(s, nlags=10, isacov=False):
     ----------
     s : array_like
         If isacov is False, then this is the time series. If iasacov is true
-        then this is interpreted as autocovariance starting with lag 0
+        then this is interpreted as autocovariance starting with lag 0. The
+        autocovariances can be an array with the lags in the last axis, then
+        the recursion is computed for all series at once and the results
+        have the same leading dimensions.
     nlags : integer
         largest lag to include in recursion or order of the autoregressive
         process
@@ -712,21 +1207,27 @@ def levinson_durbin(s, nlags=10, isacov=False):
     else:
         sxx_m = acovf(s)[:order+1]  #not tested
 
-    phi = np.zeros((order+1, order+1), 'd')
-    sig = np.zeros(order+1)
+    lead = sxx_m.shape[:-1]
+    phi = np.zeros(lead + (order+1, order+1), 'd')
+    sig = np.zeros(lead + (order+1,))
+    if order == 0:
+        # no AR coefficients, the innovation variance is the variance
+        pacf_ = np.ones(lead + (1,))
+        return sxx_m[...,0].copy(), phi[...,1:,-1], pacf_, sig, phi
     # initial points for the recursion
-    phi[1,1] = sxx_m[1]/sxx_m[0]
-    sig[1] = sxx_m[0] - phi[1,1]*sxx_m[1]
+    phi[...,1,1] = sxx_m[...,1]/sxx_m[...,0]
+    sig[...,1] = sxx_m[...,0] - phi[...,1,1]*sxx_m[...,1]
     for k in xrange(2,order+1):
-        phi[k,k] = (sxx_m[k] - np.dot(phi[1:k,k-1], sxx_m[1:k][::-1]))/sig[k-1]
-        for j in xrange(1,k):
-            phi[j,k] = phi[j,k-1] - phi[k,k]*phi[k-j,k-1]
-        sig[k] = sig[k-1]*(1 - phi[k,k]**2)
-
-    sigma_v = sig[-1]
-    arcoefs = phi[1:,-1]
-    pacf_ = np.diag(phi).copy()
-    pacf_[0] = 1.
+        phi[...,k,k] = (sxx_m[...,k] - (phi[...,1:k,k-1] *
+                        sxx_m[...,k-1:0:-1]).sum(-1))/sig[...,k-1]
+        phi[...,1:k,k] = (phi[...,1:k,k-1] -
+                          phi[...,k,k,None]*phi[...,k-1:0:-1,k-1])
+        sig[...,k] = sig[...,k-1]*(1 - phi[...,k,k]**2)
+
+    sigma_v = sig[...,-1]
+    arcoefs = phi[...,1:,-1]
+    pacf_ = np.diagonal(phi, axis1=-2, axis2=-1).copy()
+    pacf_[...,0] = 1.
     return sigma_v, arcoefs, pacf_, sig, phi  #return everything
 
 
@@ -852,6 +1353,131 @@ def grangercausalitytests(x, maxlag, addconst=True, verbose=True):
 
     return resli
 
+def _granger_job(x, targets, maxlag, addconst):
+    """
+    Restricted and unrestricted ssr of the Granger causality regressions.
+
+    For each lag length, the lags of all series and their cross products
+    are computed once. For each target the regression on its own lags is
+    factorized once, and the cross products of the lags of all candidate
+    causes, projected on its orthogonal complement, are obtained by a low
+    rank update.
+
+    Returns
+    -------
+    ssr_restricted : ndarray, (len(targets), maxlag)
+    ssr_unrestricted : ndarray, (len(targets), k_vars, maxlag)
+    """
+    nobs, k_vars = x.shape
+    ssr_restricted = np.empty((len(targets), maxlag))
+    ssr_unrestricted = np.empty((len(targets), k_vars, maxlag))
+    for mxlg in range(1, maxlag + 1):
+        n = nobs - mxlg
+        # lags 1 to mxlg of all series in the sample of lagmat2ds
+        xlags = np.empty((n, k_vars, mxlg))
+        for lag in range(1, mxlg + 1):
+            xlags[:,:,lag-1] = x[mxlg-lag:nobs-lag]
+        xlags_flat = xlags.reshape(n, k_vars * mxlg)
+        gram_lags = np.einsum('nkl,nkm->klm', xlags, xlags)
+        for ii, i in enumerate(targets):
+            endog = x[mxlg:, i]
+            own = xlags[:,i,:]
+            if addconst:
+                own = np.column_stack((own, np.ones(n)))
+            q = np.linalg.qr(own)[0]
+            resid = endog - np.dot(q, np.dot(q.T, endog))
+            # cross products of the lags of each cause after projecting out
+            # the own lags, the residuals are already orthogonal to them
+            qw = np.dot(q.T, xlags_flat).reshape(-1, k_vars, mxlg)
+            gram = gram_lags - np.einsum('akl,akm->klm', qw, qw)
+            wresid = np.dot(resid, xlags_flat).reshape(k_vars, mxlg)
+            # explained sum of squares of the projected lags of each cause
+            # with an eigen decomposition to allow for singular regressors
+            evals, evecs = np.linalg.eigh(gram)
+            proj = np.einsum('klm,kl->km', evecs, wresid)
+            valid = evals > 1e-10 * np.abs(evals).max(1)[:,None]
+            ess = (np.where(valid, proj, 0)**2 /
+                   np.where(valid, evals, 1)).sum(1)
+            ssr_restricted[ii, mxlg-1] = np.dot(resid, resid)
+            ssr_unrestricted[ii, :, mxlg-1] = ssr_restricted[ii, mxlg-1] - ess
+    return ssr_restricted, ssr_unrestricted
+
+def grangercausalitytests_many(x, maxlag, addconst=True, n_jobs=1):
+    '''Granger non causality tests for all pairs of time series
+
+    Parameters
+    ----------
+    x : array, 2d, (nobs, k_vars)
+        data with the time series in columns
+    maxlag : integer
+        the Granger causality test results are calculated for all lags up to
+        maxlag
+    addconst : bool
+        If True, a constant is included in the regressions.
+    n_jobs : int
+        Number of worker processes. If not 1, the targets are split among
+        the workers with `tools.parallel.parallel_func`, -1 uses all cores.
+
+    Returns
+    -------
+    results : structured ndarray, (k_vars, k_vars, maxlag)
+        results[i, j, lag - 1] are the tests whether series j Granger causes
+        series i with `lag` lags. The fields are 'ssr_ftest',
+        'ssr_ftest_pvalue', 'ssr_chi2test', 'ssr_chi2test_pvalue', 'lrtest'
+        and 'lrtest_pvalue'. The tests of a series on itself are nan.
+
+    Notes
+    -----
+    The test statistics are the same as those of `grangercausalitytests`
+    for the pair x[:, [i, j]]. The F test has `lag` and
+    nobs - lag - 2 * lag - addconst degrees of freedom, the chi-square tests
+    have `lag` degrees of freedom.
+
+    For each lag length the lag matrix of all series is built once, and for
+    each target the regression on its own lags is factorized once and shared
+    by all candidate causes.
+
+    See Also
+    --------
+    grangercausalitytests
+    '''
+    x = np.asarray(x, dtype=float)
+    nobs, k_vars = x.shape
+    if n_jobs == 1:
+        ssr_r, ssr_u = _granger_job(x, range(k_vars), maxlag, addconst)
+    else:
+        from statsmodels.tools.parallel import parallel_func
+        parallel, p_func, n_jobs = parallel_func(_granger_job,
+                                                 n_jobs=n_jobs, verbose=0)
+        chunks = [c for c in np.array_split(np.arange(k_vars), n_jobs)
+                  if len(c)]
+        out = parallel(p_func(x, c, maxlag, addconst) for c in chunks)
+        ssr_r = np.concatenate([o[0] for o in out])
+        ssr_u = np.concatenate([o[1] for o in out])
+
+    lags = np.arange(1, maxlag + 1)
+    n = nobs - lags
+    df_resid = n - 2 * lags - int(bool(addconst))
+    ssr_r = ssr_r[:,None,:]
+    names = ['ssr_ftest', 'ssr_ftest_pvalue', 'ssr_chi2test',
+             'ssr_chi2test_pvalue', 'lrtest', 'lrtest_pvalue']
+    results = np.empty((k_vars, k_vars, maxlag),
+                       dtype=[(name, float) for name in names])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fgc1 = (ssr_r - ssr_u) / ssr_u / lags * df_resid
+        fgc2 = n * (ssr_r - ssr_u) / ssr_u
+        lr = n * np.log(ssr_r / ssr_u)
+        for stat in [fgc1, fgc2, lr]:
+            stat[np.arange(k_vars), np.arange(k_vars)] = np.nan
+
+        results['ssr_ftest'] = fgc1
+        results['ssr_ftest_pvalue'] = stats.f.sf(fgc1, lags, df_resid)
+        results['ssr_chi2test'] = fgc2
+        results['ssr_chi2test_pvalue'] = stats.chi2.sf(fgc2, lags)
+        results['lrtest'] = lr
+        results['lrtest_pvalue'] = stats.chi2.sf(lr, lags)
+    return results
+
 def coint(y1, y2, regression="c"):
     """
     This is a simple cointegration test. Uses unit-root test on residuals to
@@ -47,3 +47,50 @@ def test_adf_autolag():
     adf3 = tsast.adfuller(x, maxlag=0, autolag='aic',
                           regression=tr, store=True, regresults=True)
     assert_equal(len(adf3[-1].autolag_results), 0 + 1)
+
+
+def test_autolag_nested():
+    # information criteria and t-stat of all lags from one QR decomposition
+    # agree with the OLS loop in _autolag
+    from statsmodels.regression.linear_model import OLS
+    x = np.log(macrodata.load().data['realgdp'])
+    xdiff = np.diff(x)
+    xdall = tsast.lagmat(xdiff[:,None], 12, trim='both', original='in')
+    nobs = xdall.shape[0]
+    xdall[:,0] = x[-nobs-1:-1]
+    exog = tsast.add_trend(xdall, 'ct', prepend=True)
+    for method in ['aic', 'bic', 't-stat']:
+        icbest, bestlag, full_rank = tsast._autolag_nested(xdiff[-nobs:],
+                                                exog, 3, 12, method)
+        res = tsast._autolag(OLS, xdiff[-nobs:], exog, 3, 12, method,
+                             regresults=True)
+        assert_equal(full_rank, True)
+        assert_equal(bestlag, res[1])
+        assert_almost_equal(icbest, res[0], decimal=10)
+
+    ssr, tvalues, full_rank = tsast._nested_ols(xdiff[-nobs:], exog)
+    for k in [1, 4, 10]:
+        res = OLS(xdiff[-nobs:], exog[:,:k]).fit()
+        assert_almost_equal(ssr[k-1], res.ssr, decimal=12)
+        assert_almost_equal(tvalues[k-1], res.tvalues[-1], decimal=10)
+
+
+def test_adfuller_many():
+    d2 = macrodata.load().data
+    x = np.column_stack((np.log(d2['realgdp']), d2['infl'], d2['unemp'],
+                         np.ones(len(d2))))
+    for tr in ['nc', 'c', 'ct', 'ctt']:
+        for autolag in ['AIC', 'BIC', 't-stat', None]:
+            res = tsast.adfuller_many(x, maxlag=8, regression=tr,
+                                      autolag=autolag)
+            for i in range(x.shape[1]):
+                res1 = tsast.adfuller(x[:,i], maxlag=8, regression=tr,
+                                      autolag=autolag)
+                assert_almost_equal(res[0][i], res1[0], decimal=10)
+                assert_almost_equal(res[1][i], res1[1], decimal=10)
+                assert_equal(res[2][i], res1[2])
+                assert_equal(res[3][i], res1[3])
+                assert_almost_equal(res[4]['5%'][i], res1[4]['5%'],
+                                    decimal=12)
+                if autolag is not None:
+                    assert_almost_equal(res[5][i], res1[5], decimal=10)
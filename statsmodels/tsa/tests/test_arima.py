@@ -4,11 +4,13 @@ from numpy.testing import (assert_almost_equal, assert_equal, assert_,
 import statsmodels.sandbox.tsa.fftarma as fa
 from statsmodels.tsa.descriptivestats import TsaDescriptive
 from statsmodels.tsa.arma_mle import Arma
-from statsmodels.tsa.arima_model import ARMA, ARIMA
+from statsmodels.tsa.arima_model import (ARMA, ARIMA, arima_select_order,
+                                         arma_fit_rolling)
 from statsmodels.tsa.base.datetools import dates_from_range
 from results import results_arma, results_arima
 import os
 from statsmodels.tsa.base import datetools
+from statsmodels.tsa.kalmanf import ARMAFilterState
 from statsmodels.tsa.arima_process import arma_generate_sample
 import pandas
 try:
@@ -1794,6 +1796,147 @@ def test_bad_start_params():
     arima_mod = ARIMA(np.log(inv), (1,1,2))
     assert_raises(ValueError, mod.fit)
 
+def test_kalman_backends():
+    np.random.seed(1234)
+    endog = arma_generate_sample([1, -.75, .2], [1, .4, .3], 250) + 2.
+    mod = ARMA(endog, (2, 2))
+    res = mod.fit(method="mle", disp=-1)
+    params = res.params
+    mod.transparams = False
+    llf_fast = mod.loglike_kalman(params)
+    sigma2_fast = mod.sigma2
+    mod.kalman_backend = "numpy"
+    llf_numpy = mod.loglike_kalman(params)
+    assert_almost_equal(llf_fast, llf_numpy, 10)
+    assert_almost_equal(sigma2_fast, mod.sigma2, 12)
+    mod.kalman_backend = "bad"
+    assert_raises(ValueError, mod.loglike_kalman, params)
+
+    # steady state switch in the filter
+    y = endog - params[0]
+    from statsmodels.tsa.kalmanf import KalmanFilter
+    R = KalmanFilter.R(params, 3, 1, 2, 2)
+    T = KalmanFilter.T(params, 3, 1, 2)
+    v, F, llf = kalman_loglike.kalman_filter_fast(y, R, T)
+    v2, F2, llf2 = kalman_loglike.kalman_filter_double(y, 1, 2, 2, 3,
+                                len(y), np.eye(1, 3), R, T)
+    assert_almost_equal(v, v2.squeeze(), 10)
+    assert_almost_equal(F, F2.squeeze(), 10)
+    assert_almost_equal(llf, llf2.item(), 10)
+    v3, F3, llf3 = kalman_loglike.kalman_filter_fast(y, R, T, tol=1e-8)
+    assert_almost_equal(v3, v, 6)
+    assert_equal(F3[-1], 1.)
+
+
+def test_analytic_score():
+    np.random.seed(1234)
+    endog = arma_generate_sample([1, -.75, .2], [1, .4, .3], 250) + 2.
+    exog = np.random.randn(250)
+    endog += .5 * exog
+    mod = ARMA(endog, (2, 2), exog=exog)
+    res = mod.fit(method="mle", disp=-1)
+
+    params = res.params + .01
+    for transparams in [False, True]:
+        mod.transparams = transparams
+        mod.kalman_backend = "fast"
+        score = mod.score(params)
+        hess = mod.hessian(params)
+        mod.kalman_backend = "numpy"
+        assert_almost_equal(score, mod.score(params), 6)
+        assert_almost_equal(hess, mod.hessian(params), 3)
+    mod.kalman_backend = "fast"
+    mod.transparams = False
+
+    # fit with and without analytic gradient agree
+    res_numpy = ARMA(endog, (2, 2), exog=exog)
+    res_numpy.kalman_backend = "numpy"
+    res_numpy = res_numpy.fit(method="mle", disp=-1)
+    assert_almost_equal(res.params, res_numpy.params, 4)
+    assert_almost_equal(res.bse, res_numpy.bse, 4)
+
+
+def test_select_order():
+    np.random.seed(12345)
+    y = arma_generate_sample([1, -.75], [1, .35], nsample=250)
+    table, res = arima_select_order(y, 2, 2, d=[0, 1])
+    assert_equal(len(table), 18)
+    best = table.ix[table.aic.idxmin()]
+    assert_equal(res.k_ar, best['p'])
+    assert_equal(getattr(res, 'k_diff', 0), best['d'])
+    assert_equal(res.k_ma, best['q'])
+    assert_almost_equal(res.aic, best['aic'], 4)
+
+    # every successful fit agrees with the individual model
+    ok = table[table.status == 'ok']
+    assert_(len(ok) > 12)
+    for _, row in ok.iloc[::3].iterrows():
+        res_i = ARIMA(y, (row['p'], row['d'], row['q'])).fit(disp=-1)
+        assert_almost_equal(row['aic'], res_i.aic, 4)
+        assert_almost_equal(row['hqic'], res_i.hqic, 4)
+    # failed fits are recorded
+    failed = table[table.status.str.startswith('failed')]
+    assert_(np.isnan(failed['aic']).all())
+    res_best = ARIMA(y, (best['p'], best['d'], best['q'])).fit(disp=-1)
+    assert_almost_equal(res.params, res_best.params, 4)
+
+    # pruning keeps the best model
+    table_p, res_p = arima_select_order(y, 2, 2, d=[0, 1], prune=2.)
+    assert_((table_p.status == 'pruned').any())
+    assert_almost_equal(res_p.params, res.params, 6)
+
+    # several series, one in each column
+    y2 = np.column_stack((y, np.cumsum(y)))
+    index = pandas.date_range('1990-01-31', periods=250, freq='M')
+    y2 = pandas.DataFrame(y2, columns=['a', 'b'], index=index)
+    table2, res2 = arima_select_order(y2, 1, 1, d=1, ic='bic', trend='nc')
+    assert_equal(len(res2), 2)
+    assert_equal(list(table2.series.unique()), ['a', 'b'])
+    assert_equal(res2[1].model.k_diff, 1)
+    assert_raises(ValueError, arima_select_order, y, ic='sic')
+
+
+def test_arma_fit_rolling():
+    np.random.seed(12345)
+    y = arma_generate_sample([1, -.75], [1, .35], nsample=300) + 1.
+    exog = np.random.randn(303)
+    y += .5 * exog[:300]
+
+    out = list(arma_fit_rolling(y, (1, 1), 280, exog=exog, steps=3,
+                                method='mle'))
+    assert_equal(len(out), 21)
+    t, params, fcast, stderr = out[-1]
+    assert_equal(t, 300)
+    res = ARMA(y, (1, 1), exog=exog[:300]).fit(method='mle', disp=-1)
+    assert_almost_equal(params, res.params, 4)
+    const, beta, ar, ma = res.params
+    u = y - const - beta * exog[:300]
+    fcast1 = const + beta * exog[300] + ar * u[-1] + ma * res.resid[-1]
+    assert_almost_equal(fcast[0], fcast1, 4)
+
+    t, params, fcast, stderr = list(arma_fit_rolling(y, (1, 1), 300, steps=3,
+                                                     method='mle'))[0]
+    res = ARMA(y, (1, 1)).fit(method='mle', disp=-1)
+    fcast2, stderr2, _ = res.forecast(3)
+    assert_almost_equal(fcast, fcast2, 4)
+    assert_almost_equal(stderr, stderr2, 4)
+
+    # appending to the filter state is the same as filtering again
+    out_fixed = list(arma_fit_rolling(y, (1, 1), 280, exog=exog,
+                                      refit_every=100, method='mle'))
+    t0, params0 = out_fixed[0][:2]
+    assert_equal(out_fixed[-1][1], params0)
+    for t, params, fcast, stderr in out_fixed[::5]:
+        X = np.column_stack((np.ones(t + 1), exog[:t+1]))
+        state = ARMAFilterState(params0, 1, 1, 2).update(y[:t], X[:t])
+        assert_almost_equal(fcast, state.forecast(1, X[t:])[0], 10)
+
+    # rolling window
+    out_w = list(arma_fit_rolling(y, (1, 0), 280, window=100, trend='nc'))
+    res_w = ARMA(y[-101:-1], (1, 0)).fit(trend='nc', disp=-1)
+    assert_almost_equal(out_w[-2][1], res_w.params, 4)
+
+
 if __name__ == "__main__":
     import nose
     nose.runmodule(argv=[__file__, '-vvs', '-x', '--pdb'], exit=False)
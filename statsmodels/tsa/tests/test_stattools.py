@@ -1,6 +1,9 @@
 from statsmodels.tsa.stattools import (adfuller, acf, pacf_ols, pacf_yw,
                                                pacf, grangercausalitytests,
-                                               coint, acovf)
+                                               coint, acovf, acovf_many,
+                                               acf_many, pacf_many, q_stat,
+                                               levinson_durbin,
+                                               grangercausalitytests_many)
 from statsmodels.tsa.base.datetools import dates_from_range
 import numpy as np
 from numpy.testing import assert_almost_equal, assert_equal, assert_raises
@@ -228,6 +231,27 @@ def test_grangercausality():
     assert_almost_equal(gr[2][0]['params_ftest'], gr[2][0]['ssr_ftest'],
                         decimal=7)
 
+def test_grangercausality_many():
+    mdata = macrodata.load().data
+    data = np.column_stack((mdata['realgdp'], mdata['realcons'],
+                            mdata['realinv']))
+    data = np.diff(np.log(data), axis=0)
+    res = grangercausalitytests_many(data, 3)
+    assert_equal(res.shape, (3, 3, 3))
+    assert_equal(np.isnan(res['ssr_ftest'][[0, 1, 2], [0, 1, 2]]), True)
+    for i, j in [(0, 1), (1, 0), (2, 1), (0, 2)]:
+        gr = grangercausalitytests(data[:,[i, j]], 3, verbose=False)
+        for lag in range(1, 4):
+            for test in ['ssr_ftest', 'ssr_chi2test', 'lrtest']:
+                assert_almost_equal(res[test][i, j, lag-1],
+                                    gr[lag][0][test][0], decimal=8)
+                assert_almost_equal(res[test + '_pvalue'][i, j, lag-1],
+                                    gr[lag][0][test][1], decimal=10)
+    # the targets are split among the jobs
+    res2 = grangercausalitytests_many(data, 3, n_jobs=2)
+    for name in res.dtype.names:
+        assert_almost_equal(res2[name], res[name], decimal=13)
+
 def test_pandasacovf():
     s = Series(range(1, 11))
     assert_almost_equal(acovf(s), acovf(s.values))
@@ -241,6 +265,76 @@ def test_acovf2d():
     X = np.random.random((10,2))
     assert_raises(ValueError, acovf, X)
 
+def test_acf_many():
+    mdata = macrodata.load().data
+    x = np.diff(np.column_stack((mdata['realgdp'], mdata['infl'],
+                                 mdata['unemp'])), axis=0)
+    for unbiased in [False, True]:
+        acov = acovf_many(x, unbiased=unbiased, nlags=10)
+        res = acf_many(x.T, unbiased=unbiased, nlags=10, qstat=True,
+                       alpha=.05, axis=1)
+        assert_equal(acov.shape, (11, 3))
+        assert_equal(res[1].shape, (3, 11, 2))
+        for i in range(3):
+            assert_almost_equal(acov[:,i],
+                                acovf(x[:,i], unbiased=unbiased)[:11], 10)
+            res1 = acf(x[:,i], unbiased=unbiased, nlags=10, qstat=True,
+                       alpha=.05)
+            for j in range(4):
+                assert_almost_equal(res[j][i], res1[j], 10)
+
+    # nlags is clipped to nobs - 1 as in acf
+    x_short = x[:30]
+    for unbiased in [False, True]:
+        acov = acovf_many(x_short, unbiased=unbiased, nlags=40)
+        res = acf_many(x_short, unbiased=unbiased, nlags=40)
+        assert_equal(acov.shape, (30, 3))
+        assert_equal(res.shape, (30, 3))
+        for i in range(3):
+            assert_almost_equal(acov[:,i],
+                                acovf(x_short[:,i], unbiased=unbiased), 10)
+            assert_almost_equal(res[:,i], acf(x_short[:,i], nlags=40,
+                                              unbiased=unbiased), 10)
+    assert_equal(pacf_many(x_short, nlags=40).shape, (30, 3))
+
+
+def test_pacf_many():
+    mdata = macrodata.load().data
+    x = np.diff(np.column_stack((mdata['realgdp'], mdata['infl'],
+                                 mdata['unemp'])), axis=0)
+    for method in ['ywunbiased', 'ywmle', 'ldb']:
+        # small block size to check the blocks
+        res = pacf_many(x, nlags=8, method=method, alpha=.05, block_size=200)
+        for i in range(3):
+            res1 = pacf(x[:,i], nlags=8, method=method, alpha=.05)
+            assert_almost_equal(res[0][:,i], res1[0], 10)
+            assert_almost_equal(res[1][:,i], res1[1], 10)
+    assert_raises(ValueError, pacf_many, x, method='ols')
+
+    # no lags, only the pacf at lag 0
+    assert_equal(pacf(x[:,0], nlags=0), [1.])
+    assert_equal(pacf_yw(x[:,0], nlags=0), [1.])
+    assert_equal(pacf_many(x, nlags=0), np.ones((1, 3)))
+
+    # batched Levinson-Durbin
+    acov = acovf_many(x, nlags=8).T
+    res = levinson_durbin(acov, nlags=8, isacov=True)
+    for i in range(3):
+        res1 = levinson_durbin(acov[i], nlags=8, isacov=True)
+        for j in range(5):
+            assert_almost_equal(res[j][i], res1[j], 12)
+
+
+def test_qstat_axis():
+    acfs = np.random.uniform(-.3, .3, size=(10, 4))
+    q, pvalue = q_stat(acfs, 100, axis=0)
+    q2, pvalue2 = q_stat(acfs.T, 100, axis=1)
+    for i in range(4):
+        q1, pvalue1 = q_stat(acfs[:,i], 100)
+        assert_almost_equal(q[:,i], q1, 13)
+        assert_almost_equal(pvalue2[i], pvalue1, 13)
+
+
 if __name__=="__main__":
     import nose
 #    nose.runmodule(argv=[__file__, '-vvs','-x','-pdb'], exit=False)